@@ -0,0 +1,105 @@
+# app/data/aggregates.py
+"""
+Günlük özet tabloları (materialized aggregate). sales ve cash_ledger'a yapılan her
+INSERT/UPDATE/DELETE tetikleyicilerle aynı işlem içinde özet satırına yansır; böylece
+günlük/aylık/yıllık KPI'lar ham satırları değil gün sayısı kadar özet satırı okur.
+
+Yeniden kurma (app/ klasöründen):  python -m data.aggregates [orbitx.db]
+"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS daily_sales_agg(
+  date TEXT NOT NULL, type TEXT NOT NULL, pay_type TEXT NOT NULL,
+  n INTEGER NOT NULL DEFAULT 0,
+  total_kurus INTEGER NOT NULL DEFAULT 0,
+  paid_kurus INTEGER NOT NULL DEFAULT 0,
+  due_kurus INTEGER NOT NULL DEFAULT 0,
+  discount_kurus INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY(date, type, pay_type)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS daily_cash_agg(
+  date TEXT NOT NULL, account TEXT NOT NULL, type TEXT NOT NULL,
+  n INTEGER NOT NULL DEFAULT 0,
+  amount_kurus INTEGER NOT NULL DEFAULT 0,
+  PRIMARY KEY(date, account, type)
+) WITHOUT ROWID;
+"""
+
+# Tetikleyici gövdeleri: (+) satırı ekler, (-) satırı düşer; UPDATE = (-) eski, (+) yeni
+_SALES_ADD = """
+  INSERT INTO daily_sales_agg(date, type, pay_type, n, total_kurus, paid_kurus, due_kurus, discount_kurus)
+  VALUES (NEW.date, NEW.type, COALESCE(NEW.pay_type, ''), 1,
+          NEW.total_kurus, NEW.paid_kurus, NEW.due_kurus, NEW.discount_kurus)
+  ON CONFLICT(date, type, pay_type) DO UPDATE SET
+    n = n + 1,
+    total_kurus = total_kurus + excluded.total_kurus,
+    paid_kurus = paid_kurus + excluded.paid_kurus,
+    due_kurus = due_kurus + excluded.due_kurus,
+    discount_kurus = discount_kurus + excluded.discount_kurus;
+"""
+_SALES_SUB = """
+  UPDATE daily_sales_agg SET
+    n = n - 1,
+    total_kurus = total_kurus - OLD.total_kurus,
+    paid_kurus = paid_kurus - OLD.paid_kurus,
+    due_kurus = due_kurus - OLD.due_kurus,
+    discount_kurus = discount_kurus - OLD.discount_kurus
+  WHERE date = OLD.date AND type = OLD.type AND pay_type = COALESCE(OLD.pay_type, '');
+  DELETE FROM daily_sales_agg
+  WHERE date = OLD.date AND type = OLD.type AND pay_type = COALESCE(OLD.pay_type, '') AND n <= 0;
+"""
+_CASH_ADD = """
+  INSERT INTO daily_cash_agg(date, account, type, n, amount_kurus)
+  VALUES (NEW.date, NEW.account, NEW.type, 1, NEW.amount_kurus)
+  ON CONFLICT(date, account, type) DO UPDATE SET
+    n = n + 1, amount_kurus = amount_kurus + excluded.amount_kurus;
+"""
+_CASH_SUB = """
+  UPDATE daily_cash_agg SET n = n - 1, amount_kurus = amount_kurus - OLD.amount_kurus
+  WHERE date = OLD.date AND account = OLD.account AND type = OLD.type;
+  DELETE FROM daily_cash_agg
+  WHERE date = OLD.date AND account = OLD.account AND type = OLD.type AND n <= 0;
+"""
+
+TRIGGERS = f"""
+CREATE TRIGGER IF NOT EXISTS trg_sales_agg_ins AFTER INSERT ON sales BEGIN {_SALES_ADD} END;
+CREATE TRIGGER IF NOT EXISTS trg_sales_agg_del AFTER DELETE ON sales BEGIN {_SALES_SUB} END;
+CREATE TRIGGER IF NOT EXISTS trg_sales_agg_upd
+AFTER UPDATE OF date, type, pay_type, total_kurus, paid_kurus, due_kurus, discount_kurus ON sales
+BEGIN {_SALES_SUB} {_SALES_ADD} END;
+
+CREATE TRIGGER IF NOT EXISTS trg_cash_agg_ins AFTER INSERT ON cash_ledger BEGIN {_CASH_ADD} END;
+CREATE TRIGGER IF NOT EXISTS trg_cash_agg_del AFTER DELETE ON cash_ledger BEGIN {_CASH_SUB} END;
+CREATE TRIGGER IF NOT EXISTS trg_cash_agg_upd
+AFTER UPDATE OF date, account, type, amount_kurus ON cash_ledger
+BEGIN {_CASH_SUB} {_CASH_ADD} END;
+"""
+
+
+def rebuild(cx):
+    """Özet tablolarını ham tablolardan sıfırdan hesaplar (açık bir işlem içinde çağrılmalı)."""
+    cx.execute("DELETE FROM daily_sales_agg")
+    cx.execute("""
+        INSERT INTO daily_sales_agg(date, type, pay_type, n, total_kurus, paid_kurus, due_kurus, discount_kurus)
+        SELECT date, type, COALESCE(pay_type, ''), COUNT(*),
+               SUM(total_kurus), SUM(paid_kurus), SUM(due_kurus), SUM(discount_kurus)
+        FROM sales GROUP BY 1, 2, 3""")
+    cx.execute("DELETE FROM daily_cash_agg")
+    cx.execute("""
+        INSERT INTO daily_cash_agg(date, account, type, n, amount_kurus)
+        SELECT date, account, type, COUNT(*), SUM(amount_kurus)
+        FROM cash_ledger GROUP BY 1, 2, 3""")
+
+
+if __name__ == "__main__":
+    import sys, time
+    from .db import DB
+
+    db = DB(sys.argv[1] if len(sys.argv) > 1 else "orbitx.db")
+    t0 = time.perf_counter()
+    with db.tx() as cx:
+        rebuild(cx)
+    days = db.query_one("SELECT COUNT(DISTINCT date) FROM daily_sales_agg")[0]
+    print(f"✓ Özet tabloları yeniden kuruldu ({days} gün, {time.perf_counter() - t0:.2f} sn)")
+    db.close()
@@ -0,0 +1,118 @@
+# app/data/balances.py
+"""
+Hesap bakiyesi kontrol noktaları: her hesabın hareket olan her günü için gün sonu bakiyesi (kuruş).
+Tarihteki bakiye = o tarihe kadarki son kontrol noktası + sonraki günlerin daily_cash_agg özeti;
+kontrol noktaları güncelse ikinci kısım o günün (ya da birkaç günün) özet satırıdır, defter taranmaz.
+
+- kontrol noktaları pencere fonksiyonuyla hesaplanır: SUM(günlük net) OVER (PARTITION BY hesap ORDER BY gün)
+- cash_ledger'a her yazım (ekle/düzelt/sil) tetikleyiciyle yalnızca o hesabın o tarih ve sonrasındaki
+  kontrol noktalarını siler, cash_balance_state'e en erken kirli tarihi yazar
+- refresh() kirli hesapları son geçerli kontrol noktasından ileri yeniden hesaplar (aynı işlemde çağrılmalı)
+
+Yeniden kurma (app/ klasöründen):  python -m data.balances [orbitx.db]
+"""
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cash_balance_ckpt(
+  account TEXT NOT NULL, date TEXT NOT NULL,
+  balance_kurus INTEGER NOT NULL,             -- gün sonu bakiyesi
+  PRIMARY KEY(account, date)
+) WITHOUT ROWID;
+
+-- Hesap listesi + kirli işareti: dirty_since ve sonrası için kontrol noktası yok (NULL: güncel)
+CREATE TABLE IF NOT EXISTS cash_balance_state(
+  account TEXT PRIMARY KEY,
+  dirty_since TEXT
+) WITHOUT ROWID;
+
+-- Kontrol noktasından sonraki günlerin özeti: hesap + gün aralığı
+CREATE INDEX IF NOT EXISTS idx_cash_agg_account_date ON daily_cash_agg(account, date);
+"""
+
+# Günlük net (giriş − çıkış); özet ve defter satırları için aynı ifade
+NET = "CASE WHEN {0}type = 'Giriş' THEN {0}amount_kurus WHEN {0}type = 'Çıkış' THEN -{0}amount_kurus ELSE 0 END"
+
+# Tetikleyici gövdesi: ROW = NEW (ekle/düzelt) ya da OLD (sil/düzelt)
+_INVALIDATE = """
+  DELETE FROM cash_balance_ckpt WHERE account = {row}.account AND date >= {row}.date;
+  INSERT INTO cash_balance_state(account, dirty_since) VALUES ({row}.account, {row}.date)
+  ON CONFLICT(account) DO UPDATE SET dirty_since = MIN(COALESCE(dirty_since, excluded.dirty_since), excluded.dirty_since);
+"""
+
+TRIGGERS = f"""
+CREATE TRIGGER IF NOT EXISTS trg_cash_ckpt_ins AFTER INSERT ON cash_ledger
+BEGIN {_INVALIDATE.format(row="NEW")} END;
+CREATE TRIGGER IF NOT EXISTS trg_cash_ckpt_del AFTER DELETE ON cash_ledger
+BEGIN {_INVALIDATE.format(row="OLD")} END;
+CREATE TRIGGER IF NOT EXISTS trg_cash_ckpt_upd AFTER UPDATE OF date, account, type, amount_kurus ON cash_ledger
+BEGIN {_INVALIDATE.format(row="OLD")} {_INVALIDATE.format(row="NEW")} END;
+"""
+
+# Bu kadar özet satırı toplanarak okunan bakiye "bayat" sayılır → çağıran refresh() planlar
+REFRESH_ROWS = 64
+
+
+def rebuild(cx):
+    """Kontrol noktalarını daily_cash_agg'den sıfırdan hesaplar (açık bir işlem içinde çağrılmalı)."""
+    cx.execute("DELETE FROM cash_balance_ckpt")
+    cx.execute("DELETE FROM cash_balance_state")
+    cx.execute("INSERT INTO cash_balance_state(account) SELECT DISTINCT account FROM daily_cash_agg")
+    cx.execute(f"""
+        INSERT INTO cash_balance_ckpt(account, date, balance_kurus)
+        SELECT account, date, SUM(SUM({NET.format('')})) OVER (PARTITION BY account ORDER BY date)
+        FROM daily_cash_agg GROUP BY account, date""")
+
+
+def refresh(cx) -> int:
+    """Kirli hesapların kontrol noktalarını kirli tarihten ileri yeniden hesaplar; yenilenen hesap sayısı."""
+    dirty = cx.execute("SELECT account, dirty_since FROM cash_balance_state WHERE dirty_since IS NOT NULL").fetchall()
+    for account, since in dirty:
+        prev = cx.execute("SELECT balance_kurus FROM cash_balance_ckpt WHERE account = ? AND date < ? "
+                          "ORDER BY date DESC LIMIT 1", (account, since)).fetchone()
+        cx.execute("DELETE FROM cash_balance_ckpt WHERE account = ? AND date >= ?", (account, since))
+        cx.execute(f"""
+            INSERT INTO cash_balance_ckpt(account, date, balance_kurus)
+            SELECT account, date, ? + SUM(SUM({NET.format('')})) OVER (ORDER BY date)
+            FROM daily_cash_agg WHERE account = ? AND date >= ? GROUP BY date""",
+                   (prev[0] if prev else 0, account, since))
+    if dirty:
+        cx.execute("UPDATE cash_balance_state SET dirty_since = NULL WHERE dirty_since IS NOT NULL")
+    return len(dirty)
+
+
+def as_of(cx, date: str) -> list[dict]:
+    """Her hesabın date günü sonundaki bakiyesi: [{"account", "balance_kurus", "stale"}]; tek sorgu.
+    stale: kontrol noktasından sonra toplanan özet satırı sayısı (REFRESH_ROWS'u aşarsa refresh() zamanı)."""
+    rows = cx.execute(f"""
+        SELECT s.account, COALESCE(k.balance_kurus, 0) + COALESCE(SUM({NET.format('g.')}), 0), COUNT(g.date)
+        FROM cash_balance_state s
+        LEFT JOIN cash_balance_ckpt k ON k.account = s.account
+             AND k.date = (SELECT MAX(date) FROM cash_balance_ckpt WHERE account = s.account AND date <= :d)
+        LEFT JOIN daily_cash_agg g ON g.account = s.account AND g.date > COALESCE(k.date, '') AND g.date <= :d
+        GROUP BY s.account""", {"d": date})
+    return [{"account": a, "balance_kurus": b, "stale": n} for a, b, n in rows]
+
+
+def statement(cx, account: str, date_from: str, date_to: str) -> list[dict]:
+    """Hesabın tarih aralığındaki hareketleri, tarih + saat sırasıyla; running_kurus: aralık başından
+    yürüyen net (açılış bakiyesi eklenmemiş). idx_cash_account_ts üzerinden tek geçiş."""
+    return [dict(r) for r in cx.execute(f"""
+        SELECT c.id, c.date, c.time, c.type, c.category, c.description, c.ref_no, c.amount_kurus,
+               SUM({NET.format('c.')}) OVER (ORDER BY c.ts, c.id) AS running_kurus
+        FROM cash_ledger c
+        WHERE c.account = ? AND c.ts >= CAST(strftime('%s', ?) AS INTEGER)
+          AND c.ts < CAST(strftime('%s', ?, '+1 day') AS INTEGER)
+        ORDER BY c.ts, c.id""", (account, date_from, date_to))]
+
+
+if __name__ == "__main__":
+    import sys, time
+    from .db import DB
+
+    db = DB(sys.argv[1] if len(sys.argv) > 1 else "orbitx.db")
+    t0 = time.perf_counter()
+    with db.tx() as cx:
+        rebuild(cx)
+    n = db.query_one("SELECT COUNT(*) FROM cash_balance_ckpt")[0]
+    print(f"✓ Bakiye kontrol noktaları yeniden kuruldu ({n} gün × hesap, {time.perf_counter() - t0:.2f} sn)")
+    db.close()
@@ -0,0 +1,212 @@
+# app/data/catalog.py
+"""
+Paylaşılan bellek içi stok kataloğu (DataService.catalog). Uygulamada stoğun tek kopyası:
+- kod → konum ve id → konum sözlükleri: kod/barkod ile O(1) arama
+- sütun dizileri (array): qty, gram, alış/satış fiyatı, kritik adet, milyem, ayar, işçilik → toplamlar ve
+  toplu fiyatlama (pricing) satırları gezmez; kategori ve işçilik tipi labels listesine tam sayı koddur
+- rows: tam satırlar (dict), tablo/diyalog tüketicileri için — salt okunur kabul edilmeli
+Commit edilen her stok yazımından sonra yalnızca etkilenen id'ler yeniden okunur, sürüm artar ve
+{"version", "changed", "added", "removed", "reset"} deltası döner (added ⊆ changed). Silmede son satır boşluğa taşınır.
+"""
+import threading
+from array import array
+
+COLUMNS = ("id, code, name, category, milyem, ayar, gram, qty, buy_price, sell_price, "
+           "isc_tip, isc_alinan, isc_verilen, vat, critical_qty")
+
+# Sütun dizilerinin adları (snapshot_columns anahtarları); self._cols ile aynı sıra
+ARRAYS = ("ids", "qty", "gram", "buy", "sell", "critical", "milyem", "ayar", "isc", "category", "isc_tip")
+
+_CHUNK = 500  # IN (...) başına id sayısı
+
+
+class StockCatalog:
+    def __init__(self):
+        self.version = 0
+        self._lock = threading.RLock()
+        self._reset()
+
+    def _reset(self):
+        self.rows = []
+        self.ids = array("q")
+        self.qty = array("q")
+        self.gram = array("d")
+        self.buy = array("d")
+        self.sell = array("d")
+        self.critical = array("q")
+        self.milyem = array("d")
+        self.ayar = array("q")
+        self.isc = array("d")        # isc_alinan
+        self.category = array("q")   # labels kodu
+        self.isc_tip = array("q")    # labels kodu
+        self._cols = (self.ids, self.qty, self.gram, self.buy, self.sell, self.critical,
+                      self.milyem, self.ayar, self.isc, self.category, self.isc_tip)
+        self.labels = [""]           # kod → metin (0 = boş); yalnızca büyür
+        self._label_code = {"": 0}
+        self._by_code = {}
+        self._by_id = {}
+
+    def code_of(self, label) -> int:
+        """Metnin tam sayı kodu (kategori / işçilik tipi); ilk görülüşte eklenir."""
+        label = label or ""
+        code = self._label_code.get(label)
+        if code is None:
+            code = self._label_code[label] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+    def _values(self, row) -> tuple:
+        # self._cols ile aynı sırada
+        return (row["id"], row["qty"] or 0, row["gram"] or 0.0, row["buy_price"] or 0.0, row["sell_price"] or 0.0,
+                row["critical_qty"] if row["critical_qty"] is not None else 5,
+                row["milyem"] or 0.0, int(row["ayar"] or 0), row["isc_alinan"] or 0.0,
+                self.code_of(row["category"]), self.code_of(row["isc_tip"]))
+
+    # --- okuma ---
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, code):
+        return code in self._by_code
+
+    def get(self, code):
+        """Kod (barkod) ile satır; yoksa None."""
+        pos = self._by_code.get(code)
+        return None if pos is None else self.rows[pos]
+
+    def by_id(self, stock_id):
+        pos = self._by_id.get(stock_id)
+        return None if pos is None else self.rows[pos]
+
+    def snapshot(self) -> list:
+        """Satırların tutarlı bir kopyası (yazıcı iş parçacığı güncellerken gezmek için)."""
+        with self._lock:
+            return list(self.rows)
+
+    def snapshot_columns(self, ids=None) -> dict:
+        """Sütun dizileri (ARRAYS), labels ve satırların tek kilit altında alınmış kopyası:
+        {"ids": array, ..., "labels": [...], "rows": [...]}. ids verilirse yalnızca o satırlar, verilen sırayla
+        (katalogda olmayan id atlanır)."""
+        with self._lock:
+            if ids is None:
+                out = {name: array(col.typecode, col) for name, col in zip(ARRAYS, self._cols)}
+                out["rows"] = list(self.rows)
+            else:
+                pos = [p for p in map(self._by_id.get, ids) if p is not None]
+                out = {name: array(col.typecode, [col[p] for p in pos]) for name, col in zip(ARRAYS, self._cols)}
+                out["rows"] = [self.rows[p] for p in pos]
+            out["labels"] = list(self.labels)
+        return out
+
+    def totals(self) -> dict:
+        """Sütun dizilerinden özet: kayıt, adet, gram, stok değeri (satış/alış), kritik ürün sayısı."""
+        with self._lock:
+            return {
+                "count": len(self.rows),
+                "qty": sum(self.qty),
+                "gram": sum(self.gram),
+                "sell_value": sum(q * p for q, p in zip(self.qty, self.sell)),
+                "buy_value": sum(q * p for q, p in zip(self.qty, self.buy)),
+                "critical": sum(1 for q, c in zip(self.qty, self.critical) if q <= c),
+            }
+
+    def products(self) -> list[dict]:
+        """Satış diyaloglarının beklediği biçim: {Kod, Ad, Kategori, Gram, Fiyat, Stok}."""
+        return [{"Kod": r["code"], "Ad": r["name"], "Kategori": r["category"] or "", "Gram": r["gram"] or 0.0,
+                 "Fiyat": r["sell_price"] or 0.0, "Stok": r["qty"] or 0} for r in self.snapshot()]
+
+    # --- güncelleme (commit sonrası) ---
+    def load(self, cx) -> dict:
+        """Tüm kataloğu yeniden yükler (toplu değişiklikler, tohumlama)."""
+        return self.load_rows(cx.execute(f"SELECT {COLUMNS} FROM stock_items ORDER BY code").fetchall())
+
+    def load_rows(self, rows) -> dict:
+        """load() ile aynı; satırlar hazır verilir (ör. sunucudan gelen JSON)."""
+        with self._lock:
+            old = set(self._by_id)
+            self._reset()
+            for r in rows:
+                self._append(dict(r))
+            self.version += 1
+            return {"version": self.version, "changed": list(self.ids), "added": sorted(self._by_id.keys() - old),
+                    "removed": sorted(old - self._by_id.keys()), "reset": True}
+
+    def refresh(self, cx, ids) -> dict:
+        """Yalnızca verilen id'leri yeniden okur; DB'de artık olmayanlar katalogdan düşer."""
+        ids = sorted(set(ids))
+        rows = []
+        for i in range(0, len(ids), _CHUNK):
+            part = ids[i:i + _CHUNK]
+            rows += cx.execute(f"SELECT {COLUMNS} FROM stock_items WHERE id IN ({','.join('?' * len(part))})",
+                               part).fetchall()
+        return self.refresh_rows(ids, rows)
+
+    def refresh_rows(self, ids, rows) -> dict:
+        """refresh() ile aynı; satırlar hazır verilir, ids içinde olup rows'ta olmayanlar silinmiş sayılır."""
+        ids = sorted(set(ids))
+        with self._lock:
+            found, added = set(), []
+            for r in rows:
+                found.add(r["id"])
+                if r["id"] not in self._by_id:
+                    added.append(r["id"])
+                self._upsert(dict(r))
+            removed = [i for i in ids if i not in found and i in self._by_id]
+            for i in removed:
+                self._remove(i)
+            self.version += 1
+            return {"version": self.version, "changed": sorted(found), "added": sorted(added),
+                    "removed": removed, "reset": False}
+
+    def set_sell_prices(self, ids, prices) -> dict:
+        """Toplu fiyatlama sonrası: DB'ye gitmeden yalnızca satış fiyatlarını günceller (ids/prices: sıralı diziler)."""
+        with self._lock:
+            changed = []
+            for sid, price in zip(ids, prices):
+                pos = self._by_id.get(sid)
+                if pos is None:
+                    continue
+                self.rows[pos] = dict(self.rows[pos], sell_price=price)  # satırlar paylaşılıyor → kopyala
+                self.sell[pos] = price
+                changed.append(sid)
+            self.version += 1
+            return {"version": self.version, "changed": changed, "added": [], "removed": [], "reset": False}
+
+    def _append(self, row):
+        pos = len(self.rows)
+        self.rows.append(row)
+        for col, v in zip(self._cols, self._values(row)):
+            col.append(v)
+        self._by_code[row["code"]] = pos
+        self._by_id[row["id"]] = pos
+
+    def _upsert(self, row):
+        pos = self._by_id.get(row["id"])
+        if pos is None:
+            self._append(row)
+            return
+        old = self.rows[pos]
+        if old["code"] != row["code"] and self._by_code.get(old["code"]) == pos:
+            del self._by_code[old["code"]]
+        self._by_code[row["code"]] = pos
+        self.rows[pos] = row
+        for col, v in zip(self._cols, self._values(row)):
+            col[pos] = v
+
+    def _remove(self, stock_id):
+        pos = self._by_id.pop(stock_id)
+        code = self.rows[pos]["code"]
+        if self._by_code.get(code) == pos:
+            del self._by_code[code]
+        last = len(self.rows) - 1
+        if pos != last:
+            # Son satırı boşluğa taşı: diziler sıkı kalır, silme O(1)
+            moved = self.rows[last]
+            self.rows[pos] = moved
+            for col in self._cols:
+                col[pos] = col[last]
+            self._by_id[moved["id"]] = pos
+            self._by_code[moved["code"]] = pos
+        self.rows.pop()
+        for col in self._cols:
+            col.pop()
@@ -0,0 +1,87 @@
+# app/data/changes.py
+"""
+Satır düzeyinde değişiklik olayları (DataService.changes). Yazım yolları commit sonrası
+post(tablo, işlem, id'ler) çağırır; olay döngüsünün bir turu boyunca gelenler birleştirilir ve
+tek bir changed(dict) sinyaliyle yayılır:
+    {"customers": {"insert": {7}, "update": {3}, "delete": set(), "reset": False}, "cash_ledger": {...}}
+Aynı satıra gelen işlemler sadeleşir: insert+update → insert, insert+delete → yok, update+delete → delete.
+reset=True: tablo toplu değişti, sayfa tam yeniden yüklemeli (tohumlama vb.).
+post() her iş parçacığından çağrılabilir; boşaltma kuyruklu bağlantıyla nesnenin iş parçacığında olur.
+subscribe(fn): Qt sinyali olmadan düz geri çağırma (başsız sunucu); flush'ı çağıran iş parçacığında çalışır.
+"""
+import threading
+
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+
+OPS = ("insert", "update", "delete")
+
+
+def _empty() -> dict:
+    return {"insert": set(), "update": set(), "delete": set(), "reset": False}
+
+
+class ChangeBus(QObject):
+    changed = pyqtSignal(dict)
+    _kick = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._scheduled = False
+        self.flushes = 0  # yayılan birleşik olay sayısı (ölçüm/test için)
+        self._listeners = []
+        # Qt yoksa kuyruk yok: olaylar post() içinde hemen boşaltılır
+        self._queued = Qt.ConnectionType.QueuedConnection is not None
+        self._kick.connect(self.flush, Qt.ConnectionType.QueuedConnection)
+
+    def post(self, table: str, op: str, ids=()):
+        """op: insert | update | delete | reset."""
+        with self._lock:
+            t = self._pending.get(table)
+            if t is None:
+                t = self._pending[table] = _empty()
+            if op == "reset":
+                t["reset"] = True
+            elif op == "insert":
+                for i in ids:
+                    if i in t["delete"]:  # aynı id geri geldi
+                        t["delete"].discard(i)
+                        t["update"].add(i)
+                    else:
+                        t["insert"].add(i)
+            elif op == "update":
+                t["update"].update(i for i in ids if i not in t["insert"])
+            elif op == "delete":
+                for i in ids:
+                    if i in t["insert"]:  # tur içinde eklenip silindi → sayfa hiç görmemeli
+                        t["insert"].discard(i)
+                    else:
+                        t["update"].discard(i)
+                        t["delete"].add(i)
+            else:
+                raise ValueError(f"Bilinmeyen işlem: {op}")
+            kick = not self._scheduled
+            self._scheduled = True
+        if not self._queued:
+            self.flush()
+        elif kick:
+            self._kick.emit()
+
+    def subscribe(self, fn):
+        self._listeners.append(fn)
+
+    def unsubscribe(self, fn):
+        if fn in self._listeners:
+            self._listeners.remove(fn)
+
+    def flush(self):
+        """Bekleyen olayları tek changed sinyaliyle yayar (boşsa hiçbir şey yapmaz)."""
+        with self._lock:
+            batch, self._pending, self._scheduled = self._pending, {}, False
+        batch = {k: v for k, v in batch.items() if v["reset"] or any(v[op] for op in OPS)}
+        if batch:
+            self.flushes += 1
+            self.changed.emit(batch)
+            for fn in self._listeners:
+                fn(batch)
@@ -0,0 +1,210 @@
+# app/data/closing.py
+"""
+Gün sonu (Z raporu) dönem kapanışı. close() kapanan günün sonundaki durumu kapanış tablolarına dondurur:
+hesap bakiyeleri (açılış/giriş/çıkış/kapanış), müşteri bakiyeleri (customer_ledger'dan), kategori bazında
+stok adet/gram/değer ve dönemin satış toplamları.
+
+- artımlı: önceki kapanışın dondurulmuş bakiyeleri + aradaki günlerin özet/defter satırları; geçmiş taranmaz
+- kilit: kapanmış gün ve öncesine tarihli sales / cash_ledger / customer_ledger / stock_moves yazımları
+  tetikleyicide reddedilir (sqlite3.IntegrityError, "Dönem kapalı: ...")
+- z_report() yalnızca kapanış tablolarını okur: süre geçmişin büyüklüğünden bağımsız
+- stok anlık durumdur (stock_items tarih tutmaz): yalnızca bugünün kapanışında alınır ve alındığı an
+  (period_close.stock_at) raporda yazar; geriye dönük kapanışın stok bölümü boş kalır
+
+Günü kapatıp Z raporunu yazdırma (app/ klasöründen):  python -m data.closing [orbitx.db] [YYYY-MM-DD]
+"""
+from .money import format_kurus
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS period_close(
+  date TEXT PRIMARY KEY,                      -- kapanan gün (dahil); bu gün ve öncesi kilitli
+  prev_date TEXT,                             -- önceki kapanış (NULL: ilk kapanış, tüm geçmiş)
+  closed_at TEXT NOT NULL DEFAULT (datetime('now', 'localtime')),
+  receivable_kurus INTEGER NOT NULL DEFAULT 0,  -- müşterilerden alacak (borçlu bakiyeler)
+  payable_kurus INTEGER NOT NULL DEFAULT 0,     -- müşterilere borç (alacaklı bakiyeler, pozitif)
+  customers_n INTEGER NOT NULL DEFAULT 0        -- bakiyesi sıfır olmayan müşteri
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS close_cash(
+  date TEXT NOT NULL, account TEXT NOT NULL,
+  opening_kurus INTEGER NOT NULL, in_kurus INTEGER NOT NULL,
+  out_kurus INTEGER NOT NULL, closing_kurus INTEGER NOT NULL,
+  PRIMARY KEY(date, account)
+) WITHOUT ROWID;
+
+-- Yalnızca bakiyesi sıfır olmayan müşteriler; silinen müşterinin dondurulmuş bakiyesi kalır (FK yok)
+CREATE TABLE IF NOT EXISTS close_customer(
+  date TEXT NOT NULL, customer_id INTEGER NOT NULL,
+  balance_kurus INTEGER NOT NULL,             -- + müşteri borçlu, − alacaklı
+  PRIMARY KEY(date, customer_id)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS close_stock(
+  date TEXT NOT NULL, category TEXT NOT NULL,
+  items INTEGER NOT NULL, qty INTEGER NOT NULL, gram REAL NOT NULL,
+  cost_kurus INTEGER NOT NULL,                -- adet × alış fiyatı
+  value_kurus INTEGER NOT NULL,               -- adet × satış fiyatı
+  PRIMARY KEY(date, category)
+) WITHOUT ROWID;
+
+-- Dönemin (önceki kapanıştan sonraki günler, bu gün dahil) satış/alış toplamları
+CREATE TABLE IF NOT EXISTS close_sales(
+  date TEXT NOT NULL, type TEXT NOT NULL, pay_type TEXT NOT NULL,
+  n INTEGER NOT NULL, total_kurus INTEGER NOT NULL, paid_kurus INTEGER NOT NULL,
+  due_kurus INTEGER NOT NULL, discount_kurus INTEGER NOT NULL,
+  PRIMARY KEY(date, type, pay_type)
+) WITHOUT ROWID;
+
+-- Artımlı kapanış: önceki kapanıştan sonraki cari hareketler
+CREATE INDEX IF NOT EXISTS idx_cust_ledger_date ON customer_ledger(date);
+"""
+
+LOCKED = "Dönem kapalı"
+_CLOSED = "(SELECT MAX(date) FROM period_close)"
+_RAISE = f"SELECT RAISE(ABORT, '{LOCKED}: kapanmış güne ait kayıt eklenemez, değiştirilemez ya da silinemez');"
+
+
+def _lock(table: str, columns: str) -> str:
+    """Kapanmış güne tarihli satırın eklenmesini, değiştirilmesini (tutar/tarih kolonları) ve silinmesini engeller."""
+    return f"""
+CREATE TRIGGER IF NOT EXISTS trg_lock_{table}_ins BEFORE INSERT ON {table}
+WHEN NEW.date <= {_CLOSED} BEGIN {_RAISE} END;
+CREATE TRIGGER IF NOT EXISTS trg_lock_{table}_upd BEFORE UPDATE OF {columns} ON {table}
+WHEN OLD.date <= {_CLOSED} OR NEW.date <= {_CLOSED} BEGIN {_RAISE} END;
+CREATE TRIGGER IF NOT EXISTS trg_lock_{table}_del BEFORE DELETE ON {table}
+WHEN OLD.date <= {_CLOSED} BEGIN {_RAISE} END;
+"""
+
+
+TRIGGERS = (_lock("sales", "date, type, pay_type, customer_id, total_kurus, paid_kurus, due_kurus, discount_kurus")
+            + _lock("cash_ledger", "date, account, type, amount_kurus")
+            + _lock("customer_ledger", "customer_id, direction, amount_kurus, date")
+            + _lock("stock_moves", "stock_id, move_type, qty, date"))
+
+# Cari hareketin bakiyeye etkisi: Borç +tutar; Alacak −|tutar| (alış satırları negatif tutarla yazılır)
+_CUST_NET = "CASE WHEN direction = 'Borç' THEN amount_kurus ELSE -ABS(amount_kurus) END"
+
+
+def last_close(cx):
+    """Son kapanan gün (YYYY-MM-DD) ya da None."""
+    return cx.execute(f"SELECT {_CLOSED}").fetchone()[0]
+
+
+def close(cx, date: str, *, stock: bool):
+    """date gününü kapatır (açık bir işlem içinde çağrılmalı); önceki kapanış tarihini döner.
+    date son kapanıştan sonra olmalı; arada kalan günler bu kapanışın dönemine girer.
+    stock=True: stoğun şu anki durumu dondurulur — yalnızca date bugünse doğrudur."""
+    prev = last_close(cx)
+    if prev is not None and date <= prev:
+        raise ValueError(f"{date} zaten kapalı (son kapanış: {prev})")
+    p = {"d": date, "prev": prev or ""}
+    cx.execute("""
+        INSERT INTO close_cash(date, account, opening_kurus, in_kurus, out_kurus, closing_kurus)
+        SELECT :d, account, SUM(o), SUM(i), SUM(x), SUM(o) + SUM(i) - SUM(x) FROM (
+          SELECT account, closing_kurus AS o, 0 AS i, 0 AS x FROM close_cash WHERE date = :prev
+          UNION ALL
+          SELECT account, 0, CASE WHEN type = 'Giriş' THEN amount_kurus ELSE 0 END,
+                 CASE WHEN type = 'Çıkış' THEN amount_kurus ELSE 0 END
+          FROM daily_cash_agg WHERE date > :prev AND date <= :d
+        ) GROUP BY account""", p)
+    cx.execute(f"""
+        INSERT INTO close_customer(date, customer_id, balance_kurus)
+        SELECT :d, customer_id, SUM(b) FROM (
+          SELECT customer_id, balance_kurus AS b FROM close_customer WHERE date = :prev
+          UNION ALL
+          SELECT customer_id, {_CUST_NET} FROM customer_ledger WHERE date > :prev AND date <= :d
+        ) GROUP BY customer_id HAVING SUM(b) != 0""", p)
+    cx.execute("""
+        INSERT INTO close_sales(date, type, pay_type, n, total_kurus, paid_kurus, due_kurus, discount_kurus)
+        SELECT :d, type, pay_type, SUM(n), SUM(total_kurus), SUM(paid_kurus), SUM(due_kurus), SUM(discount_kurus)
+        FROM daily_sales_agg WHERE date > :prev AND date <= :d GROUP BY type, pay_type""", p)
+    if stock:
+        cx.execute("""
+            INSERT INTO close_stock(date, category, items, qty, gram, cost_kurus, value_kurus)
+            SELECT :d, COALESCE(category, ''), COUNT(*), COALESCE(SUM(qty), 0), COALESCE(SUM(gram), 0),
+                   CAST(ROUND(COALESCE(SUM(qty * buy_price), 0) * 100) AS INTEGER),
+                   CAST(ROUND(COALESCE(SUM(qty * sell_price), 0) * 100) AS INTEGER)
+            FROM stock_items GROUP BY 2""", p)
+    cx.execute("""
+        INSERT INTO period_close(date, prev_date, receivable_kurus, payable_kurus, customers_n, stock_at)
+        SELECT :d, NULLIF(:prev, ''), COALESCE(SUM(MAX(balance_kurus, 0)), 0),
+               COALESCE(SUM(MAX(-balance_kurus, 0)), 0), COUNT(*),
+               CASE WHEN :stock THEN datetime('now', 'localtime') END
+        FROM close_customer WHERE date = :d""", {**p, "stock": stock})
+    return prev
+
+
+def cash(cx, date: str):
+    """Kapanmış günün dondurulmuş hesap bakiyeleri {hesap: kuruş}; o gün kapanmadıysa None."""
+    rows = cx.execute("SELECT account, closing_kurus FROM close_cash WHERE date = ?", (date,)).fetchall()
+    if not rows and not cx.execute("SELECT 1 FROM period_close WHERE date = ?", (date,)).fetchone():
+        return None
+    return dict(rows)
+
+
+def z_report(cx, date: str):
+    """Kapanmış günün dondurulmuş Z raporu (tutarlar kuruş); kapanış yoksa None."""
+    head = cx.execute("SELECT * FROM period_close WHERE date = ?", (date,)).fetchone()
+    if head is None:
+        return None
+
+    def rows(sql):
+        return [dict(r) for r in cx.execute(sql, (date,))]
+    return {**dict(head),
+            "sales": rows("SELECT type, pay_type, n, total_kurus, paid_kurus, due_kurus, discount_kurus "
+                          "FROM close_sales WHERE date = ? ORDER BY type, pay_type"),
+            "cash": rows("SELECT account, opening_kurus, in_kurus, out_kurus, closing_kurus "
+                         "FROM close_cash WHERE date = ? ORDER BY account"),
+            "stock": rows("SELECT category, items, qty, gram, cost_kurus, value_kurus "
+                          "FROM close_stock WHERE date = ? ORDER BY category")}
+
+
+def text(report: dict, width: int = 48) -> str:
+    """z_report() çıktısının fiş yazıcısına uygun düz metin hâli."""
+    def line(label, value=""):
+        if len(label) + len(value) >= width:                      # sığmıyorsa tutar alt satırda, sağa dayalı
+            return f"{label}\n{value:>{width}}"
+        return f"{label:<{width - len(value)}}{value}"
+    rule = "-" * width
+    out = ["Z RAPORU".center(width), line("Gün", report["date"]),
+           line("Dönem başı", report["prev_date"] or "ilk kapanış"), line("Kapanış", report["closed_at"]), rule]
+    for t in sorted({s["type"] for s in report["sales"]}):
+        rows = [s for s in report["sales"] if s["type"] == t]
+        out.append(line(f"{t.upper()} ({sum(s['n'] for s in rows)} fiş)",
+                        format_kurus(sum(s["total_kurus"] for s in rows))))
+        out += [line(f"  {s['pay_type'] or '—'} ({s['n']})", format_kurus(s["total_kurus"])) for s in rows]
+        out.append(line("  tahsil / kalan", f"{format_kurus(sum(s['paid_kurus'] for s in rows))} / "
+                                           f"{format_kurus(sum(s['due_kurus'] for s in rows))}"))
+    if not report["sales"]:
+        out.append(line("Satış / alış yok"))
+    out.append(rule)
+    for c in report["cash"]:
+        out += [c["account"], line("  açılış", format_kurus(c["opening_kurus"])),
+                line("  giriş / çıkış", f"{format_kurus(c['in_kurus'])} / {format_kurus(c['out_kurus'])}"),
+                line("  kapanış", format_kurus(c["closing_kurus"]))]
+    out += [rule, line(f"Cari alacak ({report['customers_n']} müşteri)", format_kurus(report["receivable_kurus"])),
+            line("Cari borç", format_kurus(report["payable_kurus"])), rule]
+    if not report.get("stock_at"):
+        out.append(line("Stok", "alınmadı (geriye dönük kapanış)"))
+        return "\n".join(out)
+    out.append(line("Stok (anlık)", report["stock_at"]))
+    for s in report["stock"]:
+        out.append(line(f"{s['category'] or 'Diğer'}: {s['qty']} adet, {s['gram']:.2f} gr", format_kurus(s["value_kurus"])))
+    out.append(line("Stok değeri (satış / alış)", f"{format_kurus(sum(s['value_kurus'] for s in report['stock']))} / "
+                                                 f"{format_kurus(sum(s['cost_kurus'] for s in report['stock']))}"))
+    return "\n".join(out)
+
+
+if __name__ == "__main__":
+    import sys
+    from datetime import date as _date
+    from .db import DB
+
+    db = DB(sys.argv[1] if len(sys.argv) > 1 else "orbitx.db")
+    today = _date.today().isoformat()
+    day = sys.argv[2] if len(sys.argv) > 2 else today
+    with db.tx() as cx:
+        close(cx, day, stock=day == today)
+    with db.read() as cx:
+        print(text(z_report(cx, day)))
+    db.close()
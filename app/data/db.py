@@ -1,152 +1,201 @@
 # app/data/db.py
-import os, sqlite3, threading
+import os, json, queue, sqlite3, threading, time, uuid
+from pathlib import Path
 from contextlib import contextmanager
+from .migrations import migrate
+from .stats import QueryStats, TimedConnection
 
 _LOCK = threading.RLock()
+_JOURNAL_KEEP = 10000   # change_log'da tutulan son işlem sayısı (daha eskisi ara ara budanır)
+_JOURNAL_RESET = 5000   # bir tabloda bundan çok id değiştiyse kayda "reset" yazılır
 
 def _connect(path: str):
     os.makedirs(os.path.dirname(path), exist_ok=True) if os.path.dirname(path) else None
     cx = sqlite3.connect(path, check_same_thread=False)
     cx.row_factory = sqlite3.Row
     cx.execute("PRAGMA foreign_keys = ON;")
+    # INSERT OR REPLACE'ın sildiği satır için de DELETE tetikleyicileri çalışsın (özet/arama dizinleri)
+    cx.execute("PRAGMA recursive_triggers = ON;")
     cx.execute("PRAGMA journal_mode = WAL;")
     cx.execute("PRAGMA synchronous = NORMAL;")
     return cx
 
+def _connect_reader(path: str):
+    """Salt-okunur WAL bağlantısı (sadece SELECT yolları için)."""
+    uri = Path(path).absolute().as_uri() + "?mode=ro"
+    # isolation_level=None: örtük BEGIN açılmaz, her SELECT en güncel anlık görüntüyü okur
+    cx = sqlite3.connect(uri, uri=True, check_same_thread=False, isolation_level=None)
+    cx.row_factory = sqlite3.Row
+    cx.execute("PRAGMA query_only = ON;")
+    return cx
+
+
+class _ReaderPool:
+    """N adet salt-okunur bağlantıyı ödünç verir; bağlantılar ilk ihtiyaçta açılır."""
+    def __init__(self, path: str, size: int):
+        self.path = path
+        self.size = max(1, int(size))
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+        self._all = []
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.size:
+                cx = _connect_reader(self.path)
+                self._opened += 1
+                self._all.append(cx)
+                return cx
+        return self._idle.get()
+
+    def release(self, cx):
+        self._idle.put(cx)
+
+    def close(self):
+        with self._lock:
+            for cx in self._all:
+                try:
+                    cx.close()
+                except Exception:
+                    pass
+            self._all.clear()
+            self._opened = 0
+            self._idle = queue.LifoQueue()
+
+
 class DB:
-    def __init__(self, path="orbitx.db"):
+    def __init__(self, path="orbitx.db", readers: int = 4):
         self.path = path
         self.cx = _connect(path)
+        self._depth = 0        # tx() iç içelik seviyesi (yalnızca _LOCK altında değişir)
+        self._on_commit = []   # commit sonrası çalışacak geri çağrılar
+        self._journal = []     # işlemin değişiklikleri: commit'ten hemen önce change_log'a tek satır
+        self.origin = uuid.uuid4().hex  # change_log'da bu bağlantının kaydı (izleyici kendi yazımını atlar)
+        self.stats = None      # enable_stats() ile açılır
         self._init_schema()
+        # Bellek içi veritabanı başka bağlantıyla paylaşılamaz → okuma da yazıcıdan yapılır
+        self._pool = None if path == ":memory:" or path.startswith("file:") else _ReaderPool(path, readers)
 
     @contextmanager
     def tx(self):
+        """Yazma işlemi. İç içe çağrılar dıştaki işlemin içinde SAVEPOINT olarak çalışır."""
         with _LOCK:
+            if self._depth:
+                yield from self._savepoint()
+                return
+            self._depth = 1
             try:
-                self.cx.execute("BEGIN;")
+                # IMMEDIATE: yazma kilidi baştan alınır; okuyup-yazan işlemler başka bir süreçle
+                # yarışıp SQLITE_BUSY_SNAPSHOT almaz, busy_timeout boyunca sırasını bekler
+                self.cx.execute("BEGIN IMMEDIATE;")
                 yield self.cx
+                if self._journal:
+                    self._write_journal()
                 self.cx.commit()
             except Exception:
                 self.cx.rollback()
+                self._on_commit.clear()
+                self._journal.clear()
                 raise
-
-    def _init_schema(self):
-        self.cx.executescript("""
-        CREATE TABLE IF NOT EXISTS customers(
-          id INTEGER PRIMARY KEY AUTOINCREMENT,
-          code TEXT UNIQUE, name TEXT NOT NULL, phone TEXT,
-          status TEXT DEFAULT 'Aktif',
-          balance REAL NOT NULL DEFAULT 0.0,
-          last_txn_at TEXT,
-          created_at TEXT DEFAULT (datetime('now')),
-          updated_at TEXT DEFAULT (datetime('now'))
-        );
-
-        CREATE TABLE IF NOT EXISTS stock_items(
-          id INTEGER PRIMARY KEY AUTOINCREMENT,
-          code TEXT UNIQUE NOT NULL, name TEXT NOT NULL,
-          category TEXT, milyem INTEGER, ayar INTEGER,
-          gram REAL DEFAULT 0.0, qty INTEGER DEFAULT 0,
-          buy_price REAL DEFAULT 0.0, sell_price REAL DEFAULT 0.0,
-          isc_tip TEXT, isc_alinan REAL DEFAULT 0.0, isc_verilen REAL DEFAULT 0.0,
-          vat REAL DEFAULT 0.0, critical_qty INTEGER DEFAULT 5, photo TEXT
-        );
-
-        CREATE TABLE IF NOT EXISTS sales(
-          id INTEGER PRIMARY KEY AUTOINCREMENT,
-          type TEXT NOT NULL,             -- 'Satış' | 'Alış'
-          doc_no TEXT, date TEXT NOT NULL, notes TEXT,
-          customer_id INTEGER, pay_type TEXT,
-          paid_amount REAL DEFAULT 0.0, discount REAL DEFAULT 0.0,
-          total REAL NOT NULL, due REAL NOT NULL,
-          created_at TEXT DEFAULT (datetime('now')),
-          FOREIGN KEY(customer_id) REFERENCES customers(id) ON DELETE SET NULL
-        );
-
-        CREATE TABLE IF NOT EXISTS sale_items(
-          id INTEGER PRIMARY KEY AUTOINCREMENT,
-          sale_id INTEGER NOT NULL, stock_id INTEGER,
-          code TEXT NOT NULL, name TEXT NOT NULL,
-          gram REAL DEFAULT 0.0, qty INTEGER NOT NULL,
-          unit_price REAL NOT NULL, milyem TEXT, iscilik REAL DEFAULT 0.0,
-          line_total REAL NOT NULL,
-          FOREIGN KEY(sale_id) REFERENCES sales(id) ON DELETE CASCADE,
-          FOREIGN KEY(stock_id) REFERENCES stock_items(id) ON DELETE SET NULL
-        );
-
-        CREATE TABLE IF NOT EXISTS customer_ledger(
-          id INTEGER PRIMARY KEY AUTOINCREMENT,
-          customer_id INTEGER NOT NULL, sale_id INTEGER,
-          direction TEXT NOT NULL,     -- 'Borç' | 'Alacak'
-          amount REAL NOT NULL, desc TEXT, date TEXT NOT NULL,
-          FOREIGN KEY(customer_id) REFERENCES customers(id) ON DELETE CASCADE,
-          FOREIGN KEY(sale_id) REFERENCES sales(id) ON DELETE SET NULL
-        );
-
-        CREATE TABLE IF NOT EXISTS stock_moves(
-          id INTEGER PRIMARY KEY AUTOINCREMENT,
-          stock_id INTEGER NOT NULL, sale_id INTEGER,
-          move_type TEXT NOT NULL,     -- 'OUT' | 'IN' | 'ADJ'
-          qty INTEGER NOT NULL, note TEXT, date TEXT NOT NULL,
-          FOREIGN KEY(stock_id) REFERENCES stock_items(id) ON DELETE CASCADE,
-          FOREIGN KEY(sale_id) REFERENCES sales(id) ON DELETE SET NULL
-        );
-
-        -- Kasa & Banka (Finance)
-        CREATE TABLE IF NOT EXISTS cash_ledger(
-          id INTEGER PRIMARY KEY AUTOINCREMENT,
-          date TEXT NOT NULL, time TEXT,
-          account TEXT NOT NULL,       -- 'Kasa' | 'Banka — …'
-          type TEXT NOT NULL,          -- 'Giriş' | 'Çıkış'
-          category TEXT, description TEXT,
-          amount REAL NOT NULL,
-          customer_id INTEGER, sale_id INTEGER,
-          -- Yeni alanlar (migration sonrası)
-          ref_no TEXT,
-          currency_code TEXT DEFAULT '00',   -- 00=TRY, 01=USD, 02=EUR
-          amount_foreign REAL DEFAULT 0,
-          fx_rate REAL DEFAULT 1,
-          type_code TEXT,                   -- Kısa kod (örn. DG, ST, MS)
-          FOREIGN KEY(customer_id) REFERENCES customers(id) ON DELETE SET NULL,
-          FOREIGN KEY(sale_id) REFERENCES sales(id) ON DELETE SET NULL
-        );
-
-        CREATE INDEX IF NOT EXISTS idx_cust_code ON customers(code);
-        CREATE INDEX IF NOT EXISTS idx_stock_code ON stock_items(code);
-        CREATE INDEX IF NOT EXISTS idx_sales_date ON sales(date);
-        CREATE INDEX IF NOT EXISTS idx_items_sale ON sale_items(sale_id);
-        CREATE INDEX IF NOT EXISTS idx_cash_date ON cash_ledger(date);
-        """)
-
-        # Migration: cash_ledger tablosuna yeni alanlar ekleme
-        self._migrate_cash_ledger_schema()
-
-    def _migrate_cash_ledger_schema(self):
-        """cash_ledger tablosuna yeni alanları ekler (migration)"""
+            finally:
+                self._depth = 0
+            callbacks, self._on_commit = self._on_commit, []
+        for cb in callbacks:
+            cb()
+
+    def _savepoint(self):
+        name = f"sp{self._depth}"
+        mark, jmark = len(self._on_commit), len(self._journal)
+        self._depth += 1
+        self.cx.execute(f"SAVEPOINT {name};")
         try:
-            # Mevcut tablo yapısını kontrol et
-            cursor = self.cx.execute("PRAGMA table_info(cash_ledger)")
-            columns = [row[1] for row in cursor.fetchall()]
-
-            # Eksik alanları ekle
-            if 'ref_no' not in columns:
-                self.cx.execute("ALTER TABLE cash_ledger ADD COLUMN ref_no TEXT")
+            yield self.cx
+            self.cx.execute(f"RELEASE {name};")
+        except Exception:
+            self.cx.execute(f"ROLLBACK TO {name};")
+            self.cx.execute(f"RELEASE {name};")
+            del self._on_commit[mark:]
+            del self._journal[jmark:]
+            raise
+        finally:
+            self._depth -= 1
+
+    def after_commit(self, fn):
+        """fn'i dıştaki işlem commit edildikten sonra çağırır (işlem yoksa hemen)."""
+        with _LOCK:
+            if self._depth:
+                self._on_commit.append(fn)
+                return
+        fn()
 
-            if 'currency_code' not in columns:
-                self.cx.execute("ALTER TABLE cash_ledger ADD COLUMN currency_code TEXT DEFAULT '00'")
+    def journal(self, table: str, op: str, ids=()):
+        """Değişikliği change_log'a işler (başka süreçlerin izleyicisi için); işlem yoksa kendi işlemini açar."""
+        with _LOCK:
+            if self._depth:
+                self._journal.append((table, op, ids))
+                return
+        with self.tx():
+            self._journal.append((table, op, ids))
+
+    def _write_journal(self):
+        # Aynı tablo+işlem birleştirilir; işlem başına tek INSERT (satış yolunda ek ifade sayısı 1)
+        merged = {}
+        for table, op, ids in self._journal:
+            merged.setdefault((table, op), set()).update(ids)
+        self._journal.clear()
+        changes = []
+        for (table, op), ids in merged.items():
+            if op == "reset" or len(ids) > _JOURNAL_RESET:
+                changes.append([table, "reset", []])
+            elif ids:
+                changes.append([table, op, sorted(ids)])
+        if not changes:
+            return
+        rid = self.cx.execute("INSERT INTO change_log(origin, at, changes) VALUES (?,?,?)",
+                              (self.origin, time.time(), json.dumps(changes))).lastrowid
+        if rid % 500 == 0:
+            self.cx.execute("DELETE FROM change_log WHERE id <= ?", (rid - _JOURNAL_KEEP,))
+
+    def enable_stats(self, *, slow_ms: float = 100.0, log_path: str = None) -> QueryStats:
+        """SQL ölçümünü açar: yazıcı ve okuma bağlantılarındaki her ifade sayılır/süresi ölçülür."""
+        with _LOCK:
+            if self.stats is None:
+                self.stats = QueryStats(slow_ms=slow_ms, log_path=log_path)
+                self.cx = TimedConnection(self.cx, self.stats)
+        return self.stats
 
-            if 'amount_foreign' not in columns:
-                self.cx.execute("ALTER TABLE cash_ledger ADD COLUMN amount_foreign REAL DEFAULT 0")
+    @contextmanager
+    def read(self):
+        """Havuzdan bir okuma bağlantısı ödünç alır (yazıcıyla paralel çalışır)."""
+        if self._pool is None:
+            with _LOCK:
+                yield self.cx
+            return
+        cx = self._pool.acquire()
+        try:
+            yield cx if self.stats is None else TimedConnection(cx, self.stats)
+        finally:
+            self._pool.release(cx)
 
-            if 'fx_rate' not in columns:
-                self.cx.execute("ALTER TABLE cash_ledger ADD COLUMN fx_rate REAL DEFAULT 1")
+    def query(self, sql: str, params=()):
+        with self.read() as cx:
+            return cx.execute(sql, params).fetchall()
 
-            if 'type_code' not in columns:
-                self.cx.execute("ALTER TABLE cash_ledger ADD COLUMN type_code TEXT")
+    def query_one(self, sql: str, params=()):
+        with self.read() as cx:
+            return cx.execute(sql, params).fetchone()
 
-            self.cx.commit()
-            print("Cash ledger migration completed successfully")
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+        with _LOCK:
+            self.cx.close()
 
-        except Exception as e:
-            print(f"Migration error: {e}")
-            # Hata durumunda rollback yapma, sadece log yaz
+    def _init_schema(self):
+        """Şemayı PRAGMA user_version'a göre günceller; güncel DB'de tek pragma okunur."""
+        self.applied_migrations = migrate(self)
@@ -0,0 +1,58 @@
+# app/data/identity.py
+"""
+Müşteri kimlik anahtarı: katlanmış ad + ayırıcısız telefon ("ahmet yilmaz|05321112233").
+customers.ident_key kolonunda tutulur ve benzersiz indekslidir. DataService eklerken anahtarı
+kendisi yazar; diğer yollarda (toplu içe aktarma, elle SQL) tetikleyiciler INSERT ve ad/telefon
+değişikliğinde anahtarı hesaplar. Aynı anahtarlı ikinci kayıt (eski veride
+yinelenen müşteriler) NULL anahtar alır; kimlik aramaları her zaman ilk kaydı bulur.
+Katlama search.fold ile aynıdır; Python (customer_key) ve SQL (_key_sql) tarafı birebir eşleşir.
+"""
+from .search import _fold_sql, fold
+
+# Telefon ayırıcıları: "0532 111-22-33", "(0532) 111 22 33", "+90.532…" aynı anahtara iner
+_PHONE_SEPARATORS = " -()+./"
+_PHONE_TABLE = str.maketrans("", "", _PHONE_SEPARATORS)
+
+
+def customer_key(name, phone="") -> str:
+    return f"{fold(str(name or '').strip(' '))}|{str(phone or '').translate(_PHONE_TABLE)}"
+
+
+def name_range(name) -> tuple:
+    """Yalnızca ada göre arama için ident_key aralığı: [ad|, ad}) — '}' karakteri '|'dan hemen sonra gelir."""
+    head = fold(str(name or "").strip(" "))
+    return head + "|", head + "}"
+
+
+def _key_sql(name: str, phone: str) -> str:
+    digits = f"COALESCE({phone}, '')"
+    for ch in _PHONE_SEPARATORS:
+        digits = f"replace({digits}, '{ch}', '')"
+    head = _fold_sql(f"trim(COALESCE({name}, ''))")
+    return f"{head} || '|' || {digits}"
+
+
+# Anahtar boştaysa yazılır, başka kayıtta varsa NULL kalır (benzersiz indeks ihlali yerine)
+_SET_KEY = f"""
+  UPDATE customers SET ident_key = CASE
+    WHEN EXISTS (SELECT 1 FROM customers WHERE ident_key = {_key_sql('NEW.name', 'NEW.phone')} AND id <> NEW.id)
+    THEN NULL ELSE {_key_sql('NEW.name', 'NEW.phone')} END
+  WHERE id = NEW.id;
+"""
+
+SCHEMA = f"""
+CREATE UNIQUE INDEX IF NOT EXISTS idx_cust_ident ON customers(ident_key);
+
+CREATE TRIGGER IF NOT EXISTS trg_customers_key_ins AFTER INSERT ON customers
+WHEN NEW.ident_key IS NULL BEGIN{_SET_KEY}END;
+CREATE TRIGGER IF NOT EXISTS trg_customers_key_upd AFTER UPDATE OF name, phone ON customers
+WHEN OLD.name IS NOT NEW.name OR OLD.phone IS NOT NEW.phone BEGIN{_SET_KEY}END;
+"""
+
+
+def backfill(cx):
+    """Mevcut kayıtlara anahtar yazar; yinelenen anahtarlarda yalnızca en eski kayıt anahtarı alır."""
+    key = _key_sql("name", "phone")
+    cx.execute("UPDATE customers SET ident_key = NULL")
+    cx.execute(f"UPDATE customers SET ident_key = {key} "
+               f"WHERE id IN (SELECT MIN(id) FROM customers GROUP BY {key})")
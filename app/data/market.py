@@ -0,0 +1,229 @@
+# app/data/market.py
+"""
+Piyasa fiyatı çekici (DataService.market). GUI iş parçacığını hiç beklemez:
+- arka plan iş parçacığı, tek kalıcı HTTP bağlantısı (keep-alive) ile periyodik çeker
+- koşullu istek: ETag / Last-Modified → 304 gelirse gövde indirilmez, olay yayılmaz
+- hata durumunda üstel geri çekilme: retry, 2·retry, 4·retry … en çok max_backoff saniye
+- son bilinen fiyatlar JSON dosyasında saklanır; açılışta ağ beklenmeden yüklenir
+Veri yalnızca gerçekten değiştiğinde on_update(data) çağrılır (çekici iş parçacığında).
+"""
+import http.client
+import json
+import os
+import threading
+import time
+from urllib.parse import urlsplit
+
+DEFAULT_URL = "https://displaydata01.orbitbulut.com/eyyupoglu_altin_v1/verileriGetir?tip=altin"
+# Gram has altın fiyatının olası anahtarları (öncelik sırasıyla)
+GOLD_KEYS = ("HAS_ALTIN", "gram_altin", "Gram Altın")
+
+
+def normalize(items) -> dict:
+    """API listesini kod → {id, name, kod, alis, satis, kapanis, tarih} sözlüğüne çevirir."""
+    md = {}
+    for item in items:
+        kod = item.get('kod') or item.get('ad')
+        if not kod:
+            continue
+        md[kod] = {
+            'id': item.get('id'),
+            'name': item.get('yeni_ad') or item.get('ad'),
+            'kod': kod,
+            'alis': float(item.get('alis') or 0.0),
+            'satis': float(item.get('satis') or 0.0),
+            'kapanis': float(item.get('kapanis') or 0.0),
+            'tarih': item.get('tarih')
+        }
+    return md
+
+
+def gold_price(md: dict) -> float:
+    """Fiyatlamada baz alınan gram has altın satış fiyatı; yoksa 0."""
+    for key in GOLD_KEYS:
+        price = (md.get(key) or {}).get("satis") or 0.0
+        if price > 0:
+            return price
+    return 0.0
+
+
+class Session:
+    """Aynı sunucuya tek kalıcı bağlantı; kopmuşsa bir kez yeniden bağlanır (yalnızca GET/DELETE —
+    POST tekrarlanırsa sunucuda iki kez işlenebilir). DataService.market ve RemoteDataService kullanır."""
+    def __init__(self):
+        self._cx = None
+        self._origin = None
+
+    def get(self, url: str, headers: dict, timeout: float):
+        return self.request("GET", url, headers, timeout)
+
+    def request(self, method: str, url: str, headers: dict, timeout: float, body: bytes = None):
+        u = urlsplit(url)
+        origin = (u.scheme, u.hostname, u.port)
+        if self._cx is None or self._origin != origin:
+            self.close()
+            cls = http.client.HTTPSConnection if u.scheme == "https" else http.client.HTTPConnection
+            self._cx, self._origin = cls(u.hostname, u.port, timeout=timeout), origin
+        self._cx.timeout = timeout
+        path = (u.path or "/") + (f"?{u.query}" if u.query else "")
+        for attempt in (0, 1):
+            try:
+                self._cx.request(method, path, body=body, headers=headers)
+                resp = self._cx.getresponse()
+                return resp.status, resp.headers, resp.read()
+            except (http.client.RemoteDisconnected, http.client.CannotSendRequest, BrokenPipeError,
+                    ConnectionResetError):
+                # Sunucu boşta kalan bağlantıyı kapatmış → temiz bağlantıyla bir kez daha dene
+                self._cx.close()
+                if attempt or method not in ("GET", "DELETE"):
+                    raise
+            except Exception:
+                self._cx.close()
+                raise
+
+    def close(self):
+        if self._cx is not None:
+            self._cx.close()
+        self._cx = None
+
+
+class MarketFeed:
+    def __init__(self, url: str = DEFAULT_URL, *, cache_path: str = None, interval: float = 30.0,
+                 timeout: float = 6.0, retry: float = 5.0, max_backoff: float = 300.0, on_update=None):
+        self.url = url
+        self.cache_path = cache_path
+        self.interval = interval
+        self.timeout = timeout
+        self.retry = retry
+        self.max_backoff = max_backoff
+        self.on_update = on_update
+        self.data = {}
+        self.etag = None
+        self.last_modified = None
+        self.fetched_at = None
+        self.failures = 0
+        self.last_error = None
+        self.requests = 0
+        self._session = Session()
+        self._lock = threading.Lock()  # fetch() hem GUI'den hem çekici iş parçacığından çağrılabilir
+        self._wake = threading.Event()
+        self._stop = False
+        self._thread = None
+        self._load_cache()
+
+    # --- zamanlama ---
+    def next_delay(self) -> float:
+        """Başarıdan sonra interval; art arda hatalarda üstel geri çekilme."""
+        if not self.failures:
+            return self.interval
+        return min(self.retry * 2 ** (self.failures - 1), self.max_backoff)
+
+    def start(self):
+        """Çekici iş parçacığını başlatır (zaten çalışıyorsa bir şey yapmaz); ilk çekim hemen yapılır."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop = False
+        self._thread = threading.Thread(target=self._run, name="orbitx-market", daemon=True)
+        self._thread.start()
+
+    def poll_now(self):
+        """Bekleme süresini kısa keser; çekici hemen bir tur daha çeker."""
+        self._wake.set()
+
+    def stop(self, timeout: float = 2.0):
+        self._stop = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+        with self._lock:
+            self._session.close()
+
+    def _run(self):
+        delay = 0.0
+        while True:
+            self._wake.wait(delay)
+            self._wake.clear()
+            if self._stop:
+                return
+            self.fetch()
+            delay = self.next_delay()
+
+    # --- çekim ---
+    def fetch(self, url: str = None, timeout: float = None):
+        """Tek çekim. Yeni veri geldiyse True; 304 ya da hata → False (hata yükseltilmez). timeout yalnızca bu çekim için.
+        Başka bir url verilirse tek seferlik okumadır: ayrıştırılmış fiyatlar (hata → None) döner; self.data,
+        önbellek, ETag, hata sayacı ve on_update bu adresin verisiyle karışmaz."""
+        if url is not None and url != self.url:
+            return self._fetch_other(url, timeout or self.timeout)
+        with self._lock:
+            headers = {"Accept": "application/json"}
+            if self.data:  # önbellek boşsa koşullu istek 304 ile bizi boş bırakmasın
+                if self.etag:
+                    headers["If-None-Match"] = self.etag
+                if self.last_modified:
+                    headers["If-Modified-Since"] = self.last_modified
+            self.requests += 1
+            try:
+                status, resp_headers, body = self._session.get(self.url, headers, timeout or self.timeout)
+                if status == 304:
+                    self.failures, self.last_error = 0, None
+                    return False
+                if status != 200:
+                    raise OSError(f"HTTP {status}")
+                md = normalize(json.loads(body.decode("utf-8")))
+            except Exception as e:
+                # ağ/ayrıştırma hatası: son bilinen fiyatlar yerinde kalır
+                self.failures += 1
+                self.last_error = str(e) or type(e).__name__
+                return False
+            self.failures, self.last_error = 0, None
+            self.etag = resp_headers.get("ETag")
+            self.last_modified = resp_headers.get("Last-Modified")
+            self.fetched_at = time.time()
+            changed = md != self.data
+            self.data = md
+            self._save_cache()
+        if changed and self.on_update is not None:
+            self.on_update(md)
+        return changed
+
+    @staticmethod
+    def _fetch_other(url: str, timeout: float):
+        # Ayrı bağlantı: çekicinin kalıcı bağlantısı kendi adresinde kalır
+        session = Session()
+        try:
+            status, _, body = session.get(url, {"Accept": "application/json"}, timeout)
+            return normalize(json.loads(body.decode("utf-8"))) if status == 200 else None
+        except Exception:
+            return None
+        finally:
+            session.close()
+
+    # --- disk önbelleği ---
+    def _load_cache(self):
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                c = json.load(f)
+        except (OSError, ValueError):
+            return  # bozuk önbellek: ilk çekimde üzerine yazılır
+        if c.get("url") != self.url:
+            return  # başka bir akışın fiyatları
+        self.data = c.get("data") or {}
+        self.etag = c.get("etag")
+        self.last_modified = c.get("last_modified")
+        self.fetched_at = c.get("fetched_at")
+
+    def _save_cache(self):
+        if not self.cache_path:
+            return
+        tmp = self.cache_path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"url": self.url, "etag": self.etag, "last_modified": self.last_modified,
+                           "fetched_at": self.fetched_at, "data": self.data}, f, ensure_ascii=False)
+            os.replace(tmp, self.cache_path)  # yarım yazılmış dosya görülmez
+        except OSError:
+            pass
@@ -0,0 +1,421 @@
+# app/data/migrations.py
+"""
+Sıralı şema göçleri. Her göç bir sürüm numarasıyla kayıtlıdır ve kendi işleminde
+çalışır; başarıyla biterse PRAGMA user_version o sürüme yükseltilir.
+Yeni şema değişikliği = listenin sonuna yeni bir @migration(N) fonksiyonu.
+"""
+import sqlite3
+
+from . import aggregates, balances, closing, identity, search, ticks
+
+MIGRATIONS = []  # [(version, name, fn)] — sürüme göre sıralı
+
+
+def migration(version: int, name: str = "", *, foreign_keys_off: bool = False):
+    """foreign_keys_off=True: tablo yeniden kurulan göçler için (SQLite 12 adım yöntemi)."""
+    def deco(fn):
+        fn.foreign_keys_off = foreign_keys_off
+        assert not MIGRATIONS or MIGRATIONS[-1][0] < version, "göçler artan sürümle kaydedilmeli"
+        MIGRATIONS.append((version, name or fn.__name__, fn))
+        return fn
+    return deco
+
+
+def latest_version() -> int:
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def run_script(cx, script: str):
+    """executescript örtük COMMIT yapar; bunun yerine ifadeleri işlem içinde tek tek çalıştırır."""
+    buf = ""
+    for line in script.splitlines(keepends=True):
+        buf += line
+        if sqlite3.complete_statement(buf):
+            cx.execute(buf)
+            buf = ""
+    if buf.strip():
+        cx.execute(buf)
+
+
+def _columns(cx, table: str) -> set:
+    return {row[1] for row in cx.execute(f"PRAGMA table_info({table})")}
+
+
+def migrate(db) -> list:
+    """Eksik göçleri uygular, uygulanan sürümlerin listesini döner."""
+    current = db.cx.execute("PRAGMA user_version").fetchone()[0]
+    if current >= latest_version():
+        return []
+    applied = []
+    for version, name, fn in MIGRATIONS:
+        if version <= current:
+            continue
+        fk_off = getattr(fn, "foreign_keys_off", False)
+        if fk_off:
+            # İşlem içinde değiştirilemez; DROP TABLE'ın CASCADE tetiklemesini önler
+            db.cx.execute("PRAGMA foreign_keys = OFF")
+        try:
+            with db.tx() as cx:
+                fn(cx)
+                if fk_off and cx.execute("PRAGMA foreign_key_check").fetchone():
+                    raise sqlite3.IntegrityError(f"göç {version} ({name}) yabancı anahtar ihlali bıraktı")
+                cx.execute(f"PRAGMA user_version = {int(version)}")
+        finally:
+            if fk_off:
+                db.cx.execute("PRAGMA foreign_keys = ON")
+        applied.append(version)
+    return applied
+
+
+def rebuild_table(cx, table: str, create_sql: str, columns: str, select: str):
+    """
+    Tabloyu yeni tanımla yeniden kurar: yeni tabloya kopyala, eskisini düşür, yeniden adlandır,
+    indeksleri ve tetikleyicileri geri yükle. Yalnızca foreign_keys_off=True göçlerinden çağrılmalı.
+    """
+    indexes = [r[0] for r in cx.execute(
+        "SELECT sql FROM sqlite_master WHERE type IN ('index', 'trigger') AND tbl_name=? AND sql IS NOT NULL "
+        "ORDER BY type", (table,))]
+    cx.execute(create_sql.format(table=f"{table}__new"))
+    cx.execute(f"INSERT INTO {table}__new({columns}) SELECT {select} FROM {table}")
+    cx.execute(f"DROP TABLE {table}")
+    cx.execute(f"ALTER TABLE {table}__new RENAME TO {table}")
+    for sql in indexes:
+        cx.execute(sql)
+
+
+# --- göçler ---
+
+@migration(1, "temel şema")
+def _v1_base_schema(cx):
+    run_script(cx, """
+        CREATE TABLE IF NOT EXISTS customers(
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          code TEXT UNIQUE, name TEXT NOT NULL, phone TEXT,
+          status TEXT DEFAULT 'Aktif',
+          balance REAL NOT NULL DEFAULT 0.0,
+          last_txn_at TEXT,
+          created_at TEXT DEFAULT (datetime('now')),
+          updated_at TEXT DEFAULT (datetime('now'))
+        );
+
+        CREATE TABLE IF NOT EXISTS stock_items(
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          code TEXT UNIQUE NOT NULL, name TEXT NOT NULL,
+          category TEXT, milyem INTEGER, ayar INTEGER,
+          gram REAL DEFAULT 0.0, qty INTEGER DEFAULT 0,
+          buy_price REAL DEFAULT 0.0, sell_price REAL DEFAULT 0.0,
+          isc_tip TEXT, isc_alinan REAL DEFAULT 0.0, isc_verilen REAL DEFAULT 0.0,
+          vat REAL DEFAULT 0.0, critical_qty INTEGER DEFAULT 5, photo TEXT
+        );
+
+        CREATE TABLE IF NOT EXISTS sales(
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          type TEXT NOT NULL,             -- 'Satış' | 'Alış'
+          doc_no TEXT, date TEXT NOT NULL, notes TEXT,
+          customer_id INTEGER, pay_type TEXT,
+          paid_amount REAL DEFAULT 0.0, discount REAL DEFAULT 0.0,
+          total REAL NOT NULL, due REAL NOT NULL,
+          created_at TEXT DEFAULT (datetime('now')),
+          FOREIGN KEY(customer_id) REFERENCES customers(id) ON DELETE SET NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS sale_items(
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          sale_id INTEGER NOT NULL, stock_id INTEGER,
+          code TEXT NOT NULL, name TEXT NOT NULL,
+          gram REAL DEFAULT 0.0, qty INTEGER NOT NULL,
+          unit_price REAL NOT NULL, milyem TEXT, iscilik REAL DEFAULT 0.0,
+          line_total REAL NOT NULL,
+          FOREIGN KEY(sale_id) REFERENCES sales(id) ON DELETE CASCADE,
+          FOREIGN KEY(stock_id) REFERENCES stock_items(id) ON DELETE SET NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS customer_ledger(
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          customer_id INTEGER NOT NULL, sale_id INTEGER,
+          direction TEXT NOT NULL,     -- 'Borç' | 'Alacak'
+          amount REAL NOT NULL, desc TEXT, date TEXT NOT NULL,
+          FOREIGN KEY(customer_id) REFERENCES customers(id) ON DELETE CASCADE,
+          FOREIGN KEY(sale_id) REFERENCES sales(id) ON DELETE SET NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS stock_moves(
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          stock_id INTEGER NOT NULL, sale_id INTEGER,
+          move_type TEXT NOT NULL,     -- 'OUT' | 'IN' | 'ADJ'
+          qty INTEGER NOT NULL, note TEXT, date TEXT NOT NULL,
+          FOREIGN KEY(stock_id) REFERENCES stock_items(id) ON DELETE CASCADE,
+          FOREIGN KEY(sale_id) REFERENCES sales(id) ON DELETE SET NULL
+        );
+
+        -- Kasa & Banka (Finance)
+        CREATE TABLE IF NOT EXISTS cash_ledger(
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          date TEXT NOT NULL, time TEXT,
+          account TEXT NOT NULL,       -- 'Kasa' | 'Banka — …'
+          type TEXT NOT NULL,          -- 'Giriş' | 'Çıkış'
+          category TEXT, description TEXT,
+          amount REAL NOT NULL,
+          customer_id INTEGER, sale_id INTEGER,
+          -- Yeni alanlar (migration sonrası)
+          ref_no TEXT,
+          currency_code TEXT DEFAULT '00',   -- 00=TRY, 01=USD, 02=EUR
+          amount_foreign REAL DEFAULT 0,
+          fx_rate REAL DEFAULT 1,
+          type_code TEXT,                   -- Kısa kod (örn. DG, ST, MS)
+          FOREIGN KEY(customer_id) REFERENCES customers(id) ON DELETE SET NULL,
+          FOREIGN KEY(sale_id) REFERENCES sales(id) ON DELETE SET NULL
+        );
+
+        CREATE INDEX IF NOT EXISTS idx_cust_code ON customers(code);
+        CREATE INDEX IF NOT EXISTS idx_stock_code ON stock_items(code);
+        CREATE INDEX IF NOT EXISTS idx_sales_date ON sales(date);
+        CREATE INDEX IF NOT EXISTS idx_items_sale ON sale_items(sale_id);
+        CREATE INDEX IF NOT EXISTS idx_cash_date ON cash_ledger(date);
+        """)
+
+
+@migration(2, "cash_ledger döviz/ref alanları")
+def _v2_cash_ledger_fields(cx):
+    # Eski (user_version=0) veritabanlarında bu kolonlar eksik olabilir
+    columns = _columns(cx, "cash_ledger")
+    if "ref_no" not in columns:
+        cx.execute("ALTER TABLE cash_ledger ADD COLUMN ref_no TEXT")
+    if "currency_code" not in columns:
+        cx.execute("ALTER TABLE cash_ledger ADD COLUMN currency_code TEXT DEFAULT '00'")
+    if "amount_foreign" not in columns:
+        cx.execute("ALTER TABLE cash_ledger ADD COLUMN amount_foreign REAL DEFAULT 0")
+    if "fx_rate" not in columns:
+        cx.execute("ALTER TABLE cash_ledger ADD COLUMN fx_rate REAL DEFAULT 1")
+    if "type_code" not in columns:
+        cx.execute("ALTER TABLE cash_ledger ADD COLUMN type_code TEXT")
+
+
+@migration(3, "bileşik/kapsayan indeksler")
+def _v3_workload_indexes(cx):
+    run_script(cx, """
+        -- UNIQUE kısıtları zaten otomatik indeks oluşturuyor; kopyalar yalnızca yazımı yavaşlatır
+        DROP INDEX IF EXISTS idx_cust_code;
+        DROP INDEX IF EXISTS idx_stock_code;
+
+        -- Cari listesi (ORDER BY name) ve ad+telefon ile müşteri çözümleme
+        CREATE INDEX IF NOT EXISTS idx_cust_name_phone ON customers(name, phone);
+
+        -- Cari hareketleri / 30 gün özeti: WHERE customer_id=? ORDER BY date DESC, id DESC
+        -- (rowid indeksin sonunda olduğu için id sıralaması da indeksten gelir)
+        CREATE INDEX IF NOT EXISTS idx_sales_customer_date ON sales(customer_id, date);
+
+        -- Cari defteri ve yabancı anahtar alt tabloları
+        CREATE INDEX IF NOT EXISTS idx_ledger_customer_date ON customer_ledger(customer_id, date);
+        CREATE INDEX IF NOT EXISTS idx_ledger_sale ON customer_ledger(sale_id);
+        CREATE INDEX IF NOT EXISTS idx_items_code ON sale_items(code);
+        CREATE INDEX IF NOT EXISTS idx_items_stock ON sale_items(stock_id);
+        CREATE INDEX IF NOT EXISTS idx_moves_stock ON stock_moves(stock_id);
+        CREATE INDEX IF NOT EXISTS idx_moves_sale ON stock_moves(sale_id);
+        CREATE INDEX IF NOT EXISTS idx_cash_sale ON cash_ledger(sale_id);
+        CREATE INDEX IF NOT EXISTS idx_cash_customer ON cash_ledger(customer_id);
+
+        -- Kasa defteri: ORDER BY date DESC, time DESC
+        CREATE INDEX IF NOT EXISTS idx_cash_date_time ON cash_ledger(date, time);
+
+        -- Kritik stok (kısmi indeks: yalnızca kritik seviyedeki ürünler)
+        CREATE INDEX IF NOT EXISTS idx_stock_critical ON stock_items(code) WHERE qty <= critical_qty;
+    """)
+
+
+def _k(col: str) -> str:
+    return f"CAST(ROUND(COALESCE({col}, 0) * 100) AS INTEGER)"
+
+
+@migration(4, "para alanları INTEGER kuruş", foreign_keys_off=True)
+def _v4_money_as_kurus(cx):
+    # Tutarlar *_kurus INTEGER kolonlarında tutulur; eski adlar salt-okunur sanal kolonlardır
+    # (SELECT'ler ve raporlar TL float görmeye devam eder, SUM'lar tam sayı üzerinden yapılır).
+    rebuild_table(cx, "customers", """
+        CREATE TABLE {table}(
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          code TEXT UNIQUE, name TEXT NOT NULL, phone TEXT,
+          status TEXT DEFAULT 'Aktif',
+          balance_kurus INTEGER NOT NULL DEFAULT 0,
+          balance REAL GENERATED ALWAYS AS (balance_kurus / 100.0) VIRTUAL,
+          last_txn_at TEXT,
+          created_at TEXT DEFAULT (datetime('now')),
+          updated_at TEXT DEFAULT (datetime('now'))
+        )""",
+        "id, code, name, phone, status, balance_kurus, last_txn_at, created_at, updated_at",
+        f"id, code, name, phone, status, {_k('balance')}, last_txn_at, created_at, updated_at")
+
+    rebuild_table(cx, "sales", """
+        CREATE TABLE {table}(
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          type TEXT NOT NULL,             -- 'Satış' | 'Alış'
+          doc_no TEXT, date TEXT NOT NULL, notes TEXT,
+          customer_id INTEGER, pay_type TEXT,
+          paid_kurus INTEGER NOT NULL DEFAULT 0,
+          discount_kurus INTEGER NOT NULL DEFAULT 0,
+          total_kurus INTEGER NOT NULL,
+          due_kurus INTEGER NOT NULL,
+          paid_amount REAL GENERATED ALWAYS AS (paid_kurus / 100.0) VIRTUAL,
+          discount REAL GENERATED ALWAYS AS (discount_kurus / 100.0) VIRTUAL,
+          total REAL GENERATED ALWAYS AS (total_kurus / 100.0) VIRTUAL,
+          due REAL GENERATED ALWAYS AS (due_kurus / 100.0) VIRTUAL,
+          created_at TEXT DEFAULT (datetime('now')),
+          FOREIGN KEY(customer_id) REFERENCES customers(id) ON DELETE SET NULL
+        )""",
+        "id, type, doc_no, date, notes, customer_id, pay_type, paid_kurus, discount_kurus, "
+        "total_kurus, due_kurus, created_at",
+        f"id, type, doc_no, date, notes, customer_id, pay_type, {_k('paid_amount')}, {_k('discount')}, "
+        f"{_k('total')}, {_k('due')}, created_at")
+
+    rebuild_table(cx, "sale_items", """
+        CREATE TABLE {table}(
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          sale_id INTEGER NOT NULL, stock_id INTEGER,
+          code TEXT NOT NULL, name TEXT NOT NULL,
+          gram REAL DEFAULT 0.0, qty INTEGER NOT NULL,
+          unit_price_kurus INTEGER NOT NULL, milyem TEXT,
+          iscilik_kurus INTEGER NOT NULL DEFAULT 0,
+          line_total_kurus INTEGER NOT NULL,
+          unit_price REAL GENERATED ALWAYS AS (unit_price_kurus / 100.0) VIRTUAL,
+          iscilik REAL GENERATED ALWAYS AS (iscilik_kurus / 100.0) VIRTUAL,
+          line_total REAL GENERATED ALWAYS AS (line_total_kurus / 100.0) VIRTUAL,
+          FOREIGN KEY(sale_id) REFERENCES sales(id) ON DELETE CASCADE,
+          FOREIGN KEY(stock_id) REFERENCES stock_items(id) ON DELETE SET NULL
+        )""",
+        "id, sale_id, stock_id, code, name, gram, qty, unit_price_kurus, milyem, iscilik_kurus, line_total_kurus",
+        f"id, sale_id, stock_id, code, name, gram, qty, {_k('unit_price')}, milyem, {_k('iscilik')}, "
+        f"{_k('line_total')}")
+
+    rebuild_table(cx, "customer_ledger", """
+        CREATE TABLE {table}(
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          customer_id INTEGER NOT NULL, sale_id INTEGER,
+          direction TEXT NOT NULL,     -- 'Borç' | 'Alacak'
+          amount_kurus INTEGER NOT NULL,
+          amount REAL GENERATED ALWAYS AS (amount_kurus / 100.0) VIRTUAL,
+          desc TEXT, date TEXT NOT NULL,
+          FOREIGN KEY(customer_id) REFERENCES customers(id) ON DELETE CASCADE,
+          FOREIGN KEY(sale_id) REFERENCES sales(id) ON DELETE SET NULL
+        )""",
+        "id, customer_id, sale_id, direction, amount_kurus, desc, date",
+        f"id, customer_id, sale_id, direction, {_k('amount')}, desc, date")
+
+    rebuild_table(cx, "cash_ledger", """
+        CREATE TABLE {table}(
+          id INTEGER PRIMARY KEY AUTOINCREMENT,
+          date TEXT NOT NULL, time TEXT,
+          account TEXT NOT NULL,       -- 'Kasa' | 'Banka — …'
+          type TEXT NOT NULL,          -- 'Giriş' | 'Çıkış'
+          category TEXT, description TEXT,
+          amount_kurus INTEGER NOT NULL,
+          amount REAL GENERATED ALWAYS AS (amount_kurus / 100.0) VIRTUAL,
+          customer_id INTEGER, sale_id INTEGER,
+          ref_no TEXT,
+          currency_code TEXT DEFAULT '00',   -- 00=TRY, 01=USD, 02=EUR
+          amount_foreign REAL DEFAULT 0,
+          fx_rate REAL DEFAULT 1,
+          type_code TEXT,                   -- Kısa kod (örn. DG, ST, MS)
+          FOREIGN KEY(customer_id) REFERENCES customers(id) ON DELETE SET NULL,
+          FOREIGN KEY(sale_id) REFERENCES sales(id) ON DELETE SET NULL
+        )""",
+        "id, date, time, account, type, category, description, amount_kurus, customer_id, sale_id, "
+        "ref_no, currency_code, amount_foreign, fx_rate, type_code",
+        f"id, date, time, account, type, category, description, {_k('amount')}, customer_id, sale_id, "
+        f"ref_no, currency_code, amount_foreign, fx_rate, type_code")
+
+
+@migration(5, "günlük satış/kasa özet tabloları")
+def _v5_daily_aggregates(cx):
+    run_script(cx, aggregates.SCHEMA)
+    run_script(cx, aggregates.TRIGGERS)
+    aggregates.rebuild(cx)  # mevcut kayıtları özetlere doldur
+
+
+@migration(6, "FTS5 arama dizinleri")
+def _v6_search_indexes(cx):
+    run_script(cx, search.SCHEMA)
+    search.rebuild(cx)
+
+
+@migration(7, "müşteri kimlik anahtarı")
+def _v7_customer_identity(cx):
+    if "ident_key" not in _columns(cx, "customers"):
+        cx.execute("ALTER TABLE customers ADD COLUMN ident_key TEXT")
+    identity.backfill(cx)
+    run_script(cx, identity.SCHEMA)
+
+
+@migration(8, "piyasa fiyat geçmişi ve OHLC özetleri")
+def _v8_market_ticks(cx):
+    run_script(cx, ticks.SCHEMA)
+    run_script(cx, ticks.TRIGGERS)
+
+
+@migration(9, "süreçler arası değişiklik günlüğü")
+def _v9_change_log(cx):
+    # INTEGER PRIMARY KEY (AUTOINCREMENT yok): id'ler boşluksuz artar; izleyici id > hwm aralığını okur
+    cx.execute("""CREATE TABLE IF NOT EXISTS change_log(
+        id INTEGER PRIMARY KEY,
+        origin TEXT NOT NULL,       -- yazan DB bağlantısı (DB.origin)
+        at REAL NOT NULL,           -- unix zamanı
+        changes TEXT NOT NULL       -- JSON: [[tablo, insert|update|delete|reset, [id, ...]], ...]
+    )""")
+
+
+@migration(10, "sayfalı liste indeksleri")
+def _v10_keyset_indexes(cx):
+    run_script(cx, """
+        -- Müşteri sayfaları: ORDER BY name, id (rowid indeksin sonunda); ad ile arama da bunu kullanır
+        DROP INDEX IF EXISTS idx_cust_name_phone;
+        CREATE INDEX IF NOT EXISTS idx_cust_name ON customers(name);
+
+        -- Kasa defteri sayfaları: ORDER BY date DESC, id DESC; hesap/kategori süzgeciyle (x, date, id)
+        CREATE INDEX IF NOT EXISTS idx_cash_date ON cash_ledger(date);
+        CREATE INDEX IF NOT EXISTS idx_cash_account_date ON cash_ledger(account, date);
+        CREATE INDEX IF NOT EXISTS idx_cash_category_date ON cash_ledger(category, date);
+
+        -- Kategoriye süzülmüş stok sayfaları: ORDER BY code
+        CREATE INDEX IF NOT EXISTS idx_stock_category_code ON stock_items(category, code);
+    """)
+
+
+@migration(11, "kasa defteri epoch sıralama anahtarı")
+def _v11_cash_ts(cx):
+    # Tarih + saat → unix saniyesi, bir kez tanımlı (VIRTUAL: satırda yer kaplamaz, indekste saklanır).
+    # Saat boş/bozuksa günün başı; kasa defteri sayfaları (date_from/date_to dahil) bu anahtarla yürür.
+    if "ts" not in _columns(cx, "cash_ledger"):
+        cx.execute("""ALTER TABLE cash_ledger ADD COLUMN ts INTEGER GENERATED ALWAYS AS (
+            COALESCE(CAST(strftime('%s', date || ' ' || time) AS INTEGER), CAST(strftime('%s', date) AS INTEGER), 0)
+        ) VIRTUAL""")
+    run_script(cx, """
+        CREATE INDEX IF NOT EXISTS idx_cash_ts ON cash_ledger(ts);
+        CREATE INDEX IF NOT EXISTS idx_cash_account_ts ON cash_ledger(account, ts);
+    """)
+
+
+@migration(12, "hesap bakiyesi kontrol noktaları")
+def _v12_cash_balances(cx):
+    run_script(cx, balances.SCHEMA)
+    run_script(cx, balances.TRIGGERS)
+    balances.rebuild(cx)  # mevcut defterden gün sonu bakiyeleri
+
+
+@migration(13, "gün sonu kapanışı (Z raporu)")
+def _v13_period_close(cx):
+    run_script(cx, closing.SCHEMA)
+    run_script(cx, closing.TRIGGERS)
+
+
+@migration(14, "arama: katlanmış ad/tanımlayıcı indeksleri")
+def _v14_search_keys(cx):
+    # Tam ve ad başı eşleşmeler aday penceresine bağlı kalmasın (search.search → _heads)
+    run_script(cx, search.KEYS_SCHEMA)
+
+
+@migration(15, "gün sonu: stok anlık görüntüsünün zamanı")
+def _v15_close_stock_at(cx):
+    # Stok yalnızca bugünün kapanışında dondurulur; geriye dönük kapanışlarda NULL (stok bölümü yok)
+    if "stock_at" not in _columns(cx, "period_close"):
+        cx.execute("ALTER TABLE period_close ADD COLUMN stock_at TEXT")
+    cx.execute("UPDATE period_close SET stock_at = closed_at "
+               "WHERE EXISTS (SELECT 1 FROM close_stock s WHERE s.date = period_close.date)")
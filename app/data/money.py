@@ -0,0 +1,102 @@
+# app/data/money.py
+"""
+Para birimi yardımcıları. Tutarlar veritabanında INTEGER kuruş olarak saklanır;
+float/metin dönüşümü yalnızca UI sınırında yapılır.
+"""
+import re
+from decimal import Decimal, ROUND_HALF_UP
+
+_NUMBER = re.compile(r"-?[\d.,]+")
+
+
+def to_kurus(value) -> int:
+    """'₺25.330,00' | '25330.5' | 12.3 | 7 → kuruş (int). Geçersiz girdi 0 döner."""
+    t = type(value)
+    if t is str:
+        parts = _split(value) if value else None
+    elif t is int:
+        return value * 100
+    elif t is float:
+        return int(round(value * 100))
+    elif value is None:
+        return 0
+    elif t is bool:
+        return int(value) * 100
+    elif isinstance(value, Decimal):
+        return int((value * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    else:
+        parts = _split(value)
+    if parts is None:
+        return 0
+    neg, whole, frac = parts
+    k = int(whole or 0) * 100
+    if frac:
+        k += int((frac + "0")[:2])
+        if len(frac) > 2 and frac[2] >= "5":
+            k += 1
+    return -k if neg else k
+
+
+def parse_number(value) -> float:
+    """TR/EN biçimli ondalık sayı (gram, milyem…) → float; kuruşa yuvarlamaz."""
+    if type(value) in (int, float):
+        return float(value)
+    if value is None or value == "":
+        return 0.0
+    parts = _split(value)
+    if parts is None:
+        return 0.0
+    neg, whole, frac = parts
+    x = float(f"{whole or 0}.{frac or 0}")
+    return -x if neg else x
+
+
+def _split(value):
+    """Metni (negatif mi, tam kısım, ondalık kısım) rakam dizilerine ayırır; olmazsa None."""
+    s = str(value)
+    if s.isdecimal():
+        return False, s, ""
+    s = s.replace("₺", "").replace(" ", "").replace("\u00a0", "")
+    if "TL" in s:
+        s = s.replace("TL", "")
+    parts = _split_number(s)
+    if parts is None:
+        # Yavaş yol: metin içindeki ilk sayıyı ayıkla ("Toplam: 1.250,00 ₺" gibi)
+        m = _NUMBER.search(s)
+        parts = _split_number(m.group()) if m else None
+    return parts
+
+
+def _split_number(s: str):
+    neg = s[:1] == "-"
+    if neg or s[:1] == "+":
+        s = s[1:]
+    comma, dot = s.rfind(","), s.rfind(".")
+    if comma == dot:                             # ikisi de yok → düz tam sayı
+        return (neg, s, "") if s.isdecimal() else None
+    if comma > dot:
+        if dot == -1 and s.count(",") > 1:       # 1,234,567 → binlik virgül
+            whole, frac = s.replace(",", ""), ""
+        else:                                    # 25.330,00 / 25330,5 → ondalık virgül
+            whole, frac = s[:comma].replace(".", ""), s[comma + 1:]
+    else:
+        if comma == -1 and s.count(".") > 1:     # 1.234.567 → binlik nokta
+            whole, frac = s.replace(".", ""), ""
+        else:                                    # 25,330.00 / 25330.00
+            whole, frac = s[:dot].replace(",", ""), s[dot + 1:]
+    if (whole or frac).isdecimal() and (not whole or whole.isdecimal()) and (not frac or frac.isdecimal()):
+        return neg, whole, frac
+    return None
+
+
+def from_kurus(k: int) -> float:
+    """kuruş → TL (float, yalnızca gösterim/uyumluluk için)."""
+    return (k or 0) / 100
+
+
+def format_kurus(k: int, *, thousands: str = ".", decimal: str = ",") -> str:
+    """12345678 → '123.456,78' (TR biçimi, para simgesi olmadan)."""
+    k = int(k or 0)
+    sign = "-" if k < 0 else ""
+    whole, frac = divmod(abs(k), 100)
+    return f"{sign}{whole:,}".replace(",", thousands) + f"{decimal}{frac:02d}"
@@ -0,0 +1,132 @@
+# app/data/paging.py
+"""
+Anahtar kümesi (keyset) sayfalama. OFFSET yerine son görülen satırın sıralama anahtarından devam
+edilir: her sayfa indeksten yalnızca limit kadar satır okur, 1M+ satırda da süre ve bellek sabittir.
+- kasa defteri: date DESC, id DESC   (idx_cash_date; hesap/kategori süzgeciyle idx_cash_account_date,
+                                      idx_cash_category_date)
+- stok: code                          (UNIQUE indeks, kategoriyle idx_stock_category_code)
+- müşteriler: name, id                (idx_cust_name)
+Başka sıralama: order=(kolon, azalan) → anahtar (kolon, id). Kasa defterinde "ts" (tarih + saat epoch'u,
+idx_cash_ts / idx_cash_account_ts) indeksli; tarih süzgeci de o zaman ts aralığına çevrilir.
+Süzgeçler SQL'e çevrilir; metin araması FTS dizininden (search.match_sql).
+Sayfa: {"rows": [...], "next": sonraki sayfanın imleci (anahtar değerleri listesi) ya da None}.
+Toplam sayı ayrı sorgudur (count); kasa defterinde süzgeç izin veriyorsa daily_cash_agg'den okunur.
+Kasa toplamları (adet, giriş, çıkış) tek SUM(CASE …) sorgusudur (cash_totals), aynı özet kuralıyla.
+"""
+from . import search
+
+# tablo → (takma ad, sıralama anahtarı kolonları, azalan mı, {süzgeç: kolon})
+TABLES = {
+    "cash_ledger": ("c", ("date", "id"), True,
+                    {"account": "account", "type": "type", "category": "category"}),
+    "stock_items": ("stock_items", ("code",), False, {"category": "category"}),
+    "customers": ("customers", ("name", "id"), False, {}),
+}
+# order= ile sıralanabilen kolonlar: tablo → {kolon: NULL olabilir mi}. NULL olabilen kolon COALESCE(…, '')
+# ile karşılaştırılır (satır değeri karşılaştırması NULL'da bozulur); imleçte de '' yazılır.
+ORDERS = {
+    "cash_ledger": {"ts": False, "date": False, "amount_kurus": False, "account": False, "type": False,
+                    "time": True, "category": True, "description": True, "ref_no": True, "type_code": True},
+    "stock_items": {},
+    "customers": {},
+}
+# daily_cash_agg'de karşılığı olan süzgeçler: yalnızca bunlar varsa sayı özetten okunur
+_AGG_FILTERS = {"date_from", "date_to", "account", "type"}
+
+
+def where(table: str, filters: dict = None, ordered: bool = False, by_ts: bool = False) -> tuple:
+    """Süzgeçler → ([WHERE parçaları], [parametreler]). Boş değerler yok sayılır.
+    filters: {"date_from", "date_to" (kasa), "account", "type", "category", "text"}
+    by_ts: kasa tarih aralığı ts üzerinden (ts sıralı sayfa aynı indeksi yürüsün)"""
+    alias, _, _, columns = TABLES[table]
+    parts, params = [], []
+    for key, value in (filters or {}).items():
+        if value in (None, ""):
+            continue
+        if key == "text":
+            p, a = search.match_sql(table, value, f"{alias}.id", ordered)
+            parts += p
+            params += a
+        elif key in ("date_from", "date_to") and table == "cash_ledger":
+            if by_ts:
+                parts.append(f"{alias}.ts >= CAST(strftime('%s', ?) AS INTEGER)" if key == "date_from" else
+                             f"{alias}.ts < CAST(strftime('%s', ?, '+1 day') AS INTEGER)")
+            else:
+                parts.append(f"{alias}.date {'>=' if key == 'date_from' else '<='} ?")
+            params.append(value)
+        elif key in columns:
+            parts.append(f"{alias}.{columns[key]} = ?")
+            params.append(value)
+        else:
+            raise ValueError(f"Bilinmeyen süzgeç: {key}")
+    return parts, params
+
+
+def page(cx, table: str, select: str, filters: dict = None, after=None, limit: int = 200, order=None) -> dict:
+    """select: takma adı TABLES'takiyle aynı olan "SELECT … FROM tablo [takma ad] [JOIN …]" (WHERE'siz).
+    order: (kolon, azalan) — ORDERS'taki kolonlardan; yoksa tablonun varsayılan sırası."""
+    alias, keys, desc, _ = TABLES[table]
+    nullable = set()
+    if order is not None:
+        column, desc = order
+        if column not in ORDERS[table]:
+            raise ValueError(f"Bilinmeyen sıralama: {column}")
+        keys = (column, "id")
+        nullable = {column} if ORDERS[table][column] else set()
+    parts, params = where(table, filters, ordered=True, by_ts=keys[0] == "ts")
+    exprs = [f"COALESCE({alias}.{k}, '')" if k in nullable else f"{alias}.{k}" for k in keys]
+    if after is not None:
+        # Satır değeri karşılaştırması: (date, id) < (?, ?) — indekste kalınan yerden devam
+        parts.append(f"({', '.join(exprs)}) {'<' if desc else '>'} ({', '.join('?' * len(keys))})")
+        params += list(after)
+    order_by = ", ".join(f"{e} {'DESC' if desc else 'ASC'}" for e in exprs)
+    sql = select + (" WHERE " + " AND ".join(parts) if parts else "") + f" ORDER BY {order_by} LIMIT ?"
+    rows = [dict(r) for r in cx.execute(sql, (*params, int(limit) + 1))]
+    more = len(rows) > limit
+    rows = rows[:limit]
+    last = rows[-1] if more and rows else None
+    return {"rows": rows,
+            "next": [last[k] if last[k] is not None or k not in nullable else "" for k in keys] if last else None}
+
+
+def _active(filters: dict = None) -> dict:
+    """Etkin süzgeçler: boş değerler atılır, arama metni kırpılır (yalnızca boşluksa süzgeç yok)."""
+    f = dict(filters or {})
+    if isinstance(f.get("text"), str):
+        f["text"] = f["text"].strip()
+    return {k: v for k, v in f.items() if v not in (None, "")}
+
+
+def count(cx, table: str, filters: dict = None) -> int:
+    f = _active(filters)
+    if table == "cash_ledger" and set(f) <= _AGG_FILTERS:
+        # Gün × hesap × tür özet satırları: ham defter satırına dokunulmaz
+        return cash_totals(cx, f)["n"]
+    alias = TABLES[table][0]
+    parts, params = where(table, f)
+    sql = f"SELECT COUNT(*) FROM {table}" + (f" {alias}" if alias != table else "")
+    return cx.execute(sql + (" WHERE " + " AND ".join(parts) if parts else ""), params).fetchone()[0]
+
+
+def cash_totals(cx, filters: dict = None) -> dict:
+    """Kasa defteri süzgecinin adet ve giriş/çıkış toplamları (kuruş), tek SUM(CASE …) sorgusu:
+    {"n", "in_k", "out_k"}. Süzgeç izin veriyorsa gün × hesap × tür özetinden (ham satıra dokunulmaz)."""
+    f = _active(filters)
+    if set(f) <= _AGG_FILTERS:
+        sql = """SELECT COALESCE(SUM(n), 0),
+                        COALESCE(SUM(CASE WHEN type = 'Giriş' THEN amount_kurus END), 0),
+                        COALESCE(SUM(CASE WHEN type = 'Çıkış' THEN amount_kurus END), 0)
+                 FROM daily_cash_agg WHERE date BETWEEN ? AND ?"""
+        params = [f.get("date_from", ""), f.get("date_to", "9999-12-31")]
+        for key in ("account", "type"):
+            if key in f:
+                sql += f" AND {key} = ?"
+                params.append(f[key])
+    else:
+        parts, params = where("cash_ledger", f)
+        sql = ("""SELECT COUNT(*),
+                         COALESCE(SUM(CASE WHEN c.type = 'Giriş' THEN c.amount_kurus END), 0),
+                         COALESCE(SUM(CASE WHEN c.type = 'Çıkış' THEN c.amount_kurus END), 0)
+                  FROM cash_ledger c""" + (" WHERE " + " AND ".join(parts) if parts else ""))
+    n, in_k, out_k = cx.execute(sql, params).fetchone()
+    return {"n": n, "in_k": in_k, "out_k": out_k}
@@ -0,0 +1,102 @@
+# app/data/pricing.py
+"""
+Toplu fiyatlama motoru. Stok kolonları (gram, milyem, ayar, kategori, işçilik) paylaşılan
+katalogun sütun dizilerinden NumPy dizilerine kopyalanır — DB'den satır satır okunmaz; tüm stok
+tek vektörel geçişte fiyatlanır ve yalnızca değişen fiyatlar tek executemany ile geri yazılır.
+
+Birim satış = yuvarla(gram × milyem/1000 × baz × (1 + kâr%)) + işçilik   (SalesPage ile aynı formül)
+- milyem boşsa ayardan: 24→995, 22→916, 18→750, 14→585, diğer → 916
+- işçilik (isc_alinan) tipine göre: Milyem → gram × isc/1000 × baz, Gram → gram × isc (₺/gr), TL → isc
+- kâr oranı / yuvarlama adımı kurallardan: en özel eşleşen kazanır (kategori+ayar > kategori > ayar > varsayılan)
+"""
+import numpy as np
+
+MILYEM_BY_AYAR = {24: 995.0, 22: 916.0, 18: 750.0, 14: 585.0}
+DEFAULT_MILYEM = 916.0
+ISC_TIPS = ("Milyem", "Gram", "TL")
+
+
+def round_to_step(v, step: float):
+    """.5 ve üstü yukarı (banker yuvarlaması yok); step <= 0 → kuruşa yuvarlanır. Sayı ya da dizi alır."""
+    if step <= 0:
+        return np.floor(np.asarray(v) * 100 + 0.5) / 100
+    return np.floor(np.asarray(v) / step + 0.5) * step
+
+
+class PriceRules:
+    """rules: [{"category": "Bilezik", "ayar": 22, "markup": 6.0, "round_step": 50}, ...] — alanlar isteğe bağlı."""
+    def __init__(self, markup: float = 0.0, round_step: float = 10.0, rules=()):
+        self.markup = markup
+        self.round_step = round_step
+        self.rules = list(rules)
+
+    def _ordered(self):
+        # Az özelden çok özele: sonra uygulanan kural öncekini ezer
+        rank = lambda r: (r.get("category") is not None) * 2 + (r.get("ayar") is not None)
+        return sorted(self.rules, key=rank)
+
+
+class Inventory:
+    """Fiyatlamada kullanılan stok kolonları (NumPy kopyaları); kategori/işçilik tipi labels kodudur."""
+    __slots__ = ("ids", "gram", "milyem", "ayar", "category", "isc_tip", "isc", "sell", "labels")
+
+    def __len__(self):
+        return len(self.ids)
+
+
+def from_catalog(catalog) -> Inventory:
+    """Katalogun sütun dizilerinden tutarlı bir kopya (snapshot_columns → NumPy)."""
+    cols = catalog.snapshot_columns()
+    inv = Inventory()
+    inv.ids = np.array(cols["ids"], dtype=np.int64)
+    inv.gram = np.array(cols["gram"], dtype=np.float64)
+    inv.milyem = np.array(cols["milyem"], dtype=np.float64)
+    inv.ayar = np.array(cols["ayar"], dtype=np.int64)
+    inv.category = np.array(cols["category"], dtype=np.int64)
+    inv.isc_tip = np.array(cols["isc_tip"], dtype=np.int64)
+    inv.isc = np.array(cols["isc"], dtype=np.float64)
+    inv.sell = np.array(cols["sell"], dtype=np.float64)
+    inv.labels = cols["labels"]
+    return inv
+
+
+def compute(inv: Inventory, base: float, rules: PriceRules) -> np.ndarray:
+    """Tüm stok için yeni birim satış fiyatları (₺), inv.ids ile aynı sırada."""
+    milyem = inv.milyem.copy()
+    missing = milyem <= 0
+    if missing.any():
+        by_ayar = np.full(len(inv), DEFAULT_MILYEM)
+        for ayar, m in MILYEM_BY_AYAR.items():
+            by_ayar[inv.ayar == ayar] = m
+        milyem[missing] = by_ayar[missing]
+
+    markup = np.full(len(inv), float(rules.markup))
+    step = np.full(len(inv), float(rules.round_step))
+    code = {label: i for i, label in enumerate(inv.labels)}
+    for r in rules._ordered():
+        mask = np.ones(len(inv), dtype=bool)
+        if r.get("category") is not None:
+            if r["category"] not in code:
+                continue
+            mask &= inv.category == code[r["category"]]
+        if r.get("ayar") is not None:
+            mask &= inv.ayar == int(r["ayar"])
+        if "markup" in r:
+            markup[mask] = float(r["markup"])
+        if "round_step" in r:
+            step[mask] = float(r["round_step"])
+
+    metal = inv.gram * milyem / 1000.0 * base * (1.0 + markup / 100.0)
+    safe = np.where(step > 0, step, 1.0)
+    rounded = np.where(step > 0, np.floor(metal / safe + 0.5) * safe, np.floor(metal * 100 + 0.5) / 100)
+    tip = [inv.isc_tip == code.get(t, -1) for t in ISC_TIPS]
+    labour = np.select(tip, [inv.gram * inv.isc / 1000.0 * base, inv.gram * inv.isc, inv.isc], 0.0)
+    return np.round(rounded + labour, 2)
+
+
+def write(cx, inv: Inventory, prices: np.ndarray) -> tuple:
+    """Yalnızca değişen fiyatları tek executemany ile yazar; (değişen id'ler, yeni fiyatlar) döner."""
+    changed = np.abs(prices - inv.sell) >= 0.005
+    ids, new = inv.ids[changed], prices[changed]
+    cx.executemany("UPDATE stock_items SET sell_price = ? WHERE id = ?", zip(new.tolist(), ids.tolist()))
+    return ids, new
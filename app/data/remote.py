@@ -0,0 +1,300 @@
+# app/data/remote.py
+"""
+İnce istemci (kasa terminali): DataService yerine app/server.py'ye HTTP/JSON ile bağlanır.
+Sayfaların kullandığı yöntemler ve sinyaller aynı adlarla sunulur:
+- stok kataloğu yerelde tutulur (açılışta bir kez çekilir), değişiklik olayları yerel ChangeBus'a aktarılır
+- arka plan iş parçacığı /api/changes'i uzun yoklamayla izler; yalnızca değişen stok satırları yeniden çekilir
+- iş parçacığı başına tek kalıcı bağlantı (keep-alive); 503 → Retry-After kadar bekleyip en çok 3 kez yeniden dener
+- 400 → ValueError (ör. yetersiz stok), diğer hatalar RuntimeError
+- sunucu anahtarı (token ya da ORBITX_API_TOKEN) her isteğe "Authorization: Bearer" olarak eklenir
+- piyasa fiyatları terminalde de doğrudan MarketFeed ile çekilir, fiyat geçmişi sunucudan okunur
+- kasa defteri satır ekleme/düzenleme/silme de (FinancePage) sunucunun yazıcı kuyruğunda çalışır
+"""
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import quote, urlencode
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from .catalog import StockCatalog
+from .changes import ChangeBus, OPS
+from .market import MarketFeed, Session, DEFAULT_URL as MARKET_URL
+
+_CHUNK = 500          # ids=... sorgusu başına id
+_FULL_RELOAD = 5000   # bundan çok stok satırı değiştiyse (toplu fiyatlama) katalog baştan çekilir
+
+
+class RemoteDataService(QObject):
+    stockChanged = pyqtSignal()
+    stockDelta = pyqtSignal(dict)
+    customersChanged = pyqtSignal()
+    cashChanged = pyqtSignal()
+    marketDataUpdated = pyqtSignal()
+    saleCommitted = pyqtSignal(dict)
+    salesBatchCommitted = pyqtSignal(list)
+
+    def __init__(self, url: str, parent=None, timeout: float = 10.0, poll_wait: float = 25.0,
+                 market_url: str = None, token: str = None):
+        super().__init__(parent)
+        self.url = url.rstrip("/")
+        self.token = token or os.environ.get("ORBITX_API_TOKEN")
+        self.timeout = timeout
+        self.poll_wait = poll_wait
+        self._local = threading.local()
+        self.retries = 0   # 503 sonrası yeniden denemeler (ölçüm için)
+        self._jobs = ThreadPoolExecutor(max_workers=1, thread_name_prefix="remote-write")
+        self.market = MarketFeed(market_url or os.environ.get("ORBITX_MARKET_URL") or MARKET_URL,
+                                 on_update=self._market_updated)
+        self.market_data = self.market.data
+        self.catalog = StockCatalog()
+        self.changes = ChangeBus(self)
+        # Önce sıra numarası, sonra katalog: arada gelen olaylar yoklamada yeniden uygulanır (zararsız)
+        self.seq = self._call("GET", "changes")["seq"]
+        self.catalog.load_rows(self._call("GET", "stock"))
+        self._stop = threading.Event()
+        self._poller = threading.Thread(target=self._poll_changes, name="remote-changes", daemon=True)
+        self._poller.start()
+
+    def _call(self, method: str, path: str, query: dict = None, body=None, timeout: float = None):
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = self._local.session = Session()
+        url = f"{self.url}/api/{path}" + (f"?{urlencode(query)}" if query else "")
+        data = None if body is None else json.dumps(body, default=str).encode()
+        headers = {"Accept": "application/json"}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        if data is not None:
+            headers["Content-Type"] = "application/json"
+        for attempt in range(4):
+            status, resp_headers, raw = session.request(method, url, headers, timeout or self.timeout, data)
+            if status != 503 or attempt == 3:
+                break
+            # Sunucu dolu: istek işlenmedi, Retry-After kadar bekleyip yeniden gönder
+            self.retries += 1
+            time.sleep(float(resp_headers.get("Retry-After") or 1))
+        out = json.loads(raw) if raw else None
+        if status >= 400:
+            msg = out.get("error") if isinstance(out, dict) else raw.decode(errors="replace")
+            raise (ValueError if status == 400 else RuntimeError)(msg if status == 400 else f"Sunucu {status}: {msg}")
+        return out
+
+    def close(self):
+        self._stop.set()
+        self.market.stop()
+        self._jobs.shutdown(wait=True)
+
+    # --- değişiklik akışı ---
+    def _poll_changes(self):
+        while not self._stop.is_set():
+            try:
+                r = self._call("GET", "changes", {"since": self.seq, "wait": self.poll_wait},
+                               timeout=self.poll_wait + self.timeout)
+                if r.get("reset"):
+                    self._resync()
+                for batch in r["batches"]:
+                    self._apply(batch)
+                self.seq = r["seq"]
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                # Sunucuya ulaşılamıyor: kısa bekleyip yeniden dene (son bilinen veri kalır)
+                print(f"Sunucu değişiklik akışı: {e}")
+                self._stop.wait(2.0)
+
+    def _apply(self, batch: dict):
+        st = batch.get("stock_items")
+        if st:
+            ids = st["insert"] + st["update"] + st["delete"]
+            if st["reset"] or len(ids) > _FULL_RELOAD:
+                # Yeni katalog kurulup tek atamayla değiştirilir: sayfalar yarım yüklenmiş kataloğu görmez
+                fresh = StockCatalog()
+                fresh.version = self.catalog.version
+                delta = fresh.load_rows(self._call("GET", "stock"))
+                self.catalog = fresh
+            else:
+                rows = []
+                for i in range(0, len(ids), _CHUNK):
+                    rows += self._call("GET", "stock", {"ids": ",".join(map(str, ids[i:i + _CHUNK]))})
+                delta = self.catalog.refresh_rows(ids, rows)
+            self.stockDelta.emit(delta)
+            self.stockChanged.emit()
+        for table, ch in batch.items():
+            if ch["reset"]:
+                self.changes.post(table, "reset")
+            for op in OPS:
+                if ch[op]:
+                    self.changes.post(table, op, ch[op])
+        if "customers" in batch:
+            self.customersChanged.emit()
+        if "cash_ledger" in batch:
+            self.cashChanged.emit()
+        if "sales" in batch:
+            self.salesBatchCommitted.emit([{"sale_id": i} for i in batch["sales"]["insert"]])
+
+    def _resync(self):
+        self._apply({t: {"insert": [], "update": [], "delete": [], "reset": True}
+                     for t in ("stock_items", "customers", "cash_ledger", "sales")})
+
+    # --- okuma ---
+    def list_stock(self):
+        return self._call("GET", "stock")
+
+    def list_customers(self, ids=None):
+        return self._by_ids("customers", ids)
+
+    def list_cash_ledger(self, ids=None):
+        return self._by_ids("cash", ids)
+
+    def _by_ids(self, path: str, ids) -> list[dict]:
+        if ids is None:
+            return self._call("GET", path)
+        ids = sorted(set(ids))
+        out = []
+        for i in range(0, len(ids), _CHUNK):
+            out += self._call("GET", path, {"ids": ",".join(map(str, ids[i:i + _CHUNK]))})
+        return out
+
+    def find_customer_id(self, name: str, phone: str = None):
+        q = {"name": name} if phone is None else {"name": name, "phone": phone}
+        return self._call("GET", "customers/find", q)["id"]
+
+    def customer_activity(self, customer_id: int, limit: int = 50):
+        return self._call("GET", f"customers/{int(customer_id)}/activity", {"limit": limit})
+
+    def customer_30day_summary(self, customer_id: int) -> dict:
+        return self._call("GET", f"customers/{int(customer_id)}/summary")
+
+    def get_recent_transactions(self, limit: int = 7):
+        return self._call("GET", "transactions", {"limit": limit})
+
+    def sales_kpis(self, day: str = None, type: str = "Satış") -> dict:
+        return self._call("GET", "kpis", {"type": type, **({"day": day} if day else {})})
+
+    def search_stock(self, query: str, limit: int = 50) -> list[int]:
+        return self._call("GET", "search/stock", {"q": query, "limit": limit})
+
+    def search_customers(self, query: str, limit: int = 50) -> list[int]:
+        return self._call("GET", "search/customers", {"q": query, "limit": limit})
+
+    def search_cash(self, query: str, limit: int = 50) -> list[int]:
+        return self._call("GET", "search/cash", {"q": query, "limit": limit})
+
+    def page_stock(self, filters: dict = None, after=None, limit: int = 200, order=None) -> dict:
+        return self._page("stock", filters, after, limit, order)
+
+    def page_customers(self, filters: dict = None, after=None, limit: int = 200, order=None) -> dict:
+        return self._page("customers", filters, after, limit, order)
+
+    def page_cash_ledger(self, filters: dict = None, after=None, limit: int = 200, order=None) -> dict:
+        return self._page("cash", filters, after, limit, order)
+
+    def _page(self, path: str, filters, after, limit, order=None) -> dict:
+        q = {k: v for k, v in (filters or {}).items() if v not in (None, "")}
+        q["limit"] = limit
+        if after is not None:
+            q["after"] = json.dumps(after)
+        if order is not None:
+            q["order"] = json.dumps(order)
+        return self._call("GET", f"page/{path}", q)
+
+    def cash_ledger_totals(self, filters: dict = None) -> dict:
+        return self._call("GET", "totals/cash", {k: v for k, v in (filters or {}).items() if v not in (None, "")})
+
+    def cash_balances(self, day: str = None) -> dict:
+        return self._call("GET", "balances/cash", {"day": day} if day else None)
+
+    def account_statement(self, account: str, date_from: str, date_to: str) -> dict:
+        return self._call("GET", "statement/cash", {"account": account, "date_from": date_from, "date_to": date_to})
+
+    def z_report(self, day: str):
+        return self._call("GET", f"closes/{day}")
+
+    def list_closes(self, limit: int = 30) -> list[dict]:
+        return self._call("GET", "closes", {"limit": limit})
+
+    def last_close(self):
+        rows = self.list_closes(1)
+        return rows[0]["date"] if rows else None
+
+    def count_stock(self, filters: dict = None) -> int:
+        return self._count("stock", filters)
+
+    def count_customers(self, filters: dict = None) -> int:
+        return self._count("customers", filters)
+
+    def count_cash_ledger(self, filters: dict = None) -> int:
+        return self._count("cash", filters)
+
+    def _count(self, path: str, filters) -> int:
+        q = {k: v for k, v in (filters or {}).items() if v not in (None, "")}
+        return self._call("GET", f"count/{path}", q)["count"]
+
+    def market_series(self, kod: str, start: float, end: float = None, max_points: int = 300) -> list[dict]:
+        q = {"kod": kod, "start": start, "max_points": max_points}
+        if end is not None:
+            q["end"] = end
+        return self._call("GET", "market/series", q)
+
+    # --- yazım (sunucunun yazıcı kuyruğunda) ---
+    def create_sale(self, header: dict, items: list[dict]) -> dict:
+        """Yetersiz stok vb. → ValueError (yerel DataService ile aynı); stok/müşteri güncellemesi akıştan gelir."""
+        return self._call("POST", "sales", body={"header": header, "items": items})
+
+    def record_cash_entry(self, **entry) -> int:
+        return self._call("POST", "cash", body=entry)["id"]
+
+    def update_cash_entry(self, rid: int, **entry) -> bool:
+        return self._call("PUT", f"cash/{int(rid)}", body=entry)["updated"]
+
+    def delete_cash_entry(self, rid: int) -> bool:
+        return self._call("DELETE", f"cash/{int(rid)}")["deleted"]
+
+    def upsert_stock_item(self, item_data: dict) -> dict:
+        return self._call("POST", "stock", body=item_data)
+
+    def delete_stock_item(self, code: str) -> dict:
+        return self._call("DELETE", f"stock/{quote(code, safe='')}")
+
+    def close_day(self, day: str = None) -> dict:
+        """Kapalı güne yazım / tekrar kapanış → ValueError (sunucunun 400 yanıtı)."""
+        return self._call("POST", "closes", body={"day": day})
+
+    def submit_write(self, fn, *args, **kwargs):
+        """fn'i arka planda çalıştırır (GUI beklemez); concurrent.futures.Future döner."""
+        return self._jobs.submit(fn, *args, **kwargs)
+
+    def create_sale_async(self, header: dict, items: list[dict]):
+        return self.submit_write(self.create_sale, header, items)
+
+    def record_cash_entry_async(self, **entry):
+        return self.submit_write(self.record_cash_entry, **entry)
+
+    def update_cash_entry_async(self, rid: int, **entry):
+        return self.submit_write(self.update_cash_entry, rid, **entry)
+
+    def delete_cash_entry_async(self, rid: int):
+        return self.submit_write(self.delete_cash_entry, rid)
+
+    def upsert_stock_item_async(self, item_data: dict):
+        return self.submit_write(self.upsert_stock_item, item_data)
+
+    def delete_stock_item_async(self, code: str):
+        return self.submit_write(self.delete_stock_item, code)
+
+    def seed_if_empty(self, *args, **kwargs):
+        """Veri sunucuda: terminal tohumlama yapmaz."""
+
+    def seed_demo_if_empty(self):
+        """Veri sunucuda: terminal tohumlama yapmaz."""
+
+    # --- piyasa ---
+    def start_market_feed(self):
+        self.market.start()
+
+    def _market_updated(self, md: dict):
+        self.market_data = md
+        self.marketDataUpdated.emit()
@@ -0,0 +1,193 @@
+# app/data/search.py
+"""
+FTS5 (trigram) arama dizinleri: stok, cari ve kasa açıklamaları.
+Dizine metnin katlanmış (fold) hali yazılır: Türkçe harfler ASCII karşılığına indirilir
+(İ/I/ı/i → i, Ş → s, Ğ → g …) ve küçük harfe çevrilir. Aynı katlama SQL tarafında
+REPLACE zinciriyle tetikleyicilerde, Python tarafında fold() ile sorguda uygulanır;
+böylece "ISIK", "ışık" ve "Işık" aynı kayıtları bulur.
+"""
+
+# Türkçe (ve şapkalı) harflerin katlanmış karşılıkları; ASCII büyük harfler lower() ile iner
+_TR_FOLD = {
+    "İ": "i", "ı": "i", "Ş": "s", "ş": "s", "Ğ": "g", "ğ": "g",
+    "Ü": "u", "ü": "u", "Ö": "o", "ö": "o", "Ç": "c", "ç": "c",
+    "Â": "a", "â": "a", "Î": "i", "î": "i", "Û": "u", "û": "u",
+}
+# SQLite lower() yalnızca ASCII'yi küçültür; Python tarafı da aynısını yapmalı
+_FOLD_TABLE = str.maketrans({**_TR_FOLD, **{chr(c): chr(c + 32) for c in range(ord("A"), ord("Z") + 1)}})
+
+# Aday penceresi: tam ve ad başı eşleşmeler kendi indeks sorgularıyla tüm tablodan gelir;
+# geri kalan ("içinde geçer") eşleşmelerden yalnızca en yeni N tanesi sıralanır (O(N), O(eşleşme) değil)
+WINDOW = 200
+# Ad başı adayları katlanmış ad indeksinden en çok bu kadar satır okunup Python'da süzülür;
+# daha fazlaysa (yaygın baş) trigram dizininde "^" ifadesiyle en yeniden geriye yürünür.
+HEAD_SCAN = 500
+# Trigram dizini 3 harften kısa parçaları bulamaz; yalnızca kısa kelimeli sorgularda "içinde geçer"
+# penceresi tablo taraması demektir, bu yüzden en yeni SHORT_SCAN kayıtla sınırlanır
+# (tam eşleşmeler ve en çok HEAD_SCAN satırlık ad başları bu sınırdan etkilenmez; bkz. search()).
+SHORT_SCAN = 5000
+
+
+def fold(text) -> str:
+    return str(text or "").translate(_FOLD_TABLE)
+
+
+def _fold_sql(expr: str) -> str:
+    for src, dst in _TR_FOLD.items():
+        expr = f"replace({expr}, '{src}', '{dst}')"
+    return f"lower({expr})"
+
+
+# tablo → (fts tablosu, [kolonlar]); fts rowid = kaynak tablonun id'si.
+# Kolon sırası sıralamada kullanılır: ilk kolon görünen ad, ikincisi tanımlayıcı (kod/telefon).
+INDEXES = {
+    "stock_items": ("stock_fts", ["name", "code", "category"]),
+    "customers": ("customers_fts", ["name", "phone", "code"]),
+    "cash_ledger": ("cash_fts", ["description", "category", "ref_no"]),
+}
+
+
+def _ddl(table: str, fts: str, cols: list) -> str:
+    col_list = ", ".join(cols)
+    values = ", ".join(_fold_sql(f"COALESCE(NEW.{c}, '')") for c in cols)
+    return f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({col_list}, tokenize='trigram');
+
+CREATE TRIGGER IF NOT EXISTS trg_{fts}_ins AFTER INSERT ON {table} BEGIN
+  INSERT INTO {fts}(rowid, {col_list}) VALUES (NEW.id, {values});
+END;
+CREATE TRIGGER IF NOT EXISTS trg_{fts}_del AFTER DELETE ON {table} BEGIN
+  DELETE FROM {fts} WHERE rowid = OLD.id;
+END;
+CREATE TRIGGER IF NOT EXISTS trg_{fts}_upd AFTER UPDATE OF {col_list} ON {table} BEGIN
+  DELETE FROM {fts} WHERE rowid = OLD.id;
+  INSERT INTO {fts}(rowid, {col_list}) VALUES (NEW.id, {values});
+END;
+"""
+
+
+SCHEMA = "".join(_ddl(table, fts, cols) for table, (fts, cols) in INDEXES.items())
+
+# Tam/ad başı eşleşmeler için kaynak tablolarda katlanmış ad ve tanımlayıcı (ilk iki kolon) ifade indeksleri;
+# sorgular aynı _fold_sql ifadesini kullandığından planlayıcı bunları eşleştirir
+KEYS_SCHEMA = "".join(f"CREATE INDEX IF NOT EXISTS idx_{table}_fold_{c} ON {table}({_fold_sql(c)});\n"
+                      for table, (_, cols) in INDEXES.items() for c in cols[:2])
+
+
+def rebuild(cx):
+    """Arama dizinlerini kaynak tablolardan yeniden doldurur (açık bir işlem içinde çağrılmalı)."""
+    for table, (fts, cols) in INDEXES.items():
+        col_list = ", ".join(cols)
+        values = ", ".join(_fold_sql(f"COALESCE({c}, '')") for c in cols)
+        cx.execute(f"DELETE FROM {fts}")
+        cx.execute(f"INSERT INTO {fts}(rowid, {col_list}) SELECT id, {values} FROM {table}")
+
+
+def _quote(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _like(term: str) -> str:
+    return "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+def _heads(cx, table: str, cols: list, terms: list, limit: int) -> list:
+    """Tam ve ad başı eşleşen, tüm kelimeleri içeren satırlar: [(id, katlanmış kolonlar...)]."""
+    needle, first = " ".join(terms), terms[0]
+    name, ident = _fold_sql(cols[0]), _fold_sql(cols[1])
+    select = f"SELECT id, {', '.join(cols)} FROM {table} WHERE "
+    # UNION iki indeks okumasını id sırasıyla birleştirir (geçici sıralama yok)
+    rows = cx.execute(select + f"id IN (SELECT id FROM {table} WHERE {name} = ? UNION "
+                               f"SELECT id FROM {table} WHERE {ident} = ? ORDER BY 1 DESC LIMIT ?)",
+                      (needle, needle, limit)).fetchall()
+    head = cx.execute(select + f"{name} >= ? AND {name} < ? LIMIT ?",
+                      (first, first + "\U0010ffff", HEAD_SCAN + 1)).fetchall()
+    if len(head) <= HEAD_SCAN:
+        rows += head
+    elif len(first) >= 3:
+        # Yaygın baş: trigram dizininde ad başında geçen ifade, en yeniden geriye (LIMIT'e ulaşınca durur)
+        fts = INDEXES[table][0]
+        words = [_quote(t) for t in terms[1:] if len(t) >= 3]
+        match = " AND ".join([f"{cols[0]} : ^{_quote(first)}", *words])
+        # Kısa kelimeler aşağıda süzülür: o durumda pencere kadar aday alınır
+        n = limit if len(words) == len(terms) - 1 else max(limit, WINDOW)
+        rows += cx.execute(f"SELECT rowid, {', '.join(cols)} FROM {fts} WHERE {fts} MATCH ? "
+                           f"ORDER BY rowid DESC LIMIT ?", (match, n)).fetchall()
+    out = []
+    for r in rows:
+        values = [fold(v) for v in r[1:]]
+        if all(any(t in v for v in values) for t in terms):
+            out.append((r[0], *values))
+    return out
+
+
+def search(cx, table: str, query: str, limit: int = 50) -> list:
+    """
+    Sorgudaki her kelimeyi (VE) içeren kayıtların id'leri, sıralı.
+    Sıra: ad/tanımlayıcıda tam eşleşme > ad başı > herhangi bir kelime başı > diğerleri;
+    eşitlikte en yeni kayıt önce.
+    Tam ve ad başı eşleşmeler katlanmış ad/tanımlayıcı indeksinden tüm tablodan gelir (istisna: ilk kelime
+    3 harften kısa ve HEAD_SCAN'dan çok ad onunla başlıyorsa ad başları da pencereye kalır). Diğerleri
+    en yeni WINDOW eşleşmeden sıralanır: 3+ harfli kelimeler trigram dizininden (MATCH), daha kısaları
+    LIKE ile süzülür; sorguda hiç 3+ harfli kelime yoksa bu pencere yalnızca en yeni SHORT_SCAN kayda bakar.
+    """
+    fts, cols = INDEXES[table]
+    terms = [t for t in fold(query).split() if t]
+    if not terms or limit <= 0:
+        return []
+    long_terms = [t for t in terms if len(t) >= 3]
+    short_terms = [t for t in terms if len(t) < 3]
+
+    where, params = [], []
+    if long_terms:
+        where.append(f"{fts} MATCH ?")
+        params.append(" AND ".join(_quote(t) for t in long_terms))
+    else:
+        where.append(f"rowid > (SELECT COALESCE(MAX(rowid), 0) FROM {fts}) - ?")
+        params.append(SHORT_SCAN)
+    for t in short_terms:
+        where.append("(" + " OR ".join(f"{c} LIKE ? ESCAPE '\\'" for c in cols) + ")")
+        params.extend([_like(t)] * len(cols))
+
+    found = {r[0]: r for r in _heads(cx, table, cols, terms, limit)}
+    for r in cx.execute(f"SELECT rowid, {', '.join(cols)} FROM {fts} WHERE {' AND '.join(where)} "
+                        f"ORDER BY rowid DESC LIMIT ?", (*params, max(limit, WINDOW))):
+        found.setdefault(r[0], tuple(r))
+
+    needle = " ".join(terms)
+    first = terms[0]
+
+    def score(row):
+        if needle in row[1:3]:
+            return 0
+        if row[1].startswith(first):
+            return 1
+        if any(v.startswith(first) or f" {first}" in v for v in row[1:]):
+            return 2
+        return 3
+
+    ranked = sorted(found.values(), key=lambda r: (score(r), -r[0]))
+    return [r[0] for r in ranked[:limit]]
+
+
+def match_sql(table: str, query: str, id_expr: str, ordered: bool = False) -> tuple:
+    """
+    Sayfalı listeler için arama süzgeci: ([WHERE parçaları], [parametreler]); boş sorgu → ([], []).
+    3+ harfli kelimeler trigram dizininden id kümesi olarak, kısalar satır başına rowid ile
+    bakılan LIKE olarak eklenir. ordered=True (sayfa sorgusu): id kümesi yalnızca üyelik testi olur,
+    plan sıralama indeksini yürür ve LIMIT'e ulaşınca durur (eşleşmeleri toplayıp sıralamaz).
+    """
+    fts, cols = INDEXES[table]
+    terms = [t for t in fold(query).split() if t]
+    where, params = [], []
+    long_terms = [t for t in terms if len(t) >= 3]
+    if long_terms:
+        # Tekli + : id üzerindeki indeks kullanımını kapatır (id kümesinden satır çekilip sıralanmaz)
+        where.append(f"{'+' if ordered else ''}{id_expr} IN (SELECT rowid FROM {fts} WHERE {fts} MATCH ?)")
+        params.append(" AND ".join(_quote(t) for t in long_terms))
+    for t in terms:
+        if len(t) < 3:
+            where.append(f"EXISTS (SELECT 1 FROM {fts} WHERE rowid = {id_expr} AND ("
+                         + " OR ".join(f"{c} LIKE ? ESCAPE '\\'" for c in cols) + "))")
+            params.extend([_like(t)] * len(cols))
+    return where, params
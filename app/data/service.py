@@ -1,42 +1,171 @@
 # app/data/service.py
-try:
-    from PyQt6.QtCore import QObject, pyqtSignal
-except Exception:
-    # Fallback shim for headless test environments where PyQt6 is not available.
-    class _SignalPlaceholder:
-        def __init__(self, *args, **kwargs):
-            pass
-        def emit(self, *a, **k):
-            return None
-
-    class QObject:
-        def __init__(self, *args, **kwargs):
-            pass
-
-    def pyqtSignal(*args, **kwargs):
-        return _SignalPlaceholder()
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
 from .db import DB
-import sys
-import os
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from pages.parameters import parse_money
+from .writer import WriteQueue
+from .money import to_kurus, from_kurus, parse_number
+from . import aggregates, balances, closing, paging, pricing, search, ticks
+from .catalog import StockCatalog
+from .changes import ChangeBus
+from .watch import ChangeWatcher
+from .market import MarketFeed, gold_price, DEFAULT_URL as MARKET_URL
+from .identity import customer_key, name_range
 from random import randint, uniform, choice
-from datetime import datetime
+from datetime import datetime, timedelta
+import os
+import sqlite3
 
 class DataService(QObject):
     stockChanged = pyqtSignal()
+    stockDelta = pyqtSignal(dict)  # {version, changed, removed, reset} — katalog güncellendikten sonra
     customersChanged = pyqtSignal()
     cashChanged = pyqtSignal()
     saleCommitted = pyqtSignal(dict)  # {sale_id, total, paid, due, ...}
+    salesBatchCommitted = pyqtSignal(list)  # create_sales_batch: parça başına [payload, ...]
     marketDataUpdated = pyqtSignal()
 
     CATEGORIES = ["Bilezik","Yüzük","Kolye","Küpe","Külçe","Gram"]
 
-    def __init__(self, path="orbitx.db", parent=None):
+    def __init__(self, path="orbitx.db", parent=None, readers: int = 4, sql_stats: bool = False, market_url: str = None):
         super().__init__(parent)
-        self.db = DB(path)
-        # cached market data from external API
-        self.market_data = {}
+        self.db = DB(path, readers=readers)
+        # SQL ölçümü: parametreyle ya da ORBITX_SQL_STATS=<yavaş eşik ms> ortam değişkeniyle açılır
+        slow_ms = os.environ.get("ORBITX_SQL_STATS")
+        if sql_stats or slow_ms:
+            log_dir = os.path.dirname(os.path.abspath(path)) if path != ":memory:" else os.getcwd()
+            self.db.enable_stats(slow_ms=float(slow_ms or 100), log_path=os.path.join(log_dir, "orbitx-slow.log"))
+        # Arka plan yazıcı: *_async metotları işleri buraya kuyruklar (group commit)
+        self.writer = WriteQueue(self.db)
+        # Piyasa fiyatları: arka planda çekilir (start_market_feed); son bilinen fiyatlar diskten anında gelir.
+        # Adres parametreyle ya da ORBITX_MARKET_URL ortam değişkeniyle değiştirilebilir
+        cache = None if path == ":memory:" else os.path.join(os.path.dirname(os.path.abspath(path)), "orbitx-market.json")
+        self.market = MarketFeed(market_url or os.environ.get("ORBITX_MARKET_URL") or MARKET_URL,
+                                 cache_path=cache, on_update=self._market_updated)
+        self.market_data = self.market.data
+        self._ticks_pruned_at = 0
+        # Toplu fiyatlama kuralları (kâr oranı / yuvarlama adımı; kategori ve ayara göre)
+        self.price_rules = pricing.PriceRules()
+        # Müşteri kimlik önbelleği: ident_key → id ve katlanmış ad → ilk id.
+        # customersChanged ile boşaltılır; DirectConnection → yazıcı iş parçacığından da hemen çalışır
+        self._cust_by_key = {}
+        self._cust_by_name = {}
+        self.customersChanged.connect(self._clear_customer_cache, Qt.ConnectionType.DirectConnection)
+        # Paylaşılan stok kataloğu: stok yazımları commit sonrası yerinde günceller (_stock_written)
+        self.catalog = StockCatalog()
+        with self.db.read() as cx:
+            self.catalog.load(cx)
+        # Satır düzeyinde değişiklik olayları: sayfalar tam yeniden yükleme yerine yalnızca değişen id'leri çeker
+        self.changes = ChangeBus(self)
+        # Başka süreçlerin commit'lerini izler (start_change_watcher ile açılır)
+        self.watcher = None
+        # Bayat bakiye kontrol noktaları okunurken yazıcıya tek yenileme işi bırakılır (Future; bitene kadar)
+        self._balance_refresh = None
+        # Son gün sonu kapanışı: bu gün ve öncesi için bakiyeler dondurulmuş tablolardan okunur
+        self._last_close = None
+        self.last_close()
+
+    def _emit(self, signal, *args):
+        """Sinyali yazım commit edildikten sonra yayar (işlem dışındaysa hemen)."""
+        self.db.after_commit(lambda: signal.emit(*args))
+
+    def _changed(self, table: str, op: str, ids=()):
+        """Commit sonrası changes veriyoluna satır olayı bırakır (geri alınırsa düşer); change_log'a da işler."""
+        ids = list(ids)
+        if ids or op == "reset":
+            self.db.journal(table, op, ids)
+            self.db.after_commit(lambda: self.changes.post(table, op, ids))
+
+    def _customers_written(self, op: str, ids=()):
+        self._emit(self.customersChanged)
+        self._changed("customers", op, ids)
+
+    def _cash_written(self, op: str, ids=()):
+        self._emit(self.cashChanged)
+        self._changed("cash_ledger", op, ids)
+
+    def _stock_written(self, ids=None):
+        """Commit sonrası kataloğu günceller (ids=None → tam yükleme); stockDelta + stockChanged yayar."""
+        ids = None if ids is None else list(ids)
+        self.db.journal("stock_items", "reset" if ids is None else "update", ids or ())
+        self.db.after_commit(lambda: self._refresh_catalog(ids))
+
+    def _refresh_catalog(self, ids=None):
+        with self.db.read() as cx:
+            delta = self.catalog.load(cx) if ids is None else self.catalog.refresh(cx, ids)
+        self._stock_delta(delta)
+
+    def _stock_delta(self, delta: dict):
+        self.stockDelta.emit(delta)
+        self.stockChanged.emit()
+        if delta["reset"]:
+            self.changes.post("stock_items", "reset")
+        else:
+            added = set(delta["added"])
+            self.changes.post("stock_items", "insert", added)
+            self.changes.post("stock_items", "update", [i for i in delta["changed"] if i not in added])
+            self.changes.post("stock_items", "delete", delta["removed"])
+
+    # --- asenkron yazım ---
+    def submit_write(self, fn, *args, **kwargs):
+        """fn'i yazıcı iş parçacığında çalıştırır; concurrent.futures.Future döner."""
+        return self.writer.submit(fn, *args, **kwargs)
+
+    def create_sale_async(self, header: dict, items: list[dict]):
+        return self.submit_write(self.create_sale, header, items)
+
+    def record_cash_entry_async(self, **entry):
+        return self.submit_write(self.record_cash_entry, **entry)
+
+    def update_cash_entry_async(self, rid: int, **entry):
+        return self.submit_write(self.update_cash_entry, rid, **entry)
+
+    def delete_cash_entry_async(self, rid: int):
+        return self.submit_write(self.delete_cash_entry, rid)
+
+    def upsert_stock_item_async(self, item_data: dict):
+        return self.submit_write(self.upsert_stock_item, item_data)
+
+    def delete_stock_item_async(self, code: str):
+        return self.submit_write(self.delete_stock_item, code)
+
+    def query_stats(self, *, sort: str = "total", limit: int = 20) -> list[dict]:
+        """İfade başına sayı/süre/satır istatistikleri (ölçüm kapalıysa boş liste)."""
+        return self.db.stats.snapshot(sort=sort, limit=limit) if self.db.stats else []
+
+    # --- süreçler arası değişiklikler ---
+    def start_change_watcher(self, interval: float = 0.5):
+        """Aynı DB'ye başka süreçlerin yazdıklarını izler; yerel yazımla aynı sinyaller yayılır."""
+        if self.watcher is None and self.db._pool is not None:
+            self.watcher = ChangeWatcher(self.db.path, self.db.origin, self._external_changes, interval).start()
+        return self.watcher
+
+    def _external_changes(self, changes: list):
+        """Başka süreçten commit edilen değişiklikler (izleyici iş parçacığında çağrılır)."""
+        tables = {}
+        for table, op, ids in changes:
+            tables.setdefault(table, []).append((op, ids))
+        stock = tables.pop("stock_items", None)
+        if stock:
+            # Stok: katalog yenilenir, olaylar _stock_delta'dan (eklenen/silinen ayrımıyla) çıkar
+            reset = any(op == "reset" for op, _ in stock)
+            self._refresh_catalog(None if reset else {i for _, ids in stock for i in ids})
+        for table, entries in tables.items():
+            for op, ids in entries:
+                self.changes.post(table, op, ids)
+        if "customers" in tables:
+            self.customersChanged.emit()
+        if "cash_ledger" in tables:
+            self.cashChanged.emit()
+        if "sales" in tables:
+            self.salesBatchCommitted.emit([{"sale_id": i} for op, ids in tables["sales"] if op == "insert"
+                                           for i in ids])
+
+    def close(self):
+        """Kuyruktaki yazımları bitirir ve bağlantıları kapatır."""
+        if self.watcher is not None:
+            self.watcher.stop()
+        self.market.stop()
+        self.writer.close()
+        self.db.close()
 
     # --- seed ---
     MOCK_STOCK = [
@@ -65,8 +194,8 @@ class DataService(QObject):
                         VALUES (?,?,?,?,?,?)""",
                         (p["Kod"], p["Ad"], p.get("Kategori"), float(p.get("Gram",0)),
                          int(p.get("Stok",0)), float(p.get("Fiyat",0))))
-        self.customersChanged.emit()
-        self.stockChanged.emit()
+            self._customers_written("reset")
+            self._stock_written()
 
     def seed_fake_stock(self, *, n: int = 60, replace: bool = False):
         """
@@ -105,8 +234,7 @@ class DataService(QObject):
                     (code, name, cat, milyem, ayar, gram, qty, buy_price, sell_price,
                      isc_tip, isc_alinan, isc_verilen, vat, critical)
                 )
-
-        self.stockChanged.emit()
+            self._stock_written()
 
     def upsert_stock_item(self, item_data: dict) -> dict:
         """
@@ -142,8 +270,8 @@ class DataService(QObject):
                            item_data["isc_verilen"], item_data["vat"], item_data["critical_qty"]))
                 stock_id = cx.execute("SELECT last_insert_rowid()").fetchone()[0]
                 message = "Stok kaydı başarıyla eklendi."
+            self._stock_written([stock_id])
 
-        self.stockChanged.emit()
         return {"success": True, "message": message, "stock_id": stock_id}
 
     def delete_stock_item(self, code: str) -> dict:
@@ -160,11 +288,13 @@ class DataService(QObject):
                 }
 
             # Stok öğesini sil
+            row = cx.execute("SELECT id FROM stock_items WHERE code=?", (code,)).fetchone()
             cx.execute("DELETE FROM stock_items WHERE code=?", (code,))
             deleted_count = cx.execute("SELECT changes()").fetchone()[0]
+            if deleted_count > 0:
+                self._stock_written([row["id"]])
 
         if deleted_count > 0:
-            self.stockChanged.emit()
             return {"success": True, "message": "Stok kaydı başarıyla silindi."}
         else:
             return {"success": False, "message": "Stok kaydı bulunamadı."}
@@ -185,232 +315,689 @@ class DataService(QObject):
             self.seed_fake_stock(n=80, replace=False)
 
     # --- listeler ---
-    def list_customers(self):
-        rows = self.db.cx.execute("SELECT * FROM customers ORDER BY name").fetchall()
+    def list_customers(self, ids=None):
+        """Tüm müşteriler; ids verilirse yalnızca o satırlar (değişiklik olaylarından sonra)."""
+        if ids is not None:
+            return self._rows_by_ids("SELECT * FROM customers WHERE id IN ({})", ids)
+        rows = self.db.query("SELECT * FROM customers ORDER BY name")
         return [dict(r) for r in rows]
 
     def list_stock(self):
-        rows = self.db.cx.execute("SELECT * FROM stock_items ORDER BY code").fetchall()
+        rows = self.db.query("SELECT * FROM stock_items ORDER BY code")
         return [dict(r) for r in rows]
 
     def list_cash(self):
-        rows = self.db.cx.execute("SELECT * FROM cash_ledger ORDER BY date DESC, id DESC").fetchall()
+        rows = self.db.query("SELECT * FROM cash_ledger ORDER BY date DESC, id DESC")
         return [dict(r) for r in rows]
 
-    # --- external market data ---
-    def fetch_market_prices(self, url: str = "https://displaydata01.orbitbulut.com/eyyupoglu_altin_v1/verileriGetir?tip=altin", timeout: int = 6, apply_to_stock: bool = False):
-        """Fetch market gold/altar prices from external API and cache them in self.market_data.
-        Emits marketDataUpdated on success. Does not raise on network errors.
+    _CASH_LEDGER_SQL = """
+            SELECT c.id, c.date, c.time, c.account, c.type, c.category, c.description,
+                   c.amount, c.amount_kurus, cu.name AS customer_name,
+                   c.ref_no, c.currency_code, c.amount_foreign, c.fx_rate, c.type_code, c.ts
+            FROM cash_ledger c
+            LEFT JOIN customers cu ON cu.id = c.customer_id
         """
+
+    def list_cash_ledger(self, ids=None):
+        """Kasa defteri satırları (müşteri adıyla), en yeni en üstte; ids verilirse yalnızca o satırlar."""
+        if ids is not None:
+            return self._rows_by_ids(self._CASH_LEDGER_SQL + " WHERE c.id IN ({})", ids)
+        rows = self.db.query(self._CASH_LEDGER_SQL + " ORDER BY c.date DESC, c.time DESC")
+        return [dict(r) for r in rows]
+
+    def _rows_by_ids(self, sql: str, ids) -> list[dict]:
+        """sql'deki IN ({}) yer tutucusunu 500'lük id parçalarıyla doldurur (sıra garanti edilmez)."""
+        ids = sorted(set(ids))
+        out = []
+        with self.db.read() as cx:
+            for i in range(0, len(ids), 500):
+                part = ids[i:i + 500]
+                out += [dict(r) for r in cx.execute(sql.format(",".join("?" * len(part))), part).fetchall()]
+        return out
+
+    # --- sayfalı listeler (keyset) ---
+    def page_cash_ledger(self, filters: dict = None, after=None, limit: int = 200, order=None) -> dict:
+        """Kasa defteri penceresi, en yeni en üstte: {"rows", "next"}; next bir sonraki çağrıya after olarak verilir.
+        filters: date_from, date_to, account, type, category, text; order: (kolon, azalan), ör. ("ts", True)"""
+        with self.db.read() as cx:
+            return paging.page(cx, "cash_ledger", self._CASH_LEDGER_SQL, filters, after, limit, order)
+
+    def page_stock(self, filters: dict = None, after=None, limit: int = 200, order=None) -> dict:
+        """Koda göre stok penceresi; filters: category, text."""
+        with self.db.read() as cx:
+            return paging.page(cx, "stock_items", "SELECT * FROM stock_items", filters, after, limit, order)
+
+    def page_customers(self, filters: dict = None, after=None, limit: int = 200, order=None) -> dict:
+        """Ada göre müşteri penceresi; filters: text."""
+        with self.db.read() as cx:
+            return paging.page(cx, "customers", "SELECT * FROM customers", filters, after, limit, order)
+
+    def count_cash_ledger(self, filters: dict = None) -> int:
+        """Süzgece uyan kayıt sayısı (tarih/hesap/tür için günlük özetten)."""
+        with self.db.read() as cx:
+            return paging.count(cx, "cash_ledger", filters)
+
+    def cash_ledger_totals(self, filters: dict = None) -> dict:
+        """Süzgece uyan kayıt sayısı ve giriş/çıkış/net (TL), tek sorguda (tarih/hesap/tür için günlük özetten)."""
+        with self.db.read() as cx:
+            t = paging.cash_totals(cx, filters)
+        return {"count": t["n"], "giris": from_kurus(t["in_k"]), "cikis": from_kurus(t["out_k"]),
+                "net": from_kurus(t["in_k"] - t["out_k"])}
+
+    def count_stock(self, filters: dict = None) -> int:
+        if not any((filters or {}).values()):
+            return len(self.catalog)
+        with self.db.read() as cx:
+            return paging.count(cx, "stock_items", filters)
+
+    def count_customers(self, filters: dict = None) -> int:
+        with self.db.read() as cx:
+            return paging.count(cx, "customers", filters)
+
+    def list_critical_stock(self):
+        """Adedi kritik seviyede veya altında olan ürünler (kısmi indeksle)."""
+        rows = self.db.query("SELECT * FROM stock_items WHERE qty <= critical_qty ORDER BY code")
+        return [dict(r) for r in rows]
+
+    def customer_activity(self, customer_id: int, limit: int = 50):
+        """Müşterinin son satış/alış hareketleri."""
+        rows = self.db.query("""
+            SELECT date, type, total FROM sales
+            WHERE customer_id = ?
+            ORDER BY date DESC, id DESC
+            LIMIT ?
+        """, (customer_id, limit))
+        return [dict(r) for r in rows]
+
+    def customer_30day_summary(self, customer_id: int) -> dict:
+        """Son 30 günün satış/alış toplamları."""
+        row = self.db.query_one("""
+            SELECT
+              COALESCE(SUM(CASE WHEN type='Satış' THEN total_kurus END), 0) / 100.0 AS sum_satis,
+              COALESCE(SUM(CASE WHEN type='Alış'  THEN total_kurus END), 0) / 100.0 AS sum_alis
+            FROM sales
+            WHERE customer_id = ?
+              AND date >= date('now','-30 day')
+        """, (customer_id,))
+        return dict(row)
+
+    def find_customer_id(self, name: str, phone: str = None):
+        """Ad (+ telefon) ile müşteri id'si; bulunamazsa None. Büyük/küçük harf ve telefon biçimi önemsizdir."""
+        if phone is not None:
+            key = customer_key(name, phone)
+            cid = self._cust_by_key.get(key)
+            if cid is None:
+                row = self.db.query_one("SELECT id FROM customers WHERE ident_key=?", (key,))
+                if row:
+                    cid = self._cust_by_key[key] = row[0]
+            return cid
+        lo, hi = name_range(name)
+        cid = self._cust_by_name.get(lo)
+        if cid is None:
+            cid = self.db.query_one("SELECT MIN(id) FROM customers WHERE ident_key >= ? AND ident_key < ?", (lo, hi))[0]
+            if cid is not None:
+                self._cust_by_name[lo] = cid
+        return cid
+
+    def _clear_customer_cache(self):
+        self._cust_by_key = {}
+        self._cust_by_name = {}
+
+    # --- arama (FTS5 trigram) ---
+    def search_stock(self, query: str, limit: int = 50) -> list[int]:
+        """Kod/ad/kategori içinde arar; stock_items id'leri (en iyi eşleşme önce)."""
+        with self.db.read() as cx:
+            return search.search(cx, "stock_items", query, limit)
+
+    def search_customers(self, query: str, limit: int = 50) -> list[int]:
+        """Ad/telefon/kod içinde arar; customers id'leri."""
+        with self.db.read() as cx:
+            return search.search(cx, "customers", query, limit)
+
+    def search_cash(self, query: str, limit: int = 50) -> list[int]:
+        """Kasa açıklaması/kategori/ref no içinde arar; cash_ledger id'leri."""
+        with self.db.read() as cx:
+            return search.search(cx, "cash_ledger", query, limit)
+
+    # --- KPI (günlük özet tabloları) ---
+    def sales_kpis(self, day: str = None, type: str = "Satış") -> dict:
+        """Günlük/aylık/yıllık ciro; ham satış satırları yerine daily_sales_agg okunur."""
+        day = day or datetime.now().strftime("%Y-%m-%d")
+        row = self.db.query_one("""
+            SELECT
+              COALESCE(SUM(CASE WHEN date = :day THEN total_kurus END), 0) AS day_k,
+              COALESCE(SUM(CASE WHEN date = :day THEN n END), 0)           AS day_n,
+              COALESCE(SUM(CASE WHEN date >= :month THEN total_kurus END), 0) AS month_k,
+              COALESCE(SUM(CASE WHEN date >= :month THEN n END), 0)           AS month_n,
+              COALESCE(SUM(total_kurus), 0) AS year_k,
+              COALESCE(SUM(n), 0)           AS year_n
+            FROM daily_sales_agg
+            WHERE date BETWEEN :year AND :day AND type = :type
+        """, {"day": day, "month": day[:8] + "01", "year": day[:5] + "01-01", "type": type})
+        return {"daily": from_kurus(row["day_k"]), "daily_count": row["day_n"],
+                "monthly": from_kurus(row["month_k"]), "monthly_count": row["month_n"],
+                "yearly": from_kurus(row["year_k"]), "yearly_count": row["year_n"]}
+
+    def cash_by_account(self, date_from: str, date_to: str):
+        """Hesap bazında giriş/çıkış/net (TL); daily_cash_agg okunur."""
+        rows = self.db.query("""
+            SELECT account,
+                   COALESCE(SUM(CASE WHEN type = 'Giriş' THEN amount_kurus END), 0) AS in_k,
+                   COALESCE(SUM(CASE WHEN type = 'Çıkış' THEN amount_kurus END), 0) AS out_k
+            FROM daily_cash_agg
+            WHERE date BETWEEN ? AND ?
+            GROUP BY account
+        """, (date_from, date_to))
+        return [{"account": r["account"], "giris": from_kurus(r["in_k"]), "cikis": from_kurus(r["out_k"]),
+                 "net": from_kurus(r["in_k"] - r["out_k"])} for r in rows]
+
+    def rebuild_daily_aggregates(self):
+        """Özet tablolarını ve bakiye kontrol noktalarını sales/cash_ledger'dan yeniden hesaplar (tutarsızlık şüphesinde)."""
+        with self.db.tx() as cx:
+            aggregates.rebuild(cx)
+            balances.rebuild(cx)
+
+    # --- hesap bakiyeleri (kontrol noktaları) ---
+    def cash_balances(self, day: str = None) -> dict:
+        """Hesap → day günü sonundaki bakiye (TL); son kontrol noktası + sonraki günlerin özeti, tek sorgu.
+        Kontrol noktaları çok geride kaldıysa (geriye dönük düzeltme, günler geçti) yazıcıda yenilenir."""
+        day = day or datetime.now().strftime("%Y-%m-%d")
+        with self.db.read() as cx:
+            if self._last_close and day <= self._last_close:
+                # Kapanmış gün: Z raporunda dondurulan bakiyeler (değişmez; kontrol noktasına gerek yok)
+                frozen = closing.cash(cx, day)
+                if frozen is not None:
+                    return {a: from_kurus(k) for a, k in frozen.items()}
+            rows = balances.as_of(cx, day)
+        if max((r["stale"] for r in rows), default=0) > balances.REFRESH_ROWS and self._balance_refresh is None:
+            self._balance_refresh = self.submit_write(self.refresh_balances)
+        return {r["account"]: from_kurus(r["balance_kurus"]) for r in rows}
+
+    def refresh_balances(self) -> int:
+        """Kirli hesapların kontrol noktalarını son geçerli noktadan ileri yeniden hesaplar."""
         try:
-            # prefer requests if available
-            try:
-                import requests
-                resp = requests.get(url, timeout=timeout)
-                resp.raise_for_status()
-                data = resp.json()
-            except Exception:
-                # fallback to urllib
-                import urllib.request, json
-                with urllib.request.urlopen(url, timeout=timeout) as u:
-                    data = json.loads(u.read().decode('utf-8'))
-
-            # normalize into dict keyed by kod
-            md = {}
-            for item in data:
-                kod = item.get('kod') or item.get('ad')
-                if not kod:
-                    continue
-                md[kod] = {
-                    'id': item.get('id'),
-                    'name': item.get('yeni_ad') or item.get('ad'),
-                    'kod': kod,
-                    'alis': float(item.get('alis') or 0.0),
-                    'satis': float(item.get('satis') or 0.0),
-                    'kapanis': float(item.get('kapanis') or 0.0),
-                    'tarih': item.get('tarih')
-                }
+            with self.db.tx() as cx:
+                return balances.refresh(cx)
+        finally:
+            self._balance_refresh = None
+
+    def account_statement(self, account: str, date_from: str, date_to: str) -> dict:
+        """Hesap ekstresi: {"account", "opening", "closing", "rows"}; satırlarda yürüyen bakiye ("balance").
+        Açılış = date_from'dan önceki günün bakiyesi (kontrol noktasından), satırlar pencere fonksiyonuyla."""
+        before = (datetime.strptime(date_from, "%Y-%m-%d") - timedelta(days=1)).strftime("%Y-%m-%d")
+        with self.db.read() as cx:
+            opening_k = next((r["balance_kurus"] for r in balances.as_of(cx, before) if r["account"] == account), 0)
+            rows = balances.statement(cx, account, date_from, date_to)
+        for r in rows:
+            r["amount"] = from_kurus(r.pop("amount_kurus"))
+            r["balance"] = from_kurus(opening_k + r.pop("running_kurus"))
+        return {"account": account, "opening": from_kurus(opening_k),
+                "closing": rows[-1]["balance"] if rows else from_kurus(opening_k), "rows": rows}
+
+    # --- gün sonu kapanışı (Z raporu) ---
+    def close_day(self, day: str = None) -> dict:
+        """day gününü (varsayılan bugün) kapatır: hesap/müşteri bakiyeleri ve satış toplamları dondurulur,
+        o gün ve öncesine tarihli yazımlar kilitlenir. Önceki kapanıştan artımlı; Z raporunu döner.
+        Stok tarih tutmadığından yalnızca bugünün kapanışında dondurulur (rapordaki stock_at)."""
+        today = datetime.now().strftime("%Y-%m-%d")
+        day = day or today
+        if day > today:
+            raise ValueError(f"{day} henüz gelmedi; gelecek bir gün kapatılamaz.")
+        with self.db.tx() as cx:
+            closing.close(cx, day, stock=day == today)
+            # Aynı işlemde okunur: yazıcı kuyruğunda grup commit'i beklerken de rapor hazır
+            rep = closing.z_report(cx, day)
+        self._last_close = max(self._last_close or "", day)
+        return self._z_report_tl(rep)
+
+    def z_report(self, day: str):
+        """Kapanmış günün Z raporu (TL) ve fiş metni ("text"); yalnızca kapanış tabloları okunur. Kapanış yoksa None."""
+        with self.db.read() as cx:
+            rep = closing.z_report(cx, day)
+        return None if rep is None else self._z_report_tl(rep)
+
+    @staticmethod
+    def _z_report_tl(rep: dict) -> dict:
+        def tl(d):
+            return {k[:-6] if k.endswith("_kurus") else k: from_kurus(v) if k.endswith("_kurus") else v
+                    for k, v in d.items()}
+        out = tl({k: v for k, v in rep.items() if k not in ("sales", "cash", "stock")})
+        out.update(sales=[tl(r) for r in rep["sales"]], cash=[tl(r) for r in rep["cash"]],
+                   stock=[tl(r) for r in rep["stock"]], text=closing.text(rep))
+        return out
+
+    def list_closes(self, limit: int = 30) -> list[dict]:
+        """Son kapanışlar, en yeni önce: {"date", "prev_date", "closed_at"}."""
+        rows = self.db.query("SELECT date, prev_date, closed_at FROM period_close ORDER BY date DESC LIMIT ?", (limit,))
+        return [dict(r) for r in rows]
 
-            self.market_data = md
-            # Optionally apply market sell prices to existing stock items (match by code or name)
-            if apply_to_stock:
-                try:
-                    with self.db.tx() as cx:
-                        for kod, info in md.items():
-                            # Try match by code first
-                            updated = cx.execute("UPDATE stock_items SET sell_price=? WHERE code=?",
-                                                (info['satis'], kod)).fetchone()
-                            # If no row updated, try match by name (yeni_ad)
-                            if cx.execute("SELECT changes()").fetchone()[0] == 0:
-                                cx.execute("UPDATE stock_items SET sell_price=? WHERE name LIKE ?",
-                                           (info['satis'], f"%{info['name']}%"))
-                except Exception:
-                    pass
-                try:
-                    self.stockChanged.emit()
-                except Exception:
-                    pass
-            try:
-                self.marketDataUpdated.emit()
-            except Exception:
-                pass
-            return md
-        except Exception as e:
-            # network error or parsing error, don't raise to caller; return empty
-            return {}
+    def last_close(self):
+        """Son kapanan gün (YYYY-MM-DD) ya da None; bu gün ve öncesine yazım yapılamaz."""
+        with self.db.read() as cx:
+            self._last_close = closing.last_close(cx)
+        return self._last_close
+
+    # --- external market data ---
+    def start_market_feed(self):
+        """Fiyat çekiciyi arka planda başlatır; her yeni veri marketDataUpdated yayar (GUI beklemez)."""
+        self.market.start()
+
+    def fetch_market_prices(self, url: str = None, timeout: float = None, apply_to_stock: bool = False):
+        """Eşzamanlı tek çekim (çağıran iş parçacığında). Başarılıysa güncel fiyatları, hata olursa {} döner.
+        url/timeout yalnızca bu çekim için: başka bir adresin fiyatları döner ama market_data'ya,
+        önbelleğe ve fiyat geçmişine yazılmaz.
+        apply_to_stock=True → tüm stok gram altın fiyatından yeniden fiyatlanır (reprice_stock).
+        """
+        if url and url != self.market.url:
+            md = self.market.fetch(url=url, timeout=timeout) or {}   # tek seferlik: çekicinin verisi değişmez
+        else:
+            self.market.fetch(timeout=timeout)
+            md = {} if self.market.failures else self.market_data
+        if apply_to_stock and gold_price(md) > 0:
+            self.reprice_stock(gold_price(md))
+        return md
+
+    def _market_updated(self, md: dict):
+        # Çekici iş parçacığından çağrılır; sinyal doğrudan yayılır, Qt alıcının iş parçacığına kuyruklar
+        self.market_data = md
+        try:
+            self.record_market_ticks(md, self.market.fetched_at)
+        except sqlite3.Error as e:
+            print(f"Fiyat geçmişi yazılamadı: {e}")
+        self.marketDataUpdated.emit()
+
+    def record_market_ticks(self, md: dict, ts: float = None):
+        """Her kod için ham tick ekler (OHLC özetleri tetikleyiciyle); saatte bir saklama süresi dolanları siler."""
+        ts = int(ts if ts is not None else datetime.now().timestamp())
+        with self.db.tx() as cx:
+            ticks.insert(cx, [(kod, ts, to_kurus(i["alis"]), to_kurus(i["satis"])) for kod, i in md.items()])
+            if ts - self._ticks_pruned_at >= 3600:
+                ticks.prune(cx, md, ts)
+                self._ticks_pruned_at = ts
+
+    def market_series(self, kod: str, start: float, end: float = None, max_points: int = 300) -> list[dict]:
+        """Fiyat serisi (satış OHLC, TL): aralığa uyan en ince özetten en çok max_points nokta."""
+        now = int(datetime.now().timestamp())
+        with self.db.read() as cx:
+            return ticks.series(cx, kod, int(start), int(end if end is not None else now),
+                                max_points=max_points, now=now)
+
+    def reprice_stock(self, base: float, rules: pricing.PriceRules = None) -> int:
+        """Tüm stoğun satış fiyatını baz gram altın fiyatından vektörel hesaplar (pricing).
+        Yalnızca değişen fiyatlar tek executemany ile yazılır; katalog DB'ye tekrar gitmeden güncellenir.
+        Değişen kart sayısını döner.
+        """
+        with self.db.tx() as cx:
+            # Anlık görüntü yazma kilidi altında: arada başka bir stok yazımı araya giremez
+            inv = pricing.from_catalog(self.catalog)
+            prices = pricing.compute(inv, float(base), rules or self.price_rules)
+            ids, new = pricing.write(cx, inv, prices)
+            if len(ids):
+                ids, new = ids.tolist(), new.tolist()
+                self.db.journal("stock_items", "update", ids)
+                self.db.after_commit(lambda: self._stock_delta(self.catalog.set_sell_prices(ids, new)))
+        return len(ids)
 
     # --- yardımcılar ---
-    def _customer_id(self, display_text: str):
+    @staticmethod
+    def _split_customer(display_text: str):
+        """'Ad — Telefon' → (ad, telefon); boş metin → None."""
         if not display_text:
             return None
         name, phone = (display_text.split(" — ", 1) + [""])[:2]
-        row = self.db.cx.execute("SELECT id FROM customers WHERE name=? AND phone=?", (name.strip(), phone.strip())).fetchone()
-        if row: return row["id"]
-        with self.db.tx() as cx:
-            cx.execute("INSERT INTO customers(name, phone) VALUES(?,?)", (name.strip(), phone.strip()))
-            return cx.execute("SELECT last_insert_rowid()").fetchone()[0]
+        return name.strip(), phone.strip()
 
-    def _stock_by_code(self, cx, code):
-        return cx.execute("SELECT * FROM stock_items WHERE code=?", (code,)).fetchone()
+    def _customer_id(self, display_text: str):
+        pair = self._split_customer(display_text)
+        if pair is None:
+            return None
+        with self.db.tx() as cx:
+            return self._customer_ids(cx, [pair])[pair]
+
+    def _customer_ids(self, cx, pairs) -> dict:
+        """(ad, telefon) çiftlerini kimlik anahtarıyla çözer (önbellek + tek IN sorgusu), olmayanları ekler."""
+        out, missing = {}, {}
+        for pair in set(pairs):
+            key = customer_key(*pair)
+            cid = self._cust_by_key.get(key)
+            if cid is None:
+                missing.setdefault(key, []).append(pair)
+            else:
+                out[pair] = cid
+        if missing:
+            rows = cx.execute(f"SELECT ident_key, id FROM customers WHERE ident_key IN ({','.join('?' * len(missing))})",
+                              list(missing)).fetchall()
+            found = {r[0]: r[1] for r in rows}
+            for key, group in missing.items():
+                cid = found.get(key)
+                if cid is None:
+                    # Yeni kayıt önbelleğe yazılmaz: işlem geri alınırsa bayat id kalmasın
+                    cid = cx.execute("INSERT INTO customers(name, phone, ident_key) VALUES(?,?,?)",
+                                     (*group[0], key)).lastrowid
+                    self._changed("customers", "insert", [cid])
+                else:
+                    self._cust_by_key[key] = cid
+                for pair in group:
+                    out[pair] = cid
+        return out
+
+    def _stock_rows(self, cx, codes) -> dict:
+        """Kodların stok satırlarını tek sorguda getirir: {code: (id, qty)}."""
+        codes = list(codes)
+        if not codes:
+            return {}
+        marks = ",".join("?" * len(codes))
+        rows = cx.execute(f"SELECT id, code, qty FROM stock_items WHERE code IN ({marks})", codes).fetchall()
+        return {r["code"]: (r["id"], r["qty"]) for r in rows}
+
+    @staticmethod
+    def _insufficient_stock_error(items, needed: dict, stock: dict) -> ValueError:
+        names = {}
+        for it in items:
+            names.setdefault(it["code"], it["name"])
+        # Stokta hiç olmayan kod, adetten bağımsız olarak yetersizdir
+        short = [(code, n, stock[code][1] if code in stock else 0) for code, n in needed.items()
+                 if code not in stock or n > stock[code][1]]
+        return ValueError("Yetersiz stok:\n" + "\n".join(
+            f"- {code} ({names[code]}): {n} adet istenen, {available} adet mevcut" for code, n, available in short))
 
     # --- kasa kaydı ---
-    def record_cash_entry(self, *, date, time, account, type, category, description, amount, customer_id=None, sale_id=None, ref_no=None):
+    @staticmethod
+    def _cash_values(date, time, account, type, category, description, amount, customer_id, ref_no,
+                     currency_code, amount_foreign, fx_rate, type_code) -> dict:
+        """cash_ledger kolon → değer (sale_id hariç: satışa bağlılık yalnızca eklemede kurulur)."""
         # Ensure time is populated (DB/UI expects a time column shown in Kasa Defteri)
         if not time:
             # store hours:minutes
             time = datetime.now().strftime("%H:%M")
+        return {"date": date, "time": time, "account": account, "type": type, "category": category,
+                "description": description, "amount_kurus": to_kurus(amount), "customer_id": customer_id,
+                "ref_no": ref_no, "currency_code": currency_code, "amount_foreign": float(amount_foreign or 0.0),
+                "fx_rate": float(fx_rate or 1.0), "type_code": type_code}
 
+    def record_cash_entry(self, *, date, time, account, type, category, description, amount, customer_id=None, sale_id=None, ref_no=None,
+                          currency_code='00', amount_foreign=0.0, fx_rate=1.0, type_code=None):
         # Persist migrated fields as well (ref_no, currency_code, amount_foreign, fx_rate, type_code)
         # Keep signature backward-compatible by using defaults where callers don't provide them.
+        row = self._cash_values(date, time, account, type, category, description, amount, customer_id,
+                                ref_no, currency_code, amount_foreign, fx_rate, type_code)
+        row["sale_id"] = sale_id
         with self.db.tx() as cx:
-            cx.execute("""INSERT INTO cash_ledger(date,time,account,type,category,description,amount,customer_id,sale_id,
-                          ref_no,currency_code,amount_foreign,fx_rate,type_code)
-                          VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)""",
-                       (date, time, account, type, category, description, float(amount), customer_id, sale_id,
-                        ref_no, '00', 0.0, 1.0, None))
-        self.cashChanged.emit()
+            rid = cx.execute(f"INSERT INTO cash_ledger({','.join(row)}) VALUES ({','.join('?' * len(row))})",
+                             tuple(row.values())).lastrowid
+            self._cash_written("insert", [rid])
+        return rid
+
+    def update_cash_entry(self, rid: int, *, date, time, account, type, category, description, amount, customer_id=None,
+                          ref_no=None, currency_code='00', amount_foreign=0.0, fx_rate=1.0, type_code=None) -> bool:
+        """Kasa satırını baştan yazar (record_cash_entry ile aynı alanlar, sale_id korunur); satır yoksa False."""
+        row = self._cash_values(date, time, account, type, category, description, amount, customer_id,
+                                ref_no, currency_code, amount_foreign, fx_rate, type_code)
+        with self.db.tx() as cx:
+            n = cx.execute(f"UPDATE cash_ledger SET {', '.join(c + '=?' for c in row)} WHERE id=?",
+                           (*row.values(), rid)).rowcount
+            if n:
+                self._cash_written("update", [rid])
+        return bool(n)
+
+    def delete_cash_entry(self, rid: int) -> bool:
+        """Kasa satırını siler; satır yoksa False. Kapanmış güne ait satırlar kilitlidir (IntegrityError)."""
+        with self.db.tx() as cx:
+            n = cx.execute("DELETE FROM cash_ledger WHERE id=?", (rid,)).rowcount
+            if n:
+                self._cash_written("delete", [rid])
+        return bool(n)
 
     # --- çekirdek satış/alış ---
+    @staticmethod
+    def _sale_amounts(header: dict, items: list[dict]):
+        """(kod başına adet, iskonto, toplam, etkin ödeme, kalan) — tutarlar kuruş."""
+        # Aynı kod birden çok satırda olabilir → adetler kod başına toplanır
+        needed = {}
+        for it in items:
+            n = int(it["qty"])
+            if n <= 0:
+                raise ValueError(f"Geçersiz adet: {it['code']} için {n}")
+            needed[it["code"]] = needed.get(it["code"], 0) + n
+
+        # Tüm tutarlar kuruş (int) → toplamlar tam, yuvarlama hatası yok
+        gross = sum(to_kurus(i["line_total"]) for i in items)
+        disc  = to_kurus(header.get("discount", 0))
+        total = max(0, gross - disc)
+
+        paid_req = to_kurus(header.get("paid_amount", 0))
+        # ETKİN ÖDEME: toplamı aşan ödeme “para üstü”dür → cariye/deftere net yansımaz
+        paid_eff = min(paid_req, total) if header.get("pay_type") != "Veresiye" else 0
+        return needed, disc, total, paid_eff, total - paid_eff
+
+    @staticmethod
+    def _sale_item_values(it: dict) -> tuple:
+        """sale_items değerleri (sale_id/stock_id hariç): code, name, gram, qty, birim, milyem, işçilik, tutar — kuruş."""
+        return (it["code"], it["name"], parse_number(it.get("gram", 0)), int(it["qty"]), to_kurus(it["unit_price"]),
+                it.get("milyem"), to_kurus(it.get("iscilik", 0)), to_kurus(it["line_total"]))
+
     def create_sale(self, header: dict, items: list[dict]) -> dict:
         """
         header = {'type','doc_no','date','notes','customer_text','pay_type','paid_amount','discount'}
         items  = [{'code','name','gram','qty','unit_price','milyem','iscilik','line_total'}, ...]
         """
         is_sale = header["type"] == "Satış"
-        cust_id = self._customer_id(header.get("customer_text",""))
-
-        # AŞIRI SATIŞ KONTROLÜ: Satış için yeterli stok var mı kontrol et
-        if is_sale:
-            insufficient_stock = []
-            for it in items:
-                row = self.db.cx.execute("SELECT * FROM stock_items WHERE code=?", (it["code"],)).fetchone()
-                if row:
-                    current_qty = row["qty"]
-                    requested_qty = int(it["qty"])
-                    if requested_qty > current_qty:
-                        insufficient_stock.append({
-                            "code": it["code"],
-                            "name": it["name"],
-                            "requested": requested_qty,
-                            "available": current_qty
-                        })
-                else:
-                    insufficient_stock.append({
-                        "code": it["code"],
-                        "name": it["name"],
-                        "requested": int(it["qty"]),
-                        "available": 0
-                    })
-
-            if insufficient_stock:
-                error_msg = "Yetersiz stok:\n" + "\n".join([
-                    f"- {item['code']} ({item['name']}): {item['requested']} adet istenen, {item['available']} adet mevcut"
-                    for item in insufficient_stock
-                ])
-                raise ValueError(error_msg)
-
-        gross = sum(parse_money(i["line_total"]) for i in items)
-        disc  = parse_money(header.get("discount",0.0))
-        total = max(0.0, gross - disc)
-
-        paid_req = parse_money(header.get("paid_amount",0.0))
-        # ETKİN ÖDEME: toplamı aşan ödeme “para üstü”dür → cariye/deftere net yansımaz
-        paid_eff = min(paid_req, total) if header.get("pay_type") != "Veresiye" else 0.0
-        due = round(total - paid_eff, 2)
+        needed, disc, total, paid_eff, due = self._sale_amounts(header, items)
 
+        # TEK COMMIT: müşteri, satış, cari ve kasa kaydı aynı işlemde; iç tx() çağrıları SAVEPOINT olur,
+        # sinyaller dıştaki commit'ten sonra yayılır → yarım kalmış satış (kasasız fiş) oluşmaz
         with self.db.tx() as cx:
-            cx.execute("""INSERT INTO sales(type,doc_no,date,notes,customer_id,pay_type,paid_amount,discount,total,due)
+            cust_id = self._customer_id(header.get("customer_text",""))
+
+            # AŞIRI SATIŞ KONTROLÜ: kontrol ve düşüm aynı yazma işleminde, tek sorgu + toplu UPDATE
+            stock = self._stock_rows(cx, needed)
+            if is_sale:
+                if any(code not in stock or n > stock[code][1] for code, n in needed.items()):
+                    raise self._insufficient_stock_error(items, needed, stock)
+                # qty >= ? koşulu: arada başka bir yazıcı stoğu düşürdüyse satır güncellenmez
+                updated = cx.executemany("UPDATE stock_items SET qty = qty - ? WHERE id = ? AND qty >= ?",
+                                         [(n, stock[code][0], n) for code, n in needed.items()]).rowcount
+                if updated != len(needed):
+                    raise self._insufficient_stock_error(items, needed, self._stock_rows(cx, needed))
+            else:
+                # ALIŞ: stokta olmayan ürünler otomatik açılır (satın alınan ürünler stokta görünsün)
+                gram_by_code = {it["code"]: parse_number(it.get("gram", 0)) for it in items}
+                for it in items:
+                    if it["code"] not in stock:
+                        cx.execute("INSERT INTO stock_items(code,name,gram,qty) VALUES (?,?,?,?)",
+                                   (it["code"], it["name"], gram_by_code[it["code"]], 0))
+                        stock[it["code"]] = (cx.execute("SELECT last_insert_rowid()").fetchone()[0], 0)
+                cx.executemany("UPDATE stock_items SET qty = qty + ? WHERE id = ?",
+                               [(n, stock[code][0]) for code, n in needed.items()])
+
+            sale_id = cx.execute("""INSERT INTO sales(type,doc_no,date,notes,customer_id,pay_type,paid_kurus,discount_kurus,total_kurus,due_kurus)
                           VALUES (?,?,?,?,?,?,?,?,?,?)""",
                        (header["type"], header.get("doc_no"), header["date"], header.get("notes"),
-                        cust_id, header.get("pay_type"), paid_eff, disc, total, due))
-            sale_id = cx.execute("SELECT last_insert_rowid()").fetchone()[0]
-
-            for it in items:
-                row = self._stock_by_code(cx, it["code"])
-                stock_id = row["id"] if row else None
+                        cust_id, header.get("pay_type"), paid_eff, disc, total, due)).lastrowid
 
-                # Eğer ALIŞ işlemi ise ve stokta kayıt yoksa, yeni bir stok öğesi oluştur
-                # (küçük demo/otomatik-yansıtma). Böylece satın alınan ürünler stokta görünür.
-                if not stock_id and not is_sale:
-                    try:
-                        cx.execute("INSERT INTO stock_items(code,name,gram,qty) VALUES (?,?,?,?)",
-                                   (it["code"], it["name"], parse_money(it.get("gram", 0)), 0))
-                        stock_id = cx.execute("SELECT last_insert_rowid()").fetchone()[0]
-                        # Yeniden oku (isteğe bağlı, burada sadece id yeterli)
-                        row = self._stock_by_code(cx, it["code"])
-                    except Exception:
-                        # Eğer ekleme başarısız olursa devam et (mevcut davranışı bozmamak için)
-                        stock_id = None
-                cx.execute("""INSERT INTO sale_items(sale_id,stock_id,code,name,gram,qty,unit_price,milyem,iscilik,line_total)
+            cx.executemany("""INSERT INTO sale_items(sale_id,stock_id,code,name,gram,qty,unit_price_kurus,milyem,iscilik_kurus,line_total_kurus)
                               VALUES (?,?,?,?,?,?,?,?,?,?)""",
-                           (sale_id, stock_id, it["code"], it["name"], parse_money(it.get("gram",0)), int(it["qty"]),
-                            parse_money(it["unit_price"]), it.get("milyem"), parse_money(it.get("iscilik",0)), parse_money(it["line_total"])))
-                if stock_id:
-                    delta = -int(it["qty"]) if is_sale else +int(it["qty"])
-                    cx.execute("UPDATE stock_items SET qty = MAX(0, qty + ?) WHERE id=?", (delta, stock_id))
-                    cx.execute("""INSERT INTO stock_moves(stock_id,sale_id,move_type,qty,note,date)
-                                  VALUES (?,?,?,?,?,?)""",
-                               (stock_id, sale_id, 'OUT' if is_sale else 'IN', abs(delta), header["type"], header["date"]))
+                           [(sale_id, stock[it["code"]][0], *self._sale_item_values(it)) for it in items])
+            cx.executemany("""INSERT INTO stock_moves(stock_id,sale_id,move_type,qty,note,date)
+                              VALUES (?,?,?,?,?,?)""",
+                           [(stock[it["code"]][0], sale_id, 'OUT' if is_sale else 'IN', int(it["qty"]),
+                             header["type"], header["date"]) for it in items])
 
             if cust_id:
                 if total > 0:
-                    cx.execute("""INSERT INTO customer_ledger(customer_id,sale_id,direction,amount,desc,date)
+                    cx.execute("""INSERT INTO customer_ledger(customer_id,sale_id,direction,amount_kurus,desc,date)
                                   VALUES (?,?,?,?,?,?)""",
                                (cust_id, sale_id, 'Borç' if is_sale else 'Alacak', total if is_sale else -total,
                                 header["type"], header["date"]))
-                    cx.execute("UPDATE customers SET balance = balance + ?, last_txn_at=? WHERE id=?",
+                    cx.execute("UPDATE customers SET balance_kurus = balance_kurus + ?, last_txn_at=? WHERE id=?",
                                (total if is_sale else -total, header["date"], cust_id))
                 if paid_eff > 0:
-                    cx.execute("""INSERT INTO customer_ledger(customer_id,sale_id,direction,amount,desc,date)
+                    cx.execute("""INSERT INTO customer_ledger(customer_id,sale_id,direction,amount_kurus,desc,date)
                                   VALUES (?,?,?,?,?,?)""",
                                (cust_id, sale_id, 'Alacak', paid_eff, f'Ödeme ({header.get("pay_type")})', header["date"]))
-                    cx.execute("UPDATE customers SET balance = balance - ? WHERE id=?", (paid_eff, cust_id))
+                    cx.execute("UPDATE customers SET balance_kurus = balance_kurus - ? WHERE id=?", (paid_eff, cust_id))
+
+            # Kasa/Banka defteri (net tahsilat = paid_eff)
+            if paid_eff > 0:
+                account = "Kasa" if (header.get("pay_type","").lower() == "nakit") else "Banka — POS"
+                if is_sale:
+                    # Satış → kasa GİRİŞ
+                    self.record_cash_entry(
+                        date=header["date"], time=None, account=account, type='Giriş',
+                        category='Satış Tahsilatı', description=header.get("doc_no",""),
+                        amount=from_kurus(paid_eff), customer_id=cust_id, sale_id=sale_id, ref_no=header.get("doc_no")
+                    )
+                else:
+                    # Alış (müşteriden ürün aldık) → kasa ÇIKIŞ
+                    self.record_cash_entry(
+                        date=header["date"], time=None, account=account, type='Çıkış',
+                        category='Alım Ödemesi', description=header.get("doc_no",""),
+                        amount=from_kurus(paid_eff), customer_id=cust_id, sale_id=sale_id, ref_no=header.get("doc_no")
+                    )
+
+            payload = {"sale_id": sale_id, "type": header["type"],
+                       "date": header["date"], "doc_no": header.get("doc_no"),
+                       "customer_id": cust_id, "total": from_kurus(total), "paid": from_kurus(paid_eff), "due": from_kurus(due),
+                       "pay_type": header.get("pay_type")}
+            self._emit(self.saleCommitted, payload)
+            self._stock_written(sid for sid, _ in stock.values())
+            self._changed("sales", "insert", [sale_id])
+            self._customers_written("update", [cust_id] if cust_id else [])
+        return payload
 
-        # Kasa/Banka defteri (net tahsilat = paid_eff)
-        if paid_eff > 0:
-            account = "Kasa" if (header.get("pay_type","").lower() == "nakit") else "Banka — POS"
+    # --- toplu satış (çevrimdışı kuyruk / e-ticaret aktarımı) ---
+    def create_sales_batch(self, sales, *, chunk_size: int = 500) -> list[dict]:
+        """
+        sales: (header, items) çiftleri (create_sale ile aynı biçim); akış halinde parça parça işlenir.
+        Her parça tek commit; müşteri ve stok kodları parça başına bir kez çözülür.
+        Dönüş girişle aynı sırada: {"success": True, **payload} ya da {"success": False, "doc_no", "message"}.
+        Sinyaller parça başına bir kez: salesBatchCommitted(list) + stok/müşteri/kasa değişti.
+        """
+        results, chunk = [], []
+        for sale in sales:
+            chunk.append(sale)
+            if len(chunk) >= chunk_size:
+                results.extend(self._commit_sales_chunk(chunk))
+                chunk = []
+        if chunk:
+            results.extend(self._commit_sales_chunk(chunk))
+        return results
+
+    @staticmethod
+    def _batch_error(header: dict, err: Exception) -> dict:
+        return {"success": False, "doc_no": header.get("doc_no"), "message": str(err)}
+
+    def _commit_sales_chunk(self, chunk: list) -> list[dict]:
+        results = [None] * len(chunk)
+        prepared = []
+        for i, (header, items) in enumerate(chunk):
+            # Yazıcının kullandığı her alan burada çözülür: bozuk satış parçayı düşürmez, yalnızca kendisi reddedilir
+            try:
+                if not header["type"] or not header["date"]:
+                    raise ValueError("İşlem türü ve tarihi gerekli")
+                prepared.append((i, header, items, self._sale_amounts(header, items),
+                                 [self._sale_item_values(it) for it in items]))
+            except (KeyError, TypeError, ValueError) as e:
+                results[i] = self._batch_error(header, e)
+        try:
+            with self.db.tx() as cx:
+                payloads, stock_ids, customer_ids, cash_ids = self._write_sales_chunk(cx, prepared, results)
+                if payloads:
+                    self._emit(self.salesBatchCommitted, payloads)
+                    self._stock_written(stock_ids)
+                    self._changed("sales", "insert", [p["sale_id"] for p in payloads])
+                    self._customers_written("update", customer_ids)
+                    if cash_ids:
+                        self._cash_written("insert", cash_ids)
+        except sqlite3.Error:
+            # Beklenmeyen veritabanı hatası: parça geri alındı → satışlar tek tek denenir, hatalı olan ayrışır
+            for i, header, items, *_ in prepared:
+                try:
+                    results[i] = {"success": True, **self.create_sale(header, items)}
+                except Exception as e:
+                    results[i] = self._batch_error(header, e)
+        return results
+
+    def _write_sales_chunk(self, cx, prepared: list, results: list):
+        """Parçayı yazar; (payload listesi, değişen stok/müşteri id'leri, eklenen kasa id'leri) döner."""
+        customers = self._customer_ids(cx, {k for k in (self._split_customer(h.get("customer_text", ""))
+                                                        for _, h, *_ in prepared) if k})
+        # Stok tek sorguda okunur; yazma kilidi bizde olduğundan adetler bellekte yürütülür
+        stock = self._stock_rows(cx, {it["code"] for _, _, items, *_ in prepared for it in items})
+        qty = {code: q for code, (_, q) in stock.items()}
+        delta, balance, last_txn = {}, {}, {}
+        sale_items, moves, ledger, cash, payloads = [], [], [], [], []
+        now = datetime.now().strftime("%H:%M")
+
+        for i, header, items, (needed, disc, total, paid_eff, due), rows in prepared:
+            is_sale = header["type"] == "Satış"
             if is_sale:
-                # Satış → kasa GİRİŞ
-                self.record_cash_entry(
-                    date=header["date"], time=None, account=account, type='Giriş',
-                    category='Satış Tahsilatı', description=header.get("doc_no",""),
-                    amount=paid_eff, customer_id=cust_id, sale_id=sale_id, ref_no=header.get("doc_no")
-                )
+                if any(code not in qty or n > qty[code] for code, n in needed.items()):
+                    results[i] = self._batch_error(header, self._insufficient_stock_error(
+                        items, needed, {code: (None, q) for code, q in qty.items()}))
+                    continue
             else:
-                # Alış (müşteriden ürün aldık) → kasa ÇIKIŞ
-                self.record_cash_entry(
-                    date=header["date"], time=None, account=account, type='Çıkış',
-                    category='Alım Ödemesi', description=header.get("doc_no",""),
-                    amount=paid_eff, customer_id=cust_id, sale_id=sale_id, ref_no=header.get("doc_no")
-                )
+                # ALIŞ: stokta olmayan ürünler otomatik açılır
+                for code, name, gram, *_ in rows:
+                    if code not in stock:
+                        sid = cx.execute("INSERT INTO stock_items(code,name,gram,qty) VALUES (?,?,?,?)",
+                                         (code, name, gram, 0)).lastrowid
+                        stock[code], qty[code] = (sid, 0), 0
+            sign = -1 if is_sale else 1
+            for code, n in needed.items():
+                qty[code] += sign * n
+                delta[stock[code][0]] = delta.get(stock[code][0], 0) + sign * n
+
+            cust_id = customers.get(self._split_customer(header.get("customer_text", "")))
+            sale_id = cx.execute("""INSERT INTO sales(type,doc_no,date,notes,customer_id,pay_type,paid_kurus,discount_kurus,total_kurus,due_kurus)
+                                    VALUES (?,?,?,?,?,?,?,?,?,?)""",
+                                 (header["type"], header.get("doc_no"), header["date"], header.get("notes"),
+                                  cust_id, header.get("pay_type"), paid_eff, disc, total, due)).lastrowid
+            sale_items.extend((sale_id, stock[r[0]][0], *r) for r in rows)
+            moves.extend((stock[r[0]][0], sale_id, 'OUT' if is_sale else 'IN', r[3],
+                          header["type"], header["date"]) for r in rows)
 
-        payload = {"sale_id": sale_id, "type": header["type"],
-                   "date": header["date"], "doc_no": header.get("doc_no"),
-                   "customer_id": cust_id, "total": total, "paid": paid_eff, "due": due,
-                   "pay_type": header.get("pay_type")}
-        self.saleCommitted.emit(payload)
-        self.stockChanged.emit(); self.customersChanged.emit()
-        return payload
+            if cust_id:
+                if total > 0:
+                    ledger.append((cust_id, sale_id, 'Borç' if is_sale else 'Alacak', total if is_sale else -total,
+                                   header["type"], header["date"]))
+                    balance[cust_id] = balance.get(cust_id, 0) + (total if is_sale else -total)
+                    last_txn[cust_id] = header["date"]
+                if paid_eff > 0:
+                    ledger.append((cust_id, sale_id, 'Alacak', paid_eff, f'Ödeme ({header.get("pay_type")})', header["date"]))
+                    balance[cust_id] = balance.get(cust_id, 0) - paid_eff
+            if paid_eff > 0:
+                account = "Kasa" if (header.get("pay_type","").lower() == "nakit") else "Banka — POS"
+                cash.append((header["date"], now, account, 'Giriş' if is_sale else 'Çıkış',
+                             'Satış Tahsilatı' if is_sale else 'Alım Ödemesi', header.get("doc_no", ""),
+                             paid_eff, cust_id, sale_id, header.get("doc_no"), '00', 0.0, 1.0, None))
+
+            payload = {"sale_id": sale_id, "type": header["type"],
+                       "date": header["date"], "doc_no": header.get("doc_no"),
+                       "customer_id": cust_id, "total": from_kurus(total), "paid": from_kurus(paid_eff), "due": from_kurus(due),
+                       "pay_type": header.get("pay_type")}
+            results[i] = {"success": True, **payload}
+            payloads.append(payload)
+
+        cx.executemany("UPDATE stock_items SET qty = qty + ? WHERE id = ?",
+                       [(d, sid) for sid, d in delta.items() if d])
+        cx.executemany("""INSERT INTO sale_items(sale_id,stock_id,code,name,gram,qty,unit_price_kurus,milyem,iscilik_kurus,line_total_kurus)
+                          VALUES (?,?,?,?,?,?,?,?,?,?)""", sale_items)
+        cx.executemany("""INSERT INTO stock_moves(stock_id,sale_id,move_type,qty,note,date)
+                          VALUES (?,?,?,?,?,?)""", moves)
+        cx.executemany("""INSERT INTO customer_ledger(customer_id,sale_id,direction,amount_kurus,desc,date)
+                          VALUES (?,?,?,?,?,?)""", ledger)
+        cx.executemany("UPDATE customers SET balance_kurus = balance_kurus + ?, last_txn_at = COALESCE(?, last_txn_at) WHERE id=?",
+                       [(b, last_txn.get(cid), cid) for cid, b in balance.items()])
+        cx.executemany("""INSERT INTO cash_ledger(date,time,account,type,category,description,amount_kurus,customer_id,sale_id,
+                          ref_no,currency_code,amount_foreign,fx_rate,type_code)
+                          VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?,?)""", cash)
+        cash_ids = []
+        if cash:
+            # AUTOINCREMENT + yazma kilidi bizde: executemany ardışık ve en büyük id'leri verir
+            last = cx.execute("SELECT MAX(id) FROM cash_ledger").fetchone()[0]
+            cash_ids = list(range(last - len(cash) + 1, last + 1))
+        return payloads, list(delta), list(balance), cash_ids
 
     def get_recent_transactions(self, limit: int = 7):
         """Son işlemleri getirir"""
@@ -430,5 +1017,5 @@ class DataService(QObject):
         ORDER BY s.date DESC, s.id DESC
         LIMIT ?
         """
-        rows = self.db.cx.execute(query, (limit,)).fetchall()
+        rows = self.db.query(query, (limit,))
         return [dict(row) for row in rows]
\ No newline at end of file
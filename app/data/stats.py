@@ -0,0 +1,174 @@
+# app/data/stats.py
+"""
+İsteğe bağlı SQL ölçümü. Bağlantı sarmalayıcısı her execute/executemany ve ardından gelen
+fetch çağrılarının süresini ölçer; sonuçlar normalize edilmiş ifade başına toplanır
+(sayı, toplam/ortalama/p95 süre, dönen satır). Eşiği aşan ifadeler dönen log dosyasına yazılır.
+Tetikleyicilerin çalıştırdığı alt ifadeler, onları tetikleyen ifadenin süresine dahildir.
+"""
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from logging.handlers import RotatingFileHandler
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?\b")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+SLOW_LOGGER = "orbitx.sql.slow"
+
+
+@lru_cache(maxsize=4096)
+def normalize(sql: str) -> str:
+    """Sabitleri ? ile değiştirir, IN (?, ?, …) listelerini ve boşlukları sadeleştirir."""
+    s = _STRING.sub("?", sql)
+    s = _NUMBER.sub("?", s)
+    s = _IN_LIST.sub("(?, …)", s)
+    return _SPACE.sub(" ", s).strip().rstrip(";")
+
+
+class _Entry:
+    __slots__ = ("count", "total", "rows", "samples")
+
+    def __init__(self, window: int):
+        self.count = 0
+        self.total = 0.0
+        self.rows = 0
+        self.samples = deque(maxlen=window)  # son çalıştırmaların hücreleri (p95 için)
+
+
+class QueryStats:
+    """İfade başına sayaçlar. Her çalıştırma bir hücredir: [süre_sn, satır, loglandı_mı, ifade]."""
+    def __init__(self, *, slow_ms: float = 100.0, log_path: str = None, window: int = 1000):
+        self.slow = slow_ms / 1000.0
+        self.window = window
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.log = logging.getLogger(SLOW_LOGGER)
+        if log_path:
+            self.log = self._file_logger(os.path.abspath(log_path))
+
+    @staticmethod
+    def _file_logger(path: str):
+        # Log dosyası başına bir alt logger: aynı süreçteki farklı veritabanları birbirine yazmaz
+        log = logging.getLogger(f"{SLOW_LOGGER}.{path}")
+        if not log.handlers:
+            handler = RotatingFileHandler(path, maxBytes=1_000_000, backupCount=3, encoding="utf-8", delay=True)
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            log.addHandler(handler)
+            log.setLevel(logging.INFO)
+            log.propagate = False
+        return log
+
+    def start(self, sql: str, dt: float, rows: int = 0):
+        key = normalize(sql)
+        cell = [dt, rows, False, key]
+        with self._lock:
+            e = self._entries.get(key)
+            if e is None:
+                e = self._entries[key] = _Entry(self.window)
+            e.count += 1
+            e.total += dt
+            e.rows += rows
+            e.samples.append(cell)
+        self._check_slow(cell)
+        return cell
+
+    def add(self, cell, dt: float, rows: int):
+        """Aynı çalıştırmanın fetch süresini/satırlarını ekler."""
+        with self._lock:
+            e = self._entries.get(cell[3])
+            cell[0] += dt
+            cell[1] += rows
+            if e is not None:
+                e.total += dt
+                e.rows += rows
+        self._check_slow(cell)
+
+    def _check_slow(self, cell):
+        if not cell[2] and cell[0] >= self.slow:
+            cell[2] = True
+            self.log.warning("%.1f ms | rows=%d | %s", cell[0] * 1000, cell[1], cell[3])
+
+    def snapshot(self, *, sort: str = "total", limit: int = None) -> list:
+        """[{sql, count, total_ms, avg_ms, p95_ms, rows}] — sort: total | count | avg | p95 | rows."""
+        with self._lock:
+            items = [(k, e.count, e.total, e.rows, sorted(c[0] for c in e.samples))
+                     for k, e in self._entries.items()]
+        out = []
+        for sql, count, total, rows, durs in items:
+            p95 = durs[min(len(durs) - 1, int(len(durs) * 0.95))] if durs else 0.0
+            out.append({"sql": sql, "count": count, "total_ms": total * 1000,
+                        "avg_ms": total * 1000 / count if count else 0.0,
+                        "p95_ms": p95 * 1000, "rows": rows})
+        key = {"total": "total_ms", "avg": "avg_ms", "p95": "p95_ms"}.get(sort, sort)
+        out.sort(key=lambda r: r[key], reverse=True)
+        return out[:limit] if limit else out
+
+    def reset(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class TimedCursor:
+    """sqlite3.Cursor sarmalayıcısı: fetch süreleri ve satır sayısı aynı hücreye eklenir."""
+    __slots__ = ("_cur", "_stats", "_cell")
+
+    def __init__(self, cur, stats, cell):
+        self._cur, self._stats, self._cell = cur, stats, cell
+
+    def fetchone(self):
+        t0 = time.perf_counter()
+        row = self._cur.fetchone()
+        self._stats.add(self._cell, time.perf_counter() - t0, row is not None)
+        return row
+
+    def fetchall(self):
+        t0 = time.perf_counter()
+        rows = self._cur.fetchall()
+        self._stats.add(self._cell, time.perf_counter() - t0, len(rows))
+        return rows
+
+    def fetchmany(self, size=None):
+        t0 = time.perf_counter()
+        rows = self._cur.fetchmany(size) if size is not None else self._cur.fetchmany()
+        self._stats.add(self._cell, time.perf_counter() - t0, len(rows))
+        return rows
+
+    def __iter__(self):
+        while True:
+            row = self.fetchone()
+            if row is None:
+                return
+            yield row
+
+    def __getattr__(self, name):  # lastrowid, rowcount, description, close …
+        return getattr(self._cur, name)
+
+
+class TimedConnection:
+    """sqlite3.Connection sarmalayıcısı; execute/executemany ölçülür, kalan her şey aynen iletilir."""
+    __slots__ = ("raw", "_stats")
+
+    def __init__(self, raw, stats: QueryStats):
+        self.raw = raw
+        self._stats = stats
+
+    def execute(self, sql, params=()):
+        t0 = time.perf_counter()
+        cur = self.raw.execute(sql, params)
+        cell = self._stats.start(sql, time.perf_counter() - t0)
+        return TimedCursor(cur, self._stats, cell)
+
+    def executemany(self, sql, seq):
+        t0 = time.perf_counter()
+        cur = self.raw.executemany(sql, seq)
+        self._stats.start(sql, time.perf_counter() - t0, max(cur.rowcount, 0))
+        return cur
+
+    def __getattr__(self, name):
+        return getattr(self.raw, name)
@@ -0,0 +1,197 @@
+# app/data/textindex.py
+"""
+Bellek içi alt dize arama dizini (liste sayfalarının arama kutusu için): konum → katlanmış anahtar.
+- anahtar search.fold() ile katlanır (ISIK = ışık = Işık); key_of() alanları ayraçla birleştirir, eşleşme alan sınırını aşmaz
+- yeniden yüklemede bir kez, NumPy ile toplu kurulur: katlama kod noktası tablosuyla, harfler küçük bir alfabeye
+  kodlanır, trigram → satır listeleri (CSR: sıralı trigram kodları + başlangıç indeksleri + satırlar)
+- 3 harfli sorgu tek liste, 1-2 harfli sorgu bitişik liste aralığı (kesin, tarama yok); daha uzun sorgu:
+  trigram listelerinin kesişimi, adaylar `q in anahtar` ile doğrulanır
+- daraltma (yeni sorgu öncekini içeriyorsa): önceki sonuç yalnızca yeni trigramlarla süzülür
+- değişiklikler yerinde: güncellenen/eklenen konumlar "kirli" kümede doğrudan doğrulanır, silinenler atlanır;
+  kirli küme büyüyünce dizin aynı konumlarla yeniden kurulur
+"""
+import numpy as np
+
+from .search import fold, _FOLD_TABLE
+
+SEP = "\n"        # kayıt ayracı (dizin içi)
+FIELD = "\x1f"    # alan ayracı: sorgu bunu içeremez → eşleşme alan sınırını aşmaz
+# Kirli konum sayısı bu eşiği (ya da kurulu boyutun 1/8'ini) aşınca yeniden kur
+REBUILD_MIN = 1000
+
+_EMPTY = np.zeros(0, dtype=np.int64)
+# fold() ile aynı katlama, kod noktası dizisi üzerinde (tablo dışındaki noktalar olduğu gibi kalır)
+_FOLD_POINTS = np.arange(max(_FOLD_TABLE) + 1, dtype=np.uint32)
+_FOLD_POINTS[list(_FOLD_TABLE)] = [ord(v) for v in _FOLD_TABLE.values()]
+
+
+def key_of(*fields) -> str:
+    """Satır alanlarından (katlanmamış) arama anahtarı; alanlar arası eşleşme yok."""
+    return FIELD.join(fields)
+
+
+def _fold_key(key: str) -> str:
+    return fold(key).replace(SEP, " ")
+
+
+class TextIndex:
+    def __init__(self, keys=()):
+        self.build(keys)
+
+    def __len__(self):
+        return len(self.keys)
+
+    # --- kurulum ---
+    def build(self, keys):
+        """Anahtarlar (key_of) konum sırasıyla verilir; konumlar çağıranın satır konumlarıdır."""
+        self.keys = list(keys)
+        self._dead = set()
+        self.version = getattr(self, "version", 0) + 1
+        self._index()
+
+    def _index(self):
+        self._dirty = set()
+        self._last = None
+        n = self._built = len(self.keys)
+        self._stale = np.zeros(n, dtype=bool)               # kurulumdan sonra değişen/silinen konumlar
+        if self._dead:
+            self._stale[list(self._dead)] = True
+        # Tüm anahtarlar tek metinde; ayraç konumları uzunluklardan (anahtar içindeki "\n" boşluk olur)
+        ends = np.cumsum(np.fromiter(map(len, self.keys), dtype=np.int64, count=n) + 1) - 1
+        points = np.frombuffer((SEP.join(self.keys) + SEP).encode("utf-32-le"), dtype=np.uint32).copy()
+        points[:-1][points[:-1] == ord(SEP)] = ord(" ")
+        points[ends] = ord(SEP)
+        low = points < len(_FOLD_POINTS)
+        points[low] = _FOLD_POINTS[points[low]]
+        self.keys = points.tobytes().decode("utf-32-le").split(SEP)[:n]
+        # Alfabe: metinde geçen kod noktaları → 0..size-1 (sıralama yok, bincount + arama tablosu)
+        alphabet = np.flatnonzero(np.bincount(points))
+        lut = np.zeros(int(alphabet[-1]) + 1, dtype=np.int32 if len(alphabet) < 1290 else np.int64)
+        lut[alphabet] = np.arange(len(alphabet))
+        codes = lut[points]
+        self._alpha = {chr(c): i for i, c in enumerate(alphabet.tolist())}
+        self._size = size = len(alphabet)
+        sep = self._alpha[SEP]
+        is_sep = codes == sep
+
+        # Ayraç olmayan her konumda başlayan üçlü (anahtar sonunda ayraçla doldurulur): trigram kodu + satır.
+        # Aynı harf(ler)le başlayan üçlüler kod sırasında bitişik → 1-2 harfli sorgu tek aralık okur.
+        codes = np.concatenate((codes, [sep, sep]))
+        at = np.flatnonzero(~is_sep)
+        second = codes[1:-1]
+        third = np.where(second == sep, sep, codes[2:])    # ayraçtan sonraki anahtara taşma
+        grams = ((codes[:-2] * size + second) * size + third)[at].astype(np.int64)
+        bits = max(n, 1).bit_length()
+        pairs = np.sort((grams << bits) | np.cumsum(is_sep, dtype=np.int64)[at])
+        if len(pairs):
+            pairs = pairs[np.concatenate(([True], pairs[1:] != pairs[:-1]))]
+        grams = pairs >> bits
+        self._postings = (pairs & ((1 << bits) - 1)).astype(np.int32 if n < 2**31 else np.int64)
+        starts = np.flatnonzero(np.concatenate(([True], grams[1:] != grams[:-1]))) if len(grams) else _EMPTY
+        self._grams = grams[starts]
+        self._offsets = np.append(starts, len(pairs))
+        # Doğrulama için UTF-8 anahtarlar (sabit genişlikli bayt dizisi; bayt alt dizesi = harf alt dizesi)
+        self._bytes = np.array([k.encode() for k in self.keys] or [b""])
+
+    # --- artımlı değişiklik ---
+    def set(self, pos: int, key: str):
+        """Konumun anahtarını günceller; pos == len → sona ekler."""
+        key = _fold_key(key)
+        if pos == len(self.keys):
+            self.keys.append(key)
+        elif self.keys[pos] == key and pos not in self._dead:
+            return
+        else:
+            self.keys[pos] = key
+            self._dead.discard(pos)
+        self._touch(pos)
+        self._dirty.add(pos)
+        self._maybe_rebuild()
+
+    def remove(self, pos: int):
+        self.keys[pos] = ""
+        self._dead.add(pos)
+        self._dirty.discard(pos)
+        self._touch(pos)
+
+    def _touch(self, pos):
+        if pos < self._built:
+            self._stale[pos] = True
+        self.version += 1
+
+    def _maybe_rebuild(self):
+        if len(self._dirty) > max(REBUILD_MIN, self._built // 8):
+            self._index()
+
+    # --- sorgu ---
+    def find(self, query) -> np.ndarray:
+        """Anahtarında katlanmış sorguyu içeren konumlar (artan sıralı int64 dizi)."""
+        q = fold(query).strip()
+        if not q:
+            live = np.arange(len(self.keys), dtype=np.int64)
+            return live if not self._dead else np.setdiff1d(live, list(self._dead), assume_unique=True)
+        last = self._last
+        if last and last[2] == self.version and last[0] == q:
+            return last[1]
+        if last and last[2] == self.version and last[0] in q and len(q) >= 3:
+            base = self._narrow(last, q)
+        else:
+            base = self._candidates(q)
+        if len(q) > 3 and len(base):
+            # Trigramların hepsi satırda var ama yan yana olmayabilir: adaylar vektörel doğrulanır
+            base = base[np.char.find(self._bytes[base], q.encode()) >= 0]
+        extra = sorted(p for p in self._dirty if q in self.keys[p])
+        hits = np.union1d(base, extra).astype(np.int64) if extra else base.astype(np.int64, copy=False)
+        self._last = (q, hits, self.version)
+        return hits
+
+    def _codes(self, q):
+        codes = [self._alpha.get(ch) for ch in q]
+        return None if None in codes or self._alpha.get(SEP) in codes else codes
+
+    def _trigrams(self, codes) -> set:
+        s = self._size
+        return {(codes[i] * s + codes[i + 1]) * s + codes[i + 2] for i in range(len(codes) - 2)}
+
+    def _fresh(self, positions):
+        """Kurulu kısımdaki (kirli/silinmiş olmayan) konumlar."""
+        positions = positions[positions < self._built]
+        return positions[~self._stale[positions]]
+
+    def _candidates(self, q) -> np.ndarray:
+        codes = self._codes(q)
+        if codes is None or not self._built:
+            return _EMPTY
+        if len(codes) < 3:
+            # Bu harf(ler)le başlayan tüm üçlülerin satırları: tek bitişik aralık, kesin sonuç
+            s = self._size
+            lo = (codes[0] * s + (codes[1] if len(codes) == 2 else 0)) * s
+            rows = self._posting(lo, lo + (s if len(codes) == 2 else s * s))
+            mark = np.zeros(self._built, dtype=bool)
+            mark[rows] = True
+            return self._fresh(np.flatnonzero(mark))
+        lists = sorted((self._posting(g) for g in self._trigrams(codes)), key=len)
+        return self._fresh(self._intersect(lists[0].astype(np.int64), lists[1:]))
+
+    def _narrow(self, last, q) -> np.ndarray:
+        """Önceki sonucu yalnızca sorguya yeni eklenen trigramlarla süzer (yeniden tarama yok)."""
+        base = self._fresh(last[1])
+        codes, old = self._codes(q), self._codes(last[0])
+        if codes is None:
+            return _EMPTY
+        grams = self._trigrams(codes) - (self._trigrams(old) if old and len(old) >= 3 else set())
+        return self._intersect(base, sorted((self._posting(g) for g in grams), key=len))
+
+    def _posting(self, lo, hi=None) -> np.ndarray:
+        """[lo, hi) kodlu üçlülerin satırları (hi yoksa yalnızca lo)."""
+        i, j = np.searchsorted(self._grams, (lo, lo + 1 if hi is None else hi))
+        return self._postings[self._offsets[i]:self._offsets[j]]
+
+    def _intersect(self, cand, lists):
+        for p in lists:
+            if not len(cand):
+                break
+            mark = np.zeros(self._built, dtype=bool)
+            mark[p] = True
+            cand = cand[mark[cand]]
+        return cand
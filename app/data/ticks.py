@@ -0,0 +1,93 @@
+# app/data/ticks.py
+"""
+Piyasa fiyat geçmişi. Her çekim market_ticks'e (kod, ts, alış, satış) ham satır olarak eklenir;
+tetikleyici aynı işlemde satış fiyatının 1 dk / 1 sa / 1 gün OHLC dilimlerini günceller.
+Ham tick'ler ve ince dilimler saklama süresi dolunca silinir (prune); özetler silmeden etkilenmez.
+series() istenen aralık için en fazla max_points noktayı, aralığı karşılayan en ince özet
+tablosundan okur → milyonlarca tick olsa da okunan satır sayısı sınırlıdır.
+Zaman damgaları unix saniyesi; dilimler UTC'ye hizalıdır. Fiyatlar kuruş.
+"""
+from math import ceil
+
+# (ad, dilim saniyesi, saklama saniyesi; None = süresiz) — inceden kabaya
+RESOLUTIONS = (("1m", 60, 90 * 86400), ("1h", 3600, 2 * 365 * 86400), ("1d", 86400, None))
+RAW_RETENTION = 7 * 86400
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS market_ticks(
+  kod TEXT NOT NULL, ts INTEGER NOT NULL,
+  alis_kurus INTEGER NOT NULL, satis_kurus INTEGER NOT NULL,
+  PRIMARY KEY(kod, ts)
+) WITHOUT ROWID;
+""" + "".join(f"""
+CREATE TABLE IF NOT EXISTS market_ohlc_{name}(
+  kod TEXT NOT NULL, bucket INTEGER NOT NULL,
+  open_kurus INTEGER NOT NULL, high_kurus INTEGER NOT NULL,
+  low_kurus INTEGER NOT NULL, close_kurus INTEGER NOT NULL,
+  first_ts INTEGER NOT NULL, last_ts INTEGER NOT NULL, n INTEGER NOT NULL,
+  PRIMARY KEY(kod, bucket)
+) WITHOUT ROWID;
+""" for name, _, _ in RESOLUTIONS)
+
+# Sıra dışı gelen tick de doğru açılış/kapanışa yerleşir (first_ts/last_ts karşılaştırması)
+_ROLLUP = """
+  INSERT INTO market_ohlc_{name}(kod, bucket, open_kurus, high_kurus, low_kurus, close_kurus, first_ts, last_ts, n)
+  VALUES (NEW.kod, NEW.ts - NEW.ts % {secs}, NEW.satis_kurus, NEW.satis_kurus, NEW.satis_kurus,
+          NEW.satis_kurus, NEW.ts, NEW.ts, 1)
+  ON CONFLICT(kod, bucket) DO UPDATE SET
+    open_kurus = CASE WHEN excluded.first_ts < first_ts THEN excluded.open_kurus ELSE open_kurus END,
+    close_kurus = CASE WHEN excluded.last_ts >= last_ts THEN excluded.close_kurus ELSE close_kurus END,
+    high_kurus = MAX(high_kurus, excluded.high_kurus),
+    low_kurus = MIN(low_kurus, excluded.low_kurus),
+    first_ts = MIN(first_ts, excluded.first_ts),
+    last_ts = MAX(last_ts, excluded.last_ts),
+    n = n + 1;
+"""
+
+TRIGGERS = ("CREATE TRIGGER IF NOT EXISTS trg_market_ticks_ohlc AFTER INSERT ON market_ticks BEGIN"
+            + "".join(_ROLLUP.format(name=name, secs=secs) for name, secs, _ in RESOLUTIONS) + "END;")
+
+
+def insert(cx, rows):
+    """rows: (kod, ts, alis_kurus, satis_kurus). Aynı saniyeye ikinci tick yok sayılır (özet iki kez sayılmasın)."""
+    cx.executemany("INSERT OR IGNORE INTO market_ticks(kod, ts, alis_kurus, satis_kurus) VALUES (?,?,?,?)", rows)
+
+
+def prune(cx, kods, now: int):
+    """Saklama süresi dolan ham tick'leri ve ince dilimleri siler (kod başına indeks aralığı)."""
+    kods = list(kods)
+    cx.executemany("DELETE FROM market_ticks WHERE kod = ? AND ts < ?", [(k, now - RAW_RETENTION) for k in kods])
+    for name, _, keep in RESOLUTIONS:
+        if keep is not None:
+            cx.executemany(f"DELETE FROM market_ohlc_{name} WHERE kod = ? AND bucket < ?",
+                           [(k, now - keep) for k in kods])
+
+
+def series(cx, kod: str, start: int, end: int, *, max_points: int = 300, now: int) -> list[dict]:
+    """[start, end] aralığı için OHLC noktaları (TL): [{ts, open, high, low, close, n}], en çok max_points."""
+    span = max(1, end - start)
+    for name, secs, keep in RESOLUTIONS:
+        covered = keep is None or start >= now - keep
+        if covered and span / secs <= max_points:
+            break
+    rows = cx.execute(f"""
+        SELECT bucket, open_kurus, high_kurus, low_kurus, close_kurus, n FROM market_ohlc_{name}
+        WHERE kod = ? AND bucket >= ? AND bucket <= ? ORDER BY bucket""",
+                      (kod, start - start % secs, end)).fetchall()
+    if len(rows) > max_points:
+        # Çok uzun aralık (yıllar): günlük dilimler bellekte birleştirilir
+        rows = _merge(rows, ceil(span / max_points / secs) * secs)
+    return [{"ts": b, "open": o / 100, "high": h / 100, "low": lo / 100, "close": c / 100, "n": n}
+            for b, o, h, lo, c, n in rows]
+
+
+def _merge(rows, step: int) -> list:
+    out = []
+    for b, o, h, lo, c, n in rows:
+        key = b - b % step
+        if out and out[-1][0] == key:
+            k, o0, h0, l0, _, n0 = out[-1]
+            out[-1] = (k, o0, max(h0, h), min(l0, lo), c, n0 + n)
+        else:
+            out.append((key, o, h, lo, c, n))
+    return out
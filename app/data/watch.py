@@ -0,0 +1,78 @@
+# app/data/watch.py
+"""
+Süreçler arası değişiklik izleyici. Aynı veritabanına başka bir süreç (ikinci pencere, API sunucusu,
+betik) yazdığında bu süreçteki sayfalar da tam yeniden yükleme yapmadan satır düzeyinde güncellenir:
+- her yazma işlemi commit'ten hemen önce change_log'a tek satır bırakır (DB.journal)
+- izleyici arka plan iş parçacığında kendi salt-okunur bağlantısıyla PRAGMA data_version'ı yoklar;
+  sayı aynıysa başka bağlantı commit etmemiştir → change_log'a hiç bakılmaz
+- değiştiyse yüksek su işaretinden (hwm) sonraki satırlar okunur, kendi kaynağımızdan gelenler atlanır
+- arada budanmış satır varsa (uzun uyku) tüm tablolar için "reset" bildirilir
+"""
+import json
+import sqlite3
+import threading
+
+from .db import _connect_reader
+
+TABLES = ("stock_items", "customers", "cash_ledger", "sales")
+
+
+class ChangeWatcher:
+    def __init__(self, path: str, origin: str, on_changes, interval: float = 0.5):
+        self.origin = origin
+        self.on_changes = on_changes   # fn([(tablo, işlem, id'ler), ...]) — izleyici iş parçacığında çağrılır
+        self.interval = interval
+        self._cx = _connect_reader(path)
+        self._version = self._data_version()
+        self.hwm = self._cx.execute("SELECT COALESCE(MAX(id), 0) FROM change_log").fetchone()[0]
+        self.polls = 0   # ölçüm: data_version yoklaması / change_log okuması
+        self.reads = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _data_version(self) -> int:
+        return self._cx.execute("PRAGMA data_version").fetchone()[0]
+
+    def poll(self) -> list:
+        """Tek yoklama; başka süreçten gelen değişiklikleri on_changes'e verir ve döner."""
+        self.polls += 1
+        version = self._data_version()
+        if version == self._version:
+            return []
+        self._version = version
+        self.reads += 1
+        rows = self._cx.execute("SELECT id, origin, changes FROM change_log WHERE id > ? ORDER BY id",
+                                (self.hwm,)).fetchall()
+        if not rows:
+            return []
+        out = []
+        if rows[0]["id"] != self.hwm + 1:
+            # Okumadığımız satırlar budanmış: neyin değiştiği bilinmiyor
+            out = [(t, "reset", []) for t in TABLES]
+        for r in rows:
+            if r["origin"] != self.origin:
+                out += [tuple(c) for c in json.loads(r["changes"])]
+        self.hwm = rows[-1]["id"]
+        if out:
+            self.on_changes(out)
+        return out
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="change-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except sqlite3.Error as e:
+                print(f"Değişiklik izleyici: {e}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(5)
+            self._thread = None
+        self._cx.close()
@@ -0,0 +1,92 @@
+# app/data/writer.py
+import queue, threading, time
+from concurrent.futures import Future
+
+_STOP = object()
+
+
+class WriteQueue:
+    """
+    Tek yazıcı iş parçacığı. submit() ile gelen işler sırayla yazıcı bağlantısında çalışır.
+    Birkaç ms içinde gelen işler tek bir işlemde toplanır (group commit); her iş kendi
+    SAVEPOINT'inde koşar, böylece hatalı iş yalnızca kendisini geri alır.
+    Future'lar commit tamamlandıktan sonra sonuçlanır.
+    """
+    def __init__(self, db, *, window_ms: float = 2.0, max_batch: int = 64):
+        self.db = db
+        self.window = window_ms / 1000.0
+        self.max_batch = max(1, int(max_batch))
+        self._q = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.commits = 0
+        self.jobs = 0
+
+    def start(self):
+        with self._start_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="orbitx-writer", daemon=True)
+                self._thread.start()
+
+    def submit(self, fn, *args, **kwargs) -> Future:
+        """fn(*args, **kwargs) yazıcı iş parçacığında bir işlem içinde çalıştırılır."""
+        fut = Future()
+        self.start()
+        self._q.put((fut, fn, args, kwargs))
+        return fut
+
+    def flush(self, timeout: float = None):
+        """Kuyruktaki tüm işler commit edilene kadar bekler."""
+        self.submit(lambda: None).result(timeout)
+
+    def close(self, timeout: float = 5.0):
+        if self._thread is not None and self._thread.is_alive():
+            self._q.put(_STOP)
+            self._thread.join(timeout)
+        self._thread = None
+
+    # --- yazıcı döngüsü ---
+    def _collect(self, first):
+        batch = [first]
+        deadline = time.perf_counter() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                job = self._q.get(timeout=remaining) if remaining > 0 else self._q.get_nowait()
+            except queue.Empty:
+                break
+            if job is _STOP:
+                self._q.put(_STOP)
+                break
+            batch.append(job)
+        return batch
+
+    def _run(self):
+        while True:
+            first = self._q.get()
+            if first is _STOP:
+                return
+            batch = [job for job in self._collect(first) if job[0].set_running_or_notify_cancel()]
+            if not batch:
+                continue
+            results = []
+            try:
+                with self.db.tx():
+                    for fut, fn, args, kwargs in batch:
+                        try:
+                            with self.db.tx():
+                                results.append((fut, fn(*args, **kwargs), None))
+                        except Exception as e:
+                            results.append((fut, None, e))
+            except Exception as e:
+                # commit başarısız → gruptaki hiçbir iş kalıcı değil
+                for fut, *_ in batch:
+                    fut.set_exception(e)
+                continue
+            self.commits += 1
+            self.jobs += len(batch)
+            for fut, res, err in results:
+                if err is not None:
+                    fut.set_exception(err)
+                else:
+                    fut.set_result(res)
@@ -23,7 +23,7 @@ def create_main_window():
     from pages.parameters import ParametersPage
 
 class MainWindow(QMainWindow):
-    def __init__(self):
+    def __init__(self, server: str = None):
         super().__init__()
         self.setWindowTitle("Kuyumcu ERP — Zarif")
 
@@ -53,16 +53,19 @@ class MainWindow(QMainWindow):
         self.sidebar.setVisible(False)  # <— önemli
         layout.addWidget(self.sidebar)
 
-        # DataService oluştur
-        self.data = DataService("orbitx.db")
+        # DataService oluştur; --server verilirse ince istemci (veri app/server.py'de)
+        if server:
+            from data.remote import RemoteDataService
+            self.data = RemoteDataService(server)
+        else:
+            self.data = DataService("orbitx.db")
+            # Aynı DB'yi açan diğer pencere/süreçlerin yazımları da sayfalara yansısın (PRAGMA data_version)
+            self.data.start_change_watcher()
         # İlk kez açılışta boşsa demo verisi yükle
         self.data.seed_demo_if_empty()
 
-        # Periodically fetch external market prices and notify UI
-        self._market_timer = QTimer(self)
-        self._market_timer.setInterval(30 * 1000)  # 30s (can be tuned)
-        self._market_timer.timeout.connect(lambda: self.data.fetch_market_prices())
-        self._market_timer.start()
+        # Piyasa fiyatları arka planda periyodik çekilir (DataService.market, 30 sn; hata → geri çekilme)
+        self.data.start_market_feed()
 
         # Sayfa yığını
         self.stack = QStackedWidget()
@@ -94,12 +97,9 @@ class MainWindow(QMainWindow):
         self.sales.transactionCommitted.connect(self.customers.on_transaction_from_sales)
         self.sales.transactionCommitted.connect(self.stock.on_transaction_from_sales)
 
-        self.data.stockChanged.connect(self.stock.reload_from_db)
-        self.data.customersChanged.connect(self.customers.reload_from_db)
-        self.data.cashChanged.connect(self.finance.reload_from_db)
-
         # Satış/Alış sonrası Dashboard "Son İşlemler"i canlı güncelle
         self.data.saleCommitted.connect(self.dashboard.on_sale_committed)
+        self.data.salesBatchCommitted.connect(self.dashboard.on_sales_batch_committed)
 
         self.stack.addWidget(self.login)      # 0
         self.stack.addWidget(self.dashboard)  # 1
@@ -162,6 +162,11 @@ class MainWindow(QMainWindow):
 if __name__ == "__main__":
     app = QApplication(sys.argv)
     apply_theme(app, scheme="dim")
-    w = MainWindow()
+    # Kasa terminali: python app/main.py --server http://sunucu:8765  (ya da ORBITX_SERVER; anahtar ORBITX_API_TOKEN)
+    server = os.environ.get("ORBITX_SERVER")
+    if "--server" in sys.argv[:-1]:
+        server = sys.argv[sys.argv.index("--server") + 1]
+    w = MainWindow(server)
+    app.aboutToQuit.connect(w.data.close)  # bekleyen yazımları commit et
     w.showMaximized()  # Tam ekranda aç
     sys.exit(app.exec())
@@ -0,0 +1,140 @@
+# app/pages/customer_model.py
+"""
+CustomersPage tablosunun modeli (QTableView + QAbstractTableModel):
+- satırlar (dict) yuvalarda: konum yeniden yüklemeye kadar sabit, silinen yuva None; yüklemeden sonra
+  eklenenler listenin başında gösterilir (en yeni en üstte)
+- arama: kod/ad/telefon anahtarlarının trigram dizini (TextIndex) yüklemede bir kez kurulur,
+  ekleme/güncelleme/silmede yerinde güncellenir; durum süzgeci ve özet NumPy ile
+- görünüm = yuva konumlarının dizisi; hücre metni data() içinde, yalnızca görünen hücreler için okunur
+"""
+from array import array
+
+import numpy as np
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+from data.textindex import TextIndex, key_of
+
+HEADERS = ["Kod", "Ad Soyad", "Telefon", "Son İşlem", "Durum"]
+KEYS = ("Kod", "AdSoyad", "Telefon", "Son İşlem", "Durum")
+_FILTER_KEYS = ("Kod", "AdSoyad", "Telefon", "Durum")
+
+
+def _key(row: dict) -> str:
+    return key_of(row["Kod"], row["AdSoyad"], row["Telefon"])
+
+
+class CustomerTableModel(QAbstractTableModel):
+    def __init__(self, statuses, parent=None):
+        super().__init__(parent)
+        self.statuses = list(statuses)
+        self.rows = []                              # yuva → satır (silinmiş: None)
+        self.pos_by_id = {}                         # DB id → yuva
+        self._base = 0                              # yüklemedeki satır sayısı
+        self._status = array("q")                   # yuva → statuses konumu (-1: bilinmeyen)
+        self.search_index = TextIndex()
+        self._view = np.zeros(0, dtype=np.int64)   # görünen satır → yuva
+        self._text = ""
+        self._state = None
+
+    # --- Qt arayüzü ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._view)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if index.isValid() and role == Qt.ItemDataRole.DisplayRole:
+            return self.rows[int(self._view[index.row()])][KEYS[index.column()]]
+        return None
+
+    # --- veri ---
+    def load(self, rows):
+        self.beginResetModel()
+        self.rows = list(rows)
+        self._base = len(self.rows)
+        self.pos_by_id = {r["id"]: i for i, r in enumerate(self.rows) if "id" in r}
+        self._status = array("q", (self._status_code(r) for r in self.rows))
+        self.search_index.build(_key(r) for r in self.rows)
+        self._view = self._build_view()
+        self.endResetModel()
+
+    def put(self, pos: int, row: dict) -> bool:
+        """Yuvayı yazar (pos == len → ekler). Görünümü etkiler mi: yeni satır ya da süzülen alan değişti."""
+        if pos == len(self.rows):
+            self.rows.append(row)
+            self._status.append(0)
+            changed = True
+        else:
+            old = self.rows[pos]
+            changed = any(old[k] != row[k] for k in _FILTER_KEYS)
+            self.rows[pos] = row
+        if "id" in row:
+            self.pos_by_id[row["id"]] = pos
+        self._status[pos] = self._status_code(row)
+        self.search_index.set(pos, _key(row))
+        return changed
+
+    def drop(self, pos: int):
+        row = self.rows[pos]
+        if row is None:
+            return
+        self.pos_by_id.pop(row.get("id"), None)
+        self.rows[pos] = None
+        self._status[pos] = -1
+        self.search_index.remove(pos)
+
+    def set_filter(self, text: str = "", state: str = None):
+        self._text, self._state = text or "", state
+        self.refilter()
+
+    def refilter(self):
+        view = self._build_view()
+        self.beginResetModel()
+        self._view = view
+        self.endResetModel()
+
+    def refresh(self):
+        """Yalnızca hücre değerleri değişti: görünüm görünür hücreleri yeniden boyar."""
+        if len(self._view):
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._view) - 1, len(HEADERS) - 1))
+
+    def _status_code(self, row) -> int:
+        return self.statuses.index(row["Durum"]) if row["Durum"] in self.statuses else -1
+
+    def _build_view(self):
+        hits = self.search_index.find(self._text)
+        if self._state is not None:
+            code = self.statuses.index(self._state) if self._state in self.statuses else -2
+            hits = hits[self._status_codes()[hits] == code]
+        # Yüklemeden sonra eklenenler (yuva >= _base) en yeni en üstte
+        new = hits[hits >= self._base]
+        return np.concatenate((new[::-1], hits[hits < self._base])) if len(new) else hits
+
+    def _status_codes(self) -> np.ndarray:
+        return np.frombuffer(self._status, dtype=np.int64) if len(self._status) else np.zeros(0, dtype=np.int64)
+
+    # --- sayfa yardımcıları ---
+    def row_at(self, row: int) -> dict:
+        return self.rows[int(self._view[row])]
+
+    def pos_at(self, row: int) -> int:
+        return int(self._view[row])
+
+    def row_of(self, pos: int):
+        """Yuvanın görünümdeki satır numarası (süzgeç dışındaysa None)."""
+        hits = np.flatnonzero(self._view == pos)
+        return int(hits[0]) if len(hits) else None
+
+    def visible(self) -> list:
+        """Görünen satırlar (dışa aktarma için)."""
+        return [self.rows[p] for p in self._view.tolist()]
+
+    def summary(self) -> dict:
+        active = self.statuses.index("Aktif") if "Aktif" in self.statuses else -2
+        return {"count": len(self._view), "active": int((self._status_codes()[self._view] == active).sum())}
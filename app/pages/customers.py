@@ -1,7 +1,7 @@
 ### app/pages/customers.py ###
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QComboBox,
-    QPushButton, QTableWidget, QTableWidgetItem, QFrame, QAbstractItemView,
+    QPushButton, QTableWidget, QTableWidgetItem, QTableView, QFrame, QAbstractItemView,
     QHeaderView, QTextEdit, QSplitter, QMessageBox
 )
 from PyQt6.QtGui import QRegularExpressionValidator
@@ -14,6 +14,7 @@ import os
 from theme import elevate
 from dialogs import NewCustomerDialog
 from .parameters import fmt_money, fmt_date
+from .customer_model import CustomerTableModel
 
 # TR yerel para
 TR = QLocale(QLocale.Language.Turkish, QLocale.Country.Turkey)
@@ -28,6 +29,7 @@ MOCK_NAMES = [
     "Emre Korkmaz","Elif Öztürk","Merve Aydın","Mustafa Şahin","Gizem Yıldız"
 ]
 STATUSES = ["Aktif","Pasif"]
+SEARCH_DELAY_MS = 150   # arama kutusu: yazma durunca süz (tuş başına değil)
 
 def generate_customers(n=24):
     rows = []
@@ -46,9 +48,11 @@ class CustomersPage(QWidget):
     def __init__(self, data=None, parent=None):
         super().__init__(parent)
         self.data = data
-        self._all_rows = []
-        self._filtered = []
+        # Tablo modeli: satır yuvaları + arama dizini + görünüm dizisi (hücreler yalnızca görünürken okunur)
+        self.model = CustomerTableModel(STATUSES, self)
         if self.data:
+            # Satır düzeyinde olaylar: yalnızca değişen müşteriler çekilir (tam yeniden yükleme yok)
+            self.data.changes.changed.connect(self.on_data_changed)
             self.reload_from_db()
 
         # === KOZMİK ARKA PLAN ===
@@ -78,7 +82,12 @@ class CustomersPage(QWidget):
 
         self.search = QLineEdit(placeholderText="Ara: kod, ad, telefon…")
         self.search.setMinimumWidth(300)
-        self.search.textChanged.connect(self.apply_filters)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DELAY_MS)
+        self._search_timer.timeout.connect(self.apply_filters)
+        self.search.textChanged.connect(lambda _: self._search_timer.start())
+        self.search.returnPressed.connect(self.apply_filters)
 
         self.filter = QComboBox()
         self.filter.addItems(["Tümü"] + STATUSES)
@@ -114,15 +123,16 @@ class CustomersPage(QWidget):
         table_title.setFont(QFont("Segoe UI", 14, QFont.Weight.Bold))
         table_layout.addWidget(table_title)
 
-        self.table = QTableWidget(0, 5, self)
-        self.table.setHorizontalHeaderLabels(["Kod","Ad Soyad","Telefon","Son İşlem","Durum"])
+        self.table = QTableView(self)
+        self.table.setModel(self.model)
         self.table.verticalHeader().setVisible(False)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.table.setCornerButtonEnabled(False)
         self.table.setAlternatingRowColors(True)
-        self.table.itemSelectionChanged.connect(self._toggle_row_actions)
-        self.table.itemDoubleClicked.connect(self._open_drawer)
+        self.table.selectionModel().selectionChanged.connect(self._toggle_row_actions)
+        self.table.doubleClicked.connect(self._open_drawer)
         self.table.setHorizontalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
         self.table.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
 
@@ -173,14 +183,14 @@ class CustomersPage(QWidget):
 
         # Tablo stilleri - Daha belirgin ve büyük
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background: rgba(10,16,32,0.4);
                 border: 2px solid rgba(255,255,255,0.12);
                 border-radius: 12px;
                 gridline-color: rgba(255,255,255,0.08);
                 selection-background-color: rgba(76,125,255,0.15);
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 12px 16px;
                 border-bottom: 1px solid rgba(255,255,255,0.06);
                 background: transparent;
@@ -188,15 +198,15 @@ class CustomersPage(QWidget):
                 font-size: 13px;
                 border-radius: 4px;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background: rgba(76,125,255,0.2);
                 color: #F1F4F8;
                 border: 1px solid rgba(76,125,255,0.4);
             }
-            QTableWidget::item:hover {
+            QTableView::item:hover {
                 background: rgba(76,125,255,0.08);
             }
-            QTableWidget::item:alternate {
+            QTableView::item:alternate {
                 background: rgba(255,255,255,0.02);
             }
         """)
@@ -397,52 +407,29 @@ class CustomersPage(QWidget):
 
     # === Davranışlar
     def _toggle_row_actions(self):
-        has = len(self.table.selectedItems()) > 0
+        has = self.table.selectionModel().hasSelection()
         self.btn_edit.setEnabled(has)
         self.btn_del.setEnabled(has)
 
     def apply_filters(self):
-        # UI öğeleri henüz yüklenmemişse çık
+        # UI öğeleri henüz yüklenmemişse çık (model yüklemede süzgeçsiz kurulur)
         if not hasattr(self, 'search') or not hasattr(self, 'filter') or not hasattr(self, 'table'):
-            self._filtered = list(self._all_rows)
-            if hasattr(self, 'table'):
-                self.populate(self._filtered)
-                self.update_summary(self._filtered)
             return
-
-        text = (self.search.text() or "").strip().lower()
+        self._search_timer.stop()
         f = self.filter.currentText()
+        self.model.set_filter(self.search.text(), None if f == "Tümü" else f)
+        self.update_summary()
 
-        self._filtered = []
-        for r in self._all_rows:
-            if f != "Tümü" and r["Durum"] != f:
-                continue
-            blob = f"{r['Kod']} {r['AdSoyad']} {r['Telefon']}".lower()
-            if text and text not in blob:
-                continue
-            self._filtered.append(r)
-
-        self.populate(self._filtered)
-        self.update_summary(self._filtered)
-
-    def populate(self, rows):
-        self.table.setRowCount(len(rows))
-        for i, r in enumerate(rows):
-            self.table.setItem(i, 0, QTableWidgetItem(r["Kod"]))
-            self.table.setItem(i, 1, QTableWidgetItem(r["AdSoyad"]))
-            self.table.setItem(i, 2, QTableWidgetItem(r["Telefon"]))
-            self.table.setItem(i, 3, QTableWidgetItem(r["Son İşlem"]))
-            self.table.setItem(i, 4, QTableWidgetItem(r["Durum"]))
-
-    def update_summary(self, rows):
-        total_customers = len(rows)
-        active_customers = sum(1 for row in rows if row.get("Durum") == "Aktif")
-        self.summary.setText(f"Toplam Cari: {total_customers} • Aktif: {active_customers}")
+    def update_summary(self):
+        if not hasattr(self, 'summary'):
+            return
+        s = self.model.summary()
+        self.summary.setText(f"Toplam Cari: {s['count']} • Aktif: {s['active']}")
 
     # (Bakiye kartı kaldırıldı)
 
     def _open_drawer(self):
-        row = self.table.currentRow()
+        row = self.table.currentIndex().row()
         if row < 0:
             return
 
@@ -452,18 +439,9 @@ class CustomersPage(QWidget):
             if widget is not None:
                 widget.deleteLater()
 
-        kod = self.table.item(row,0).text()
-        ad  = self.table.item(row,1).text()
-
-        # Müşteri verisini bul
-        current_customer = None
-        for customer in self._all_rows:
-            if customer["Kod"] == kod:
-                current_customer = customer
-                break
-
-        if not current_customer:
-            return
+        # Müşteri verisi
+        current_customer = self.model.row_at(row)
+        kod, ad = current_customer["Kod"], current_customer["AdSoyad"]
 
         # 1. Başlık
         drawer_title = QLabel(f"{ad} — {kod}")
@@ -626,16 +604,9 @@ class CustomersPage(QWidget):
 
         # DB'den veri çek ve güncelle
         if self.data:
-            # Müşteri ID'sini bul
-            customer_id = None
-            for customer in self._all_rows:
-                if customer["Kod"] == kod:
-                    # ID'yi bulmak için customers tablosunda ara
-                    row = self.data.db.cx.execute("SELECT id FROM customers WHERE name=? AND phone=?",
-                                                 (customer["AdSoyad"], customer["Telefon"])).fetchone()
-                    if row:
-                        customer_id = row["id"]
-                    break
+            # Müşteri ID'si: DB'den gelen satırda hazır; elle eklenenlerde kimlik önbelleğinden
+            customer_id = current_customer.get("id") or self.data.find_customer_id(
+                current_customer["AdSoyad"], current_customer["Telefon"])
 
             if customer_id:
                 self._load_customer_activity(customer_id)
@@ -645,34 +616,29 @@ class CustomersPage(QWidget):
     def on_new(self):
         dlg = NewCustomerDialog(self)
         if dlg.exec():
-            self._all_rows.insert(0, dlg.data())
+            self.model.put(len(self.model.rows), dlg.data())
             self.apply_filters()
             QMessageBox.information(self, "Başarılı", "Müşteri başarıyla eklendi.")
 
     def on_edit(self):
-        row = self.table.currentRow()
+        row = self.table.currentIndex().row()
         if row < 0:
             return
-        current = self._filtered[row]
+        current = self.model.row_at(row)
         dlg = NewCustomerDialog(self, current)
         if dlg.exec():
-            new = dlg.data()
-            for r in self._all_rows:
-                if r["Kod"] == current["Kod"]:
-                    r.update(new)
-                    break
+            self.model.put(self.model.pos_at(row), {**current, **dlg.data()})
             self.apply_filters()
             QMessageBox.information(self, "Başarılı", "Müşteri başarıyla güncellendi.")
 
     def on_delete(self):
-        row = self.table.currentRow()
+        row = self.table.currentIndex().row()
         if row < 0:
             return
-        current = self._filtered[row]
+        current = self.model.row_at(row)
         reply = QMessageBox.question(self, "Onay", f"{current['AdSoyad']} müşterisini silmek istediğinizden emin misiniz?")
         if reply == QMessageBox.StandardButton.Yes:
-            kod = self.table.item(row,0).text()
-            self._all_rows = [r for r in self._all_rows if r["Kod"] != kod]
+            self.model.drop(self.model.pos_at(row))
             self.apply_filters()
             QMessageBox.information(self, "Başarılı", "Müşteri başarıyla silindi.")
 
@@ -684,7 +650,7 @@ class CustomersPage(QWidget):
             wb = Workbook(); ws = wb.active; ws.title = "Cari"
             headers = ["Kod","Ad Soyad","Telefon","Son İşlem","Durum"]
             ws.append(headers)
-            for r in self._filtered:
+            for r in self.model.visible():
                 ws.append([r[h] for h in headers])
             wb.save("exports/cari_listesi.xlsx")
             self.summary.setText(self.summary.text() + " • Excel: exports/cari_listesi.xlsx")
@@ -703,7 +669,7 @@ class CustomersPage(QWidget):
             c.setFont("Helvetica-Bold", 12)
             c.drawString(20*mm, y, "Cari Listesi"); y -= 10*mm
             c.setFont("Helvetica", 9)
-            for r in self._filtered:
+            for r in self.model.visible():
                 line = f"{r['Kod']:6}  {r['AdSoyad']:<22}  {r['Telefon']:>14}  {r['Son İşlem']:>10}  {r['Durum']}"
                 c.drawString(15*mm, y, line)
                 y -= 6*mm
@@ -715,36 +681,51 @@ class CustomersPage(QWidget):
             self.summary.setText("PDF aktarımında hata: " + str(e))
 
     def reload_from_db(self):
-        """DB'den cari verilerini çek ve tabloyu güncelle"""
+        """DB'den cari verilerini çek; model (ve arama dizini) bir kez kurulur"""
         if not self.data:
             return
-        rows = self.data.list_customers()
-        self._all_rows = [{
+        self.model.load(self._row_from_db(r) for r in self.data.list_customers())
+        self.apply_filters()
+        self.update_summary()
+
+    @staticmethod
+    def _row_from_db(r: dict) -> dict:
+        return {
+           "id": r["id"],
            "Kod": r.get("code") or f"CAR{r['id']:04}",
            "AdSoyad": r["name"] or "", "Telefon": r.get("phone") or "",
            "Son İşlem": (r.get("last_txn_at") or "")[:10],
            "Durum": r.get("status") or "Aktif"
-        } for r in rows]
-        self._filtered = list(self._all_rows)
-        # UI öğeleri yüklenene kadar populate'u doğrudan çağır
-        if hasattr(self, 'search') and hasattr(self, 'filter') and hasattr(self, 'table'):
+        }
+
+    def on_data_changed(self, batch: dict):
+        """DataService.changes: değişen müşterileri tek sorguda çeker; model yuvaları ve arama dizini yerinde
+        güncellenir. Ekleme/silme ya da süzülen alan değiştiyse süzgeç yeniden uygulanır, yoksa hücreler yenilenir."""
+        ch = batch.get("customers")
+        if not ch:
+            return
+        if ch["reset"]:
+            self.reload_from_db()
+            return
+        m = self.model
+        fresh = {r["id"]: self._row_from_db(r) for r in self.data.list_customers(ch["insert"] | ch["update"])}
+        gone = [m.pos_by_id[i] for i in ch["delete"] | (ch["update"] - fresh.keys()) if i in m.pos_by_id]
+        for pos in gone:
+            m.drop(pos)
+        relayout = bool(gone)
+        for cid, row in fresh.items():
+            relayout |= m.put(m.pos_by_id.get(cid, len(m.rows)), row)
+        if relayout:
             self.apply_filters()
         else:
-            if hasattr(self, 'table'):
-                self.populate(self._filtered)
-                self.update_summary(self._filtered)
+            m.refresh()
 
     def _load_customer_activity(self, customer_id: int):
         """Son hareketleri DB'den çek ve tabloya doldur"""
         if not self.data:
             return
         # Son hareketler: sales tablosundan
-        rows = self.data.db.cx.execute("""
-            SELECT date, type, total FROM sales
-            WHERE customer_id = ?
-            ORDER BY date DESC, id DESC
-            LIMIT 50
-        """, (customer_id,)).fetchall()
+        rows = self.data.customer_activity(customer_id, limit=50)
 
         if hasattr(self, 'transactions_table'):
             self.transactions_table.setRowCount(len(rows))
@@ -757,14 +738,7 @@ class CustomersPage(QWidget):
         """30-gün özetini DB'den çek ve etiketlere doldur"""
         if not self.data:
             return
-        row = self.data.db.cx.execute("""
-            SELECT
-              COALESCE(SUM(CASE WHEN type='Satış' THEN total END), 0) AS sum_satis,
-              COALESCE(SUM(CASE WHEN type='Alış'  THEN total END), 0) AS sum_alis
-            FROM sales
-            WHERE customer_id = ?
-              AND date >= date('now','-30 day')
-        """, (customer_id,)).fetchone()
+        row = self.data.customer_30day_summary(customer_id)
 
         if hasattr(self, 'lbl_sum_satis') and hasattr(self, 'lbl_sum_alis'):
             self.lbl_sum_satis.setText(fmt_money(row["sum_satis"]))
@@ -772,5 +746,6 @@ class CustomersPage(QWidget):
 
     def on_transaction_from_sales(self, payload: dict):
         """Satış işleminden sonra cari tablosunu güncelle"""
-        if hasattr(self, 'table'):
+        # DB varsa müşteri satırı DataService.changes olayıyla gelir (on_data_changed)
+        if not self.data and hasattr(self, 'table'):
             self.reload_from_db()
@@ -1,9 +1,10 @@
 # app/pages/dashboard.py
 from PyQt6.QtWidgets import (QWidget, QGridLayout, QLabel, QFrame, QVBoxLayout,
                            QHBoxLayout, QPushButton, QLayout)
-from PyQt6.QtCore import Qt, QLocale, QDate, pyqtSignal
-from PyQt6.QtGui import QFont, QPixmap, QPainter, QLinearGradient, QColor
+from PyQt6.QtCore import Qt, QLocale, QDate, QDateTime, QTime, QPointF, pyqtSignal
+from PyQt6.QtGui import QFont, QPixmap, QPainter, QLinearGradient, QColor, QPen, QPolygonF
 import random
+from concurrent.futures import ThreadPoolExecutor
 from random import uniform, randint
 from theme import elevate
 
@@ -32,6 +33,7 @@ def kpi_card(title: str, value: str, subtitle: str = "") -> QFrame:
     value_label = QLabel(value)
     value_label.setProperty("variant", "heading")
     v.addWidget(value_label)
+    card.value_label = value_label  # canlı güncelleme için
 
     if subtitle:
         sub_label = QLabel(subtitle)
@@ -42,12 +44,47 @@ def kpi_card(title: str, value: str, subtitle: str = "") -> QFrame:
     elevate(card, scheme="dim", blur=32, y=10)
     return card
 
+class Sparkline(QWidget):
+    """Küçük fiyat çizgisi (QPainter ile; grafik kütüphanesi gerekmez)."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._values = []
+        self.setMinimumHeight(48)
+
+    def set_values(self, values):
+        self._values = list(values)
+        self.update()
+
+    def paintEvent(self, e):
+        if len(self._values) < 2:
+            return
+        lo, hi = min(self._values), max(self._values)
+        span = (hi - lo) or 1.0
+        w, h = self.width() - 1, self.height() - 4
+        step = w / (len(self._values) - 1)
+        line = QPolygonF([QPointF(i * step, 2 + h - (v - lo) / span * h) for i, v in enumerate(self._values)])
+        p = QPainter(self)
+        p.setRenderHint(QPainter.RenderHint.Antialiasing)
+        up = self._values[-1] >= self._values[0]
+        p.setPen(QPen(QColor(120, 200, 140) if up else QColor(220, 120, 120), 1.6))
+        p.drawPolyline(line)
+        p.end()
+
+
+# Fiyat serisi arka planda okunur: ince istemcide (RemoteDataService) her okuma bir HTTP gidiş-dönüşü
+_SERIES = ThreadPoolExecutor(max_workers=1, thread_name_prefix="gram-series")
+
+
 class DashboardPage(QWidget):
     quick_action_triggered = pyqtSignal(dict)
+    gramSeriesReady = pyqtSignal(object)   # list[dict]; okuma hatasında None
 
     def __init__(self, data=None, parent=None):
         super().__init__(parent)
         self.data = data
+        self._gram_fut = None
+        self._gram_again = None              # okuma sürerken gelen güncelleme: bitince bir kez daha
+        self.gramSeriesReady.connect(self._on_gram_series)
         self._recent_max = 7
 
         # === KOZMİK ARKA PLAN ===
@@ -115,14 +152,20 @@ class DashboardPage(QWidget):
         sub.setProperty("variant", "muted")
         gv.addWidget(sub)
 
+        # Gün içi grafik: fiyat geçmişinin 1 dk'lık özetinden (ham tick'ler taranmaz)
+        self._gram_chart = Sparkline()
+        gv.addWidget(self._gram_chart)
+
         gv.addStretch(1)
         elevate(gold_card, scheme="dim", blur=32, y=10)
         kpi_grid.addWidget(gold_card, 0, 0)
 
         # Diğer KPI kartları
-        kpi_grid.addWidget(kpi_card("Günlük Satış", fmt_currency(self.satis), "Bugünün toplam işlemleri"), 0, 1)
+        self._kpi_satis = kpi_card("Günlük Satış", fmt_currency(self.satis), "Bugünün toplam işlemleri")
+        self._kpi_ciro = kpi_card("Aylık Ciro", fmt_currency(self.aylik_ciro), "Bu ay toplam satış")
+        kpi_grid.addWidget(self._kpi_satis, 0, 1)
         kpi_grid.addWidget(kpi_card("Toplam Stok Değeri", fmt_currency(self.stok), "Stoktaki varlıkların değeri"), 0, 2)
-        kpi_grid.addWidget(kpi_card("Aylık Ciro", fmt_currency(self.aylik_ciro), "Bu ay toplam satış"), 1, 0)
+        kpi_grid.addWidget(self._kpi_ciro, 1, 0)
         kpi_grid.addWidget(kpi_card("Bekleyen Ödeme", fmt_currency(self.bekleyen_odeme), "Tedarikçi borçları"), 1, 1)
         kpi_grid.addWidget(kpi_card("Kritik Stok", f"{self.kritik_stok} ürün", "Düşük stok seviyesi"), 1, 2)
 
@@ -233,8 +276,9 @@ class DashboardPage(QWidget):
         if self.data:
             # Market data güncellendiğinde otomatik güncelle
             self.data.marketDataUpdated.connect(self._update_market_kpis)
-            self.data.fetch_market_prices()
-            self._update_market_kpis()
+            self._update_market_kpis()             # diskteki son bilinen fiyatlar
+            self.data.start_market_feed()          # arka planda çeker; açılışı bekletmez
+            self._update_sales_kpis()
 
         # Kozmik arka planı çiz
         self._paint_sky(self.width(), self.height())
@@ -320,9 +364,24 @@ class DashboardPage(QWidget):
 
     def on_sale_committed(self, payload: dict):
         self.reload_recent_from_db()
+        self._update_sales_kpis()
         if hasattr(self, '_update_market_kpis'):
             self._update_market_kpis()
 
+    def on_sales_batch_committed(self, payloads: list):
+        # Toplu aktarım: parça başına tek yenileme
+        if payloads:
+            self.on_sale_committed(payloads[-1])
+
+    def _update_sales_kpis(self):
+        """Günlük satış / aylık ciro: özet tablodan (gün sayısı kadar satır) okunur."""
+        if not self.data:
+            return
+        k = self.data.sales_kpis()
+        self.satis, self.aylik_ciro = k["daily"], k["monthly"]
+        self._kpi_satis.value_label.setText(fmt_currency(self.satis))
+        self._kpi_ciro.value_label.setText(fmt_currency(self.aylik_ciro))
+
     def _update_market_kpis(self):
         if not self.data or not hasattr(self.data, 'market_data'):
             return
@@ -336,8 +395,31 @@ class DashboardPage(QWidget):
                     price = market[key].get('satis', 0)  # satış fiyatını kullan
                     if price > 0:
                         self._gram_val_label.setText(fmt_currency(price))
+                        self._update_gram_chart(key)
                         break
 
+    def _update_gram_chart(self, kod: str):
+        if self._gram_fut is not None and not self._gram_fut.done():
+            self._gram_again = kod
+            return
+        start = QDateTime(QDate.currentDate(), QTime(0, 0)).toSecsSinceEpoch()
+        # 1 gün / 1440 nokta → dakikalık özet tablosu, en çok 1440 satır
+        self._gram_fut = _SERIES.submit(self.data.market_series, kod, start, max_points=1440)
+
+        def done(f):
+            err = f.exception()
+            if err is not None:
+                print(f"Gram altın serisi okunamadı: {err}")
+            self.gramSeriesReady.emit(None if err is not None else f.result())
+        self._gram_fut.add_done_callback(done)
+
+    def _on_gram_series(self, points):
+        if points is not None:
+            self._gram_chart.set_values(p["close"] for p in points)
+        kod, self._gram_again = self._gram_again, None
+        if kod is not None:
+            self._update_gram_chart(kod)
+
     # --- kozmik arka plan
     def _paint_sky(self, w: int, h: int):
         if w <= 0 or h <= 0: return
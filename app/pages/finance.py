@@ -1,33 +1,34 @@
 ### app/pages/finance.py ###
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QFrame, QGridLayout, QSplitter,
-    QTableWidget, QTableWidgetItem, QAbstractItemView, QHeaderView,
+    QTableView, QAbstractItemView, QHeaderView,
     QLineEdit, QComboBox, QDateEdit, QTimeEdit, QPushButton, QGroupBox, QFormLayout,
     QDoubleSpinBox, QTextEdit, QMessageBox, QDialog, QSizePolicy, QScrollArea
 )
-from PyQt6.QtCore import Qt, QDate, QTime, QDateTime, QLocale, QTimer, QSettings
+from PyQt6.QtCore import Qt, QDate, QTime, QDateTime, QLocale, QTimer, QSettings, pyqtSignal
 from PyQt6.QtGui import QFont, QPixmap, QPainter, QLinearGradient, QColor, QPalette, QShortcut, QKeySequence
 import random
 from random import randint, choice
 from theme import elevate, apply_dialog_theme
 from dialogs import ExpenseVoucherDialog
 from .parameters import parse_money, fmt_money, fmt_date, fmt_time, TR
+from data.money import to_kurus, from_kurus, format_kurus
+from .finance_model import LedgerTableModel, StatementTableModel, epoch
 
-# Özel sıralama için item sınıfı
-class SortableItem(QTableWidgetItem):
-    def __lt__(self, other):
-        tw = self.tableWidget()
-        if not tw:
-            return super().__lt__(other)
-        col = tw.horizontalHeader().sortIndicatorSection()
-        # Kolon 0: Tarih için epoch/saniye (UserRole+1)
-        if col == 0:
-            return (self.data(Qt.ItemDataRole.UserRole + 1)
-                    < other.data(Qt.ItemDataRole.UserRole + 1))
-        # Kolon 8: Tutar için sayısal değer (UserRole+2)
-        if col == 8:
-            return float(self.data(Qt.ItemDataRole.UserRole + 2) or 0) < float(other.data(Qt.ItemDataRole.UserRole + 2) or 0)
-        return super().__lt__(other)
+# Arama kutusu: son tuştan bu kadar sonra süzülür (her tuşta SQL yok)
+SEARCH_DELAY_MS = 150
+
+
+def _totals(rows) -> tuple[float, float]:
+    """(giriş, çıkış) toplamları; kuruş üzerinden toplanır → float birikim hatası yok."""
+    k_in = k_out = 0
+    for r in rows:
+        k = to_kurus(r["tutar"])
+        if k > 0:
+            k_in += k
+        else:
+            k_out -= k
+    return from_kurus(k_in), from_kurus(k_out)
 
 # Mock cari hesap listesi
 CUSTOMERS_FOR_FINANCE = [
@@ -308,6 +309,157 @@ class NewFinanceRecordDialog(QDialog):
         }
         return code_map.get(cat, "XX")
 
+# --- Hesap Ekstresi Diyaloğu --------------------------------------------------------
+class AccountStatementDialog(QDialog):
+    """Tek hesabın tarih aralığındaki hareketleri + yürüyen bakiye (açılış kontrol noktasından)."""
+
+    def __init__(self, data, accounts, account="Kasa", date_from=None, date_to=None, parent=None):
+        super().__init__(parent)
+        self.data = data
+        self.setModal(True)
+        self.setSizeGripEnabled(True)
+        self.resize(900, 600)
+        self.setWindowTitle("Hesap Ekstresi")
+        self.setObjectName("FinanceDialog")
+        apply_dialog_theme(self, "dim")
+        QShortcut(QKeySequence("Esc"), self, activated=self.reject)
+
+        root = QVBoxLayout(self); root.setContentsMargins(24,24,24,24); root.setSpacing(14)
+        title = QLabel("Hesap Ekstresi")
+        title.setFont(QFont("Segoe UI", 18, QFont.Weight.Bold))
+        title.setProperty("variant", "title")
+        root.addWidget(title)
+
+        bar = QHBoxLayout(); bar.setSpacing(8)
+        self.f_acc = QComboBox(); self.f_acc.addItems(accounts)
+        self.f_acc.setCurrentText(account)
+        self.f_from = QDateEdit(date_from or QDate.currentDate().addMonths(-1)); self.f_from.setCalendarPopup(True)
+        self.f_to = QDateEdit(date_to or QDate.currentDate()); self.f_to.setCalendarPopup(True)
+        for w in (self.f_from, self.f_to):
+            w.setDisplayFormat("dd.MM.yyyy")
+        bar.addWidget(QLabel("Hesap")); bar.addWidget(self.f_acc, 1)
+        bar.addWidget(QLabel("Başlangıç")); bar.addWidget(self.f_from)
+        bar.addWidget(QLabel("Bitiş")); bar.addWidget(self.f_to)
+        root.addLayout(bar)
+
+        self.model = StatementTableModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        self.table.setAlternatingRowColors(True)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setSectionResizeMode(4, QHeaderView.ResizeMode.Stretch)
+        root.addWidget(self.table, 1)
+
+        totals = QHBoxLayout()
+        self.lbl_opening = QLabel(); self.lbl_closing = QLabel()
+        self.lbl_closing.setStyleSheet("font-weight:700;")
+        totals.addWidget(self.lbl_opening); totals.addStretch(1); totals.addWidget(self.lbl_closing)
+        root.addLayout(totals)
+
+        actions = QHBoxLayout(); actions.addStretch(1)
+        btn_close = QPushButton("Kapat"); btn_close.clicked.connect(self.reject)
+        actions.addWidget(btn_close)
+        root.addLayout(actions)
+
+        self.f_acc.currentIndexChanged.connect(self.reload)
+        self.f_from.dateChanged.connect(self.reload)
+        self.f_to.dateChanged.connect(self.reload)
+        self.reload()
+
+    def reload(self):
+        st = self.data.account_statement(self.f_acc.currentText(),
+                                         self.f_from.date().toString(Qt.DateFormat.ISODate),
+                                         self.f_to.date().toString(Qt.DateFormat.ISODate))
+        self.model.set_rows(st["rows"])
+        self.lbl_opening.setText(f"Açılış bakiyesi: {tl(st['opening'])}")
+        self.lbl_closing.setText(f"Kapanış bakiyesi: {tl(st['closing'])} • {len(st['rows'])} hareket")
+
+class ZReportDialog(QDialog):
+    """Gün sonu: seçilen günün dondurulmuş Z raporu; kapanmamışsa günü kapatma (o gün ve öncesi kilitlenir)."""
+    # Kapanış yazıcı kuyruğunda çalışır; sonucu (hata mesajı, başarıda boş) GUI thread'e taşır
+    closeFinished = pyqtSignal(str)
+
+    def __init__(self, data, day=None, parent=None):
+        super().__init__(parent)
+        self.data = data
+        self.closeFinished.connect(self._on_close_finished)
+        self.setModal(True)
+        self.setSizeGripEnabled(True)
+        self.resize(560, 680)
+        self.setWindowTitle("Gün Sonu (Z Raporu)")
+        self.setObjectName("FinanceDialog")
+        apply_dialog_theme(self, "dim")
+        QShortcut(QKeySequence("Esc"), self, activated=self.reject)
+
+        root = QVBoxLayout(self); root.setContentsMargins(24,24,24,24); root.setSpacing(14)
+        title = QLabel("Gün Sonu (Z Raporu)")
+        title.setFont(QFont("Segoe UI", 18, QFont.Weight.Bold))
+        title.setProperty("variant", "title")
+        root.addWidget(title)
+
+        bar = QHBoxLayout(); bar.setSpacing(8)
+        self.f_day = QDateEdit(day or QDate.currentDate()); self.f_day.setCalendarPopup(True)
+        self.f_day.setDisplayFormat("dd.MM.yyyy")
+        self.f_day.setMaximumDate(QDate.currentDate())
+        self.lbl_state = QLabel()
+        bar.addWidget(QLabel("Gün")); bar.addWidget(self.f_day); bar.addWidget(self.lbl_state, 1)
+        root.addLayout(bar)
+
+        self.text = QTextEdit(readOnly=True)
+        self.text.setFont(QFont("Consolas", 10))
+        self.text.setLineWrapMode(QTextEdit.LineWrapMode.NoWrap)
+        root.addWidget(self.text, 1)
+
+        actions = QHBoxLayout(); actions.addStretch(1)
+        self.btn_close_day = QPushButton("Günü Kapat")
+        self.btn_close_day.clicked.connect(self.close_day)
+        btn_close = QPushButton("Kapat"); btn_close.clicked.connect(self.reject)
+        actions.addWidget(self.btn_close_day); actions.addWidget(btn_close)
+        root.addLayout(actions)
+
+        self.f_day.dateChanged.connect(self.reload)
+        self.reload()
+
+    def _day(self) -> str:
+        return self.f_day.date().toString(Qt.DateFormat.ISODate)
+
+    def reload(self):
+        report = self.data.z_report(self._day())
+        last = self.data.last_close()
+        if report is not None:
+            self.text.setPlainText(report["text"])
+            self.lbl_state.setText(f"Kapalı • {report['closed_at']}")
+        else:
+            self.text.setPlainText("Bu gün henüz kapatılmadı.\n\nGünü kapatınca kasa/banka ve müşteri bakiyeleri "
+                                   "ile satış toplamları dondurulur (bugün kapatılıyorsa stok da); o gün ve "
+                                   "öncesine kayıt eklenemez, kayıtlar değiştirilemez.")
+            self.lbl_state.setText(f"Açık • son kapanış: {fmt_date(last) if last else 'yok'}")
+        # Kapanış yalnızca son kapanıştan sonraki günler için
+        self.btn_close_day.setEnabled(report is None and (last is None or self._day() > last))
+
+    def close_day(self):
+        day = self._day()
+        btn = QMessageBox.question(
+            self, "Günü Kapat",
+            f"{fmt_date(day)} kapatılsın mı?\nBu gün ve öncesine ait kasa, satış ve cari kayıtları kilitlenir.",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No, QMessageBox.StandardButton.No)
+        if btn != QMessageBox.StandardButton.Yes:
+            return
+        self.btn_close_day.setEnabled(False)
+        self.lbl_state.setText("Kapatılıyor…")
+        fut = self.data.submit_write(self.data.close_day, day)
+        def done(f):
+            err = f.exception()
+            self.closeFinished.emit("" if err is None else str(err))
+        fut.add_done_callback(done)
+
+    def _on_close_finished(self, error: str):
+        if error:
+            QMessageBox.warning(self, "Gün Sonu", f"Kapanış yapılamadı:\n{error}")
+        self.reload()
+
 # --- cam KPI kartı - GÜNCELLENDİ (DAHA KOMPAKT) ---
 def _kpi(title: str, value: str, sub: str = "") -> tuple[QFrame, QLabel]:
     card = QFrame()
@@ -339,12 +491,16 @@ def _kpi(title: str, value: str, sub: str = "") -> tuple[QFrame, QLabel]:
 # --- ana sayfa ----------------------------------------------------------------
 class FinancePage(QWidget):
     """Kasa & Finans (frontend/mock) — kozmik tema, orantılı yerleşim"""
+    # Yazıcı iş parçacığından gelen hata → GUI thread'de mesaj kutusu
+    writeFailed = pyqtSignal(str, str)
+
     def __init__(self, data=None, parent=None):
         super().__init__(parent)
         self.data = data
+        self.writeFailed.connect(self._show_write_error)
         if self.data:
-            self.data.cashChanged.connect(self.reload_from_db)
-            self.reload_from_db()
+            # Satır düzeyinde olaylar: yalnızca değişen kasa satırları çekilir (tam yeniden yükleme yok)
+            self.data.changes.changed.connect(self.on_data_changed)
 
         # Prefs durum bayrakları
         self._loading_prefs = False
@@ -378,8 +534,10 @@ class FinancePage(QWidget):
         kpi_grid = QGridLayout()
         kpi_grid.setHorizontalSpacing(16)
         kpi_grid.setVerticalSpacing(10) # Dikey boşluk azaltıldı
-        k0, _ = _kpi("Kasa Bakiyesi", tl(215_450.00), "Güncel nakit")
-        k1, _ = _kpi("Banka Toplam", tl(1_485_200.00), "3 hesap aktif")
+        # Bakiyeler hesap kontrol noktalarından (DataService.cash_balances); _update_balances doldurur
+        k0, self.kpi_cash = _kpi("Kasa Bakiyesi", tl(0), "Güncel nakit")
+        k1, self.kpi_bank = _kpi("Banka Toplam", tl(0), "Banka hesapları")
+        self.kpi_bank_sub = k1.findChildren(QLabel)[-1]
         kpi_grid.addWidget(k0, 0, 0)
         kpi_grid.addWidget(k1, 0, 1)
         k1, self.kpi_sel_in  = _kpi("Seçili Aralık Giriş", tl(0), "Tahsilat")
@@ -548,8 +706,13 @@ class FinancePage(QWidget):
         """)
         self.cmb_quick.currentIndexChanged.connect(self._apply_quick_range)
 
-        # Filtre sinyalleri - canlı güncelleme
-        self.e_search.textChanged.connect(self._refresh_table)
+        # Filtre sinyalleri - canlı güncelleme (arama gecikmeli: yazma bitince tek sorgu)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DELAY_MS)
+        self._search_timer.timeout.connect(self._refresh_table)
+        self.e_search.textChanged.connect(lambda _: self._search_timer.start())
+        self.e_search.returnPressed.connect(self._refresh_table)
         self.cmb_account.currentIndexChanged.connect(self._refresh_table)
         self.cmb_type.currentIndexChanged.connect(self._refresh_table)
         self.dt_from.dateChanged.connect(self._refresh_table)
@@ -644,35 +807,38 @@ class FinancePage(QWidget):
         lbl_left.setStyleSheet("color: #E9EDF2; margin-bottom: 4px;")
         lv.addWidget(lbl_left)
 
-        self.table = QTableWidget(0, 9, self)
-        self.table.setHorizontalHeaderLabels(["Tarih","Saat","Ref No","Hesap","Tür","Kod","Kategori","Açıklama","Tutar"])
+        # Defter SQL'den sayfa sayfa gelir (LedgerTableModel); sıralama da SQL'de
+        self.model = LedgerTableModel(self)
+        self.table = QTableView(self)
+        self.table.setModel(self.model)
         self.table.verticalHeader().setVisible(False)
         self.table.setCornerButtonEnabled(False)
         self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.table.setAlternatingRowColors(True)
+        self.table.horizontalHeader().setSortIndicator(0, Qt.SortOrder.DescendingOrder)  # en yeni en üstte
         self.table.setSortingEnabled(True)
-        self.table.itemSelectionChanged.connect(self._toggle_right_actions)
+        self.table.selectionModel().selectionChanged.connect(self._toggle_right_actions)
 
         # Tablo stilleri
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background: rgba(10,16,32,0.3);
                 border: 1px solid rgba(255,255,255,0.08);
                 border-radius: 8px;
                 gridline-color: rgba(255,255,255,0.08);
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 8px 12px;
                 border-bottom: 1px solid rgba(255,255,255,0.04);
                 background: transparent;
                 color: #E9EDF2;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background: rgba(76,125,255,0.12);
                 color: #F1F4F8;
             }
-            QTableWidget::item:hover {
+            QTableView::item:hover {
                 background: rgba(76,125,255,0.06);
             }
         """)
@@ -736,9 +902,9 @@ class FinancePage(QWidget):
 
         lv.addWidget(self.table)
 
-        # --- dahili defter veri modeli
-        self._rows: list[dict] = []    # {id,tarih,saat,hesap,tur,kategori,aciklama,tutar}
-        self._seq = 1  # benzersiz id sayacı
+        # --- örnek kayıtlar (veri servisi yok / defter boş) için id sayacı
+        self._seq = 1
+        self._mock_shown = False
 
         self.splitter.addWidget(left)
         self.splitter.setStretchFactor(0, 1)
@@ -827,12 +993,20 @@ class FinancePage(QWidget):
         self.btn_del  = self._action_btn("Sil",     "neutral"); self.btn_del.setEnabled(False)
         self.btn_del.setToolTip("Seçili kaydı sil")
 
+        # 4. satır: Hesap Ekstresi (yürüyen bakiye) | Gün Sonu (Z raporu, dönem kapanışı)
+        self.btn_statement = self._action_btn("Hesap Ekstresi", "neutral")
+        self.btn_statement.setToolTip("Seçili hesabın tarih aralığındaki hareketleri ve bakiyesi")
+        self.btn_z_report = self._action_btn("Gün Sonu (Z)", "neutral")
+        self.btn_z_report.setToolTip("Günü kapat ve Z raporunu al; kapanmış günlerin raporlarını görüntüle")
+
         # yerleşim
         actions_grid.addWidget(self.btn_new_income,      0, 0)
         actions_grid.addWidget(self.btn_new_expense,     0, 1)
         actions_grid.addWidget(self.btn_expense_voucher, 1, 0, 1, 2, alignment=Qt.AlignmentFlag.AlignCenter)
         actions_grid.addWidget(self.btn_edit,            2, 0)
         actions_grid.addWidget(self.btn_del,             2, 1)
+        actions_grid.addWidget(self.btn_statement,       3, 0)
+        actions_grid.addWidget(self.btn_z_report,        3, 1)
 
         # sütunlar eşit genişlikte yayılsın
         actions_grid.setColumnStretch(0, 1)
@@ -852,7 +1026,9 @@ class FinancePage(QWidget):
 
         self.btn_edit.clicked.connect(self._edit_selected)
         self.btn_del.clicked.connect(self._delete_selected)
-        self.table.itemDoubleClicked.connect(lambda _: self._edit_selected())
+        self.btn_statement.clicked.connect(self.open_account_statement)
+        self.btn_z_report.clicked.connect(self.open_z_report)
+        self.table.doubleClicked.connect(lambda _: self._edit_selected())
         QShortcut(QKeySequence.StandardKey.Delete, self, activated=self._delete_selected)  # Delete tuşu ile sil
 
         self.btn_export_xls.clicked.connect(self._export_excel)
@@ -1019,19 +1195,46 @@ class FinancePage(QWidget):
             self.dt_to.setDate(QDate(2025, 9, 30))
 
     def _update_kpis(self):
-        rows = getattr(self, "_visible_cache", [])
-        total_in  = sum(r["tutar"] for r in rows if r["tutar"] > 0)
-        total_out = -sum(r["tutar"] for r in rows if r["tutar"] < 0)
-        net = total_in - total_out
-        self.lbl_sum_in.setText(tl(total_in))
-        self.lbl_sum_out.setText(tl(total_out))
-        self.lbl_sum_net.setText(tl(net))
+        self._recalc_summary()
+
+    def _update_balances(self):
+        """Kasa / banka KPI'ları: hesapların bugünkü bakiyesi (kontrol noktası + bugünün özeti, tek sorgu).
+        Örnek kayıtlar gösterilirken bakiye bellekteki satırlardan toplanır."""
+        if not hasattr(self, 'kpi_cash'):
+            return
+        if self.data and not self._mock_shown:
+            balances = self.data.cash_balances()
+        else:
+            balances = {}
+            for r in self.model.static:
+                sign = 1 if r["type"] == "Giriş" else -1
+                balances[r["account"]] = balances.get(r["account"], 0) + sign * r["amount_kurus"]
+            balances = {a: from_kurus(k) for a, k in balances.items()}
+        banks = {a: v for a, v in balances.items() if a.startswith("Banka")}
+        self.kpi_cash.setText(tl(sum(v for a, v in balances.items() if a not in banks)))
+        self.kpi_bank.setText(tl(sum(banks.values())))
+        self.kpi_bank_sub.setText(f"{len(banks)} hesap aktif")
+
+    def open_account_statement(self):
+        if not self.data or self._mock_shown:
+            QMessageBox.information(self, "Hesap Ekstresi", "Ekstre için kasa defterinde kayıt bulunmalı.")
+            return
+        accounts = [self.cmb_account.itemText(i) for i in range(1, self.cmb_account.count())]
+        account = self.cmb_account.currentText() if self.cmb_account.currentIndex() > 0 else accounts[0]
+        AccountStatementDialog(self.data, accounts, account, self.dt_from.date(), self.dt_to.date(), self).exec()
+
+    def open_z_report(self):
+        if not self.data:
+            QMessageBox.information(self, "Gün Sonu", "Gün sonu kapanışı için veritabanı bağlantısı gerekli.")
+            return
+        ZReportDialog(self.data, parent=self).exec()
+        self._update_balances()
 
     def _toggle_right_actions(self):
         if not hasattr(self, 'table') or not hasattr(self, 'btn_edit'):
             return
         sm = self.table.selectionModel()
-        has = bool(sm and sm.selectedRows())
+        has = bool(sm and sm.hasSelection())
         self.btn_edit.setEnabled(has)
         self.btn_del.setEnabled(has)
 
@@ -1053,128 +1256,52 @@ class FinancePage(QWidget):
             ("08.09.2025","14:15","Kasa","Çıkış","Masraf","Elektrik faturası", -2450.00, "MS"),
             ("08.09.2025","11:50","Banka — VakıfBank","Çıkış","Tedarikçi Ödemesi","Altın külçe tedarikçisi", -89400.00, "TO"),
         ]
-        self._rows = []
+        rows = []
         for (t,s,h,tur,k,a,v,code) in samples:
             # Tutarlı ref_no üretimi
             qd = QDate.fromString(t, "dd.MM.yyyy")
             ref_no = f"FIN{qd.toString('yyMMdd')}{str(random.randint(1, 9999)).zfill(4)}"
-
-            self._rows.append({
-                "id": self._seq, "tarih": t, "saat": s,
-                "hesap": h, "tur": tur, "kategori": k,
-                "aciklama": a, "tutar": v,
-                "ref_no": ref_no, "type_code": code,
-                "currency_code": "00", "amount_foreign": 0.0, "fx_rate": 1.0
-            })
-            self._seq += 1
+            rows.append(self._mock_row(qd.toString(Qt.DateFormat.ISODate), s, h, tur, k, a, abs(v), ref_no, code))
+        self.model.set_static(rows)
         self._refresh_table()   # tabloyu ve özeti ilk kez çiz
-
-    def _pass_filters(self, r: dict) -> bool:
-        # tarih
-        d = QDate.fromString(r["tarih"], "dd.MM.yyyy")
-        if d.isValid():
-            if d < self.dt_from.date() or d > self.dt_to.date():
-                return False
-        # tür
-        t = self.cmb_type.currentText()
-        if t != "Tümü" and r["tur"] != t:
-            return False
-        # hesap
-        h = self.cmb_account.currentText()
-        if h != "Tüm Hesaplar" and r["hesap"] != h:
-            return False
-
-        # arama
-        q = self.e_search.text().strip().lower()
-        if q:
-            hay = (r["aciklama"] + " " + r["kategori"] + " " + r["hesap"] + " " + r.get("ref_no", "")).lower()
-            if q not in hay:
-                return False
-        return True
+        self._update_balances()
+
+    def _mock_row(self, date, time, account, type, category, description, amount, ref_no, type_code, cari=""):
+        """Örnek kayıt, DB satırı biçiminde (LedgerTableModel aynı yoldan gösterir/süzer)."""
+        row = {"id": self._seq, "date": date, "time": time, "account": account, "type": type,
+               "category": category, "description": description, "amount": amount,
+               "amount_kurus": to_kurus(amount), "customer_name": cari, "ref_no": ref_no,
+               "currency_code": "00", "amount_foreign": 0.0, "fx_rate": 1.0, "type_code": type_code,
+               "ts": epoch(date, time)}
+        self._seq += 1
+        return row
+
+    def _filters(self) -> dict:
+        """Süzgeç kutuları → DataService.page_cash_ledger süzgeçleri (SQL'e çevrilir)."""
+        account, type_ = self.cmb_account.currentText(), self.cmb_type.currentText()
+        return {"date_from": self.dt_from.date().toString(Qt.DateFormat.ISODate),
+                "date_to": self.dt_to.date().toString(Qt.DateFormat.ISODate),
+                "account": None if account == "Tüm Hesaplar" else account,
+                "type": None if type_ == "Tümü" else type_,
+                "text": self.e_search.text().strip()}
 
     def _refresh_table(self):
         # UI öğeleri hazır değilse çık
-        if not hasattr(self, 'table'):
+        if not hasattr(self, 'table') or self._loading_prefs:
             return
-        # Tablo sıralamasını geçici olarak kapat (veri yükleme sırasında)
-        sorting_enabled = self.table.isSortingEnabled()
-        if sorting_enabled:
-            self.table.setSortingEnabled(False)
-
-        # filtrelerden geçen kayıtları topla
-        vis = [r for r in self._rows if self._pass_filters(r)]
-        self.table.setRowCount(len(vis))
-
-        for i, r in enumerate(vis):
-            # Tarih formatını düzelt (yyyy-MM-dd → dd.MM.yyyy)
-            tarih_fmt = fmt_date(r["tarih"])
-            it_date = SortableItem(tarih_fmt)
-            it_date.setData(Qt.ItemDataRole.UserRole, r["id"])
-            # Sıralama için tarih+saat'i UserRole'a koy (PyQt6'da SortRole yok)
-            raw_date = r["tarih"]  # DB'den iso gelebilir veya dd.MM.yyyy olabilir
-            raw_time = r["saat"] or "00:00"
-
-            # Her iki formata da dene:
-            dt = QDateTime.fromString(f"{raw_date} {raw_time}", "dd.MM.yyyy HH:mm")
-            if not dt.isValid():
-                dt = QDateTime.fromString(f"{raw_date} {raw_time}", "yyyy-MM-dd HH:mm")
-
-            # Epoch/saniye olarak sakla (kesin sayısal sıralama için)
-            it_date.setData(Qt.ItemDataRole.UserRole + 1, int(dt.toSecsSinceEpoch()) if dt.isValid() else 0)
-            self.table.setItem(i, 0, it_date)
-
-            self.table.setItem(i, 1, QTableWidgetItem(fmt_time(r["saat"])))
-            self.table.setItem(i, 2, QTableWidgetItem(r.get("ref_no", "—")))
-            self.table.setItem(i, 3, QTableWidgetItem(r["hesap"]))
-            self.table.setItem(i, 4, QTableWidgetItem(r["tur"]))
-            self.table.setItem(i, 5, QTableWidgetItem(r.get("type_code", "—")))
-            self.table.setItem(i, 6, QTableWidgetItem(r["kategori"]))
-
-            # açıklama hücresine müşteri adını dahil et
-            desc_text = r["aciklama"]
-            if r.get("cari"):
-                desc_text = f'{r["aciklama"]} — {r["cari"]}'
-            desc_item = QTableWidgetItem(desc_text)
-            desc_item.setToolTip(f"İlişkili Cari: {r.get('cari', '—')}")
-            self.table.setItem(i, 7, desc_item)
-
-            # Tutarı fmt_money ile formatla ve döviz tooltip'i ekle
-            it = SortableItem(fmt_money(abs(r["tutar"])))
-            it.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-            it.setForeground(QColor(120,200,140) if r["tutar"] >= 0 else QColor(220,120,120))
-
-            # Döviz bilgilerini tooltip'e ekle
-            currency_code = r.get("currency_code", "00")
-            currency_map = {"00": "TRY", "01": "USD", "02": "EUR"}
-            currency = currency_map.get(currency_code, "TRY")
-
-            if currency != "TRY" and r.get("amount_foreign", 0) > 0:
-                fx_rate = r.get("fx_rate", 1.0)
-                tip = f"{r.get('amount_foreign', 0):,.2f} {currency} @ {fx_rate:,.4f} → {fmt_money(abs(r['tutar']))}"
-                it.setToolTip(tip)
-            else:
-                it.setToolTip("Türk Lirası")
-
-            it.setData(Qt.ItemDataRole.UserRole + 2, abs(float(r["tutar"])))
-            self.table.setItem(i, 8, it)
-
-        self._visible_cache = vis
-        self._recalc_summary(vis)
-
-        # Sıralamayı geri aç
-        if sorting_enabled:
-            self.table.setSortingEnabled(True)
-
-        # Varsayılan: tarih (kolon 0) AZALAN (en yeni en üstte)
-        self.table.sortItems(0, Qt.SortOrder.DescendingOrder)
-
-    def _recalc_summary(self, rows: list[dict]):
+        self._search_timer.stop()
+        # Süzme/sıralama SQL'de: yalnızca ilk sayfa çekilir, devamı tablo kaydırıldıkça
+        self.model.set_query(self._filters())
+        self._recalc_summary()
+        self._toggle_right_actions()
+
+    def _recalc_summary(self):
         # UI öğeleri hazır değilse çık
         if not hasattr(self, 'lbl_sum_in'):
             return
-        total_in  = sum(r["tutar"] for r in rows if r["tutar"] > 0)
-        total_out = -sum(r["tutar"] for r in rows if r["tutar"] < 0)
-        net = total_in - total_out
+        # Süzgecin tamamının toplamları tek sorguda (yüklü sayfalar değil)
+        t = self.model.totals()
+        total_in, total_out, net = t["giris"], t["cikis"], t["net"]
         self.lbl_sum_in.setText(tl(total_in))
         self.lbl_sum_out.setText(tl(total_out))
         self.lbl_sum_net.setText(tl(net))
@@ -1189,42 +1316,19 @@ class FinancePage(QWidget):
 
 
     def _selected_row_id(self):
-        sel = self.table.selectionModel().selectedRows()
-        if not sel: return None
-        row = sel[0].row()
-        it = self.table.item(row, 0)
-        return it.data(Qt.ItemDataRole.UserRole) if it else None
-
-    def _find_row_index_by_id(self, rid: int) -> int:
-        for i, r in enumerate(self._rows):
-            if r.get("id") == rid:
-                return i
-        return -1
+        if not self.table.selectionModel().hasSelection():
+            return None
+        return self.model.row_id(self.table.currentIndex().row())
 
     def _select_id_in_table(self, rid: int):
-        # Önce tabloyu sıralamasız moda al (sıralama bozulmasın)
-        sorting_enabled = self.table.isSortingEnabled()
-        if sorting_enabled:
-            self.table.setSortingEnabled(False)
-
-        # Görünür satırlarda ara
-        if hasattr(self, "_visible_cache"):
-            for idx, rec in enumerate(self._visible_cache):
-                if rec.get("id") == rid:
-                    self.table.setCurrentCell(idx, 0)
-                    break
-
-        # Sıralamayı geri aç
-        if sorting_enabled:
-            self.table.setSortingEnabled(True)
+        row = self.model.row_of(rid)
+        if row is not None:
+            self.table.selectRow(row)
 
     def _edit_selected(self):
         rid = self._selected_row_id()
         if rid is None: return
-        i = self._find_row_index_by_id(rid)
-        if i < 0: return
-
-        rec = self._rows[i]
+        rec = self.model.record(self.model.row_of(rid))
         dlg = NewFinanceRecordDialog(self, rec["tur"])
 
         # mevcut verilerle doldur
@@ -1280,14 +1384,6 @@ class FinancePage(QWidget):
         rid = self._selected_row_id()
         if rid is None: return
 
-        # Hedef satırın görünür listedeki indeksini bul
-        next_index = 0
-        if hasattr(self, "_visible_cache"):
-            for i, rec in enumerate(self._visible_cache):
-                if rec["id"] == rid:
-                    next_index = min(i, len(self._visible_cache)-2)  # bir sonrasına hizala
-                    break
-
         btn = QMessageBox.question(
             self, "Sil", "Seçili kaydı silmek istiyor musun?",
             QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No,
@@ -1325,25 +1421,15 @@ class FinancePage(QWidget):
                 QMessageBox.warning(self, "Uyarı", "Tutar > 0 ve açıklama en az 3 karakter olmalıdır.")
                 return
 
-            # modele ekle
-            self._rows.append({
-                "id": self._seq,
-                "tarih": data["tarih"],
-                "saat":  data["saat"],
-                "hesap": data["hesap"],
-                "tur":   data["tur"],
-                "kategori": data["kategori"],
-                "aciklama": data["aciklama"],
-                "tutar":  data["tutar"] if record_type=="Giriş" else -data["tutar"],
-                "cari": data["cari"] if not data["cari"].startswith("Müşteri Seç") else "",
-                "ref_no": data["ref_no"],
-                "currency_code": data["currency_code"],
-                "amount_foreign": data["amount_foreign"],
-                "fx_rate": data["fx_rate"],
-                "type_code": data["type_code"],
-            })
-            self._seq += 1
-            self._refresh_table()
+            if not self.data:
+                # Veri servisi yok: örnek kayıtlara ekle (DB'li akışta satır changes olayıyla gelir)
+                iso = QDate.fromString(data["tarih"], "dd.MM.yyyy").toString(Qt.DateFormat.ISODate)
+                cari = data["cari"] if not data["cari"].startswith("Müşteri Seç") else ""
+                self.model.static.append(self._mock_row(iso, data["saat"], data["hesap"], data["tur"],
+                                                        data["kategori"], data["aciklama"], data["tutar"],
+                                                        data["ref_no"], data["type_code"], cari))
+                self._refresh_table()
+                self._update_balances()
 
             # DB'ye kaydet
             self._insert_cash_row(data)
@@ -1377,7 +1463,7 @@ class FinancePage(QWidget):
             QMessageBox.information(self, "Gider Pusulası", f"Kayıt eklendi. Tutar: {tl(d['tutar'])}")
 
     def _export_excel(self):
-        rows = getattr(self, "_visible_cache", [])
+        rows = self.model.all_records()
         if not rows:
             QMessageBox.information(self, "Dışa Aktar", "Aktarılacak kayıt yok.")
             return
@@ -1449,7 +1535,7 @@ class FinancePage(QWidget):
                     w = csv.writer(f, delimiter=";")
                     w.writerow(headers)
                     for rec in rows:
-                        tutar = f"{rec['tutar']:.2f}".replace(".", ",")  # TR uyumlu
+                        tutar = format_kurus(to_kurus(rec['tutar']), thousands="")  # TR uyumlu
 
                         w.writerow([
                             rec["tarih"], rec["saat"], rec.get("ref_no", "—"),
@@ -1464,7 +1550,7 @@ class FinancePage(QWidget):
         QMessageBox.information(self, "Dışa Aktar", "Dosya kaydedildi.")
 
     def _export_pdf(self):
-        rows = getattr(self, "_visible_cache", [])
+        rows = self.model.all_records()
         if not rows:
             QMessageBox.information(self, "Dışa Aktar", "Aktarılacak kayıt yok.")
             return
@@ -1497,10 +1583,8 @@ class FinancePage(QWidget):
             ])
 
             # Toplam hesaplamaları - HTML'den önce
-            rows = getattr(self, "_visible_cache", [])
-            total_in  = sum(r['tutar'] for r in rows if r['tutar'] > 0)
-            total_out = -sum(r['tutar'] for r in rows if r['tutar'] < 0)
-            net       = sum(r['tutar'] for r in rows)
+            total_in, total_out = _totals(rows)
+            net       = from_kurus(to_kurus(total_in) - to_kurus(total_out))
 
             html = f"""
             <style>
@@ -1610,9 +1694,9 @@ class FinancePage(QWidget):
             cari_disp = self._resolve_customer_display(cari_raw)
             self._last_sales_customer_display = cari_disp or cari_raw
 
-            # Veritabanı tek gerçektir; DataService.cashChanged zaten yayılıyor
-            # Sadece hızlı senkron için DB'den çek:
-            self.reload_from_db()
+            # Veritabanı tek gerçektir; kasa satırı DataService.changes olayıyla gelir (on_data_changed)
+            if not self.data:
+                self.reload_from_db()
 
             print(f"Satış işlemi eklendi: {payload.get('doc_no','')}")
 
@@ -1620,46 +1704,28 @@ class FinancePage(QWidget):
             print(f"Satış işlemi ekleme hatası: {e}")
 
     def reload_from_db(self):
-        if not self.data: return
-        # Customer bilgisi ile birlikte çek (yeni alanları dahil et)
-        rows = self.data.db.cx.execute("""
-            SELECT c.id, c.date, c.time, c.account, c.type, c.category, c.description,
-                   c.amount, cu.name AS customer_name,
-                   c.ref_no, c.currency_code, c.amount_foreign, c.fx_rate, c.type_code
-            FROM cash_ledger c
-            LEFT JOIN customers cu ON cu.id = c.customer_id
-            ORDER BY c.date DESC, c.time DESC;
-        """).fetchall()
-
-        self._rows = []
-        for r in rows:
-            # sqlite3.Row nesneleri için dict() kullan
-            row_dict = dict(r)
-            # DB'den gelen ISO tarihi dd.MM.yyyy formatına dönüştür
-            db_date = row_dict["date"]  # YYYY-MM-DD formatında
-            display_date = QDate.fromString(db_date, Qt.DateFormat.ISODate).toString("dd.MM.yyyy")
-
-            self._rows.append({
-                "id": row_dict["id"], "tarih": display_date, "saat": row_dict.get("time") or "",
-                "hesap": row_dict["account"], "tur": row_dict["type"], "kategori": row_dict.get("category") or "",
-                "aciklama": row_dict.get("description") or "", "tutar": (row_dict["amount"] if row_dict["type"]=="Giriş" else -row_dict["amount"]),
-                "cari": row_dict.get("customer_name") or "",  # müşteri adı
-                "ref_no": row_dict.get("ref_no") or "—",
-                "currency_code": row_dict.get("currency_code") or "00",
-                "amount_foreign": row_dict.get("amount_foreign") or 0.0,
-                "fx_rate": row_dict.get("fx_rate") or 1.0,
-                "type_code": row_dict.get("type_code") or "—",
-            })
-
-        # Eğer DB boşsa mock'larla doldur; doluysa tabloyu çiz
-        if not self._rows:
+        if not self.data or not hasattr(self, 'model'): return
+        # Eğer DB boşsa mock'larla doldur; doluysa tablo defteri sayfa sayfa SQL'den okur
+        self._mock_shown = not self.data.page_cash_ledger(limit=1)["rows"]
+        if self._mock_shown:
             self._load_mock_rows()
             return
+        self.model.set_source(self.data)
+        self._refresh_table()
+        self._update_balances()
 
-        # Tabloyu ve özetleri yenile - ancak UI öğeleri hazır olduğunda
-        if hasattr(self, 'table') and hasattr(self, 'lbl_sum_in'):
-            self._refresh_table()
-            self._recalc_summary(getattr(self, "_visible_cache", []))
+    def on_data_changed(self, batch: dict):
+        """DataService.changes: yalnızca değişen kasa satırlarını tek sorguda çekip yüklü pencereye yamar."""
+        ch = batch.get("cash_ledger")
+        if not ch or not hasattr(self, 'model'):
+            return
+        if ch["reset"] or self._mock_shown:
+            self.reload_from_db()
+            return
+        fresh = self.data.list_cash_ledger(ch["insert"] | ch["update"])
+        self.model.patch(fresh, ch["delete"] | (ch["update"] - {r["id"] for r in fresh}))
+        self._recalc_summary()
+        self._update_balances()
 
     def _load_prefs(self):
         self._loading_prefs = True
@@ -1695,7 +1761,7 @@ class FinancePage(QWidget):
 
         # Sıralama
         sortCol   = int(s.value("sortCol", 0))
-        sortOrder = int(s.value("sortOrder", 0))  # 0 = AscendingOrder, 1 = DescendingOrder
+        sortOrder = int(s.value("sortOrder", 1))  # 0 = AscendingOrder, 1 = DescendingOrder (varsayılan: en yeni en üstte)
         self.table.horizontalHeader().setSortIndicator(sortCol, Qt.SortOrder(sortOrder))
 
         s.endGroup()
@@ -1705,78 +1771,59 @@ class FinancePage(QWidget):
         self._refresh_table()
 
     # --- DB Kalıcılık Fonksiyonları ---
+    # Yazımlar DataService yazıcı kuyruğunda çalışır; GUI beklemez.
+    # Commit sonrası DataService.changes "cash_ledger" olayı yayılır → on_data_changed yalnızca o satırı çeker.
+    def _submit_cash_write(self, job, error_title: str):
+        fut = self.data.submit_write(job)
+        def done(f):
+            err = f.exception()
+            if err is not None:
+                print(f"DB write error: {err}")
+                self.writeFailed.emit(error_title, str(err))
+        fut.add_done_callback(done)
+        return fut
+
+    def _show_write_error(self, title: str, message: str):
+        QMessageBox.critical(self, "Hata", f"{title}:\n{message}")
+
+    def _cash_entry(self, data: dict) -> dict:
+        # ISO formatına dönüştür; tutar kuruşa yuvarlanıp işaretsiz yazılır (yön "tur" alanında)
+        iso_date = QDate.fromString(data["tarih"], "dd.MM.yyyy").toString(Qt.DateFormat.ISODate)
+        return dict(
+            date=iso_date, time=data["saat"], account=data["hesap"], type=data["tur"], category=data["kategori"],
+            description=data["aciklama"], amount=from_kurus(abs(to_kurus(data["tutar"]))), ref_no=data["ref_no"],
+            currency_code=data["currency_code"], amount_foreign=float(data["amount_foreign"]),
+            fx_rate=float(data["fx_rate"]), type_code=data["type_code"]
+        )
+
+    def _customer_id_for(self, cari: str):
+        # Cari ID'yi bul (DataService kimlik önbelleği: ada göre, büyük/küçük harf duyarsız)
+        customer_name = cari.split(" — ")[0] if cari and cari != "Müşteri Seç" else None
+        if not customer_name:
+            return None
+        return self.data.find_customer_id(customer_name)
+
     def _insert_cash_row(self, data: dict):
         """Yeni kayıt ekler"""
         if not self.data: return
-        try:
-            with self.data.db.tx() as cx:
-                # Cari ID'yi bul
-                customer_name = data["cari"].split(" — ")[0] if data["cari"] and data["cari"] != "Müşteri Seç" else None
-                customer_id = None
-                if customer_name:
-                    row = cx.execute("SELECT id FROM customers WHERE name = ? LIMIT 1", (customer_name,)).fetchone()
-                    customer_id = row[0] if row else None
-
-                # ISO formatına dönüştür
-                iso_date = QDate.fromString(data["tarih"], "dd.MM.yyyy").toString(Qt.DateFormat.ISODate)
-
-                cx.execute("""
-                  INSERT INTO cash_ledger
-                    (date,time,account,type,category,description,amount,
-                     ref_no,currency_code,amount_foreign,fx_rate,type_code,customer_id)
-                  VALUES (?,?,?,?,?,?,?,?,?,?,?,?,?)
-                """, (
-                    iso_date, data["saat"], data["hesap"], data["tur"], data["kategori"],
-                    data["aciklama"], abs(float(data["tutar"])), data["ref_no"],
-                    data["currency_code"], float(data["amount_foreign"]),
-                    float(data["fx_rate"]), data["type_code"], customer_id
-                ))
-            self.data.cashChanged.emit()  # reload_from_db tetikler
-        except Exception as e:
-            print(f"DB insert error: {e}")
-            QMessageBox.critical(self, "Hata", f"Kayıt eklenirken hata oluştu:\n{e}")
+        entry = self._cash_entry(data)
+
+        def job():
+            return self.data.record_cash_entry(customer_id=self._customer_id_for(data["cari"]), **entry)
+
+        return self._submit_cash_write(job, "Kayıt eklenirken hata oluştu")
 
     def _update_cash_row(self, rid: int, data: dict):
         """Kayıt günceller"""
         if not self.data: return
-        try:
-            with self.data.db.tx() as cx:
-                # Cari ID'yi bul
-                customer_name = data["cari"].split(" — ")[0] if data["cari"] and data["cari"] != "Müşteri Seç" else None
-                customer_id = None
-                if customer_name:
-                    row = cx.execute("SELECT id FROM customers WHERE name = ? LIMIT 1", (customer_name,)).fetchone()
-                    customer_id = row[0] if row else None
-
-                # ISO formatına dönüştür
-                iso_date = QDate.fromString(data["tarih"], "dd.MM.yyyy").toString(Qt.DateFormat.ISODate)
-
-                cx.execute("""
-                  UPDATE cash_ledger SET
-                    date=?, time=?, account=?, type=?, category=?, description=?, amount=?,
-                    ref_no=?, currency_code=?, amount_foreign=?, fx_rate=?, type_code=?, customer_id=?
-                  WHERE id=?
-                """, (
-                    iso_date, data["saat"], data["hesap"], data["tur"], data["kategori"],
-                    data["aciklama"], abs(float(data["tutar"])), data["ref_no"],
-                    data["currency_code"], float(data["amount_foreign"]),
-                    float(data["fx_rate"]), data["type_code"], customer_id, rid
-                ))
-            self.data.cashChanged.emit()  # reload_from_db tetikler
-        except Exception as e:
-            print(f"DB update error: {e}")
-            QMessageBox.critical(self, "Hata", f"Kayıt güncellenirken hata oluştu:\n{e}")
+        entry = self._cash_entry(data)
+
+        def job():
+            return self.data.update_cash_entry(rid, customer_id=self._customer_id_for(data["cari"]), **entry)
+
+        return self._submit_cash_write(job, "Kayıt güncellenirken hata oluştu")
 
     def _delete_cash_row(self, rid: int):
         """Kayıt siler"""
         if not self.data: return
-        try:
-            with self.data.db.tx() as cx:
-                cx.execute("DELETE FROM cash_ledger WHERE id=?", (rid,))
-            self.data.cashChanged.emit()  # reload_from_db tetikler
-        except Exception as e:
-            print(f"DB delete error: {e}")
-            QMessageBox.critical(self, "Hata", f"Kayıt silinirken hata oluştu:\n{e}")
-
-        # Açılışta da en yeni en üstte olsun
-        QTimer.singleShot(100, lambda: self.table.sortItems(0, Qt.SortOrder.DescendingOrder))
\ No newline at end of file
+        return self._submit_cash_write(lambda: self.data.delete_cash_entry(rid), "Kayıt silinirken hata oluştu")
@@ -0,0 +1,315 @@
+# app/pages/finance_model.py
+"""
+FinancePage kasa defteri tablosunun modeli (QTableView + QAbstractTableModel); defter belleğe alınmaz:
+- tarih aralığı/hesap/tür/arama süzgeçleri SQL'e gider (DataService.page_cash_ledger, indeksli keyset sayfası);
+  satırlar sayfa sayfa, görünüm kaydırıldıkça çekilir (canFetchMore/fetchMore)
+- sıralama SQL'de: Tarih kolonu önceden hesaplanmış epoch anahtarıyla (cash_ledger.ts), diğerleri kolonun
+  kendisiyle; eşitlikte id. Satır başına tarih ayrıştırma yok
+- toplamlar (adet, giriş, çıkış, net) tek SUM(CASE …) sorgusu (DataService.cash_ledger_totals); süzgeç
+  değişince ilk sayfayla paralel çalışır (ayrı okuma bağlantısı), sonuç süzgeç değişene kadar saklanır
+- değişiklik olayında yalnızca değişen satırlar okunur: süzgece uyanlar yüklü pencereye sıralama anahtarıyla
+  yerleştirilir (patch); ilk sayfa yeniden çekilmez
+- kaynak yoksa (servis yok / boş defter) örnek kayıtlar bellekte (set_static), aynı süzgeç ve sıralamayla
+"""
+import calendar
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt6.QtGui import QColor
+
+from data.money import from_kurus
+from data.paging import ORDERS
+from data.search import fold
+from .parameters import fmt_money, fmt_date, fmt_time
+
+HEADERS = ["Tarih", "Saat", "Ref No", "Hesap", "Tür", "Kod", "Kategori", "Açıklama", "Tutar"]
+# Kolon → SQL sıralama kolonu (paging.ORDERS["cash_ledger"])
+SORT_KEYS = ("ts", "time", "ref_no", "account", "type", "type_code", "category", "description", "amount_kurus")
+PAGE = 200                  # fetchMore başına satır
+EXPORT_PAGE = 5000          # dışa aktarmada sayfa boyu
+_NULLABLE = ORDERS["cash_ledger"]
+_CURRENCIES = {"00": "TRY", "01": "USD", "02": "EUR"}
+_AMOUNT_COL = 8
+_RIGHT = Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+_IN_FG = QColor(120, 200, 140)
+_OUT_FG = QColor(220, 120, 120)
+# Toplam sorgusu arka planda: metin aramasında sayfa ve toplam aynı FTS kümesini ayrı ayrı okur
+_TOTALS = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ledger-totals")
+
+
+def epoch(date: str, time: str = "") -> int:
+    """cash_ledger.ts ile aynı anahtar: ISO tarih + saat (UTC) → unix saniyesi; saat boş/bozuksa günün başı."""
+    for text, fmt in ((f"{date} {time}", "%Y-%m-%d %H:%M"), (date, "%Y-%m-%d")):
+        try:
+            return calendar.timegm(datetime.strptime(text, fmt).timetuple())
+        except ValueError:
+            continue
+    return 0
+
+
+def matches(row: dict, filters: dict) -> bool:
+    """Satır süzgece uyuyor mu — paging.where ile aynı anlam (değişen birkaç satır ve örnek kayıtlar için)."""
+    for key, value in filters.items():
+        if value in (None, ""):
+            continue
+        if key == "date_from" and row["date"] < value or key == "date_to" and row["date"] > value:
+            return False
+        if key == "text":
+            fields = [fold(row.get(c) or "") for c in ("description", "category", "ref_no")]
+            if not all(any(t in f for f in fields) for t in fold(value).split()):
+                return False
+        elif key not in ("date_from", "date_to") and row.get(key) != value:
+            return False
+    return True
+
+
+def to_record(row: dict) -> dict:
+    """DB satırı → sayfanın kayıt biçimi (düzenleme diyaloğu ve dışa aktarma)."""
+    date = row["date"]
+    return {
+        "id": row["id"], "tarih": fmt_date(date), "saat": row.get("time") or "",
+        "hesap": row["account"], "tur": row["type"], "kategori": row.get("category") or "",
+        "aciklama": row.get("description") or "",
+        "tutar": row["amount"] if row["type"] == "Giriş" else -row["amount"],
+        "cari": row.get("customer_name") or "",
+        "ref_no": row.get("ref_no") or "—",
+        "currency_code": row.get("currency_code") or "00",
+        "amount_foreign": row.get("amount_foreign") or 0.0,
+        "fx_rate": row.get("fx_rate") or 1.0,
+        "type_code": row.get("type_code") or "—",
+    }
+
+
+class LedgerTableModel(QAbstractTableModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.source = None                  # page_cash_ledger/cash_ledger_totals sağlayan servis
+        self.static = []                    # kaynak yokken bellek içi satırlar (DB biçiminde)
+        self.filters = {}
+        self.order = ("ts", True)           # (SQL kolonu, azalan)
+        self.rows = []                      # yüklü pencere (DB biçiminde)
+        self._keys = []                     # satır → sıralama anahtarı (kolon değeri, id)
+        self._next = None                   # sonraki sayfanın imleci (None: hepsi yüklü)
+        self._totals = None                 # süzgecin toplamları (dict ya da hesaplanan Future)
+
+    # --- Qt arayüzü ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        r, col = self.rows[index.row()], index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if col == 0:
+                return fmt_date(r["date"])
+            if col == 1:
+                return fmt_time(r["time"])
+            if col == 7:
+                return f'{r["description"] or ""} — {r["customer_name"]}' if r.get("customer_name") else \
+                    r["description"] or ""
+            if col == _AMOUNT_COL:
+                return fmt_money(r["amount"])
+            value = r[SORT_KEYS[col]]
+            return value or ("—" if col in (2, 5) else "")           # ref no / kod boşsa tire
+        if role == Qt.ItemDataRole.UserRole and col == 0:
+            return r["id"]
+        if col == _AMOUNT_COL:
+            if role == Qt.ItemDataRole.TextAlignmentRole:
+                return _RIGHT
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return _IN_FG if r["type"] == "Giriş" else _OUT_FG
+            if role == Qt.ItemDataRole.ToolTipRole:
+                currency = _CURRENCIES.get(r.get("currency_code") or "00", "TRY")
+                if currency != "TRY" and (r.get("amount_foreign") or 0) > 0:
+                    return f"{r['amount_foreign']:,.2f} {currency} @ {r.get('fx_rate') or 1.0:,.4f} → " \
+                           f"{fmt_money(r['amount'])}"
+                return "Türk Lirası"
+        if col == 7 and role == Qt.ItemDataRole.ToolTipRole:
+            return f"İlişkili Cari: {r.get('customer_name') or '—'}"
+        return None
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._next is not None
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._next is None:
+            return
+        page = self._page(self._next, PAGE)
+        self._next = page["next"]
+        if page["rows"]:
+            n = len(self.rows)
+            self.beginInsertRows(QModelIndex(), n, n + len(page["rows"]) - 1)
+            self._append(page["rows"])
+            self.endInsertRows()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self.order = (SORT_KEYS[column], order == Qt.SortOrder.DescendingOrder)
+        self.refetch()
+
+    # --- veri ---
+    def set_source(self, source):
+        self.source, self.static, self._totals = source, [], None
+
+    def set_static(self, rows):
+        self.source, self.static, self._totals = None, list(rows), None
+
+    def set_query(self, filters: dict):
+        self.filters = {k: v for k, v in filters.items() if v not in (None, "")}
+        self._totals = None
+        self.refetch()
+
+    def refetch(self):
+        """Pencereyi boşaltıp ilk sayfayı çeker (devamı kaydırdıkça fetchMore ile)."""
+        if self.source is not None and self._totals is None:
+            self._totals = _TOTALS.submit(self.source.cash_ledger_totals, dict(self.filters))
+        page = self._page(None, PAGE)
+        self.beginResetModel()
+        self.rows, self._keys, self._next = [], [], page["next"]
+        self._append(page["rows"])
+        self.endResetModel()
+
+    def patch(self, fresh, gone=()):
+        """Değişiklik olayı: gone ve fresh id'leri pencereden çıkar; süzgece uyan fresh satırları sıralama
+        anahtarının yerine koyar. Yer henüz çekilmemiş kısımdaysa atlanır (o sayfa gelince zaten gelir)."""
+        self._totals = None
+        drop = set(gone) | {r["id"] for r in fresh}
+        for i in reversed([i for i, r in enumerate(self.rows) if r["id"] in drop]):
+            self.beginRemoveRows(QModelIndex(), i, i)
+            del self.rows[i], self._keys[i]
+            self.endRemoveRows()
+        for r in fresh:
+            if not matches(r, self.filters):
+                continue
+            key = self._key(r)
+            i = self._slot(key)
+            if i == len(self.rows) and self._next is not None:
+                continue
+            self.beginInsertRows(QModelIndex(), i, i)
+            self.rows.insert(i, r)
+            self._keys.insert(i, key)
+            self.endInsertRows()
+
+    def totals(self) -> dict:
+        """Süzgecin tamamı (yalnızca yüklü pencere değil): {"count", "giris", "cikis", "net"}."""
+        if self.source is not None:
+            if self._totals is None:
+                self._totals = self.source.cash_ledger_totals(self.filters)
+            elif isinstance(self._totals, Future):
+                self._totals = self._totals.result()
+            return self._totals
+        rows = [r for r in self.static if matches(r, self.filters)]
+        in_k = sum(r["amount_kurus"] for r in rows if r["type"] == "Giriş")
+        out_k = sum(r["amount_kurus"] for r in rows if r["type"] == "Çıkış")
+        return {"count": len(rows), "giris": from_kurus(in_k), "cikis": from_kurus(out_k),
+                "net": from_kurus(in_k - out_k)}
+
+    def _page(self, after, limit) -> dict:
+        if self.source is not None:
+            return self.source.page_cash_ledger(self.filters, after, limit, self.order)
+        desc = self.order[1]
+        rows = sorted((r for r in self.static if matches(r, self.filters)), key=self._key, reverse=desc)
+        if after is not None:
+            after = tuple(after)
+            rows = [r for r in rows if (self._key(r) < after if desc else self._key(r) > after)]
+        return {"rows": rows[:limit], "next": list(self._key(rows[limit - 1])) if len(rows) > limit else None}
+
+    def _append(self, rows):
+        self.rows += rows
+        self._keys += map(self._key, rows)
+
+    def _key(self, row) -> tuple:
+        col = self.order[0]
+        value = row.get(col)
+        return ("" if value is None and _NULLABLE[col] else value), row["id"]
+
+    def _slot(self, key) -> int:
+        """Anahtarın sıralı penceredeki yeri (ikili arama; azalan sırada ters karşılaştırma)."""
+        keys, desc = self._keys, self.order[1]
+        lo, hi = 0, len(keys)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if (keys[mid] > key) if desc else (keys[mid] < key):
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    # --- sayfa yardımcıları ---
+    def row_id(self, row: int):
+        return self.rows[row]["id"] if 0 <= row < len(self.rows) else None
+
+    def row_of(self, rid: int):
+        """Yüklü penceredeki satır numarası (yoksa None)."""
+        return next((i for i, r in enumerate(self.rows) if r["id"] == rid), None)
+
+    def record(self, row: int) -> dict:
+        return to_record(self.rows[row])
+
+    def all_records(self) -> list:
+        """Süzgece uyan tüm kayıtlar, görünen sırayla (dışa aktarma; sayfa sayfa çekilir)."""
+        out, after = [], None
+        while True:
+            page = self._page(after, EXPORT_PAGE)
+            out += map(to_record, page["rows"])
+            if page["next"] is None:
+                return out
+            after = page["next"]
+
+
+STATEMENT_HEADERS = ["Tarih", "Saat", "Ref No", "Kategori", "Açıklama", "Giriş", "Çıkış", "Bakiye"]
+
+
+class StatementTableModel(QAbstractTableModel):
+    """Hesap ekstresi satırları (DataService.account_statement): hareket + yürüyen bakiye."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(STATEMENT_HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return STATEMENT_HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        r, col = self.rows[index.row()], index.column()
+        if role == Qt.ItemDataRole.DisplayRole:
+            if col == 0:
+                return fmt_date(r["date"])
+            if col == 1:
+                return fmt_time(r["time"])
+            if col in (5, 6):
+                return fmt_money(r["amount"]) if (r["type"] == "Giriş") == (col == 5) else ""
+            if col == 7:
+                return fmt_money(r["balance"])
+            return r[("ref_no", "category", "description")[col - 2]] or ("—" if col == 2 else "")
+        if col >= 5:
+            if role == Qt.ItemDataRole.TextAlignmentRole:
+                return _RIGHT
+            if role == Qt.ItemDataRole.ForegroundRole:
+                if col == 7:
+                    return _OUT_FG if r["balance"] < 0 else None
+                return _IN_FG if col == 5 else _OUT_FG
+        return None
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self.rows = list(rows)
+        self.endResetModel()
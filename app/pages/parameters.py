@@ -7,6 +7,7 @@ from PyQt6.QtCore import Qt, QLocale, QSettings
 from PyQt6.QtGui import QFont, QPixmap, QPainter, QLinearGradient, QColor
 from random import randint
 from theme import elevate
+from data.money import to_kurus, from_kurus
 
 TR = QLocale(QLocale.Language.Turkish, QLocale.Country.Turkey)
 
@@ -195,67 +196,8 @@ class ParametersPage(QWidget):
 # === ORTAK YARDIMCI FONKSİYONLAR ===
 
 def parse_money(text) -> float:
-    """'₺25.330,00' → 25330.00; sağlam fallback'li."""
-    if text in (None, ""):
-        return 0.0
-
-    s = str(text).replace("₺", "").replace("\u00a0", "").strip()
-
-    # TR formatı için özel mantık: "25.330,00"
-    import re
-
-    # Sayısal kısmı çıkar
-    match = re.search(r'[\d.,]+', s)
-    if match:
-        num_str = match.group()
-
-        # TR formatı: binlik nokta, ondalık virgül
-        if ',' in num_str and '.' in num_str:
-            # "25.330,00" formatı
-            # Virgülü noktaya çevir
-            num_str = num_str.replace(',', '.')
-            # Son noktadan önceki tüm noktaları kaldır
-            parts = num_str.split('.')
-            if len(parts) > 2:
-                integer_part = ''.join(parts[:-1])
-                decimal_part = parts[-1]
-                num_str = f"{integer_part}.{decimal_part}"
-        elif ',' in num_str:
-            # "25330,00" formatı - sadece virgül
-            num_str = num_str.replace(',', '.')
-        elif '.' in num_str:
-            # "25330.00" formatı - zaten doğru
-            pass
-        else:
-            # "25330" formatı - tam sayı
-            pass
-
-        try:
-            result = float(num_str)
-            if result > 0:
-                return result
-        except:
-            pass
-
-    # QLocale'yu yedek olarak dene
-    ok, val = TR.toDouble(s)
-    if ok and val > 0:
-        return float(val)
-
-    # Son çare: tüm nokta ve virgülleri kaldır
-    cleaned = re.sub(r'[.,]', '', s)
-    try:
-        result = float(cleaned)
-        if result > 0:
-            # Eğer 6+ haneli ise kuruş olarak değerlendir
-            if len(cleaned) > 5:
-                return result / 100
-            else:
-                return result
-    except:
-        pass
-
-    return 0.0
+    """'₺25.330,00' → 25330.00; ayrıştırma data.money'de (kuruşa yuvarlanır, işaret yok sayılır)."""
+    return from_kurus(abs(to_kurus(text)))
 
 def fmt_money(val: float) -> str:
     return TR.toCurrencyString(float(val), "₺")
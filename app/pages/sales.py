@@ -10,6 +10,7 @@ from PyQt6.QtCore import Qt, QDate, QLocale, QTimer, pyqtSignal
 from PyQt6.QtGui import QFont, QPixmap, QPainter, QLinearGradient, QColor, QPalette
 import os
 from .parameters import parse_money, fmt_money, TR
+from data.pricing import round_to_step
 
 # PDF oluşturma için gerekli import'lar
 try:
@@ -772,10 +773,15 @@ class SalesPage(QWidget):
 
     # Finans sayfası dinleyebilsin diye sinyal
     transactionCommitted = pyqtSignal(dict)  # payload: finans kaydı
+    # Yazıcı iş parçacığından gelen sonuç/hata → GUI thread'de işlenir
+    saleSaved = pyqtSignal(dict)
+    saleFailed = pyqtSignal(str)
 
     def __init__(self, data=None, parent=None):
         super().__init__(parent)
         self.data = data
+        self.saleSaved.connect(self._on_sale_saved)
+        self.saleFailed.connect(self._on_sale_failed)
 
         # Seed (bir kere)
         try:
@@ -1491,9 +1497,8 @@ class SalesPage(QWidget):
             step = getattr(self, "_round_step", 10.0)
         if step <= 0:
             return v
-        # .5 ve üstünü hep yukarı at (banker rounding sorununu çöz)
-        import math
-        return math.floor(v / step + 0.5) * step
+        # .5 ve üstünü hep yukarı at — toplu fiyatlama (data.pricing) ile aynı kural
+        return float(round_to_step(v, step))
 
     def _refresh_row_pricing(self, r: int):
         # temel alanlar
@@ -1656,16 +1661,22 @@ class SalesPage(QWidget):
                     parent.replaceWidget(self.lbl_remaining, self.lbl_change)
 
     # — satır işlemleri (mock)
+    def _products(self) -> list[dict]:
+        # Paylaşılan stok kataloğu; veri servisi yoksa örnek liste
+        return self.data.catalog.products() if self.data else PRODUCTS
+
     def bulk_add_items(self):
-        dlg = MultiProductPickerDialog(self, PRODUCTS)
+        products = self._products()
+        dlg = MultiProductPickerDialog(self, products)
         if not dlg.exec():
             return
         items = dlg.data()
         if not items:
             return
+        by_code = {p["Kod"]: p for p in products}
         # Stok kontrolü + ekleme
         for d in items:
-            product = next((p for p in PRODUCTS if p["Kod"] == d["Kod"]), None)
+            product = by_code.get(d["Kod"])
             if product and self.cmb_type.currentText() == "Satış":
                 if d["Adet"] > product.get("Stok", 0):
                     QMessageBox.warning(self, "Stok Uyarısı",
@@ -1692,7 +1703,7 @@ class SalesPage(QWidget):
             "Iscilik": float(self.table.item(row,5).data(Qt.ItemDataRole.UserRole) or 0.0),
         }
 
-        dlg = NewSaleItemDialog(self, PRODUCTS, current)
+        dlg = NewSaleItemDialog(self, self._products(), current)
         if dlg.exec():
             data = dlg.data()
             self._set_row(row, data)
@@ -1813,19 +1824,32 @@ class SalesPage(QWidget):
             "discount": float(getattr(self, "_discount", 0.0))
         }
 
-        try:
-            payload = self.data.create_sale(header, items)
-            self.transactionCommitted.emit(payload)
-            QMessageBox.information(self, "Başarılı", "İşlem kaydedildi.")
+        # Yazım DataService yazıcı kuyruğunda çalışır; GUI beklemez. Sonuç gelene dek ikinci kayıt engellenir.
+        self.btn_save.setEnabled(False)
+        fut = self.data.create_sale_async(header, items)
+        def done(f):
+            err = f.exception()
+            if err is not None:
+                print(f"DB write error: {err}")
+                self.saleFailed.emit(str(err))
+            else:
+                self.saleSaved.emit(f.result())
+        fut.add_done_callback(done)
 
-            # Makbuz otomatik oluştur
-            self._auto_generate_receipt_pdf()
+    def _on_sale_saved(self, payload: dict):
+        self.transactionCommitted.emit(payload)
+        QMessageBox.information(self, "Başarılı", "İşlem kaydedildi.")
 
-            # Formu temizle
-            self.clear_form_for_new_sale()
+        # Makbuz otomatik oluştur
+        self._auto_generate_receipt_pdf()
 
-        except Exception as e:
-            QMessageBox.critical(self, "Hata", f"İşlem kaydedilemedi:\n{e}")
+        # Formu temizle
+        self.clear_form_for_new_sale()
+        self._update_save_button_state()
+
+    def _on_sale_failed(self, message: str):
+        self._update_save_button_state()
+        QMessageBox.critical(self, "Hata", f"İşlem kaydedilemedi:\n{message}")
 
     def clear_form_for_new_sale(self):
         """Yeni satış için formu temizle"""
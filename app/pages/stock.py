@@ -1,17 +1,19 @@
 ### app/pages/stock.py ###
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QComboBox,
-    QPushButton, QTableWidget, QTableWidgetItem, QFrame,
+    QPushButton, QTableView, QFrame,
     QAbstractItemView, QHeaderView, QDialog, QMessageBox   # <— QDialog ve QMessageBox eklendi
 )
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
 from PyQt6.QtGui import QFont, QPalette, QColor, QPixmap, QPainter, QLinearGradient
 from random import randint, uniform
 from theme import elevate
 from dialogs import NewStockDialog  # dialog
+from pages.stock_model import StockTableModel
 
 CATEGORIES = ["Tümü", "Bilezik", "Yüzük", "Kolye", "Külçe", "Gram"]
 ISC_TIPS = ["Milyem", "Gram", "TL"]
+SEARCH_DELAY_MS = 150   # arama kutusu: yazma durunca süz (tuş başına değil)
 
 
 def generate_rows(n=60):
@@ -42,13 +44,20 @@ def generate_rows(n=60):
 
 
 class StockPage(QWidget):
+    # Yazıcı iş parçacığından gelen sonuç/hata → GUI thread'de mesaj kutusu
+    writeDone = pyqtSignal(dict)
+    writeFailed = pyqtSignal(str, str)
+
     def __init__(self, data=None, parent=None):
         super().__init__(parent)
         self.data = data
-        self._all_rows = []
-        self._filtered = []
+        self.writeDone.connect(self._show_write_result)
+        self.writeFailed.connect(self._show_write_error)
+        # Tablo modeli: sütunlu depo + görünüm dizisi; hücreler yalnızca görünürken biçimlenir
+        self.model = StockTableModel(self)
         if self.data:
-            self.data.stockChanged.connect(self.reload_from_db)
+            # Katalog deltası: yalnızca değişen satırlar güncellenir
+            self.data.stockDelta.connect(self.on_stock_delta)
             self.reload_from_db()
 
         # === KOZMİK ARKA PLAN ===
@@ -76,7 +85,12 @@ class StockPage(QWidget):
         toolbar = QHBoxLayout()
         self.search = QLineEdit()
         self.search.setPlaceholderText("Ara: kod, ad…")
-        self.search.textChanged.connect(self.apply_filters)
+        self._search_timer = QTimer(self)
+        self._search_timer.setSingleShot(True)
+        self._search_timer.setInterval(SEARCH_DELAY_MS)
+        self._search_timer.timeout.connect(self.apply_filters)
+        self.search.textChanged.connect(lambda _: self._search_timer.start())
+        self.search.returnPressed.connect(self.apply_filters)
 
         self.filter = QComboBox()
         self.filter.addItems(CATEGORIES)
@@ -113,35 +127,32 @@ class StockPage(QWidget):
         card_layout.setSpacing(10)
 
         # === KOZMİK TABLO ===
-        self.table = QTableWidget(0, 13, self)
-        self.table.setHorizontalHeaderLabels([
-            "Kod","Kategori","Ürün Adı",
-            "Milyem","Ayar","Gram","Adet",
-            "Alış Fiyat","Satış Fiyat",
-            "İşçilik Tipi","Alınan İşç.","Verilen İşç.","KDV %"
-        ])
+        self.table = QTableView(self)
+        self.table.setModel(self.model)
         self.table.verticalHeader().setVisible(False)
+        # Sabit satır yüksekliği: görünüm satırları tek tek ölçmez (500k satırda da anında açılır)
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         self.table.setCornerButtonEnabled(False)
         self.table.setAlternatingRowColors(True)
         self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
         self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
         self.table.setStyleSheet("""
-            QTableWidget {
+            QTableView {
                 background: rgba(10,16,32,0.3);
                 border: 1px solid rgba(255,255,255,0.08);
                 border-radius: 12px;
                 gridline-color: rgba(255,255,255,0.08);
             }
-            QTableWidget::item {
+            QTableView::item {
                 padding: 10px 8px;
                 border-bottom: 1px solid rgba(255,255,255,0.04);
                 background: transparent;
             }
-            QTableWidget::item:selected {
+            QTableView::item:selected {
                 background: rgba(76,125,255,0.12);
                 border-left: 3px solid #4C7DFF;
             }
-            QTableWidget::item:hover {
+            QTableView::item:hover {
                 background: rgba(76,125,255,0.04);
             }
         """)
@@ -224,7 +235,7 @@ class StockPage(QWidget):
 
         # sıralama ve çift tıkla düzenleme
         self.table.setSortingEnabled(True)
-        self.table.itemDoubleClicked.connect(lambda *_: self.on_edit())
+        self.table.doubleClicked.connect(lambda *_: self.on_edit())
 
         # İlk render sonrası arka planı çiz
         self.resizeEvent(None)
@@ -284,7 +295,7 @@ class StockPage(QWidget):
 
     # --- satır seçim durumuna göre butonlar
     def _toggle_row_actions(self):
-        has = len(self.table.selectedItems()) > 0
+        has = self.table.selectionModel().hasSelection()
         self.btn_edit.setEnabled(has)
         self.btn_del.setEnabled(has)
 
@@ -294,28 +305,7 @@ class StockPage(QWidget):
         return idxs[0].row() if idxs else None
 
     def _row_to_dict(self, row):
-        def num(txt): return float(txt.replace(" ₺","").replace(" %","").replace(",","."))
-
-        kod = self.table.item(row, 0).text()
-        # _all_rows içinden gerçek kritik stok
-        ks = next((r.get("KritikStok", 5) for r in self._all_rows if r["Kod"] == kod), 5)
-
-        return {
-            "Kod": kod,
-            "Kategori": self.table.item(row, 1).text(),
-            "Ad": self.table.item(row, 2).text(),
-            "Milyem": num(self.table.item(row, 3).text()),
-            "Ayar": int(float(self.table.item(row, 4).text())),
-            "Gram": num(self.table.item(row, 5).text()),
-            "Adet": int(self.table.item(row, 6).text()),
-            "AlisFiyat": num(self.table.item(row, 7).text()),
-            "SatisFiyat": num(self.table.item(row, 8).text()),
-            "IscTip": self.table.item(row, 9).text(),
-            "IscAlinan": num(self.table.item(row,10).text()),
-            "IscVerilen": num(self.table.item(row,11).text()),
-            "KDV": num(self.table.item(row,12).text()),
-            "KritikStok": int(ks),
-        }
+        return self.model.row_dict(row)
 
     # --- Yeni
     def on_new(self):
@@ -342,11 +332,8 @@ class StockPage(QWidget):
                 "critical_qty": data["KritikStok"]
             }
 
-            try:
-                result = self.data.upsert_stock_item(item_data)
-                QMessageBox.information(self, "Başarılı", result["message"])
-            except Exception as e:
-                QMessageBox.critical(self, "Hata", f"Stok kaydı eklenirken hata oluştu:\n{str(e)}")
+            self._submit_stock_write(self.data.upsert_stock_item_async(item_data),
+                                     "Stok kaydı eklenirken hata oluştu")
 
     # --- Düzenle
     def on_edit(self):
@@ -376,11 +363,8 @@ class StockPage(QWidget):
                 "critical_qty": data["KritikStok"]
             }
 
-            try:
-                result = self.data.upsert_stock_item(item_data)
-                QMessageBox.information(self, "Başarılı", result["message"])
-            except Exception as e:
-                QMessageBox.critical(self, "Hata", f"Stok kaydı güncellenirken hata oluştu:\n{str(e)}")
+            self._submit_stock_write(self.data.upsert_stock_item_async(item_data),
+                                     "Stok kaydı güncellenirken hata oluştu")
 
     # --- Sil
     def on_delete(self):
@@ -391,131 +375,71 @@ class StockPage(QWidget):
         reply = QMessageBox.question(self, "Onay",
                                      f"{current['Ad']} ürününü silmek istediğinizden emin misiniz?")
         if reply == QMessageBox.StandardButton.Yes:
-            kod = self.table.item(row, 0).text()
-
-            try:
-                result = self.data.delete_stock_item(kod)
-                if result["success"]:
-                    QMessageBox.information(self, "Başarılı", result["message"])
-                else:
-                    QMessageBox.warning(self, "Uyarı", result["message"])
-            except Exception as e:
-                QMessageBox.critical(self, "Hata", f"Stok kaydı silinirken hata oluştu:\n{str(e)}")
-
-    # --- filtreleme & tablo doldurma
+            kod = self.model.code_at(row)
+            self._submit_stock_write(self.data.delete_stock_item_async(kod),
+                                     "Stok kaydı silinirken hata oluştu")
+
+    # --- Yazımlar DataService yazıcı kuyruğunda çalışır; GUI beklemez.
+    # Commit sonrası stockDelta yalnızca değişen satırı tabloya yansıtır; sonuç mesajı sinyalle GUI'ye döner.
+    def _submit_stock_write(self, fut, error_title: str):
+        def done(f):
+            err = f.exception()
+            if err is not None:
+                print(f"DB write error: {err}")
+                self.writeFailed.emit(error_title, str(err))
+            else:
+                self.writeDone.emit(f.result())
+        fut.add_done_callback(done)
+        return fut
+
+    def _show_write_result(self, result: dict):
+        if result.get("success", True):
+            QMessageBox.information(self, "Başarılı", result["message"])
+        else:
+            QMessageBox.warning(self, "Uyarı", result["message"])
+
+    def _show_write_error(self, title: str, message: str):
+        QMessageBox.critical(self, "Hata", f"{title}:\n{message}")
+
+    # --- filtreleme
     def apply_filters(self):
         # UI öğeleri henüz yüklenmemişse çık
-        if not hasattr(self, 'search') or not hasattr(self, 'filter') or not hasattr(self, 'table'):
-            self._filtered = list(self._all_rows)
-            if hasattr(self, 'table'):
-                self.populate_table(self._filtered)
-                self.update_summary(self._filtered)
+        if not hasattr(self, 'search') or not hasattr(self, 'filter'):
             return
-
-        text = (self.search.text() or "").strip().casefold()
+        self._search_timer.stop()
         cat = self.filter.currentText()
-
-        filtered = []
-        for r in self._all_rows:
-            if cat != "Tümü" and r["Kategori"] != cat:
-                continue
-            if text and (text not in r["Kod"].casefold() and text not in r["Ad"].casefold()):
-                continue
-            filtered.append(r)
-
-        self.populate_table(filtered)
-        self.update_summary(filtered)
+        self.model.set_filter(self.search.text(), None if cat == "Tümü" else cat)
+        self.update_summary()
         self._toggle_row_actions()
 
-    def populate_table(self, rows):
-        # 1) Aktif sıralamayı geçici kapat
-        was_sorted = self.table.isSortingEnabled()
-        if was_sorted:
-            self.table.setSortingEnabled(False)
-
-        # 2) İçeriği temizle ve yeniden doldur
-        self.table.clearContents()
-        self.table.setRowCount(len(rows))
-
-        for i, r in enumerate(rows):
-            self.table.setItem(i, 0, QTableWidgetItem(r["Kod"]))
-            self.table.setItem(i, 1, QTableWidgetItem(r["Kategori"]))
-            self.table.setItem(i, 2, QTableWidgetItem(r["Ad"]))
-
-            def num_item(val, suffix=""):
-                it = QTableWidgetItem(f"{val:.2f}{suffix}")
-                it.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-                return it
-
-            self.table.setItem(i, 3, num_item(r.get("Milyem", 0.0)))
-            it_ayar = QTableWidgetItem(str(r.get("Ayar", 0)))
-            it_ayar.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-            self.table.setItem(i, 4, it_ayar)
-
-            self.table.setItem(i, 5, num_item(r["Gram"]))
-
-            it_adet = QTableWidgetItem(str(r["Adet"]))
-            it_adet.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
-            if r["Adet"] <= r.get("KritikStok", 5):
-                it_adet.setBackground(QColor(244, 67, 54, 60))
-                it_adet.setForeground(QColor(255, 255, 255))
-            self.table.setItem(i, 6, it_adet)
-
-            self.table.setItem(i, 7, num_item(r.get("AlisFiyat", 0.0), " ₺"))
-            self.table.setItem(i, 8, num_item(r.get("SatisFiyat", 0.0), " ₺"))
-
-            it_tip = QTableWidgetItem(r.get("IscTip","Milyem"))
-            it_tip.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-            self.table.setItem(i, 9, it_tip)
-
-            self.table.setItem(i,10, num_item(r.get("IscAlinan", 0.0), " ₺"))
-            self.table.setItem(i,11, num_item(r.get("IscVerilen", 0.0), " ₺"))
-            self.table.setItem(i,12, num_item(r.get("KDV", 0.0), " %"))
-
-        # 3) Sıralamayı eski haline getir (varsa tekrar sırala)
-        if was_sorted:
-            self.table.setSortingEnabled(True)
-            sec = self.header.sortIndicatorSection()
-            order = self.header.sortIndicatorOrder()
-            self.table.sortItems(sec, order)
-
-    def update_summary(self, rows):
-        toplam_gram = sum(r["Gram"] for r in rows)
-        toplam_adet = sum(r["Adet"] for r in rows)
-        toplam_deger = sum(r["Adet"] * r.get('SatisFiyat', 0) for r in rows)
-        toplam_alis_deger = sum(r["Adet"] * r.get('AlisFiyat', 0) for r in rows)
-        kar_potential = toplam_deger - toplam_alis_deger
-        kritik_stok_sayisi = sum(1 for r in rows if r["Adet"] <= r.get("KritikStok", 5))
-
+    def update_summary(self):
+        if not hasattr(self, 'summary'):
+            return
+        t = self.model.summary()
+        kar_potential = t["sell_value"] - t["buy_value"]
         self.summary.setText(
-            f"Toplam kayıt: {len(rows)} • Toplam Gram: {toplam_gram:.2f} • Toplam Adet: {toplam_adet} • "
-            f"Stok Değeri: {toplam_deger:.2f} ₺ • Potansiyel Kâr: {kar_potential:.2f} ₺ • "
-            f"Kritik Stok: {kritik_stok_sayisi} ürün"
+            f"Toplam kayıt: {t['count']} • Toplam Gram: {t['gram']:.2f} • Toplam Adet: {t['qty']} • "
+            f"Stok Değeri: {t['sell_value']:.2f} ₺ • Potansiyel Kâr: {kar_potential:.2f} ₺ • "
+            f"Kritik Stok: {t['critical']} ürün"
         )
 
+    def on_stock_delta(self, delta: dict):
+        """Katalog deltası: değişen/eklenen/silinen satırlar modelde yerinde uygulanır (görünür hücreler
+        yeniden boyanır). Sıfırlama ya da toplu fiyatlama gibi çok büyük delta → depo katalogdan yeniden kurulur."""
+        if delta.get("reset") or len(delta["changed"]) + len(delta.get("removed", ())) > 2000:
+            self.reload_from_db()
+            return
+        self.model.apply_delta(self.data.catalog, delta["changed"], delta.get("removed", ()))
+        self.update_summary()
+
     def reload_from_db(self):
-        """DB'den stok verilerini çek ve tabloyu güncelle"""
+        """Stok verilerini paylaşılan katalogdan (DB'ye gitmeden) modele yükler"""
         if not self.data:
             return
-        rows = self.data.list_stock()
-        self._all_rows = [{
-            "Kod": r["code"] or "", "Kategori": r["category"] or "", "Ad": r["name"] or "",
-            "Milyem": r["milyem"] or 0, "Ayar": r["ayar"] or 0, "Gram": r["gram"] or 0.0,
-            "Adet": r["qty"] or 0, "AlisFiyat": r["buy_price"] or 0.0, "SatisFiyat": r["sell_price"] or 0.0,
-            "IscTip": r["isc_tip"] or "", "IscAlinan": r["isc_alinan"] or 0.0, "IscVerilen": r["isc_verilen"] or 0.0,
-            "KDV": r["vat"] or 0.0, "KritikStok": r["critical_qty"] or 5
-        } for r in rows]
-        self._filtered = list(self._all_rows)
-        # UI öğeleri yüklenene kadar populate_table'ı doğrudan çağır
-        if hasattr(self, 'search') and hasattr(self, 'filter') and hasattr(self, 'table'):
-            self.apply_filters()
-        else:
-            # UI öğeleri henüz yüklenmemişse sadece veri yapısını hazırla
-            if hasattr(self, 'table'):
-                self.populate_table(self._filtered)
-                self.update_summary(self._filtered)
+        self.model.load(self.data.catalog)
+        self.update_summary()
 
     def on_transaction_from_sales(self, payload: dict):
-        """Satış işleminden sonra stok tablosunu güncelle"""
-        if hasattr(self, 'table'):
+        """Satış sonrası: tablo stockDelta ile zaten güncellenir; veri servisi yoksa tam yükleme."""
+        if hasattr(self, 'table') and not self.data:
             self.reload_from_db()
@@ -0,0 +1,291 @@
+# app/pages/stock_model.py
+"""
+StockPage tablosunun modeli (QTableView + QAbstractTableModel). Satır başına QTableWidgetItem yok:
+- veri sütunlu bir depoda (StockRows): sayılar array, kod/ad listeleri, kategori/işçilik tipi labels kodu;
+  depo paylaşılan katalogdan (DataService.catalog) dizileri kopyalayarak kurulur
+- görünüm = depo konumlarının dizisi (_view): süzme ve sıralama yalnızca bu diziyi yeniden kurar
+- hücre metni data() içinde, yalnızca görünen hücreler için biçimlenir
+- katalog deltası depoda yerinde uygulanır: değişen satır kopyalanır, eklenen sona yazılır, silinen yuva boş kalır
+  (görünümlerden arama dizini ile dışlanır); yeniden yüklemede depo sıkıştırılır
+- arama: kod/ad anahtarlarının trigram dizini (TextIndex) yüklemede bir kez kurulur, deltada yerinde güncellenir;
+  daraltan sorgu (öncekini içeren) mevcut görünümü süzer — yeniden sıralama yok
+"""
+from array import array
+
+import numpy as np
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex
+from PyQt6.QtGui import QColor
+
+from data.catalog import ARRAYS
+from data.search import fold
+from data.textindex import TextIndex, key_of
+
+HEADERS = ["Kod", "Kategori", "Ürün Adı", "Milyem", "Ayar", "Gram", "Adet",
+           "Alış Fiyat", "Satış Fiyat", "İşçilik Tipi", "Alınan İşç.", "Verilen İşç.", "KDV %"]
+
+# Katalogdan aynen kopyalanan sütun dizileri (depo adı = katalog adı)
+_ARRAYS = ARRAYS
+# Kolon → (depo sütunu, biçim); biçim None → metin, "label" → labels kodu
+_COLUMNS = [("code", None), ("category", "label"), ("name", None), ("milyem", "{:.2f}"), ("ayar", "{}"),
+            ("gram", "{:.2f}"), ("qty", "{}"), ("buy", "{:.2f} ₺"), ("sell", "{:.2f} ₺"), ("isc_tip", "label"),
+            ("isc", "{:.2f} ₺"), ("isc_ver", "{:.2f} ₺"), ("vat", "{:.2f} %")]
+_RIGHT = Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+_CRITICAL_BG = QColor(244, 67, 54, 60)
+_CRITICAL_FG = QColor(255, 255, 255)
+_QTY_COL = 6
+
+
+class StockRows:
+    """Sütunlu stok deposu; konum = katalogdaki sıra (yeniden kurulana kadar sabit)."""
+    __slots__ = _ARRAYS + ("code", "name", "isc_ver", "vat", "labels", "pos_by_id")
+
+    def __init__(self):
+        for name in _ARRAYS:
+            setattr(self, name, array("d" if name in ("gram", "buy", "sell", "milyem", "isc") else "q"))
+        self.code, self.name, self.labels = [], [], [""]
+        self.isc_ver, self.vat = array("d"), array("d")
+        self.pos_by_id = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def from_catalog(cls, catalog) -> "StockRows":
+        s = cls()
+        snap = catalog.snapshot_columns()
+        for name in _ARRAYS:
+            setattr(s, name, snap[name])
+        s.labels, rows = snap["labels"], snap["rows"]
+        s.code = [r["code"] or "" for r in rows]
+        s.name = [r["name"] or "" for r in rows]
+        s.isc_ver = array("d", [r["isc_verilen"] or 0.0 for r in rows])
+        s.vat = array("d", [r["vat"] or 0.0 for r in rows])
+        s.pos_by_id = {sid: i for i, sid in enumerate(s.ids)}
+        return s
+
+    def update(self, catalog, ids) -> bool:
+        """Değişen satırları katalogdan kopyalar; depoda olmayan id sona eklenir.
+        Kod/ad/kategori (süzgeç alanları) değişti ya da satır eklendi mi."""
+        keys_changed = False
+        snap = catalog.snapshot_columns(ids)          # katalogda olmayan id zaten atlanmış
+        if len(snap["labels"]) != len(self.labels):
+            self.labels = snap["labels"]
+        for cpos, (sid, r) in enumerate(zip(snap["ids"], snap["rows"])):
+            pos = self.pos_by_id.get(sid)
+            code, name = r["code"] or "", r["name"] or ""
+            if pos is None:
+                pos = self.pos_by_id[sid] = len(self.ids)
+                for col in _ARRAYS:
+                    getattr(self, col).append(snap[col][cpos])
+                self.code.append(code)
+                self.name.append(name)
+                self.isc_ver.append(r["isc_verilen"] or 0.0)
+                self.vat.append(r["vat"] or 0.0)
+                keys_changed = True
+                continue
+            keys_changed |= (code, name, snap["category"][cpos]) != (self.code[pos], self.name[pos],
+                                                                     self.category[pos])
+            for col in _ARRAYS:
+                getattr(self, col)[pos] = snap[col][cpos]
+            self.code[pos], self.name[pos] = code, name
+            self.isc_ver[pos], self.vat[pos] = r["isc_verilen"] or 0.0, r["vat"] or 0.0
+        return keys_changed
+
+    def remove(self, ids) -> list:
+        """Silinen satırların konumları; yuva yeniden kurulana kadar boş kalır (kod/ad temizlenir)."""
+        out = []
+        for sid in ids:
+            pos = self.pos_by_id.pop(sid, None)
+            if pos is not None:
+                self.code[pos] = self.name[pos] = ""
+                out.append(pos)
+        return out
+
+    def label(self, name: str, pos: int) -> str:
+        return self.labels[getattr(self, name)[pos]]
+
+    def column(self, name: str) -> np.ndarray:
+        """Sayısal sütunun kopyasız NumPy görünümü."""
+        col = getattr(self, name)
+        return np.frombuffer(col, dtype=np.float64 if col.typecode == "d" else np.int64) if len(col) else \
+            np.zeros(0)
+
+
+class StockTableModel(QAbstractTableModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = StockRows()
+        self._view = np.zeros(0, dtype=np.int64)   # görünen satır → depo konumu
+        self.search_index = TextIndex()             # depo konumu → katlanmış "kod, ad" anahtarı
+        self._text = ""
+        self._category = None
+        self._sort = None                           # (kolon, Qt.SortOrder)
+        self._order = None                          # tüm depo konumlarının sıralı hâli (önbellek)
+
+    # --- Qt arayüzü ---
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._view)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(HEADERS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        pos, col = int(self._view[index.row()]), index.column()
+        name, fmt = _COLUMNS[col]
+        if role == Qt.ItemDataRole.DisplayRole:
+            if fmt is None:
+                return getattr(self.rows, name)[pos]
+            if fmt == "label":
+                return self.rows.label(name, pos)
+            return fmt.format(getattr(self.rows, name)[pos])
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            if col == 9:
+                return Qt.AlignmentFlag.AlignCenter
+            return _RIGHT if fmt not in (None, "label") else None
+        if col == _QTY_COL and role in (Qt.ItemDataRole.BackgroundRole, Qt.ItemDataRole.ForegroundRole):
+            if self.rows.qty[pos] <= self.rows.critical[pos]:
+                return _CRITICAL_BG if role == Qt.ItemDataRole.BackgroundRole else _CRITICAL_FG
+        return None
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        self._sort, self._order = (column, order), None
+        self._set_view(self._sorted(self._view))
+
+    # --- veri ---
+    def load(self, catalog):
+        """Depoyu katalogdan yeniden kurar; süzgeç ve sıralama korunur."""
+        self.beginResetModel()
+        self.rows = StockRows.from_catalog(catalog)
+        self._order = None
+        self.search_index.build(map(key_of, self.rows.code, self.rows.name))
+        self._view = self._build_view()
+        self.endResetModel()
+
+    def set_filter(self, text: str = "", category: str = None):
+        text = fold(text).strip()
+        narrows = bool(self._text) and self._text in text and category == self._category
+        self._text, self._category = text, category
+        if narrows:
+            # Önceki sonuç kümesinin alt kümesi: görünüm (sıralı hâliyle) yalnızca süzülür
+            keep = np.zeros(len(self.rows), dtype=bool)
+            keep[self.search_index.find(text)] = True
+            self._set_view(self._view[keep[self._view]])
+        else:
+            self._set_view(self._build_view())
+
+    def apply_delta(self, catalog, ids, removed=()):
+        """Değişen/eklenen satırlar yerinde yazılır, silinenler dizinden düşer. Süzgeç alanı (kod/ad/kategori)
+        değiştiyse görünüm yeniden süzülür; yalnızca değerler değiştiyse mevcut görünüm yeniden sıralanır."""
+        rows = self.rows
+        keys_changed = rows.update(catalog, ids)
+        if keys_changed:
+            for sid in ids:
+                pos = rows.pos_by_id.get(sid)
+                if pos is not None:
+                    self.search_index.set(pos, key_of(rows.code[pos], rows.name[pos]))   # değişmeyen anahtar: işlem yok
+        for pos in rows.remove(removed):
+            self.search_index.remove(pos)
+            keys_changed = True
+        if self._sort and (keys_changed or _COLUMNS[self._sort[0]][1] is not None):
+            self._order = None                      # sıralama kolonu değişmiş olabilir
+        if keys_changed:
+            self._set_view(self._build_view())
+        elif self._sort:
+            self._set_view(self._sorted(self._view))
+        if len(self._view):
+            # Görünüm yalnızca görünür hücreleri yeniden boyar
+            self.dataChanged.emit(self.index(0, 0), self.index(len(self._view) - 1, len(HEADERS) - 1))
+
+    def _set_view(self, view):
+        if len(view) == len(self._view) and np.array_equal(view, self._view):
+            return                                  # aynı görünüm (ör. daraltan sorgu satır düşürmedi)
+        if len(view) != len(self._view):
+            self.beginResetModel()
+            self._view = view
+            self.endResetModel()
+            return
+        # Aynı satır sayısı: seçim/geçerli hücre aynı ürünü göstermeye devam etsin
+        self.layoutAboutToBeChanged.emit()
+        old = self.persistentIndexList()
+        if old:
+            new = []
+            for ix in old:
+                hits = np.flatnonzero(view == self._view[ix.row()])
+                new.append(self.index(int(hits[0]), ix.column()) if len(hits) else QModelIndex())
+            self.changePersistentIndexList(old, new)
+        self._view = view
+        self.layoutChanged.emit()
+
+    def _build_view(self):
+        rows = self.rows
+        view = self.search_index.find(self._text)                 # boş metin: silinmemiş tüm konumlar
+        if self._category:
+            code = rows.labels.index(self._category) if self._category in rows.labels else -1
+            view = view[rows.column("category")[view] == code]
+        return self._sorted(view)
+
+    def _sorted(self, view):
+        """Görünümü geçerli sıralamaya dizer: sıralı tam konum listesi önbellekte, süzgeç yalnızca onu maskeler
+        (tuş başına sıralama yok)."""
+        if not self._sort or not len(view):
+            return view
+        order = self._full_order()
+        keep = np.zeros(len(self.rows), dtype=bool)
+        keep[view] = True
+        return order[keep[order]]
+
+    def _full_order(self):
+        if self._order is None:
+            column, order = self._sort
+            name, fmt = _COLUMNS[column]
+            n = len(self.rows)
+            # Kararlı sıralama: eşit anahtarlar her seferinde aynı (depo) sırada kalsın
+            if fmt is None:
+                keys = getattr(self.rows, name)
+                full = np.array(sorted(range(n), key=keys.__getitem__), dtype=np.int64)
+            elif fmt == "label":
+                labels = np.array(self.rows.labels, dtype=object)
+                full = np.argsort(labels[self.rows.column(name)], kind="stable")
+            else:
+                full = np.argsort(self.rows.column(name), kind="stable")
+            self._order = full[::-1].copy() if order == Qt.SortOrder.DescendingOrder else full
+        return self._order
+
+    # --- sayfa yardımcıları ---
+    def code_at(self, row: int) -> str:
+        return self.rows.code[int(self._view[row])]
+
+    def row_of(self, code: str):
+        """Görünümdeki satır numarası (süzgeç dışındaysa None)."""
+        try:
+            pos = self.rows.code.index(code)
+        except ValueError:
+            return None
+        hits = np.flatnonzero(self._view == pos)
+        return int(hits[0]) if len(hits) else None
+
+    def row_dict(self, row: int) -> dict:
+        """Diyalogların beklediği biçim (Kod, Kategori, Ad, …)."""
+        r, p = self.rows, int(self._view[row])
+        return {"Kod": r.code[p], "Kategori": r.label("category", p), "Ad": r.name[p], "Milyem": r.milyem[p],
+                "Ayar": r.ayar[p], "Gram": r.gram[p], "Adet": r.qty[p], "AlisFiyat": r.buy[p],
+                "SatisFiyat": r.sell[p], "IscTip": r.label("isc_tip", p), "IscAlinan": r.isc[p],
+                "IscVerilen": r.isc_ver[p], "KDV": r.vat[p], "KritikStok": r.critical[p]}
+
+    def summary(self) -> dict:
+        """Görünen satırların toplamları (NumPy, satır gezmeden)."""
+        v, r = self._view, self.rows
+        if not len(v):
+            return {"count": 0, "gram": 0.0, "qty": 0, "sell_value": 0.0, "buy_value": 0.0, "critical": 0}
+        qty = r.column("qty")[v]
+        return {"count": len(v), "gram": float(r.column("gram")[v].sum()), "qty": int(qty.sum()),
+                "sell_value": float((qty * r.column("sell")[v]).sum()),
+                "buy_value": float((qty * r.column("buy")[v]).sum()),
+                "critical": int((qty <= r.column("critical")[v]).sum())}
@@ -0,0 +1,394 @@
+# app/server.py
+"""
+Başsız sunucu modu: DataService'i mağazadaki kasa terminallerine HTTP/JSON API olarak açar.
+Kullanım: python app/server.py [--db orbitx.db] [--host 127.0.0.1] [--port 8765] [--token ANAHTAR]
+Terminal: ORBITX_API_TOKEN=ANAHTAR python app/main.py --server http://sunucu:8765   (data.remote.RemoteDataService)
+
+- asyncio tek iş parçacığında bağlantıları yönetir (HTTP/1.1 keep-alive, Content-Length gövdeler)
+- okumalar okuma havuzu kadar iş parçacığında, yazımlar DataService yazıcı kuyruğunda (submit_write);
+  olay döngüsü hiçbir SQL'i beklemez
+- eşzamanlılık sınırı: en çok max_inflight istek işlenir, max_queue kadarı sırada bekler; fazlası 503
+- /api/changes?since=N uzun yoklama: commit edilen satır olayları (ChangeBus) terminallere dağıtılır
+- varsayılan yalnızca bu makineden erişim (127.0.0.1); ağa açmak (--host 0.0.0.0) paylaşılan anahtar ister:
+  yazma uçları "Authorization: Bearer <anahtar>" olmadan 401 döner (--token ya da ORBITX_API_TOKEN)
+
+Uçlar (/api/...):
+  GET  health | stock[?ids=] | customers[?ids=] | customers/find?name=&phone= | customers/<id>/activity
+  GET  customers/<id>/summary | cash[?ids=] | transactions[?limit=] | kpis[?day=&type=]
+  GET  search/<stock|customers|cash>?q=&limit= | market | market/series?kod=&start=[&end=&max_points=]
+  GET  page/<stock|customers|cash>?after=[json]&order=[json]&limit=&<süzgeç>= | count/<stock|customers|cash>?<süzgeç>=
+  GET  totals/cash?<süzgeç>= | balances/cash[?day=] | statement/cash?account=&date_from=&date_to=
+  GET  closes[?limit=] | closes/<YYYY-MM-DD> (Z raporu) | changes?since=&wait=
+  POST sales {header, items} | cash {date, time, account, ...} | stock {code, name, ...} | closes {day}
+  PUT  cash/<id> {date, time, account, ...}
+  DELETE stock/<kod> | cash/<id>
+"""
+import argparse
+import asyncio
+import hmac
+import json
+import os
+import sqlite3
+import sys
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from data.service import DataService
+
+DEFAULT_PORT = 8765
+MAX_BODY = 8 * 1024 * 1024
+_REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found", 413: "Payload Too Large",
+            500: "Internal Server Error", 503: "Service Unavailable"}
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def _ids(q: dict):
+    """"1,2,3" → [1, 2, 3]; parametre yoksa None."""
+    if "ids" not in q:
+        return None
+    return [int(i) for i in q["ids"].split(",") if i]
+
+
+class ApiServer:
+    def __init__(self, svc: DataService, host: str = "127.0.0.1", port: int = DEFAULT_PORT, *,
+                 readers: int = 4, max_inflight: int = 32, max_queue: int = 256, idle_timeout: float = 120.0,
+                 changes_kept: int = 1024, token: str = None):
+        self.svc = svc
+        self.token = token                 # verilirse yazma uçları için zorunlu (Bearer)
+        self.host = host
+        self.port = port
+        self.max_inflight = max_inflight
+        self.max_queue = max_queue
+        self.idle_timeout = idle_timeout
+        self.stats = {"requests": 0, "rejected": 0, "errors": 0}
+        self.seq = 0                       # son değişiklik grubunun sıra numarası
+        self._log = deque(maxlen=changes_kept)
+        self._reads = ThreadPoolExecutor(max_workers=readers, thread_name_prefix="api-read")
+        self._loop = None
+        self._server = None
+        self._clients = set()
+        self._thread = None
+        # (yöntem, kaynak) → (işleyici, tür); tür: read | write | inline (changes ayrı: uzun yoklama)
+        self._routes = {
+            ("GET", "health"): (self._health, "inline"),
+            ("GET", "stock"): (self._stock, "read"),
+            ("POST", "stock"): (lambda a, q, b: self.svc.upsert_stock_item(b), "write"),
+            ("DELETE", "stock"): (lambda a, q, b: self.svc.delete_stock_item(a[0]), "write"),
+            ("GET", "customers"): (self._customers, "read"),
+            ("GET", "cash"): (lambda a, q, b: self.svc.list_cash_ledger(_ids(q)), "read"),
+            ("POST", "cash"): (lambda a, q, b: {"id": self.svc.record_cash_entry(**b)}, "write"),
+            ("PUT", "cash"): (lambda a, q, b: {"updated": self.svc.update_cash_entry(int(a[0]), **b)}, "write"),
+            ("DELETE", "cash"): (lambda a, q, b: {"deleted": self.svc.delete_cash_entry(int(a[0]))}, "write"),
+            ("POST", "sales"): (lambda a, q, b: self.svc.create_sale(b["header"], b["items"]), "write"),
+            ("GET", "transactions"): (lambda a, q, b: self.svc.get_recent_transactions(int(q.get("limit", 7))),
+                                      "read"),
+            ("GET", "kpis"): (lambda a, q, b: self.svc.sales_kpis(q.get("day"), q.get("type", "Satış")), "read"),
+            ("GET", "search"): (self._search, "read"),
+            ("GET", "page"): (lambda a, q, b: self._page(a, q), "read"),
+            ("GET", "count"): (lambda a, q, b: self._page(a, q, count=True), "read"),
+            ("GET", "totals"): (self._totals, "read"),
+            ("GET", "balances"): (self._balances, "read"),
+            ("GET", "statement"): (self._statement, "read"),
+            ("GET", "market"): (self._market, "read"),
+            ("GET", "closes"): (self._closes, "read"),
+            ("POST", "closes"): (lambda a, q, b: self.svc.close_day((b or {}).get("day")), "write"),
+        }
+        svc.changes.subscribe(self._on_changes)
+
+    # --- yaşam döngüsü ---
+    async def start(self):
+        self.svc.changes.flush()   # açılıştan önceki olaylar: terminaller zaten güncel durumu çeker
+        self._loop = asyncio.get_running_loop()
+        self._slots = asyncio.Semaphore(self.max_inflight)
+        self._waiting = 0
+        self._new_changes = asyncio.Event()
+        self._server = await asyncio.start_server(self._client, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._flusher = asyncio.create_task(self._flush_changes())
+
+    async def serve_forever(self):
+        await self.start()
+        print(f"✓ API sunucusu: http://{self.host}:{self.port}/api (en çok {self.max_inflight} eşzamanlı istek)")
+        async with self._server:
+            await self._server.serve_forever()
+
+    def start_background(self):
+        """Sunucuyu ayrı bir iş parçacığında (kendi olay döngüsüyle) başlatır; bağlandıktan sonra döner."""
+        ready = threading.Event()
+
+        def run():
+            loop = asyncio.new_event_loop()
+            loop.run_until_complete(self.start())
+            ready.set()
+            loop.run_forever()
+            loop.close()
+        self._thread = threading.Thread(target=run, daemon=True, name="api-server")
+        self._thread.start()
+        ready.wait()
+        return self
+
+    def stop(self):
+        self.svc.changes.unsubscribe(self._on_changes)
+        if self._loop is None:
+            return
+
+        async def shutdown():
+            self._flusher.cancel()
+            self._server.close()
+            for task in list(self._clients):   # açık keep-alive / uzun yoklama bağlantıları
+                task.cancel()
+            await asyncio.gather(*self._clients, return_exceptions=True)
+            await self._server.wait_closed()
+        if self._thread is not None:
+            asyncio.run_coroutine_threadsafe(shutdown(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+        self._loop = None
+        self._reads.shutdown(wait=True)
+
+    # --- HTTP ---
+    async def _client(self, reader, writer):
+        task = asyncio.current_task()
+        self._clients.add(task)
+        try:
+            while True:
+                line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                if not line:
+                    break
+                method, target, version = line.decode("latin-1").split()
+                headers = {}
+                while True:
+                    h = await reader.readline()
+                    if h in (b"\r\n", b"\n", b""):
+                        break
+                    k, _, v = h.decode("latin-1").partition(":")
+                    headers[k.strip().lower()] = v.strip()
+                n = int(headers.get("content-length") or 0)
+                if n > MAX_BODY:
+                    await self._respond(writer, 413, {"error": "Gövde çok büyük"}, keep=False)
+                    break
+                body = await reader.readexactly(n) if n else b""
+                status, payload = await self._dispatch(method, target, body, headers)
+                keep = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                await self._respond(writer, status, payload, keep=keep)
+                if not keep:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError, ValueError,
+                asyncio.CancelledError):
+            pass
+        finally:
+            self._clients.discard(task)
+            writer.close()
+
+    async def _respond(self, writer, status: int, payload, *, keep: bool):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload, default=str).encode()
+        head = (f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\nContent-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep else 'close'}\r\n")
+        if status == 503:
+            head += "Retry-After: 1\r\n"
+        writer.write(head.encode("latin-1") + b"\r\n" + body)
+        await writer.drain()
+
+    def _authorized(self, headers: dict) -> bool:
+        if self.token is None:
+            return True
+        got = headers.get("authorization", "").encode("latin-1")
+        return hmac.compare_digest(got, f"Bearer {self.token}".encode())
+
+    async def _dispatch(self, method: str, target: str, body: bytes, headers: dict = None):
+        self.stats["requests"] += 1
+        u = urlsplit(target)
+        parts = [unquote(p) for p in u.path.strip("/").split("/")]
+        q = dict(parse_qsl(u.query))
+        try:
+            if len(parts) < 2 or parts[0] != "api":
+                raise ApiError(404, f"Bilinmeyen yol: {u.path}")
+            if (method, parts[1]) == ("GET", "changes"):
+                return 200, await self._changes(q)   # uzun yoklama: eşzamanlılık sınırına girmez
+            route = self._routes.get((method, parts[1]))
+            if route is None:
+                raise ApiError(404, f"Bilinmeyen uç: {method} {u.path}")
+            fn, kind = route
+            if kind == "write" and not self._authorized(headers or {}):
+                raise ApiError(401, "Yazma için geçerli anahtar gerekli")
+            args = parts[2:]
+            data = json.loads(body) if body else None
+            return 200, await self._limited(fn, kind, args, q, data)
+        except ApiError as e:
+            if e.status == 503:
+                self.stats["rejected"] += 1
+            return e.status, {"error": str(e)}
+        except (ValueError, KeyError, TypeError, IndexError, sqlite3.IntegrityError) as e:
+            # Hatalı istek ya da iş kuralı (ör. yetersiz stok) — terminal mesajı gösterir
+            return 400, {"error": str(e)}
+        except Exception as e:
+            self.stats["errors"] += 1
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+
+    async def _limited(self, fn, kind: str, args, q, data):
+        if kind == "inline":
+            return fn(args, q, data)
+        if self._slots.locked() and self._waiting >= self.max_queue:
+            raise ApiError(503, "Sunucu meşgul, tekrar deneyin")
+        self._waiting += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self._waiting -= 1
+        try:
+            if kind == "write":
+                result = await asyncio.wrap_future(self.svc.submit_write(fn, args, q, data))
+                return json.dumps(result, default=str).encode()
+            # Büyük listelerin JSON'a çevrilmesi de olay döngüsü dışında
+            return await self._loop.run_in_executor(
+                self._reads, lambda: json.dumps(fn(args, q, data), default=str).encode())
+        finally:
+            self._slots.release()
+
+    # --- uçlar ---
+    def _health(self, args, q, body):
+        return {"ok": True, "seq": self.seq, "stock": len(self.svc.catalog), **self.stats}
+
+    def _stock(self, args, q, body):
+        # Stoğun tek kopyası katalogda: DB'ye gitmeden
+        ids = _ids(q)
+        if ids is None:
+            return self.svc.catalog.snapshot()
+        return [r for r in map(self.svc.catalog.by_id, ids) if r is not None]
+
+    def _customers(self, args, q, body):
+        if not args:
+            return self.svc.list_customers(_ids(q))
+        if args[0] == "find":
+            return {"id": self.svc.find_customer_id(q["name"], q.get("phone"))}
+        cid = int(args[0])
+        if args[1:] == ["activity"]:
+            return self.svc.customer_activity(cid, int(q.get("limit", 50)))
+        if args[1:] == ["summary"]:
+            return self.svc.customer_30day_summary(cid)
+        raise ApiError(404, "Bilinmeyen müşteri ucu")
+
+    def _search(self, args, q, body):
+        fn = {"stock": self.svc.search_stock, "customers": self.svc.search_customers,
+              "cash": self.svc.search_cash}.get(args[0] if args else None)
+        if fn is None:
+            raise ApiError(404, "Arama: stock | customers | cash")
+        return fn(q.get("q", ""), int(q.get("limit", 50)))
+
+    def _page(self, args, q, count=False):
+        svc = self.svc
+        fns = {"stock": (svc.page_stock, svc.count_stock), "customers": (svc.page_customers, svc.count_customers),
+               "cash": (svc.page_cash_ledger, svc.count_cash_ledger)}.get(args[0] if args else None)
+        if fns is None:
+            raise ApiError(404, "Sayfa: stock | customers | cash")
+        filters = {k: v for k, v in q.items() if k not in ("after", "limit", "order")}
+        if count:
+            return {"count": fns[1](filters)}
+        after = json.loads(q["after"]) if q.get("after") else None
+        order = json.loads(q["order"]) if q.get("order") else None
+        return fns[0](filters, after, int(q.get("limit", 200)), order)
+
+    def _totals(self, args, q, body):
+        if args != ["cash"]:
+            raise ApiError(404, "Toplamlar: cash")
+        return self.svc.cash_ledger_totals(q)
+
+    def _balances(self, args, q, body):
+        if args != ["cash"]:
+            raise ApiError(404, "Bakiyeler: cash")
+        return self.svc.cash_balances(q.get("day"))
+
+    def _statement(self, args, q, body):
+        if args != ["cash"]:
+            raise ApiError(404, "Ekstre: cash")
+        return self.svc.account_statement(q["account"], q["date_from"], q["date_to"])
+
+    def _closes(self, args, q, body):
+        if not args:
+            return self.svc.list_closes(int(q.get("limit", 30)))
+        return self.svc.z_report(args[0])      # kapanmamış gün: null
+
+    def _market(self, args, q, body):
+        if args == ["series"]:
+            return self.svc.market_series(q["kod"], float(q["start"]), float(q["end"]) if "end" in q else None,
+                                          int(q.get("max_points", 300)))
+        return self.svc.market_data
+
+    # --- değişiklik akışı ---
+    def _on_changes(self, batch: dict):
+        # ChangeBus.flush hangi iş parçacığında çalışırsa oradan çağrılır → döngüye aktar
+        out = {t: {"insert": sorted(ch["insert"]), "update": sorted(ch["update"]),
+                   "delete": sorted(ch["delete"]), "reset": ch["reset"]} for t, ch in batch.items()}
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._append_changes, out)
+
+    def _append_changes(self, batch: dict):
+        self.seq += 1
+        self._log.append((self.seq, batch))
+        self._new_changes.set()
+        self._new_changes = asyncio.Event()
+
+    async def _flush_changes(self):
+        # Qt olay döngüsü yok: ChangeBus'ın kuyruklu boşaltması burada yapılır
+        while True:
+            await asyncio.sleep(0.05)
+            self.svc.changes.flush()
+
+    async def _changes(self, q: dict) -> dict:
+        """since'ten sonraki olay grupları; yoksa wait saniye bekler. Geçmiş yetmezse reset=True."""
+        since = int(q.get("since", -1))
+        if since < 0:
+            return {"seq": self.seq, "batches": []}
+        if since == self.seq:
+            event = self._new_changes
+            try:
+                await asyncio.wait_for(event.wait(), min(float(q.get("wait", 25)), 60))
+            except asyncio.TimeoutError:
+                pass
+        oldest = self._log[0][0] if self._log else self.seq + 1
+        if since > self.seq or since + 1 < oldest <= self.seq:
+            # Sunucu yeniden başlamış ya da terminal çok geride: tam yeniden yükleme
+            return {"seq": self.seq, "reset": True, "batches": []}
+        return {"seq": self.seq, "batches": [b for s, b in self._log if s > since]}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Kuyumcu ERP başsız API sunucusu")
+    ap.add_argument("--db", default="orbitx.db")
+    ap.add_argument("--host", default="127.0.0.1", help="ağa açmak için 0.0.0.0 (--token gerekir)")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    ap.add_argument("--token", default=os.environ.get("ORBITX_API_TOKEN"),
+                    help="yazma uçları için paylaşılan anahtar (varsayılan ORBITX_API_TOKEN)")
+    ap.add_argument("--readers", type=int, default=4)
+    ap.add_argument("--max-inflight", type=int, default=32)
+    ap.add_argument("--no-market", action="store_true", help="piyasa fiyatlarını çekme")
+    args = ap.parse_args(argv)
+    if not args.token and args.host not in ("127.0.0.1", "localhost", "::1"):
+        ap.error("--host ağa açıkken --token (ya da ORBITX_API_TOKEN) zorunlu")
+
+    svc = DataService(args.db, readers=args.readers)
+    svc.start_change_watcher()   # sunucu dışındaki yazımlar (yerel pencere, betik) da terminallere gider
+    if not args.no_market:
+        svc.start_market_feed()
+    server = ApiServer(svc, args.host, args.port, readers=args.readers, max_inflight=args.max_inflight,
+                       token=args.token)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        svc.close()  # bekleyen yazımları commit et
+
+
+if __name__ == "__main__":
+    main()
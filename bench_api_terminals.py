@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Çok terminalli yük testi: süreç içinde API sunucusu (app/server.py) açılır, N kasa terminali
+(RemoteDataService, varsayılan 20) aynı anda arama + stok bakışı + satış + son işlemler döngüsü koşar.
+İşlem türü başına gecikme (p50/p95/en kötü), toplam satış/sn, 503 yeniden denemeleri ve sonunda
+stok tutarlılığı (sunucu DB'si, sunucu kataloğu ve her terminalin kataloğu) raporlanır.
+Kullanım: python bench_api_terminals.py [terminal_sayısı] [terminal_başına_satış] [max_inflight]
+"""
+import sys
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+from data.remote import RemoteDataService
+from data.service import DataService
+from server import ApiServer
+
+PRODUCTS = 2000
+START_QTY = 10**6
+CUSTOMERS = [f"Müşteri {i} — 0532 000 {i:02} {i:02}" for i in range(40)]
+
+
+def prepare(svc):
+    cats = DataService.CATEGORIES
+    with svc.db.tx() as cx:
+        cx.executemany("INSERT INTO stock_items(code, name, category, gram, qty, sell_price) VALUES (?,?,?,?,?,?)",
+                       [(f"P{i:05}", f"{cats[i % len(cats)]} {i}", cats[i % len(cats)], 2.5, START_QTY, 1000.0)
+                        for i in range(PRODUCTS)])
+    svc._stock_written()
+
+
+def terminal(no, url, sales, times, errors):
+    rnd = random.Random(no)
+    t = RemoteDataService(url, poll_wait=5)
+
+    def timed(op, fn, *a):
+        t0 = time.perf_counter()
+        try:
+            return fn(*a)
+        except Exception as e:
+            errors.append(f"{op}: {e}")
+        finally:
+            times.setdefault(op, []).append((time.perf_counter() - t0) * 1000)
+
+    for i in range(sales):
+        timed("arama", t.search_stock, rnd.choice(DataService.CATEGORIES)[:4], 20)
+        codes = [f"P{rnd.randrange(PRODUCTS):05}" for _ in range(rnd.randint(1, 3))]
+        items = [{"code": c, "name": t.catalog.get(c)["name"], "qty": 1, "unit_price": "1000", "line_total": "1000"}
+                 for c in dict.fromkeys(codes)]
+        header = {"type": "Satış", "doc_no": f"T{no}-{i}", "date": "2025-09-20",
+                  "customer_text": rnd.choice(CUSTOMERS + [""]), "pay_type": rnd.choice(["Nakit", "Kart"]),
+                  "paid_amount": str(1000 * len(items)), "discount": "0"}
+        timed("satış", t.create_sale, header, items)
+        timed("son işlemler", t.get_recent_transactions, 7)
+        if i % 5 == 0:
+            timed("kpi", t.sales_kpis, "2025-09-20")
+    return t
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    sales = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    inflight = int(sys.argv[3]) if len(sys.argv) > 3 else 32
+    with tempfile.TemporaryDirectory() as d:
+        svc = DataService(os.path.join(d, "bench_api.db"))
+        prepare(svc)
+        server = ApiServer(svc, port=0, max_inflight=inflight).start_background()
+        url = f"http://127.0.0.1:{server.port}"
+        print(f"✓ sunucu {url}: {PRODUCTS:,} ürün, {n} terminal × {sales} satış, max_inflight={inflight}")
+
+        times, errors, terminals = {}, [], [None] * n
+
+        def run(k):
+            terminals[k] = terminal(k, url, sales, times, errors)
+        threads = [threading.Thread(target=run, args=(k,)) for k in range(n)]
+        t0 = time.perf_counter()
+        for th in threads:
+            th.start()
+        for th in threads:
+            th.join()
+        dt = time.perf_counter() - t0
+
+        print(f"✓ {n * sales:,} satış {dt:.1f} sn: {n * sales / dt:.0f} satış/sn, "
+              f"{server.stats['requests']:,} istek ({server.stats['requests'] / dt:.0f} istek/sn)")
+        for op, ms in times.items():
+            ms.sort()
+            print(f"✓ {op:<13} p50 {statistics.median(ms):7.1f} ms | p95 {ms[int(len(ms) * 0.95)]:7.1f} ms | "
+                  f"en kötü {ms[-1]:7.1f} ms ({len(ms):,} çağrı)")
+        print(f"✓ 503 reddi: {server.stats['rejected']}, terminal yeniden denemesi: "
+              f"{sum(t.retries for t in terminals)}, hata: {len(errors)}")
+        for e in errors[:5]:
+            print(f"  ! {e}")
+
+        # Tutarlılık: satılan adet = düşen stok; terminallerin katalogları sunucuyla aynı
+        svc.writer.flush()
+        sold = svc.db.query_one("SELECT COALESCE(SUM(qty), 0) FROM sale_items")[0]
+        left = svc.db.query_one("SELECT SUM(qty) FROM stock_items")[0]
+        assert left == PRODUCTS * START_QTY - sold, (left, sold)
+        want = {r["code"]: r["qty"] for r in svc.catalog.snapshot()}
+        deadline = time.monotonic() + 15
+        while time.monotonic() < deadline and any(
+                {r["code"]: r["qty"] for r in t.catalog.snapshot()} != want for t in terminals):
+            time.sleep(0.1)
+        synced = sum({r["code"]: r["qty"] for r in t.catalog.snapshot()} == want for t in terminals)
+        print(f"✓ tutarlılık: {sold:,} adet satıldı, stok doğru düştü; {synced}/{n} terminal kataloğu sunucuyla aynı")
+        for t in terminals:
+            t.close()
+        server.stop()
+        svc.close()
+
+
+if __name__ == "__main__":
+    main()
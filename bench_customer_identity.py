@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Müşteri kimlik önbelleği benchmark'ı (varsayılan 200k müşteri).
+Karşılaştırılanlar:
+  - eski SQL yolları: name=? AND phone=? ve name=? LIMIT 1 (her çağrıda sorgu)
+  - find_customer_id: soğuk (ident_key indeks araması) ve sıcak (bellekten)
+  - CustomersPage drawer'ı: _all_rows üzerinde doğrusal tarama ↔ Kod sözlüğü
+Kullanım: python bench_customer_identity.py [müşteri_sayısı] [arama_sayısı]
+"""
+import sys
+import os
+import random
+import tempfile
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+from data.identity import customer_key
+from data.service import DataService
+
+
+def timed(label, fn, n):
+    t0 = time.perf_counter()
+    fn()
+    dt = time.perf_counter() - t0
+    print(f"✓ {label:<34}: {dt * 1e6 / n:9.1f} µs/arama")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    lookups = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+    rnd = random.Random(7)
+    with tempfile.TemporaryDirectory() as d:
+        svc = DataService(os.path.join(d, "bench_ident.db"))
+        t0 = time.perf_counter()
+        with svc.db.tx() as cx:
+            cx.executemany("INSERT INTO customers(name, phone, code, ident_key) VALUES (?,?,?,?)",
+                           [(f"Müşteri {i}", f"0532 {i:07}", f"CAR{i:06}", customer_key(f"Müşteri {i}", f"0532 {i:07}"))
+                            for i in range(n)])
+        print(f"✓ {n} müşteri eklendi (arama dizini tetikleyicisi dahil): {time.perf_counter() - t0:.2f} sn")
+
+        sample = [rnd.randrange(n) for _ in range(lookups)]
+        pairs = [(f"Müşteri {i}", f"0532 {i:07}") for i in sample]
+
+        def old_name_phone():
+            for name, phone in pairs:
+                svc.db.query_one("SELECT id FROM customers WHERE name=? AND phone=?", (name, phone))
+
+        def old_name_only():
+            for name, _ in pairs:
+                svc.db.query_one("SELECT id FROM customers WHERE name=? LIMIT 1", (name,))
+
+        def cached():
+            for name, phone in pairs:
+                svc.find_customer_id(name, phone)
+
+        timed("eski: name=? AND phone=?", old_name_phone, lookups)
+        timed("eski: name=? LIMIT 1", old_name_only, lookups)
+        svc._clear_customer_cache()
+        timed("find_customer_id (soğuk)", cached, lookups)
+        timed("find_customer_id (sıcak)", cached, lookups)
+
+        rows = [{"id": r["id"], "Kod": r["code"]} for r in svc.db.query("SELECT id, code FROM customers")]
+        by_code = {r["Kod"]: r for r in rows}
+        codes = [f"CAR{i:06}" for i in sample[:200]]
+
+        def linear():
+            for kod in codes:
+                next(r for r in rows if r["Kod"] == kod)
+
+        def indexed():
+            for kod in codes:
+                by_code[kod]
+
+        timed("drawer: _all_rows taraması", linear, len(codes))
+        timed("drawer: Kod sözlüğü", indexed, len(codes))
+        svc.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Özet tablosu benchmark'ı: sales büyürken (varsayılan 10k → 5M satır) günlük/aylık/yıllık
+KPI sorgusunun ham tablo taraması ile daily_sales_agg üzerinden süresini karşılaştırır.
+Satırlar ~3 yıla yayılır; tetikleyiciler açık olduğundan ekleme süresi de bakım maliyetini içerir.
+Kullanım: python bench_daily_aggregates.py [10000,100000,1000000,5000000]
+"""
+import sys
+import os
+import tempfile
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+from data.service import DataService
+
+DAY = "2025-09-20"
+
+RAW_KPI = """
+    SELECT
+      COALESCE(SUM(CASE WHEN date = :day THEN total_kurus END), 0),
+      COALESCE(SUM(CASE WHEN date >= :month THEN total_kurus END), 0),
+      COALESCE(SUM(total_kurus), 0)
+    FROM sales
+    WHERE date BETWEEN :year AND :day AND type = 'Satış'
+"""
+
+def grow(svc, start, stop):
+    # 1095 gün, 3 ödeme tipi, %10 alış; tutarlar 100–10.000 TL arası
+    with svc.db.tx() as cx:
+        cx.execute("""
+            WITH RECURSIVE seq(i) AS (SELECT ? UNION ALL SELECT i + 1 FROM seq WHERE i + 1 < ?)
+            INSERT INTO sales(type, doc_no, date, pay_type, total_kurus, paid_kurus, due_kurus)
+            SELECT CASE WHEN i % 10 = 0 THEN 'Alış' ELSE 'Satış' END, 'B' || i,
+                   date('2025-09-20', '-' || (i % 1095) || ' day'),
+                   CASE i % 3 WHEN 0 THEN 'Nakit' WHEN 1 THEN 'Kart' ELSE 'Veresiye' END,
+                   10000 + (i * 7919) % 990000, 10000 + (i * 7919) % 990000, 0
+            FROM seq""", (start, stop))
+
+def best_of(fn, n=5):
+    times = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    return min(times), result
+
+def main():
+    sizes = [int(x) for x in (sys.argv[1] if len(sys.argv) > 1 else "10000,100000,1000000,5000000").split(",")]
+    params = {"day": DAY, "month": DAY[:8] + "01", "year": DAY[:5] + "01-01"}
+    with tempfile.TemporaryDirectory() as d:
+        svc = DataService(os.path.join(d, "bench_agg.db"))
+        have = 0
+        print(f"{'satır':>10} | {'ekleme':>9} | {'ham SUM':>10} | {'özet':>8} | özet satırı")
+        for n in sizes:
+            t0 = time.perf_counter()
+            grow(svc, have, n)
+            dt_ins = time.perf_counter() - t0
+            have = n
+
+            dt_raw, raw = best_of(lambda: tuple(svc.db.query_one(RAW_KPI, params)), n=3)
+            dt_agg, kpi = best_of(lambda: svc.sales_kpis(DAY))
+            assert raw[2] == round(kpi["yearly"] * 100), "özet ile ham toplam uyuşmuyor"
+            agg_rows = svc.db.query_one("SELECT COUNT(*) FROM daily_sales_agg")[0]
+            print(f"{n:>10,} | {dt_ins:>7.2f} s | {dt_raw * 1000:>7.2f} ms | {dt_agg * 1000:>5.2f} ms | {agg_rows:,}")
+        svc.close()
+    print("✓ KPI sorgusu satır sayısından bağımsız (gün × tür × ödeme tipi)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Kasa defteri sayfası benchmark'ı (başsız, QT_QPA_PLATFORM=offscreen): N kasa kaydı (varsayılan 2M) üzerinde
+FinancePage açılışı, yeniden yükleme, süzgeç değişiklikleri (hesap, tür, tarih aralığı, arama), kaydırma
+(fetchMore) ve tek kayıtlık değişiklik olayı. Süzgeç/sıralama/toplam SQL'de olduğundan süreler defter
+büyüklüğünden bağımsız olmalı; hedef açılış ve süzgeç değişikliği başına < 200 ms.
+Karşılaştırma: eski yol (list_cash_ledger ile tüm defteri belleğe almak).
+Kullanım: python bench_finance_ledger.py [kayıt_sayısı]
+"""
+import sys
+import os
+import random
+import tempfile
+import time
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+from PyQt6.QtCore import Qt, QDate, QSettings
+from PyQt6.QtWidgets import QApplication
+
+from data.service import DataService
+
+ACCOUNTS = ["Kasa", "Banka — VakıfBank", "Banka — Ziraat"]
+WORDS = ["Tahsilat", "Ödeme", "Kira", "Satış", "Fatura", "Maaş", "Hurda alım", "Işıklı kolye"]
+TARGET_MS = 200.0
+
+
+def prepare(svc, n):
+    rnd = random.Random(5)
+    with svc.db.tx() as cx:
+        cx.executemany(
+            "INSERT INTO cash_ledger(date, time, account, type, category, description, amount_kurus) "
+            "VALUES (?,?,?,?,?,?,?)",
+            ((f"20{20 + i * 6 // n:02}-{1 + rnd.randrange(12):02}-{1 + rnd.randrange(28):02}",
+              f"{8 + rnd.randrange(11):02}:{rnd.randrange(60):02}", rnd.choice(ACCOUNTS),
+              rnd.choice(("Giriş", "Çıkış")), rnd.choice(("Satış Tahsilatı", "Masraf", "Diğer")),
+              f"{rnd.choice(WORDS)} {i}", rnd.randrange(1, 10**7)) for i in range(n)))
+    svc.rebuild_daily_aggregates()
+
+
+def ms(fn, *args):
+    t0 = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - t0) * 1000
+
+
+def check(label, t, target=TARGET_MS):
+    print(f"{'✓' if t < target else '✗'} {label:<44} {t:8.1f} ms")
+    return t
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    app = QApplication.instance() or QApplication([])
+    from pages.finance import FinancePage
+    with tempfile.TemporaryDirectory() as d:
+        # Kullanıcının kayıtlı süzgeç/sıralama tercihleri ölçüme karışmasın
+        FinancePage._prefs = lambda self: QSettings(os.path.join(d, "prefs.ini"), QSettings.Format.IniFormat)
+        svc = DataService(os.path.join(d, "bench_finance.db"))
+        t0 = time.perf_counter()
+        prepare(svc, n)
+        print(f"✓ {n:,} kasa kaydı hazırlandı ({time.perf_counter() - t0:.1f} sn)")
+
+        worst = []
+        t0 = time.perf_counter()
+        page = FinancePage(svc)
+        app.processEvents()
+        worst.append(check("sayfa açılışı (kurulum + ilk pencere)", (time.perf_counter() - t0) * 1000))
+        worst.append(check("yeniden yükleme", ms(page.reload_from_db)))
+
+        def step(label, fn):
+            t = ms(fn)
+            worst.append(check(f"{label} → {page.model.totals()['count']:,} kayıt", t))
+
+        step("tarih: 2020 – 2025", lambda: (page.dt_from.setDate(QDate(2020, 1, 1)),
+                                            page.dt_to.setDate(QDate(2025, 12, 31))))
+        step("hesap: Banka — Ziraat", lambda: page.cmb_account.setCurrentText("Banka — Ziraat"))
+        step("tür: Çıkış", lambda: page.cmb_type.setCurrentText("Çıkış"))
+        step("tarih: 2023 Mart", lambda: (page.dt_from.setDate(QDate(2023, 3, 1)),
+                                          page.dt_to.setDate(QDate(2023, 3, 31))))
+        step("arama: 'ışıklı' (gecikme sonrası)", lambda: (page.e_search.setText("ışıklı"), page._refresh_table()))
+        step("süzgeçleri temizle", lambda: (page.e_search.setText(""), page.cmb_type.setCurrentText("Tümü"),
+                                            page.cmb_account.setCurrentText("Tüm Hesaplar"), page._refresh_table()))
+        t = ms(lambda: [page.model.fetchMore() for _ in range(50)])
+        worst.append(check(f"kaydırma: 50 × fetchMore → {page.model.rowCount():,} satır", t))
+
+        row = svc.record_cash_entry(date="2023-03-31", time="23:59", account="Kasa", type="Giriş",
+                                    category="Satış", description="Yeni satış", amount=100)
+        worst.append(check("tek kayıt değişiklik olayı (patch)", ms(app.processEvents)))
+        assert page.model.row_id(0) == row
+        mark = "✓" if max(worst) < TARGET_MS else "✗"
+        print(f"{mark} en kötü {max(worst):.1f} ms (hedef < {TARGET_MS:.0f} ms)")
+
+        # Ts dışı sıralama SQL'de geçici sıralamayla: süzgeç aralığı büyüdükçe pahalanır (bilgi amaçlı)
+        page.dt_from.setDate(QDate(2020, 1, 1))
+        page.dt_to.setDate(QDate(2025, 12, 31))
+        t = ms(page.table.sortByColumn, 8, Qt.SortOrder.DescendingOrder)
+        print(f"          tutara göre sıralama, tüm defter: {t:8.1f} ms")
+        page.cmb_account.setCurrentText("Kasa")
+        page.dt_from.setDate(QDate(2023, 3, 1))
+        page.dt_to.setDate(QDate(2023, 3, 31))
+        t = ms(page.table.sortByColumn, 8, Qt.SortOrder.AscendingOrder)
+        print(f"          tutara göre sıralama, bir ay × bir hesap: {t:8.1f} ms")
+
+        t = ms(svc.list_cash_ledger)
+        print(f"          eski yol: list_cash_ledger (tüm defter belleğe) {t:8.0f} ms")
+        page.deleteLater()
+        app.processEvents()
+        svc.close()
+
+
+if __name__ == "__main__":
+    main()
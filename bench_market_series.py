@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Fiyat geçmişi benchmark'ı: N ham tick (varsayılan 2M, 3 kod) üzerinde market_series süreleri
+(OHLC özet tabloları) ile aynı aralığın ham tick'lerden GROUP BY ile hesaplanmasının karşılaştırması.
+Kullanım: python bench_market_series.py [tick_sayısı]
+"""
+import sys
+import os
+import random
+import statistics
+import tempfile
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+from data import ticks
+from data.service import DataService
+
+KODS = ["HAS_ALTIN", "CEYREK", "USDTRY"]
+STEP = 5  # sn — gerçek akıştan (30 sn) sık: kötü durum
+
+
+def timed(fn, rounds=30):
+    times = []
+    for _ in range(rounds):
+        t0 = time.perf_counter()
+        n = fn()
+        times.append((time.perf_counter() - t0) * 1000)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.95)], n
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    rnd = random.Random(7)
+    per_kod = n // len(KODS)
+    end = 1_758_326_400
+    start = end - per_kod * STEP
+    with tempfile.TemporaryDirectory() as d:
+        svc = DataService(os.path.join(d, "bench_ticks.db"))
+        t0 = time.perf_counter()
+        with svc.db.tx() as cx:
+            for kod in KODS:
+                price = 3_000_00
+
+                def rows():
+                    nonlocal price
+                    for i in range(per_kod):
+                        price += rnd.randint(-300, 300)
+                        yield kod, start + i * STEP, price - 1500, price
+                ticks.insert(cx, rows())
+        dt = time.perf_counter() - t0
+        print(f"✓ {per_kod * len(KODS):,} tick eklendi (1m/1h/1d özetleri tetikleyiciyle): {dt:.1f} sn "
+              f"({dt / (per_kod * len(KODS)) * 1e6:.1f} µs/tick)")
+
+        ranges = [("son 1 saat", 3600, 300), ("bugün", 86400, 1440), ("son 7 gün", 7 * 86400, 300),
+                  ("tüm aralık", end - start, 300)]
+        with svc.db.read() as cx:
+            for label, span, points in ranges:
+                a = end - span
+                med, p95, got = timed(lambda: len(ticks.series(cx, "HAS_ALTIN", a, end, max_points=points, now=end)))
+                step = max(60, span // points)
+                raw_med, raw_p95, _ = timed(lambda: len(cx.execute(
+                    "SELECT ts - ts % ?, MIN(satis_kurus), MAX(satis_kurus), COUNT(*) FROM market_ticks "
+                    "WHERE kod = ? AND ts >= ? AND ts <= ? GROUP BY 1", (step, "HAS_ALTIN", a, end)).fetchall()), rounds=5)
+                print(f"✓ {label:<11} {got:>5} nokta: özet {med:7.2f} ms (p95 {p95:.2f}) | "
+                      f"ham tick GROUP BY {raw_med:8.1f} ms (p95 {raw_p95:.1f})")
+        svc.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Para benchmark'ı: eski parse_money (regex + float) ile data.money.to_kurus ayrıştırma hızını,
+ve REAL / INTEGER kolon üzerinde SUM hızını ve doğruluğunu karşılaştırır.
+Kullanım: python bench_money.py [ayrıştırma_sayısı] [satır_sayısı]
+"""
+import sys
+import os
+import re
+import random
+import sqlite3
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+from data.money import to_kurus, format_kurus
+
+def legacy_parse(text) -> float:
+    # Eski parse_money'nin regex yolu (QLocale yedeği olmadan)
+    s = str(text).replace("₺", "").replace(" ", "").strip()
+    num_str = re.search(r'[\d.,]+', s).group()
+    if ',' in num_str and '.' in num_str:
+        num_str = num_str.replace(',', '.')
+        parts = num_str.split('.')
+        if len(parts) > 2:
+            num_str = f"{''.join(parts[:-1])}.{parts[-1]}"
+    elif ',' in num_str:
+        num_str = num_str.replace(',', '.')
+    return float(num_str)
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rows = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    rnd = random.Random(42)
+    ks = [rnd.randint(1, 10_000_000) for _ in range(1000)]
+    texts = ["₺" + format_kurus(k) for k in ks]
+
+    t0 = time.perf_counter()
+    for i in range(n):
+        legacy_parse(texts[i % 1000])
+    dt_old = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for i in range(n):
+        to_kurus(texts[i % 1000])
+    dt_new = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for i in range(n):
+        format_kurus(ks[i % 1000])
+    dt_fmt = time.perf_counter() - t0
+
+    cx = sqlite3.connect(":memory:")
+    cx.execute("CREATE TABLE t(a_real REAL, a_kurus INTEGER)")
+    cx.executemany("INSERT INTO t VALUES (?, ?)", ((0.1, 10) for _ in range(rows)))
+    t0 = time.perf_counter()
+    s_real = cx.execute("SELECT SUM(a_real) FROM t").fetchone()[0]
+    dt_real = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    s_kurus = cx.execute("SELECT SUM(a_kurus) FROM t").fetchone()[0]
+    dt_int = time.perf_counter() - t0
+
+    print(f"✓ {n:,} ayrıştırma / biçimlendirme")
+    print(f"   - parse_money (eski) : {n / dt_old:,.0f} işlem/sn")
+    print(f"   - to_kurus           : {n / dt_new:,.0f} işlem/sn")
+    print(f"   - format_kurus       : {n / dt_fmt:,.0f} işlem/sn")
+    print(f"✓ {rows:,} satır × 0,10 TL toplamı")
+    print(f"   - REAL    : {s_real!r} ({dt_real * 1000:.1f} ms)")
+    print(f"   - INTEGER : {format_kurus(s_kurus)} ({dt_int * 1000:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Sayfalı liste benchmark'ı: N kasa defteri kaydında (varsayılan 1M) list_cash_ledger (tümünü yükle) ile
+page_cash_ledger (keyset, 200 satırlık pencere) karşılaştırılır. Sayfanın süresi ve belleği defter
+büyüdükçe sabit kalmalı: ilk sayfa, 1000 sayfa derindeki sayfa, süzgeçli sayfalar ve özetten sayım ölçülür.
+Kullanım: python bench_paging.py [kayıt_sayısı]
+"""
+import sys
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+from data.service import DataService
+
+ACCOUNTS = ["Kasa", "Banka — Ziraat", "Banka — Garanti"]
+WORDS = ["Tahsilat", "Ödeme", "Kira", "Satış", "Fatura", "Maaş", "Hurda alım"]
+
+
+def prepare(svc, n):
+    rnd = random.Random(3)
+    with svc.db.tx() as cx:
+        cx.executemany(
+            "INSERT INTO cash_ledger(date, time, account, type, category, description, amount_kurus) "
+            "VALUES (?,?,?,?,?,?,?)",
+            ((f"20{20 + i * 6 // n:02}-{1 + rnd.randrange(12):02}-{1 + rnd.randrange(28):02}", "10:00",
+              rnd.choice(ACCOUNTS), rnd.choice(("Giriş", "Çıkış")), rnd.choice(("Satış", "Masraf", "Diğer")),
+              f"{rnd.choice(WORDS)} {i}", rnd.randrange(1, 10**7)) for i in range(n)))
+
+
+def timed(fn, *args, repeat=5):
+    best, peak = None, 0
+    for _ in range(repeat):
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        out = fn(*args)
+        dt = time.perf_counter() - t0
+        peak = max(peak, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        best = dt if best is None else min(best, dt)
+    return out, best * 1000, peak / 2**20
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with tempfile.TemporaryDirectory() as d:
+        svc = DataService(os.path.join(d, "bench_paging.db"))
+        t0 = time.perf_counter()
+        prepare(svc, n)
+        print(f"✓ {n:,} kasa kaydı hazırlandı ({time.perf_counter() - t0:.1f} sn)")
+
+        rows, ms, mb = timed(svc.list_cash_ledger, repeat=1)
+        print(f"✓ list_cash_ledger (tümü): {ms:8.1f} ms, {mb:7.1f} MB, {len(rows):,} satır")
+        del rows
+
+        page, ms, mb = timed(svc.page_cash_ledger)
+        print(f"✓ ilk sayfa:               {ms:8.2f} ms, {mb:7.2f} MB, {len(page['rows'])} satır")
+        after = page["next"]
+        for _ in range(999):
+            after = svc.page_cash_ledger(None, after)["next"]
+        page, ms, mb = timed(svc.page_cash_ledger, None, after)
+        print(f"✓ 1000. sayfa:             {ms:8.2f} ms, {mb:7.2f} MB ({page['rows'][0]['date']})")
+
+        for f in ({"account": "Kasa", "type": "Giriş"}, {"date_from": "2023-03-01", "date_to": "2023-03-31"},
+                  {"category": "Masraf"}, {"text": "kira"}, {"account": "Kasa", "text": "hurda"}):
+            page, ms, mb = timed(svc.page_cash_ledger, f)
+            _, cms, _ = timed(svc.count_cash_ledger, f, repeat=1)
+            count = svc.count_cash_ledger(f)
+            print(f"✓ süzgeç {str(f):<52} sayfa {ms:7.2f} ms | sayım {cms:8.1f} ms ({count:,})")
+        svc.close()
+
+
+if __name__ == "__main__":
+    main()
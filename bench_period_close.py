@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Gün sonu kapanışı (Z raporu) benchmark'ı: N günlük geçmiş (varsayılan 5 yıl, günde 500 kasa + 150 satış +
+300 cari hareketi) üzerinde ilk kapanış (tüm geçmiş), sonraki günlük kapanışlar (önceki kapanıştan artımlı)
+ve kapanmış günün raporu / bakiyeleri. Artımlı kapanış ve dondurulmuş okumalar geçmişin büyüklüğünden
+bağımsız olmalı; hedef günlük kapanış < 200 ms, Z raporu < 5 ms.
+Kullanım: python bench_period_close.py [gün_sayısı]
+"""
+import sys
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+from data.service import DataService
+
+ACCOUNTS = ["Kasa", "Banka — VakıfBank", "Banka — Ziraat", "Banka — POS"]
+CATEGORIES = ["Bilezik", "Yüzük", "Kolye", "Küpe", "Külçe", "Gram"]
+
+
+def prepare(svc, days):
+    rnd = random.Random(11)
+    start = date.today() - timedelta(days=days + 5)
+    with svc.db.tx() as cx:
+        cx.executemany("INSERT INTO customers(code, name, phone) VALUES (?,?,?)",
+                       ((f"CAR{i:05}", f"Müşteri {i}", f"05{i:09}") for i in range(2000)))
+        cx.executemany("INSERT INTO stock_items(code, name, category, gram, qty, buy_price, sell_price) "
+                       "VALUES (?,?,?,?,?,?,?)",
+                       ((f"STK{i:05}", f"Ürün {i}", CATEGORIES[i % 6], rnd.uniform(1, 30), rnd.randrange(50),
+                         rnd.uniform(500, 5000), rnd.uniform(600, 6000)) for i in range(5000)))
+        for d in range(days):
+            day = (start + timedelta(days=d)).isoformat()
+            cx.executemany("INSERT INTO cash_ledger(date, time, account, type, category, description, amount_kurus) "
+                           "VALUES (?,?,?,?,?,?,?)",
+                           ((day, "12:00", rnd.choice(ACCOUNTS), rnd.choice(("Giriş", "Çıkış")), "Diğer", "Hareket",
+                             rnd.randrange(1, 10**6)) for _ in range(500)))
+            cx.executemany("INSERT INTO sales(type, date, customer_id, pay_type, paid_kurus, total_kurus, due_kurus) "
+                           "VALUES (?,?,?,?,?,?,?)",
+                           ((rnd.choice(("Satış", "Alış")), day, rnd.randrange(1, 2001), rnd.choice(("Nakit", "Kart")),
+                             t, t, 0) for t in (rnd.randrange(1, 10**7) for _ in range(150))))
+            cx.executemany("INSERT INTO customer_ledger(customer_id, direction, amount_kurus, date) VALUES (?,?,?,?)",
+                           ((rnd.randrange(1, 2001), rnd.choice(("Borç", "Alacak")), rnd.randrange(1, 10**6), day)
+                            for _ in range(300)))
+    return start
+
+
+def ms(fn, *args):
+    t0 = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - t0) * 1000
+
+
+def check(label, t, target):
+    print(f"{'✓' if t < target else '✗'} {label:<46} {t:8.1f} ms  (hedef < {target:.0f} ms)")
+    return t < target
+
+
+def main():
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 5 * 365
+    with tempfile.TemporaryDirectory() as d:
+        svc = DataService(os.path.join(d, "bench_close.db"))
+        t0 = time.perf_counter()
+        start = prepare(svc, days)
+        svc.rebuild_daily_aggregates()
+        print(f"✓ {days} gün hazırlandı: {days * 500:,} kasa, {days * 150:,} satış, {days * 300:,} cari hareketi "
+              f"({time.perf_counter() - t0:.1f} sn)")
+
+        first = (start + timedelta(days=days - 8)).isoformat()
+        t = ms(svc.close_day, first)
+        print(f"          ilk kapanış (tüm geçmiş) {t:8.0f} ms")
+
+        ok = True
+        for i in range(7, 0, -1):
+            day = (start + timedelta(days=days - i)).isoformat()
+            ok &= check(f"günlük kapanış {day} (artımlı)", ms(svc.close_day, day), 200)
+        # Stok yalnızca bugünün kapanışında dondurulur (geriye dönük kapanışlarda stok bölümü yok)
+        ok &= check("bugünün kapanışı (stok anlık görüntüsü dahil)", ms(svc.close_day), 200)
+        ok &= check("kapanmış günün Z raporu", ms(svc.z_report, first), 5)
+        ok &= check("kapanmış günün hesap bakiyeleri", ms(svc.cash_balances, first), 5)
+        t = ms(lambda: svc.db.query("SELECT account, SUM(CASE WHEN type='Giriş' THEN amount_kurus ELSE -amount_kurus END) "
+                                    "FROM cash_ledger WHERE date <= ? GROUP BY account", (first,)))
+        print(f"          eski yol: bakiyeler ham defterden {t:8.0f} ms")
+        print(svc.z_report(date.today().isoformat())["text"])
+        print(f"{'✓' if ok else '✗'} sonuç")
+        svc.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Okuma havuzu benchmark'ı: iş parçacığı sayısına göre okuma verimi
+Kullanım: python bench_reader_pool.py [satır_sayısı]
+"""
+import sys
+import os
+import tempfile
+import threading
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+from data.service import DataService
+
+def run(svc, threads: int, seconds: float = 2.0) -> float:
+    stop = time.perf_counter() + seconds
+    counts = [0] * threads
+
+    def worker(i):
+        while time.perf_counter() < stop:
+            # Rapor tipi sorgu: işin çoğu SQLite içinde (GIL serbest) yapılır
+            svc.db.query("SELECT category, COUNT(*), SUM(qty * sell_price) FROM stock_items "
+                         "WHERE name LIKE ? GROUP BY category", (f"%{i % 10}%",))
+            counts[i] += 1
+
+    ts = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for t in ts: t.start()
+    for t in ts: t.join()
+    return sum(counts) / seconds
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    with tempfile.TemporaryDirectory() as d:
+        for readers in (1, 8):
+            svc = DataService(os.path.join(d, f"bench_{readers}.db"), readers=readers)
+            svc.seed_fake_stock(n=n, replace=True)
+            print(f"✓ Havuz boyutu: {readers} ({n} stok satırı)")
+            for threads in (1, 2, 4, 8):
+                qps = run(svc, threads)
+                print(f"   - {threads} thread: {qps:,.0f} sorgu/sn")
+            svc.db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Toplu fiyatlama benchmark'ı: N stok kartını (varsayılan 500k) yeni gram altın fiyatından yeniden fiyatlar.
+"Satır başına" yolu SalesPage'deki formülün Python döngüsüyle satır satır hesaplanıp tek tek UPDATE edilmesidir;
+reprice_stock katalog dizilerinden NumPy ile hesaplar ve yalnızca değişen fiyatları tek executemany ile yazar.
+Kullanım: python bench_reprice.py [kart_sayısı]
+"""
+import sys
+import os
+import math
+import random
+import tempfile
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+from data import pricing
+from data.service import DataService
+
+RULES = pricing.PriceRules(markup=3.0, round_step=10.0, rules=[
+    {"category": "Bilezik", "markup": 5.0, "round_step": 50},
+    {"category": "Bilezik", "ayar": 22, "markup": 6.0},
+    {"ayar": 14, "markup": 8.0, "round_step": 5},
+])
+
+
+def prepare(svc, n):
+    rnd = random.Random(7)
+    cats = DataService.CATEGORIES
+    with svc.db.tx() as cx:
+        cx.executemany(
+            "INSERT INTO stock_items(code, name, category, milyem, ayar, gram, qty, sell_price, isc_tip, isc_alinan) "
+            "VALUES (?,?,?,?,?,?,?,?,?,?)",
+            ((f"P{i:07}", f"Ürün {i}", cats[i % len(cats)], rnd.choice((916, 995, 750, None)),
+              rnd.choice((22, 24, 18, 14)), round(rnd.uniform(0.5, 25), 2), rnd.randint(1, 25), 0.0,
+              rnd.choice(("Milyem", "Gram", "TL")), round(rnd.uniform(0, 20), 2)) for i in range(n)))
+    svc._stock_written()
+
+
+def per_row(svc, base, limit):
+    # Eski yol: satır başına hesap + ayrı UPDATE
+    t0 = time.perf_counter()
+    rows = svc.catalog.rows[:limit]
+    with svc.db.tx() as cx:
+        for r in rows:
+            mil = r["milyem"] or pricing.MILYEM_BY_AYAR.get(r["ayar"], pricing.DEFAULT_MILYEM)
+            unit = math.floor(r["gram"] * mil / 1000 * base * 1.03 / 10 + 0.5) * 10
+            cx.execute("UPDATE stock_items SET sell_price = ? WHERE id = ?", (unit, r["id"]))
+    return (time.perf_counter() - t0) / len(rows)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    with tempfile.TemporaryDirectory() as d:
+        svc = DataService(os.path.join(d, "bench_reprice.db"))
+        t0 = time.perf_counter()
+        prepare(svc, n)
+        print(f"✓ {n:,} stok kartı eklendi ve kataloğa yüklendi: {time.perf_counter() - t0:.1f} sn")
+
+        each = per_row(svc, 3000.0, min(n, 20_000))
+        print(f"✓ satır başına (tahmini, {n:,} kart): {each * n:6.2f} sn ({each * 1e6:.1f} µs/kart)")
+
+        for base in (3000.0, 3012.5, 3012.5):
+            t0 = time.perf_counter()
+            inv = pricing.from_catalog(svc.catalog)
+            t1 = time.perf_counter()
+            prices = pricing.compute(inv, base, RULES)
+            t2 = time.perf_counter()
+            changed = svc.reprice_stock(base, RULES)
+            t3 = time.perf_counter()
+            print(f"✓ baz {base:8.2f}: reprice_stock {t3 - t2:6.3f} sn, {changed:>7,} değişen kart "
+                  f"(anlık görüntü {(t1 - t0) * 1000:.0f} ms, hesap {(t2 - t1) * 1000:.0f} ms)")
+        assert svc.db.query_one("SELECT COUNT(*) FROM stock_items WHERE sell_price <> ?", (0,))[0] > 0
+        svc.close()
+
+
+if __name__ == "__main__":
+    main()
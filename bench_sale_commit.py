@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Satış commit benchmark'ı: yeni müşterili, nakit tahsilatlı satışlarda saniyedeki satış sayısı.
+"3 commit" yolu eski akışı taklit eder (müşteri tx → satış tx → kasa tx);
+"tek commit" yolu create_sale'in bugünkü halidir (iç tx() çağrıları SAVEPOINT olur).
+Her iki yol synchronous=NORMAL (varsayılan) ve FULL (her commit'te fsync) ile ölçülür.
+Kullanım: python bench_sale_commit.py [satış_sayısı]
+"""
+import sys
+import os
+import tempfile
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+from data.money import from_kurus, to_kurus
+from data.service import DataService
+
+ITEMS = [{"code": f"C{j}", "name": f"Ürün {j}", "qty": 1, "unit_price": "1000", "line_total": "1000"}
+         for j in range(3)]
+
+
+def header(i, pay_type="Nakit"):
+    return {"type": "Satış", "doc_no": f"S{i}", "date": "2025-09-20",
+            "customer_text": f"Müşteri {i} — 0555 {i:07}", "pay_type": pay_type,
+            "paid_amount": "3000", "discount": "0"}
+
+
+def three_commits(svc, i):
+    # Eski akış: müşteri kendi tx'inde, satış (kasasız) ayrı, kasa kaydı ayrı commit
+    h = header(i)
+    svc._customer_id(h["customer_text"])
+    sale = svc.create_sale(dict(h, pay_type="Veresiye"), ITEMS)
+    svc.record_cash_entry(date=h["date"], time=None, account="Kasa", type="Giriş",
+                          category="Satış Tahsilatı", description=h["doc_no"],
+                          amount=from_kurus(to_kurus(h["paid_amount"])), customer_id=sale["customer_id"],
+                          sale_id=sale["sale_id"], ref_no=h["doc_no"])
+
+
+def one_commit(svc, i):
+    svc.create_sale(header(i), ITEMS)
+
+
+def run(d, label, fn, n, sync):
+    svc = DataService(os.path.join(d, f"{label}_{sync}.db"))
+    svc.db.cx.execute(f"PRAGMA synchronous = {sync};")
+    with svc.db.tx() as cx:
+        cx.executemany("INSERT INTO stock_items(code,name,qty) VALUES (?,?,?)",
+                       [(it["code"], it["name"], 10**9) for it in ITEMS])
+    commits = []
+    svc.db.cx.set_trace_callback(lambda s: commits.append(1) if s == "COMMIT" else None)
+    t0 = time.perf_counter()
+    for i in range(n):
+        fn(svc, i)
+    dt = time.perf_counter() - t0
+    svc.db.cx.set_trace_callback(None)
+    print(f"✓ {label:>10} | synchronous={sync:<6} | {n / dt:7.0f} satış/sn | satış başına {len(commits) / n:.0f} commit")
+    svc.close()
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    with tempfile.TemporaryDirectory() as d:
+        for sync in ("NORMAL", "FULL"):
+            run(d, "3 commit", three_commits, n, sync)
+            run(d, "tek commit", one_commit, n, sync)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Toplu satış benchmark'ı: çevrimdışı kasa kuyruğunun yeniden oynatılması gibi N satışı
+create_sale döngüsü ile create_sales_batch arasında karşılaştırır (hedef: ≥10k satış/dk).
+Satışlar 3 satırlı, 500 farklı müşteriye dağılır; üçte biri nakit, üçte biri kart, kalanı veresiye.
+Kullanım: python bench_sales_batch.py [satış_sayısı] [parça_boyu]
+"""
+import sys
+import os
+import tempfile
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+from data.service import DataService
+
+PRODUCTS = 200
+
+
+def make_sales(n):
+    for i in range(n):
+        pay_type = ("Nakit", "Kart", "Veresiye")[i % 3]
+        header = {"type": "Satış", "doc_no": f"W{i}", "date": "2025-09-20",
+                  "customer_text": f"Müşteri {i % 500} — 0555 {i % 500:07}",
+                  "pay_type": pay_type, "paid_amount": "1.500", "discount": "0"}
+        items = [{"code": f"P{(i * 7 + j) % PRODUCTS:03}", "name": "Ürün", "qty": 1,
+                  "unit_price": "500", "line_total": "500"} for j in range(3)]
+        yield header, items
+
+
+def fresh(d, name):
+    svc = DataService(os.path.join(d, name))
+    with svc.db.tx() as cx:
+        cx.executemany("INSERT INTO stock_items(code,name,qty) VALUES (?,?,?)",
+                       [(f"P{k:03}", "Ürün", 10**9) for k in range(PRODUCTS)])
+    return svc
+
+
+def report(label, n, dt):
+    print(f"✓ {label:<22}: {n:6d} satış {dt:6.2f} sn | {n / dt * 60:9,.0f} satış/dk".replace(",", "."))
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    chunk = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+    with tempfile.TemporaryDirectory() as d:
+        svc = fresh(d, "loop.db")
+        loop_n = min(n, 2000)
+        t0 = time.perf_counter()
+        for header, items in make_sales(loop_n):
+            svc.create_sale(header, items)
+        report("create_sale döngüsü", loop_n, time.perf_counter() - t0)
+        svc.close()
+
+        svc = fresh(d, "batch.db")
+        t0 = time.perf_counter()
+        results = svc.create_sales_batch(make_sales(n), chunk_size=chunk)
+        report(f"create_sales_batch/{chunk}", n, time.perf_counter() - t0)
+        assert all(r["success"] for r in results)
+        svc.close()
+
+
+if __name__ == "__main__":
+    main()
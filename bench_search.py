@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Arama benchmark'ı: 500k stok ve 200k cari üzerinde search_stock / search_customers süreleri
+(FTS5 trigram) ile eski Python `in` taramasının karşılaştırması.
+Kullanım: python bench_search.py [stok_sayısı] [cari_sayısı]
+"""
+import sys
+import os
+import random
+import statistics
+import tempfile
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+from data.service import DataService
+
+CATS = ["Bilezik", "Yüzük", "Kolye", "Küpe", "Külçe", "Gram"]
+ADJ = ["Şahmeran", "Burma", "Hasır", "Trabzon", "Zincir", "Tektaş", "Ajda", "Mega", "Çift", "Işıltı", "İnce", "Kalın"]
+FIRST = ["Ahmet", "Ayşe", "Mehmet", "Fatma", "İsmail", "Işık", "Şule", "Çağrı", "Gülşen", "Ömer", "Ümit", "Zeynep"]
+LAST = ["Yılmaz", "Kaya", "Demir", "Şahin", "Çelik", "Yıldız", "Öztürk", "Aydın", "Özdemir", "Arslan", "Doğan"]
+
+STOCK_QUERIES = ["bilezik", "sahmeran 22", "ışıltı kolye", "STK123456", "ajda", "ka", "burma yüzük 18", "zzz yok"]
+CUST_QUERIES = ["ahmet", "isik celik", "0532 1", "ömer öz", "yıl", "xq"]
+
+def timed(fn, queries, rounds=20):
+    times = []
+    for _ in range(rounds):
+        for q in queries:
+            t0 = time.perf_counter()
+            fn(q)
+            times.append((time.perf_counter() - t0) * 1000)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.95)], times[-1]
+
+def main():
+    n_stock = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    n_cust = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    rnd = random.Random(7)
+    with tempfile.TemporaryDirectory() as d:
+        svc = DataService(os.path.join(d, "bench_search.db"))
+        t0 = time.perf_counter()
+        with svc.db.tx() as cx:
+            cx.executemany("INSERT INTO stock_items(code,name,category,qty) VALUES (?,?,?,1)",
+                           ((f"STK{i:06}", f"{rnd.choice(ADJ)} {c} {rnd.choice([14, 18, 22, 24])} Ayar", c)
+                            for i, c in ((i, rnd.choice(CATS)) for i in range(n_stock))))
+            cx.executemany("INSERT INTO customers(name, phone) VALUES (?,?)",
+                           ((f"{rnd.choice(FIRST)} {rnd.choice(LAST)} {i}", f"05{rnd.randint(30, 59)} {rnd.randint(100, 999)} "
+                             f"{rnd.randint(10, 99)} {rnd.randint(10, 99)}") for i in range(n_cust)))
+        print(f"✓ {n_stock:,} stok + {n_cust:,} cari eklendi (tetikleyicilerle): {time.perf_counter() - t0:.1f} sn")
+
+        p50, p95, worst = timed(svc.search_stock, STOCK_QUERIES)
+        print(f"   - search_stock     : p50 {p50:.2f} ms, p95 {p95:.2f} ms, en kötü {worst:.2f} ms")
+        p50, p95, worst = timed(svc.search_customers, CUST_QUERIES)
+        print(f"   - search_customers : p50 {p50:.2f} ms, p95 {p95:.2f} ms, en kötü {worst:.2f} ms")
+
+        # Eski yol: tüm satırlar bellekte, her tuşta casefold + `in`
+        rows = [(r["code"], r["name"]) for r in svc.list_stock()]
+        def legacy(q):
+            q = q.casefold()
+            return [c for c, n in rows if q in c.casefold() or q in n.casefold()]
+        p50, p95, worst = timed(legacy, STOCK_QUERIES, rounds=2)
+        print(f"   - eski `in` taraması: p50 {p50:.2f} ms, p95 {p95:.2f} ms")
+        svc.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Liste araması benchmark'ı (başsız, QT_QPA_PLATFORM=offscreen): N stok kartı ve N cari (varsayılan 200k)
+üzerinde arama kutusuna harf harf yazma. Süzgeç gecikmeli (debounce) uygulandığı için her ölçüm bir
+tuşun süzgeç işidir (setText + apply_filters, boyama hariç); hedef tuş başına < 16 ms.
+Karşılaştırma: eski satır satır casefold taraması; ayrıca dizin kurulumu ve tek satırlık delta süresi.
+Kullanım: python bench_search_filter.py [satır_sayısı]
+"""
+import sys
+import os
+import random
+import tempfile
+import time
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+from PyQt6.QtWidgets import QApplication
+
+from data.service import DataService
+
+QUERIES = ["bilezik 2", "22 ayar", "p000123", "ışıl", "YÜZÜK 18 AYAR 1", "zz"]
+NAMES = ["Ahmet Yılmaz", "Mehmet Demir", "Zeynep Arslan", "Ayşe Kaya", "Ali Çelik", "Işıl Öztürk"]
+TARGET_MS = 16.0
+
+
+def fake_stock(n):
+    rnd = random.Random(11)
+    cats = DataService.CATEGORIES
+    return [{"id": i + 1, "code": f"P{i:07}",
+             "name": f"{cats[i % len(cats)]} {rnd.choice(('22', '18', '14'))} Ayar {rnd.choice(NAMES).split()[0]} {i}",
+             "category": cats[i % len(cats)], "milyem": 916.0, "ayar": 22, "gram": round(rnd.uniform(0.5, 25), 2),
+             "qty": rnd.randint(0, 25), "buy_price": 100.0, "sell_price": round(rnd.uniform(500, 50000), 2),
+             "isc_tip": "TL", "isc_alinan": 0.0, "isc_verilen": 0.0, "vat": 20.0, "critical_qty": 3}
+            for i in range(n)]
+
+
+def fake_customers(n):
+    rnd = random.Random(7)
+    return [{"id": i + 1, "code": f"CAR{i + 1:06}", "name": f"{rnd.choice(NAMES)} {i}",
+             "phone": f"05{rnd.randrange(10**9):09}", "last_txn_at": "2025-09-20", "status": "Aktif"}
+            for i in range(n)]
+
+
+def ms(fn, *args):
+    t0 = time.perf_counter()
+    fn(*args)
+    return (time.perf_counter() - t0) * 1000
+
+
+def type_query(page, query):
+    """Sorguyu harf harf yazar; her tuşun süzgeç süresi (ms) listesi."""
+    out = []
+    for k in range(1, len(query) + 1):
+        page.search.setText(query[:k])
+        out.append(ms(page.apply_filters))
+    page.search.setText("")
+    page.apply_filters()
+    return out
+
+
+def report(label, page):
+    worst = []
+    type_query(page, QUERIES[0])                # ısınma (ilk çağrılardaki önbellek/ayırma maliyeti)
+    for q in QUERIES:
+        keys = type_query(page, q)
+        worst.append(max(keys))
+        print(f"          {q!r:<20} tuş başına en kötü {max(keys):6.2f} ms, ortalama {sum(keys) / len(keys):6.2f} ms")
+    mark = "✓" if max(worst) < TARGET_MS else "✗"
+    print(f"{mark} {label}: tüm sorgularda tuş başına en kötü {max(worst):.2f} ms (hedef < {TARGET_MS:.0f} ms)")
+
+
+def old_scan(keys, text):
+    # Eski yol: her tuşta tüm satırlarda casefold + alt dize
+    t = text.casefold()
+    return [i for i, (c, a) in enumerate(keys) if t in c.casefold() or t in a.casefold()]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    app = QApplication.instance() or QApplication([])
+    from pages.stock import StockPage
+    from pages.customers import CustomersPage
+    with tempfile.TemporaryDirectory() as d:
+        svc = DataService(os.path.join(d, "bench_search.db"))
+        stock = fake_stock(n)
+        svc.catalog.load_rows(stock)
+        page = StockPage(svc)
+        t = ms(page.reload_from_db)
+        print(f"✓ {n:,} stok kartı | yeniden yükleme (depo + trigram dizini) {t:.0f} ms")
+        report("stok", page)
+        keys = [(r["code"], r["name"]) for r in stock]
+        old = max(ms(old_scan, keys, "bilezik 2"[:k]) for k in range(1, 10))
+        print(f"          eski casefold taraması: tuş başına en kötü {old:.1f} ms")
+
+        # Tek satırın adı değişti: dizin yerinde güncellenir, süzgeç yeniden uygulanır
+        page.search.setText("zümrüt")
+        page.apply_filters()
+        with svc.catalog._lock:
+            row = dict(svc.catalog.rows[n // 2], name="Zümrüt Kolye")
+        delta = svc.catalog.refresh_rows([row["id"]], [row])
+        t = ms(page.on_stock_delta, delta)
+        print(f"✓ ad değişikliği deltası {t:.2f} ms → {page.model.rowCount()} eşleşme")
+        # Yeni ürün: depoya ve dizine eklenir (yeniden yükleme yok)
+        delta = svc.catalog.refresh_rows([n + 1], [dict(row, id=n + 1, code="YENI1", name="Zümrüt Küpe")])
+        t = ms(page.on_stock_delta, delta)
+        print(f"✓ ekleme deltası {t:.2f} ms → {page.model.rowCount()} eşleşme")
+        page.deleteLater()
+        app.processEvents()
+
+        svc.list_customers = lambda ids=None: fake_customers(n)   # DB'ye yazmadan sayfayı besle
+        page = CustomersPage(svc)
+        print(f"✓ {n:,} cari | yeniden yükleme {ms(page.reload_from_db):.0f} ms")
+        report("cari", page)
+        page.deleteLater()
+        app.processEvents()
+        svc.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Stok düşüm benchmark'ı: 50 satırlık satışları saniyede kaç adet işleyebildiğimizi ölçer.
+"Satır başına" yolu eski davranışı taklit eder (her satır için SELECT + UPDATE);
+"küme" yolu create_sale'in tek IN sorgusu + koşullu toplu UPDATE yoludur.
+Kullanım: python bench_stock_sale.py [satış_sayısı] [satır_sayısı]
+"""
+import sys
+import os
+import tempfile
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+from data.service import DataService
+
+
+def prepare(svc, lines):
+    with svc.db.tx() as cx:
+        cx.executemany("INSERT INTO stock_items(code,name,qty) VALUES (?,?,?)",
+                       [(f"B{i:04}", f"Ürün {i}", 10**9) for i in range(lines)])
+
+
+def sale(i, lines):
+    header = {"type": "Satış", "doc_no": f"S{i}", "date": "2025-09-20", "customer_text": "",
+              "pay_type": "Kart", "paid_amount": "0", "discount": "0"}
+    items = [{"code": f"B{j:04}", "name": f"Ürün {j}", "qty": 1, "unit_price": "10", "line_total": "10"}
+             for j in range(lines)]
+    return header, items
+
+
+def per_line_decrement(svc, items):
+    # Eski yol: satır başına arama + ayrı UPDATE (aynı yazma işleminde)
+    with svc.db.tx() as cx:
+        for it in items:
+            sid, qty = cx.execute("SELECT id, qty FROM stock_items WHERE code=?", (it["code"],)).fetchone()
+            if qty < int(it["qty"]):
+                raise ValueError(it["code"])
+            cx.execute("UPDATE stock_items SET qty = qty - ? WHERE id=?", (int(it["qty"]), sid))
+
+
+def set_based_decrement(svc, items):
+    with svc.db.tx() as cx:
+        stock = svc._stock_rows(cx, {it["code"] for it in items})
+        cx.executemany("UPDATE stock_items SET qty = qty - ? WHERE id = ? AND qty >= ?",
+                       [(int(it["qty"]), stock[it["code"]][0], int(it["qty"])) for it in items])
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    lines = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    with tempfile.TemporaryDirectory() as d:
+        svc = DataService(os.path.join(d, "bench_stock.db"), sql_stats=True)
+        prepare(svc, lines)
+
+        for label, fn in (("satır başına", per_line_decrement), ("küme", set_based_decrement)):
+            svc.db.stats.reset()
+            t0 = time.perf_counter()
+            for i in range(n):
+                fn(svc, sale(i, lines)[1])
+            dt = time.perf_counter() - t0
+            stmts = sum(r["count"] for r in svc.query_stats(limit=None))
+            print(f"✓ düşüm ({label:>12}): {n / dt:8.0f} işlem/sn | işlem başına {stmts / n:5.1f} ifade")
+
+        svc.db.stats.reset()
+        t0 = time.perf_counter()
+        for i in range(n):
+            svc.create_sale(*sale(i, lines))
+        dt = time.perf_counter() - t0
+        stmts = sum(r["count"] for r in svc.query_stats(limit=None))
+        print(f"✓ create_sale ({lines} satır): {n / dt:8.0f} satış/sn | satış başına {stmts / n:5.1f} ifade")
+        svc.close()
+
+
+if __name__ == "__main__":
+    main()
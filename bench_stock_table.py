@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+StockPage tablo benchmark'ı (başsız, QT_QPA_PLATFORM=offscreen): 10k / 100k / 500k stok kartında
+yeniden yükleme, arama kutusuna harf harf yazma, kategori süzgeci ve sütun sıralaması süreleri.
+Model/görünüm (StockTableModel) yolu, eski QTableWidget yoluyla (satır başına 13 öğe) karşılaştırılır;
+eski yol yalnızca 100k'ya kadar ölçülür. Her ölçüm iki süre verir: model/süzgeç işi ve görünen hücrelerin
+boyanması dahil toplam (sayfadaki cam kart gölgesi her boyamada ~50 ms sabit ekler). RSS Qt belleğini de sayar.
+Kullanım: python bench_stock_table.py [kart_sayısı ...]
+"""
+import sys
+import os
+import random
+import tempfile
+import time
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QApplication, QTableWidget, QTableWidgetItem
+
+from data.service import DataService
+
+OLD_LIMIT = 100_000
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+
+def fake_rows(n):
+    rnd = random.Random(11)
+    cats = DataService.CATEGORIES
+    return [{"id": i + 1, "code": f"P{i:07}",
+             "name": f"{cats[i % len(cats)]} {rnd.choice(('22', '18', '14'))} Ayar {i}",
+             "category": cats[i % len(cats)], "milyem": 916.0, "ayar": 22, "gram": round(rnd.uniform(0.5, 25), 2),
+             "qty": rnd.randint(0, 25), "buy_price": 100.0, "sell_price": round(rnd.uniform(500, 50000), 2),
+             "isc_tip": "TL", "isc_alinan": 0.0, "isc_verilen": 0.0, "vat": 20.0, "critical_qty": 3}
+            for i in range(n)]
+
+
+class Timing:
+    def __init__(self, work, total):
+        self.work, self.total = work, total
+
+    def __str__(self):
+        return f"{self.work:7.1f} ms ({self.total:6.1f} boyamayla)"
+
+
+def timed(app, widget, fn, *args):
+    t0 = time.perf_counter()
+    fn(*args)
+    t1 = time.perf_counter()
+    app.processEvents()
+    widget.viewport().grab()   # görünen hücreler gerçekten boyansın
+    return Timing((t1 - t0) * 1000, (time.perf_counter() - t0) * 1000)
+
+
+def search(page, text):
+    # Arama kutusu gecikmeli (debounce): metni yaz ve süzgeci beklemeden uygula
+    page.search.setText(text)
+    page.apply_filters()
+
+
+def old_populate(table, rows):
+    # Eski StockPage.populate_table: satır başına 13 QTableWidgetItem, sayılar hemen biçimlenir
+    table.clearContents()
+    table.setRowCount(len(rows))
+    for i, r in enumerate(rows):
+        table.setItem(i, 0, QTableWidgetItem(r["code"]))
+        table.setItem(i, 1, QTableWidgetItem(r["category"]))
+        table.setItem(i, 2, QTableWidgetItem(r["name"]))
+        for c, (key, suffix) in enumerate((("milyem", ""), ("ayar", ""), ("gram", ""), ("qty", ""),
+                                           ("buy_price", " ₺"), ("sell_price", " ₺"), ("isc_tip", ""),
+                                           ("isc_alinan", " ₺"), ("isc_verilen", " ₺"), ("vat", " %")), start=3):
+            v = r[key]
+            it = QTableWidgetItem(f"{v:.2f}{suffix}" if isinstance(v, float) else str(v))
+            it.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+            table.setItem(i, c, it)
+
+
+def run(app, n, d):
+    from pages.stock import StockPage
+    svc = DataService(os.path.join(d, f"bench_table_{n}.db"))
+    rows = fake_rows(n)
+    svc.catalog.load_rows(rows)   # tablo yalnızca katalogdan okur: DB'ye yazmaya gerek yok
+    page = StockPage(svc)
+    page.resize(1400, 900)
+    page.show()
+    app.processEvents()
+
+    rss = rss_mb()
+    reload_ = min((timed(app, page.table, page.reload_from_db) for _ in range(3)), key=lambda t: t.total)
+    print(f"✓ {n:>7,} kart | yeniden yükleme {reload_} | model belleği ~{rss_mb() - rss:+.0f} MB RSS")
+    typing = [timed(app, page.table, search, page, "bilezik"[:k]) for k in range(1, 8)]
+    worst = max(typing, key=lambda t: t.work)
+    print(f"          'bilezik' yazma, harf başına en kötü {worst} | "
+          f"temizle {timed(app, page.table, search, page, '')}")
+    print(f"          kategori {timed(app, page.table, page.filter.setCurrentText, 'Yüzük')}")
+    by_price = timed(app, page.table, page.table.sortByColumn, 8, Qt.SortOrder.DescendingOrder)
+    by_name = timed(app, page.table, page.table.sortByColumn, 2, Qt.SortOrder.AscendingOrder)
+    print(f"          satış fiyatına göre sırala {by_price} | ada göre {by_name}")
+
+    if n <= OLD_LIMIT:
+        table = QTableWidget(0, 13)
+        table.resize(1400, 800)
+        table.show()
+        rss = rss_mb()
+        old_ms = timed(app, table, old_populate, table, rows)
+        print(f"          eski QTableWidget doldurma {old_ms} | ~{rss_mb() - rss:+.0f} MB RSS")
+        table.deleteLater()
+    page.deleteLater()
+    app.processEvents()
+    svc.close()
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 100_000, 500_000]
+    app = QApplication.instance() or QApplication([])
+    with tempfile.TemporaryDirectory() as d:
+        for n in sizes:
+            run(app, n, d)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Yazıcı kuyruğu benchmark'ı: senkron record_cash_entry ile group commit'li asenkron yolun
+saniyedeki yazım sayısını karşılaştırır.
+Kullanım: python bench_write_queue.py [kayıt_sayısı] [synchronous: NORMAL|FULL]
+"""
+import sys
+import os
+import tempfile
+import time
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+from data.service import DataService
+
+def entry(i):
+    return dict(date="2025-09-20", time="10:00", account="Kasa", type="Giriş",
+                category="Bench", description=f"kayıt {i}", amount=100.0 + i)
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    sync_mode = sys.argv[2] if len(sys.argv) > 2 else "FULL"
+    with tempfile.TemporaryDirectory() as d:
+        svc = DataService(os.path.join(d, "bench_sync.db"))
+        svc.db.cx.execute(f"PRAGMA synchronous = {sync_mode};")
+        t0 = time.perf_counter()
+        for i in range(n):
+            svc.record_cash_entry(**entry(i))
+        dt_sync = time.perf_counter() - t0
+        svc.close()
+
+        svc = DataService(os.path.join(d, "bench_async.db"))
+        svc.db.cx.execute(f"PRAGMA synchronous = {sync_mode};")
+        t0 = time.perf_counter()
+        futs = [svc.record_cash_entry_async(**entry(i)) for i in range(n)]
+        for f in futs:
+            f.result()
+        dt_async = time.perf_counter() - t0
+        commits = svc.writer.commits
+        svc.close()
+
+    print(f"✓ {n} kasa kaydı (synchronous={sync_mode})")
+    print(f"   - Senkron : {n / dt_sync:,.0f} yazım/sn ({n} commit)")
+    print(f"   - Kuyruk  : {n / dt_async:,.0f} yazım/sn ({commits} commit)")
+
+if __name__ == "__main__":
+    main()
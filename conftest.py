@@ -0,0 +1,36 @@
+"""
+Testlerin ortak parçaları: app/ içe aktarma yolu, QApplication (offscreen) ve örnek fiş/stok kayıtları.
+Modüle özgü kurulum (tohum verisi, sayfa, sunucu) test dosyalarında kalır.
+"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+CUSTOMER = "Ayşe Kaya — 0532 111 22 33"
+CUSTOMERS = [CUSTOMER, "Mehmet Demir — 0555 000 11 22", "Zeynep Ak — 0541 222 33 44"]
+
+
+def sale_header(doc_no, customer=CUSTOMER, paid="100", **kw) -> dict:
+    """Nakit satış fişi başlığı (2025-09-20); diğer alanlar kw ile ezilir."""
+    return {"type": "Satış", "doc_no": doc_no, "date": "2025-09-20", "customer_text": customer,
+            "pay_type": "Nakit", "paid_amount": paid, "discount": "0", **kw}
+
+
+def sale_items(code="STK0001", qty=1, price=100) -> list:
+    return [{"code": code, "name": "Ürün", "qty": qty, "unit_price": str(price), "line_total": str(price * qty)}]
+
+
+def stock_item(code, qty, category="Yüzük", sell_price=150.0) -> dict:
+    return {"code": code, "name": f"Ürün {code}", "category": category, "milyem": 916, "ayar": 22, "gram": 2.5,
+            "qty": qty, "buy_price": 100.0, "sell_price": sell_price, "isc_tip": "TL", "isc_alinan": 0.0,
+            "isc_verilen": 0.0, "vat": 20.0, "critical_qty": 1}
+
+
+@pytest.fixture
+def app():
+    QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
@@ -0,0 +1,187 @@
+import threading
+import time
+
+import pytest
+
+from conftest import CUSTOMER, sale_header, sale_items, stock_item
+from data.market import Session
+from data.remote import RemoteDataService
+from data.service import DataService
+from server import ApiServer
+
+
+def _sale(doc_no, code="A1", qty=1, customer=CUSTOMER):
+    return sale_header(doc_no, customer, paid="150"), sale_items(code, qty, price=150)
+
+
+def _wait(cond, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not cond() and time.monotonic() < deadline:
+        time.sleep(0.02)
+    return cond()
+
+
+def _serve(tmp_path, **kw):
+    svc = DataService(str(tmp_path / "server.db"))
+    for code, qty in (("A1", 5), ("B2", 1)):
+        svc.upsert_stock_item(stock_item(code, qty))
+    srv = ApiServer(svc, port=0, **kw).start_background()
+    srv.url = f"http://127.0.0.1:{srv.port}"
+    return srv
+
+
+@pytest.fixture
+def server(tmp_path):
+    srv = _serve(tmp_path)
+    yield srv
+    srv.stop()
+    srv.svc.close()
+
+
+def test_terminal_sale_reaches_other_terminals(server):
+    a, b = RemoteDataService(server.url, poll_wait=2), RemoteDataService(server.url, poll_wait=2)
+    assert b.catalog.get("A1")["qty"] == 5 and len(b.catalog) == 2
+    payload = a.create_sale(*_sale("T1", qty=2))
+    assert payload["total"] == 300.0
+    assert server.svc.catalog.get("A1")["qty"] == 3
+    # Diğer terminal uzun yoklamayla yalnızca değişen satırı çeker
+    assert _wait(lambda: b.catalog.get("A1")["qty"] == 3)
+    cid = b.find_customer_id("Ayşe Kaya")
+    assert cid and [r["id"] for r in b.list_customers([cid])] == [cid]
+    assert b.get_recent_transactions(5)[0]["doc_no"] == "T1"
+    assert b.sales_kpis("2025-09-20")["daily"] == 300.0
+    assert b.search_stock("B2") == [server.svc.catalog.get("B2")["id"]]
+    a.close()
+    b.close()
+
+
+def test_business_errors_are_value_errors(server):
+    t = RemoteDataService(server.url, poll_wait=2)
+    with pytest.raises(ValueError, match="B2"):
+        t.create_sale(*_sale("T2", code="B2", qty=3))
+    assert server.svc.catalog.get("B2")["qty"] == 1          # geri alındı
+    rid = t.record_cash_entry(date="2025-09-20", time="10:00", account="Kasa", type="Giriş",
+                              category="Diğer", description="Terminal", amount=42.5)
+    assert [r["amount_kurus"] for r in t.list_cash_ledger([rid])] == [4250]
+    t.upsert_stock_item(stock_item("C3", 7))
+    assert _wait(lambda: t.catalog.get("C3") is not None)
+    t.delete_stock_item("C3")
+    assert _wait(lambda: t.catalog.get("C3") is None)
+    t.close()
+
+
+def test_concurrency_limit_rejects_overflow(tmp_path):
+    server = _serve(tmp_path, max_inflight=1, max_queue=0)
+    gate = threading.Event()
+    server.svc.submit_write(gate.wait)           # yazıcıyı meşgul et → ilk istek yuvayı tutar
+    first = {}
+    body = b'{"date": "2025-09-20", "time": "10:00", "account": "Kasa", "type": "Giri\\u015f", ' \
+           b'"category": "Di\\u011fer", "description": "x", "amount": 1}'
+    th = threading.Thread(target=lambda: first.update(r=Session().request(
+        "POST", server.url + "/api/cash", {"Content-Type": "application/json"}, 10, body)))
+    th.start()
+    assert _wait(lambda: server._slots.locked())
+    status, headers, _ = Session().get(server.url + "/api/stock", {}, 5)
+    assert status == 503 and headers["Retry-After"] == "1"
+    status, _, _ = Session().get(server.url + "/api/health", {}, 5)   # sağlık kontrolü sınırsız
+    assert status == 200
+    gate.set()
+    th.join(5)
+    assert first["r"][0] == 200 and server.stats["rejected"] == 1
+    server.stop()
+    server.svc.close()
+
+
+def test_unknown_route_and_bad_input(server):
+    s = Session()
+    assert s.get(server.url + "/api/nope", {}, 5)[0] == 404
+    assert s.get(server.url + "/api/customers/find", {}, 5)[0] == 400
+    assert s.request("POST", server.url + "/api/sales", {}, 5, b"not json")[0] == 400
+
+
+def test_pages_over_http(server):
+    t = RemoteDataService(server.url, poll_wait=2)
+    for i in range(5):
+        t.record_cash_entry(date=f"2025-09-2{i}", time="10:00", account="Kasa", type="Giriş",
+                            category="Diğer", description=f"Tahsilat {i}", amount=10)
+    first = t.page_cash_ledger({"account": "Kasa"}, limit=3)
+    rest = t.page_cash_ledger({"account": "Kasa"}, first["next"], limit=3)
+    assert [r["date"] for r in first["rows"] + rest["rows"]] == [f"2025-09-2{i}" for i in range(4, -1, -1)]
+    assert rest["next"] is None and t.count_cash_ledger({"account": "Kasa", "type": "Giriş"}) == 5
+    by_amount = t.page_cash_ledger({"account": "Kasa"}, limit=2, order=("amount_kurus", False))
+    assert len(by_amount["rows"]) == 2 and by_amount["next"][0] == 1000
+    assert t.cash_ledger_totals({"account": "Kasa", "date_from": "2025-09-22"}) == \
+        {"count": 3, "giris": 30.0, "cikis": 0.0, "net": 30.0}
+    assert [r["code"] for r in t.page_stock({"text": "A1"})["rows"]] == ["A1"] and t.count_stock() == 2
+    t.close()
+
+
+def test_cash_edits_over_http(server):
+    t = RemoteDataService(server.url, poll_wait=2)
+    t.create_sale(*_sale("K1"))
+    rid, sale_id = server.svc.db.query_one("SELECT id, sale_id FROM cash_ledger WHERE ref_no = 'K1'")
+    entry = dict(date="2025-09-20", time="11:00", account="Banka — Ziraat", type="Giriş", category="Düzeltme",
+                 description="Düzeltildi", amount=149.99, currency_code="USD", amount_foreign=5.0, fx_rate=30.0)
+    assert t.update_cash_entry(rid, **entry) is True
+    row = t.list_cash_ledger([rid])[0]
+    assert (row["account"], row["amount_kurus"], row["currency_code"]) == ("Banka — Ziraat", 14999, "USD")
+    assert server.svc.db.query_one("SELECT sale_id FROM cash_ledger WHERE id = ?", (rid,))[0] == sale_id
+    assert t.cash_balances("2025-09-20") == {"Banka — Ziraat": 149.99, "Kasa": 0.0}
+    assert t.delete_cash_entry(rid) is True and t.list_cash_ledger([rid]) == []
+    assert t.delete_cash_entry(rid) is False and t.update_cash_entry(rid, **entry) is False
+    rid = t.record_cash_entry(**entry)
+    t.close_day("2025-09-20")
+    with pytest.raises(ValueError, match="Dönem kapalı"):
+        t.delete_cash_entry(rid)
+    t.close()
+
+
+def test_day_close_over_http(server):
+    t = RemoteDataService(server.url, poll_wait=2)
+    t.create_sale(*_sale("Z1"))
+    assert t.z_report("2025-09-20") is None and t.last_close() is None
+    rep = t.close_day("2025-09-20")
+    assert rep["cash"] == [{"account": "Kasa", "opening": 0.0, "in": 150.0, "out": 0.0, "closing": 150.0}]
+    assert t.z_report("2025-09-20")["text"] == rep["text"] and t.last_close() == "2025-09-20"
+    assert t.cash_balances("2025-09-20") == {"Kasa": 150.0}
+    with pytest.raises(ValueError, match="Dönem kapalı"):          # kapanmış güne satış: 400
+        t.create_sale(*_sale("Z2"))
+    with pytest.raises(ValueError, match="zaten kapalı"):
+        t.close_day("2025-09-20")
+    t.close()
+
+
+def test_writes_need_the_shared_token(tmp_path):
+    server = _serve(tmp_path, token="s3cret")
+    s = Session()
+    body = b'{"day": "2025-09-20"}'
+    assert s.request("POST", server.url + "/api/closes", {}, 5, body)[0] == 401
+    assert s.request("DELETE", server.url + "/api/stock/A1", {"Authorization": "Bearer yanlis"}, 5)[0] == 401
+    assert s.get(server.url + "/api/stock", {}, 5)[0] == 200              # okumalar açık
+    assert server.svc.catalog.get("A1") is not None and server.svc.last_close() is None
+    with pytest.raises(RuntimeError, match="401"):
+        RemoteDataService(server.url, poll_wait=2, token="yanlis").delete_stock_item("A1")
+    t = RemoteDataService(server.url, poll_wait=2, token="s3cret")
+    t.delete_stock_item("A1")
+    assert server.svc.catalog.get("A1") is None
+    t.close()
+    server.stop()
+    server.svc.close()
+
+
+def test_cli_defaults_to_loopback_and_needs_token_on_network(tmp_path, monkeypatch):
+    import server as server_mod
+    monkeypatch.delenv("ORBITX_API_TOKEN", raising=False)
+    with pytest.raises(SystemExit):
+        server_mod.main(["--db", str(tmp_path / "cli.db"), "--host", "0.0.0.0", "--no-market"])
+    got = {}
+
+    class Fake:
+        def __init__(self, svc, host, port, **kw):
+            got.update(host=host, token=kw["token"])
+
+        async def serve_forever(self):
+            pass
+    monkeypatch.setattr(server_mod, "ApiServer", Fake)
+    server_mod.main(["--db", str(tmp_path / "cli.db"), "--no-market"])
+    assert got == {"host": "127.0.0.1", "token": None}
@@ -0,0 +1,102 @@
+import random
+
+import pytest
+
+from app.data import balances
+from app.data.service import DataService
+
+ACCOUNTS = ["Kasa", "Banka — Ziraat", "Banka — VakıfBank"]
+
+
+@pytest.fixture
+def svc(tmp_path):
+    svc = DataService(str(tmp_path / "balances.db"))
+    rnd = random.Random(4)
+    with svc.db.tx() as cx:
+        cx.executemany("INSERT INTO cash_ledger(date, time, account, type, category, description, amount_kurus) "
+                       "VALUES (?,?,?,?,?,?,?)",
+                       [(f"2025-{8 + i % 2:02}-{1 + rnd.randrange(28):02}", f"{8 + rnd.randrange(10):02}:{rnd.randrange(60):02}",
+                         rnd.choice(ACCOUNTS), rnd.choice(("Giriş", "Çıkış")), "Diğer", f"Hareket {i}",
+                         rnd.randrange(1, 10**6)) for i in range(600)])
+    svc.refresh_balances()
+    yield svc
+    svc.close()
+
+
+def _brute(svc, day):
+    out = dict.fromkeys(ACCOUNTS, 0)
+    for r in svc.db.query("SELECT account, type, amount_kurus FROM cash_ledger WHERE date <= ?", (day,)):
+        out[r["account"]] = out.get(r["account"], 0) + (r["amount_kurus"] if r["type"] == "Giriş" else -r["amount_kurus"])
+    return out
+
+
+def _kurus(svc, day):
+    with svc.db.read() as cx:
+        return {r["account"]: r["balance_kurus"] for r in balances.as_of(cx, day)}
+
+
+def _ckpts(svc):
+    return {(r[0], r[1]): r[2] for r in svc.db.query("SELECT account, date, balance_kurus FROM cash_balance_ckpt")}
+
+
+@pytest.mark.parametrize("day", ["2025-07-31", "2025-08-01", "2025-08-17", "2025-09-03", "2025-09-28", "2026-01-01"])
+def test_balance_as_of_matches_ledger(svc, day):
+    with svc.db.read() as cx:
+        rows = balances.as_of(cx, day)
+    assert {r["account"]: r["balance_kurus"] for r in rows} == _brute(svc, day)
+    assert max(r["stale"] for r in rows) == 0                        # kontrol noktası o günü zaten kapsıyor
+    assert svc.cash_balances(day) == pytest.approx({a: k / 100 for a, k in _kurus(svc, day).items()})
+
+
+def test_edit_invalidates_only_later_checkpoints_of_that_account(svc):
+    before = _ckpts(svc)
+    rid, account = svc.db.query_one("SELECT id, account FROM cash_ledger WHERE date = '2025-09-10' LIMIT 1")
+    other = next(a for a in ACCOUNTS if a != account)
+    with svc.db.tx() as cx:
+        cx.execute("UPDATE cash_ledger SET amount_kurus = amount_kurus + 12345 WHERE id = ?", (rid,))
+        cx.execute("DELETE FROM cash_ledger WHERE account = ? AND date = '2025-09-20'", (other,))
+        svc._cash_written("update", [rid])
+    after = _ckpts(svc)
+    assert {k: v for k, v in after.items() if k[0] == account} == \
+        {k: v for k, v in before.items() if k[0] == account and k[1] < "2025-09-10"}
+    assert {k for k in after if k[0] == other} == {k for k in before if k[0] == other and k[1] < "2025-09-20"}
+    state = dict(svc.db.query("SELECT account, dirty_since FROM cash_balance_state"))
+    assert state[account] == "2025-09-10" and state[other] == "2025-09-20"
+
+    for day in ("2025-09-09", "2025-09-15", "2025-09-30"):            # bayatken de doğru: özet toplanır
+        assert _kurus(svc, day) == _brute(svc, day)
+    assert svc.refresh_balances() == 2
+    assert _ckpts(svc).keys() >= {k for k in before if k[1] < "2025-09-10"}
+    assert _kurus(svc, "2025-09-30") == _brute(svc, "2025-09-30")
+    assert svc.refresh_balances() == 0
+
+
+def test_stale_reads_schedule_one_refresh(svc, monkeypatch):
+    monkeypatch.setattr(balances, "REFRESH_ROWS", 5)
+    with svc.db.tx() as cx:
+        cx.execute("UPDATE cash_ledger SET amount_kurus = amount_kurus + 1 WHERE date = '2025-08-01'")
+    svc.cash_balances("2025-09-30")
+    fut = svc._balance_refresh
+    assert fut is not None
+    svc.cash_balances("2025-09-30")                                  # ikinci okuma yeni iş kuyruğa koymaz
+    assert svc._balance_refresh in (fut, None)
+    touched = svc.db.query_one("SELECT COUNT(DISTINCT account) FROM cash_ledger WHERE date = '2025-08-01'")[0]
+    assert fut.result(5) == touched and svc._balance_refresh is None
+    assert svc.db.query_one("SELECT COUNT(*) FROM cash_balance_state WHERE dirty_since IS NOT NULL")[0] == 0
+    with svc.db.read() as cx:
+        assert max(r["stale"] for r in balances.as_of(cx, "2025-09-30")) == 0
+
+
+def test_account_statement_runs_balance_from_opening(svc):
+    st = svc.account_statement("Kasa", "2025-09-05", "2025-09-12")
+    rows = svc.db.query("SELECT id, type, amount_kurus FROM cash_ledger WHERE account = 'Kasa' "
+                        "AND date BETWEEN '2025-09-05' AND '2025-09-12' ORDER BY date, time, id")
+    assert [r["id"] for r in st["rows"]] == [r["id"] for r in rows]
+    assert st["opening"] == pytest.approx(_brute(svc, "2025-09-04")["Kasa"] / 100)
+    assert st["closing"] == pytest.approx(_brute(svc, "2025-09-12")["Kasa"] / 100)
+    run = _brute(svc, "2025-09-04")["Kasa"]
+    for r, want in zip(st["rows"], rows):
+        run += want["amount_kurus"] if want["type"] == "Giriş" else -want["amount_kurus"]
+        assert r["balance"] == pytest.approx(run / 100)
+    empty = svc.account_statement("Kasa", "2030-01-01", "2030-01-31")
+    assert empty["rows"] == [] and empty["opening"] == empty["closing"] == svc.cash_balances("2030-01-01")["Kasa"]
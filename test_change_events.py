@@ -0,0 +1,80 @@
+import pytest
+
+from conftest import CUSTOMERS, sale_header, sale_items
+from data.changes import ChangeBus
+from data.service import DataService
+
+
+def _svc(tmp_path, **kw):
+    svc = DataService(str(tmp_path / "changes.db"), **kw)
+    svc.seed_if_empty(CUSTOMERS[:2])
+    svc.record_cash_entry(date="2025-09-19", time="10:00", account="Kasa", type="Çıkış",
+                          category="Masraf", description="Kira", amount=500)
+    return svc
+
+
+def test_events_coalesce_within_one_tick(app):
+    bus = ChangeBus()
+    got = []
+    bus.changed.connect(got.append)
+    bus.post("customers", "update", [1, 2])
+    bus.post("customers", "insert", [3])
+    bus.post("customers", "update", [3])       # insert + update → insert
+    bus.post("customers", "delete", [2])       # update + delete → delete
+    bus.post("cash_ledger", "insert", [9])
+    bus.post("cash_ledger", "delete", [9])     # tur içinde eklenip silindi → olay yok
+    assert got == []                           # olay döngüsü dönmeden yayılmaz
+    app.processEvents()
+    assert got == [{"customers": {"insert": {3}, "update": {1}, "delete": {2}, "reset": False}}]
+    assert bus.flushes == 1
+
+
+def test_batch_posts_one_event_with_row_ids(tmp_path, app):
+    svc = _svc(tmp_path)
+    app.processEvents()
+    got = []
+    svc.changes.changed.connect(got.append)
+    res = svc.create_sales_batch([(sale_header(f"B{i}"), sale_items()) for i in range(3)])
+    app.processEvents()
+    assert len(got) == 1
+    ev = got[0]
+    assert ev["sales"]["insert"] == {r["sale_id"] for r in res}
+    cash = {r[0] for r in svc.db.query("SELECT id FROM cash_ledger WHERE sale_id IS NOT NULL")}
+    assert ev["cash_ledger"]["insert"] == cash and len(cash) == 3
+    assert ev["customers"]["update"] == {svc.find_customer_id("Ayşe Kaya", "0532 111 22 33")}
+    assert ev["stock_items"]["update"] == {svc.catalog.get("STK0001")["id"]}
+    svc.close()
+
+
+def test_sale_updates_pages_with_few_queries(tmp_path, app):
+    from pages.customers import CustomersPage
+    from pages.finance import FinancePage
+
+    svc = _svc(tmp_path, sql_stats=True)
+    customers, finance = CustomersPage(svc), FinancePage(svc)
+    app.processEvents()
+    svc.db.stats.reset()
+
+    svc.create_sale(sale_header("S1"), sale_items())
+    app.processEvents()
+
+    stats = svc.query_stats(limit=None)
+    total = sum(s["count"] for s in stats)
+    full_reloads = [s for s in stats if ("FROM customers" in s["sql"] or "FROM cash_ledger c" in s["sql"])
+                    and "ORDER BY" in s["sql"] and "IN (" not in s["sql"]]
+    assert full_reloads == []
+    # Satış yazımı (16 ifade) + change_log kaydı + katalog tazeleme + iki sayfanın id IN (…) okuması
+    # + kasa toplamı + hesap bakiyeleri = 22
+    assert total <= 22, [(s["count"], s["sql"][:60]) for s in stats]
+
+    sale_cash = svc.db.query_one("SELECT id FROM cash_ledger WHERE ref_no='S1'")[0]
+    fm = finance.model
+    assert [(r["id"], r["tutar"]) for r in map(fm.record, range(fm.rowCount()))][0] == (sale_cash, 100)
+    assert fm.rowCount() == 2 and fm.totals()["count"] == 2
+    cid = svc.find_customer_id("Ayşe Kaya", "0532 111 22 33")
+    m = customers.model
+    assert m.rows[m.pos_by_id[cid]]["Son İşlem"] == "2025-09-20"
+    assert m.index(m.row_of(m.pos_by_id[cid]), 3).data() == "2025-09-20"
+
+    customers.deleteLater(); finance.deleteLater(); app.processEvents()
+    svc.close()
@@ -0,0 +1,70 @@
+import pytest
+
+from conftest import CUSTOMER, sale_header, sale_items
+from data.service import DataService
+
+
+@pytest.fixture
+def pair(tmp_path):
+    """Aynı dosyayı açan iki bağımsız DataService (iki pencere/süreç gibi); izleyiciler elle yoklanır."""
+    path = str(tmp_path / "shared.db")
+    a, b = DataService(path), DataService(path)
+    for svc in (a, b):
+        svc.start_change_watcher(interval=3600)
+    yield a, b
+    a.close()
+    b.close()
+
+
+def test_other_process_sale_reaches_catalog_and_signals(pair):
+    a, b = pair
+    a.seed_if_empty([CUSTOMER])
+    assert len(b.catalog) == 0
+    got = b.watcher.poll()
+    assert ("stock_items", "reset", []) in got and len(b.catalog) == 10
+
+    signals, batches = [], []
+    b.customersChanged.connect(lambda: signals.append("customers"))
+    b.cashChanged.connect(lambda: signals.append("cash"))
+    b.salesBatchCommitted.connect(signals.append)
+    b.changes.changed.connect(batches.append)
+    qty = b.catalog.get("STK0001")["qty"]
+    sale = a.create_sale(sale_header("S1"), sale_items())
+
+    b.watcher.poll()
+    b.changes.flush()
+    assert b.catalog.get("STK0001")["qty"] == qty - 1
+    assert [{"sale_id": sale["sale_id"]}] in signals and "customers" in signals and "cash" in signals
+    ev = batches[-1]
+    assert ev["sales"]["insert"] == {sale["sale_id"]}
+    assert ev["stock_items"]["update"] == {b.catalog.get("STK0001")["id"]}
+    assert ev["customers"]["update"] and ev["cash_ledger"]["insert"]
+
+
+def test_own_writes_and_idle_polls_are_skipped(pair):
+    a, b = pair
+    b.upsert_stock_item({"code": "X1", "name": "Yüzük", "category": "Yüzük", "milyem": 916, "ayar": 22,
+                         "gram": 2.5, "qty": 3, "buy_price": 100.0, "sell_price": 150.0, "isc_tip": "TL",
+                         "isc_alinan": 0.0, "isc_verilen": 0.0, "vat": 20.0, "critical_qty": 1})
+    assert b.watcher.poll() == []                      # kendi yazımı: yerel sinyaller zaten yayıldı
+    assert a.watcher.poll() == [("stock_items", "update", [b.catalog.get("X1")["id"]])]
+    assert a.catalog.get("X1")["qty"] == 3
+
+    reads = a.watcher.reads
+    for _ in range(5):
+        assert a.watcher.poll() == []
+    assert a.watcher.reads == reads                    # commit yok → change_log okunmadı
+
+    with pytest.raises(RuntimeError):
+        with b.db.tx():
+            b._cash_written("insert", [99])
+            raise RuntimeError("geri al")
+    assert a.watcher.poll() == []                      # geri alınan işlem günlüğe yazılmaz
+
+
+def test_pruned_gap_reports_reset(pair):
+    a, b = pair
+    with a.db.tx() as cx:
+        cx.execute("INSERT INTO change_log(id, origin, at, changes) VALUES (?, 'x', 0, '[]')", (b.watcher.hwm + 5,))
+    assert set(t for t, op, _ in b.watcher.poll() if op == "reset") == {"stock_items", "customers",
+                                                                          "cash_ledger", "sales"}
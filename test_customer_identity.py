@@ -0,0 +1,87 @@
+from app.data import migrations
+from app.data.db import DB
+from app.data.identity import customer_key
+from app.data.service import DataService
+
+
+def _sale(svc, customer_text, doc_no):
+    svc.create_sale({"type": "Satış", "doc_no": doc_no, "date": "2025-09-20", "customer_text": customer_text,
+                     "pay_type": "Veresiye", "paid_amount": "0", "discount": "0"},
+                    [{"code": "KMK1", "name": "Künye", "qty": 1, "unit_price": "10", "line_total": "10"}])
+
+
+def _svc(tmp_path, **kw):
+    svc = DataService(str(tmp_path / "ident.db"), **kw)
+    with svc.db.tx() as cx:
+        cx.execute("INSERT INTO stock_items(code,name,qty) VALUES ('KMK1','Künye',100)")
+    return svc
+
+
+def test_key_is_casefolded_and_phone_digits_only():
+    assert customer_key(" AHMET YILMAZ ", "(0532) 111-22 33") == customer_key("ahmet yılmaz", "05321112233") \
+        == "ahmet yilmaz|05321112233"
+    assert customer_key("Işık", None) == "isik|"
+
+
+def test_spelling_variants_resolve_to_one_customer(tmp_path):
+    svc = _svc(tmp_path)
+    _sale(svc, "Ahmet Yılmaz — 0532 111 22 33", "K1")
+    _sale(svc, "AHMET YILMAZ — 0532-111-22-33", "K2")
+    svc.create_sales_batch([({"type": "Satış", "doc_no": "K3", "date": "2025-09-20", "pay_type": "Veresiye",
+                              "customer_text": "ahmet yılmaz — (0532) 1112233", "paid_amount": "0", "discount": "0"},
+                             [{"code": "KMK1", "name": "Künye", "qty": 1, "unit_price": "10", "line_total": "10"}])])
+    rows = svc.db.query("SELECT id, name, balance_kurus FROM customers")
+    assert [(r["name"], r["balance_kurus"]) for r in rows] == [("Ahmet Yılmaz", 3000)]
+    cid = rows[0]["id"]
+    assert svc.find_customer_id("ahmet yilmaz", "05321112233") == cid
+    assert svc.find_customer_id("AHMET YILMAZ") == cid
+    assert svc.find_customer_id("Ahmet") is None
+    svc.close()
+
+
+def test_lookups_hit_cache_until_customers_changed(tmp_path):
+    svc = _svc(tmp_path, sql_stats=True)
+    _sale(svc, "Zeynep Arslan — 0555", "C1")
+    cid = svc.find_customer_id("Zeynep Arslan", "0555")
+
+    def db_lookups():
+        return sum(r["count"] for r in svc.query_stats(limit=None) if "ident_key" in r["sql"])
+
+    before = db_lookups()
+    for _ in range(50):
+        assert svc.find_customer_id("ZEYNEP ARSLAN", "0 555") == cid
+    assert db_lookups() == before
+    # Satış customersChanged yayar → önbellek boşalır; ilk arama DB'ye gider, sonrası yine bellekten
+    _sale(svc, "Zeynep Arslan — 0555", "C2")
+    for _ in range(50):
+        assert svc.find_customer_id("ZEYNEP ARSLAN", "0 555") == cid
+    assert db_lookups() == before + 1
+
+    with svc.db.tx() as cx:
+        cx.execute("UPDATE customers SET name='Zeynep Kaya' WHERE id=?", (cid,))
+        svc._emit(svc.customersChanged)
+    assert svc.find_customer_id("Zeynep Arslan", "0555") is None
+    assert svc.find_customer_id("zeynep kaya", "0555") == cid
+    svc.close()
+
+
+def test_v7_keeps_oldest_of_legacy_duplicates(tmp_path, monkeypatch):
+    path = str(tmp_path / "legacy.db")
+    monkeypatch.setattr(migrations, "MIGRATIONS", [m for m in migrations.MIGRATIONS if m[0] < 7])
+    db = DB(path)
+    with db.tx() as cx:
+        cx.executemany("INSERT INTO customers(name, phone) VALUES (?,?)",
+                       [("Ali Çelik", "0532 000"), ("ALİ ÇELİK", "0532000"), ("Veli", None)])
+    db.close()
+    monkeypatch.undo()
+
+    svc = DataService(path)
+    assert 7 in svc.db.applied_migrations
+    keys = [tuple(r) for r in svc.db.query("SELECT id, ident_key FROM customers ORDER BY id")]
+    assert keys == [(1, "ali celik|0532000"), (2, None), (3, "veli|")]
+    # Aynı anahtarlı yeni kayıt benzersiz indeksi ihlal etmez, yalnızca anahtarsız kalır
+    with svc.db.tx() as cx:
+        cx.execute("INSERT INTO customers(name, phone) VALUES ('veli', '')")
+    assert svc.db.query_one("SELECT ident_key FROM customers WHERE id=4")[0] is None
+    assert svc.find_customer_id("Ali Celik", "0532-000") == 1
+    svc.close()
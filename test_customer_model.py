@@ -0,0 +1,65 @@
+import pytest
+
+pytest.importorskip("PyQt6.QtWidgets")
+
+from data.service import DataService
+
+
+@pytest.fixture
+def page(tmp_path, app):
+    from pages.customers import CustomersPage
+    svc = DataService(str(tmp_path / "customers.db"))
+    with svc.db.tx() as cx:
+        cx.executemany("INSERT INTO customers(name, phone, status) VALUES (?, ?, ?)",
+                       [(f"{('Ayşe', 'Mehmet', 'Işık')[i % 3]} {i:02}", f"0532 {i:04}", "Pasif" if i % 4 == 0 else "Aktif")
+                        for i in range(60)])
+    page = CustomersPage(svc)
+    yield page
+    page.deleteLater()
+    app.processEvents()
+    svc.close()
+
+
+def _names(model):
+    return [model.index(r, 1).data() for r in range(model.rowCount())]
+
+
+def test_search_is_debounced_folded_and_filtered_by_status(page):
+    m = page.model
+    assert m.rowCount() == 60
+    page.search.setText("ISIK")
+    assert m.rowCount() == 60 and page._search_timer.isActive()   # tuş başına süzme yok
+    page._search_timer.timeout.emit()
+    assert sorted(_names(m)) == sorted(f"Işık {i:02}" for i in range(2, 60, 3))
+
+    page.search.setText("IŞIK 1")                                  # daraltma: önceki sonucun alt kümesi
+    page.apply_filters()
+    assert sorted(_names(m)) == ["Işık 11", "Işık 14", "Işık 17"]
+    page.filter.setCurrentText("Pasif")
+    assert _names(m) == []
+    page.search.setText("0532 004")
+    page.apply_filters()
+    assert sorted(_names(m)) == sorted(f"{('Ayşe', 'Mehmet', 'Işık')[i % 3]} {i:02}" for i in (40, 44, 48))
+    assert page.summary.text() == "Toplam Cari: 3 • Aktif: 0"
+
+
+def test_row_events_patch_rows_and_search_index(page, app):
+    m, svc = page.model, page.data
+    page.search.setText("zeynep")
+    page.apply_filters()
+    assert m.rowCount() == 0
+    with svc.db.tx() as cx:
+        cx.execute("UPDATE customers SET name = 'Zeynep Şahin' WHERE id = 5")
+        new = cx.execute("INSERT INTO customers(name, phone) VALUES ('Zeynep Arslan', '0555')").lastrowid
+        cx.execute("DELETE FROM customers WHERE id = 8")
+        svc._customers_written("update", [5])
+        svc._customers_written("insert", [new])
+        svc._customers_written("delete", [8])
+    app.processEvents()
+
+    assert _names(m) == ["Zeynep Arslan", "Zeynep Şahin"]      # yeni kayıt başta
+    page.search.setText("")
+    page.apply_filters()
+    assert m.rowCount() == 60 and m.row_at(0)["AdSoyad"] == "Zeynep Arslan"
+    assert 8 not in m.pos_by_id and "Mehmet 07" not in _names(m)
+    assert len(m.search_index) == 61                           # yuvalar sabit: silinen yuva boş kalır
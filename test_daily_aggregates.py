@@ -0,0 +1,98 @@
+import sqlite3
+
+from app.data import migrations
+from app.data.db import DB
+from app.data.service import DataService
+
+
+def _snapshot(db):
+    return (db.query("SELECT * FROM daily_sales_agg ORDER BY date, type, pay_type"),
+            db.query("SELECT * FROM daily_cash_agg ORDER BY date, account, type"))
+
+
+def _rows(snap):
+    return [[tuple(r) for r in part] for part in snap]
+
+
+def _sale(svc, doc_no, date, total, pay_type="Nakit", type="Satış"):
+    svc.create_sale({"type": type, "doc_no": doc_no, "date": date, "customer_text": "Ali — 555",
+                     "pay_type": pay_type, "paid_amount": total, "discount": "0"},
+                    [{"code": "AGG1", "name": "Bilezik", "qty": 1, "unit_price": total, "line_total": total}])
+
+
+def test_aggregates_follow_writes(tmp_path):
+    svc = DataService(str(tmp_path / "agg.db"))
+    with svc.db.tx() as cx:
+        cx.execute("INSERT INTO stock_items(code,name,qty) VALUES ('AGG1','Bilezik',100)")
+    _sale(svc, "A1", "2025-09-01", "1.000,10")
+    _sale(svc, "A2", "2025-09-01", "250,25")
+    _sale(svc, "A3", "2025-09-15", "99,99", pay_type="Veresiye")
+    _sale(svc, "A4", "2025-08-31", "10", type="Alış")
+
+    k = svc.sales_kpis("2025-09-15")
+    assert k["daily"] == 99.99 and k["daily_count"] == 1
+    assert k["monthly"] == 1350.34 and k["monthly_count"] == 3
+    assert k["yearly"] == 1350.34
+
+    # FinancePage yolu: doğrudan UPDATE/DELETE de özetlere yansımalı
+    with svc.db.tx() as cx:
+        rid = cx.execute("SELECT MIN(id) FROM cash_ledger").fetchone()[0]
+        cx.execute("UPDATE cash_ledger SET account='Banka — Ziraat', amount_kurus=5000 WHERE id=?", (rid,))
+        cx.execute("DELETE FROM cash_ledger WHERE id=(SELECT MAX(id) FROM cash_ledger)")
+        cx.execute("UPDATE sales SET date='2025-09-02' WHERE doc_no='A2'")
+        cx.execute("DELETE FROM sales WHERE doc_no='A3'")
+
+    live = _rows(_snapshot(svc.db))
+    svc.rebuild_daily_aggregates()
+    assert live == _rows(_snapshot(svc.db))
+
+    by_acc = {r["account"]: r for r in svc.cash_by_account("2025-09-01", "2025-09-30")}
+    assert by_acc["Banka — Ziraat"]["giris"] == 50.0
+    assert by_acc["Kasa"]["giris"] == 250.25
+    assert svc.sales_kpis("2025-09-15")["daily_count"] == 0
+    svc.close()
+
+
+def test_failed_sale_leaves_aggregates_untouched(tmp_path):
+    svc = DataService(str(tmp_path / "agg_fail.db"))
+    with svc.db.tx() as cx:
+        cx.execute("INSERT INTO stock_items(code,name,qty) VALUES ('AGG1','Bilezik',0)")
+    try:
+        _sale(svc, "F1", "2025-09-01", "100")
+    except ValueError:
+        pass
+    assert _rows(_snapshot(svc.db)) == [[], []]
+    svc.close()
+
+
+def test_v5_backfills_existing_rows(tmp_path, monkeypatch):
+    path = str(tmp_path / "legacy.db")
+    monkeypatch.setattr(migrations, "MIGRATIONS", [m for m in migrations.MIGRATIONS if m[0] < 5])
+    db = DB(path)
+    with db.tx() as cx:
+        cx.executemany("INSERT INTO sales(type,date,pay_type,total_kurus,due_kurus) VALUES ('Satış',?,?,?,0)",
+                       [("2025-01-01", "Nakit", 100), ("2025-01-01", "Nakit", 250), ("2025-01-02", None, 5)])
+        cx.execute("INSERT INTO cash_ledger(date,account,type,amount_kurus) VALUES ('2025-01-01','Kasa','Giriş',350)")
+    db.close()
+    monkeypatch.undo()
+
+    db = DB(path)
+    assert 5 in db.applied_migrations
+    assert [tuple(r) for r in db.query("SELECT date, pay_type, n, total_kurus FROM daily_sales_agg ORDER BY date")] \
+        == [("2025-01-01", "Nakit", 2, 350), ("2025-01-02", "", 1, 5)]
+    assert db.query_one("SELECT n, amount_kurus FROM daily_cash_agg")[:] == (1, 350)
+    db.close()
+
+
+def test_table_rebuild_keeps_triggers(tmp_path):
+    db = DB(str(tmp_path / "rebuild.db"))
+    sql = "SELECT name FROM sqlite_master WHERE type='trigger' AND tbl_name='cash_ledger'"
+    before = {r[0] for r in db.query(sql)}
+    with db.tx() as cx:
+        migrations.rebuild_table(cx, "cash_ledger",
+                                 cx.execute("SELECT sql FROM sqlite_master WHERE name='cash_ledger'").fetchone()[0]
+                                 .replace("cash_ledger", "{table}", 1),
+                                 "id, date, account, type, amount_kurus", "id, date, account, type, amount_kurus")
+    assert {"trg_cash_agg_ins", "trg_cash_agg_del", "trg_cash_agg_upd"} <= before
+    assert {r[0] for r in db.query(sql)} == before
+    db.close()
@@ -0,0 +1,163 @@
+import pytest
+
+QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+from PyQt6.QtCore import Qt, QDate, QSettings
+
+from data.search import fold
+from data.service import DataService
+
+ACCOUNTS = ["Kasa", "Banka — VakıfBank", "Banka — Ziraat"]
+
+
+def _page(tmp_path, app, monkeypatch, rows=()):
+    from pages.finance import FinancePage
+    # Tercihler (süzgeç/sıralama) geçici dosyada: testler kullanıcı ayarlarını okumaz/yazmaz
+    monkeypatch.setattr(FinancePage, "_prefs", lambda self: QSettings(str(tmp_path / "prefs.ini"),
+                                                                      QSettings.Format.IniFormat))
+    svc = DataService(str(tmp_path / "finance.db"))
+    with svc.db.tx() as cx:
+        cx.executemany("INSERT INTO cash_ledger(date, time, account, type, category, description, ref_no, amount_kurus) "
+                       "VALUES (?,?,?,?,?,?,?,?)", rows)
+    svc.rebuild_daily_aggregates()
+    page = FinancePage(svc)
+    app.processEvents()
+    return svc, page
+
+
+def _ledger(n=450):
+    return [(f"2025-09-{1 + i % 20:02}", f"{8 + i % 10:02}:{i % 60:02}", ACCOUNTS[i % 3],
+             "Giriş" if i % 4 else "Çıkış", "Masraf" if i % 5 == 0 else "Satış Tahsilatı",
+             f"{'Işıklı kolye' if i % 7 == 0 else 'Bilezik'} satışı {i}", f"FIN{i:05}", 1000 + 37 * i)
+            for i in range(n)]
+
+
+def _loaded(model):
+    while model.canFetchMore():
+        model.fetchMore()
+    return model.rows
+
+
+def _brute(svc, account=None, type_=None, text="", date_from="2025-09-01", date_to="2025-09-30"):
+    rows = [r for r in svc.list_cash_ledger()
+            if date_from <= r["date"] <= date_to and account in (None, r["account"]) and type_ in (None, r["type"])
+            and fold(text) in fold(r["description"])]
+    return sorted(rows, key=lambda r: (r["date"], r["time"], r["id"]), reverse=True)
+
+
+def test_filters_totals_and_sort_run_in_sql_and_page_lazily(tmp_path, app, monkeypatch):
+    svc, page = _page(tmp_path, app, monkeypatch, _ledger())
+    m = page.model
+    page.dt_from.setDate(QDate(2025, 9, 1))
+    page.dt_to.setDate(QDate(2025, 9, 30))
+    assert m.rowCount() == 200 and m.canFetchMore()               # ilk sayfa; devamı kaydırınca
+    want = _brute(svc)
+    assert [r["id"] for r in _loaded(m)] == [r["id"] for r in want]
+    assert m.index(0, 0).data() == "20.09.2025" and m.index(0, 0).data(Qt.ItemDataRole.UserRole) == want[0]["id"]
+
+    page.cmb_account.setCurrentText("Banka — Ziraat")
+    page.cmb_type.setCurrentText("Giriş")
+    page.e_search.setText("IŞIKLI")
+    assert page._search_timer.isActive()                          # arama gecikmeli
+    page._search_timer.timeout.emit()
+    want = _brute(svc, "Banka — Ziraat", "Giriş", "IŞIKLI")
+    assert [r["id"] for r in _loaded(m)] == [r["id"] for r in want] and want
+    t = m.totals()
+    assert t["count"] == len(want) and t["giris"] == sum(r["amount"] for r in want) and t["cikis"] == 0
+    assert page.lbl_sum_in.text() == page.kpi_sel_in.text()
+
+    page.e_search.setText("")
+    page.cmb_type.setCurrentText("Tümü")
+    page._refresh_table()
+    page.table.sortByColumn(8, Qt.SortOrder.AscendingOrder)       # tutar: SQL'de, sayfalar boyunca sıralı
+    amounts = [r["amount_kurus"] for r in _loaded(m)]
+    assert amounts == sorted(amounts) and len(amounts) == len(_brute(svc, "Banka — Ziraat"))
+    page.deleteLater(); app.processEvents()
+    svc.close()
+
+
+def test_change_events_patch_loaded_window(tmp_path, app, monkeypatch):
+    svc, page = _page(tmp_path, app, monkeypatch, _ledger(900))
+    m = page.model
+    page.dt_from.setDate(QDate(2025, 9, 1))
+    page.dt_to.setDate(QDate(2025, 9, 30))
+    page.cmb_account.setCurrentText("Kasa")
+    before = m.totals()
+    monkeypatch.setattr(m, "refetch", lambda: pytest.fail("değişiklik olayı pencereyi yeniden çekti"))
+
+    first = m.rows[0]["id"]
+    new = svc.record_cash_entry(date="2025-09-30", time="18:00", account="Kasa", type="Giriş",
+                                category="Satış", description="Yeni satış", amount=250)
+    old = svc.record_cash_entry(date="2025-09-02", time="09:00", account="Kasa", type="Giriş",
+                                category="Satış", description="Eski satış", amount=1)     # çekilmemiş kısma düşer
+    other = svc.record_cash_entry(date="2025-09-30", time="19:00", account="Banka — Ziraat", type="Giriş",
+                                  category="Satış", description="Başka hesap", amount=5)
+    app.processEvents()
+    assert m.rowCount() == 201 and m.rows[0]["id"] == new and m.rows[1]["id"] == first
+    assert old not in {r["id"] for r in m.rows} and other not in {r["id"] for r in m.rows}
+    assert m.totals()["count"] == before["count"] + 2
+
+    with svc.db.tx() as cx:
+        cx.execute("UPDATE cash_ledger SET date = '2025-09-19' WHERE id = ?", (new,))
+        cx.execute("DELETE FROM cash_ledger WHERE id = ?", (first,))
+        svc._cash_written("update", [new])
+        svc._cash_written("delete", [first])
+    app.processEvents()
+    ids = [r["id"] for r in _loaded(m)]
+    assert first not in ids and ids == [r["id"] for r in _brute(svc, "Kasa")]
+    assert ids.count(old) == 1
+    page.deleteLater(); app.processEvents()
+    svc.close()
+
+
+def test_empty_ledger_shows_filtered_samples(tmp_path, app, monkeypatch):
+    svc, page = _page(tmp_path, app, monkeypatch)
+    m = page.model
+    page.dt_from.setDate(QDate(2025, 9, 1))
+    page.dt_to.setDate(QDate(2025, 9, 30))
+    assert page._mock_shown and m.source is None and m.rowCount() == 15
+    page.cmb_type.setCurrentText("Çıkış")
+    assert m.rowCount() == 7 and {m.index(r, 4).data() for r in range(7)} == {"Çıkış"}
+    assert m.totals()["cikis"] == pytest.approx(850 + 67300 + 15500 + 120 + 8900 + 2450 + 89400)
+    page.e_search.setText("tedarikçi")
+    page._refresh_table()
+    assert m.rowCount() == 3 and m.totals()["giris"] == 0
+    page.deleteLater(); app.processEvents()
+    svc.close()
+
+
+def test_balance_kpis_and_account_statement(tmp_path, app, monkeypatch):
+    from pages.finance import AccountStatementDialog, tl
+    svc, page = _page(tmp_path, app, monkeypatch, _ledger(300))
+    bal = svc.cash_balances()
+    assert page.kpi_cash.text() == tl(bal["Kasa"])
+    assert page.kpi_bank.text() == tl(bal["Banka — VakıfBank"] + bal["Banka — Ziraat"])
+
+    svc.record_cash_entry(date=QDate.currentDate().toString(Qt.DateFormat.ISODate), time="12:00", account="Kasa",
+                          type="Giriş", category="Satış", description="Bugün", amount=1000)
+    app.processEvents()
+    assert page.kpi_cash.text() == tl(bal["Kasa"] + 1000)
+
+    dlg = AccountStatementDialog(svc, ACCOUNTS, "Banka — Ziraat", QDate(2025, 9, 5), QDate(2025, 9, 9))
+    rows = [r for r in svc.list_cash_ledger() if r["account"] == "Banka — Ziraat" and "2025-09-05" <= r["date"] <= "2025-09-09"]
+    assert dlg.model.rowCount() == len(rows) > 0
+    assert dlg.lbl_closing.text().startswith(f"Kapanış bakiyesi: {tl(svc.cash_balances('2025-09-09')['Banka — Ziraat'])}")
+    dlg.deleteLater(); page.deleteLater(); app.processEvents()
+    svc.close()
+
+
+def test_z_report_dialog_closes_day(tmp_path, app, monkeypatch):
+    from pages.finance import ZReportDialog
+    svc, page = _page(tmp_path, app, monkeypatch, _ledger(60))
+    monkeypatch.setattr(QtWidgets.QMessageBox, "question", lambda *a: QtWidgets.QMessageBox.StandardButton.Yes)
+    dlg = ZReportDialog(svc, QDate(2025, 9, 10), page)
+    assert dlg.btn_close_day.isEnabled() and "kapatılmadı" in dlg.text.toPlainText()
+    dlg.close_day()                                               # yazıcı kuyruğunda; GUI beklemez
+    assert not dlg.btn_close_day.isEnabled() and dlg.lbl_state.text() == "Kapatılıyor…"
+    svc.writer.flush()
+    app.processEvents()
+    assert not dlg.btn_close_day.isEnabled() and "Z RAPORU" in dlg.text.toPlainText()
+    assert svc.last_close() == "2025-09-10"
+    dlg.f_day.setDate(QDate(2025, 9, 9))                          # kapanmış dönem içinde, kendisi kapanış değil
+    assert not dlg.btn_close_day.isEnabled()
+    dlg.deleteLater(); page.deleteLater(); app.processEvents()
+    svc.close()
@@ -0,0 +1,154 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from app.data.market import MarketFeed
+from app.data.service import DataService
+
+PRICES = [{"id": 1, "kod": "HAS_ALTIN", "ad": "Has Altın", "alis": "3050.5", "satis": "3075.25",
+           "kapanis": "3040", "tarih": "2025-09-20 10:00"},
+          {"id": 2, "kod": "CEYREK", "ad": "Çeyrek", "alis": "5000", "satis": "5100"}]
+
+
+class _Stub:
+    """Yerel fiyat sunucusu: ETag destekli, istenirse hata ya da gecikme üretir."""
+    def __init__(self):
+        self.items = list(PRICES)
+        self.status = 200
+        self.delay = 0.0
+        self.hits = []  # (istemci portu, If-None-Match, yanıt kodu)
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive
+
+            def do_GET(self):
+                time.sleep(stub.delay)
+                body = json.dumps(stub.items).encode()
+                etag = f'"{hash(body) & 0xffffffff:x}"'
+                inm = self.headers.get("If-None-Match")
+                code = stub.status if stub.status != 200 else (304 if inm == etag else 200)
+                stub.hits.append((self.client_address[1], inm, code))
+                self.send_response(code)
+                self.send_header("ETag", etag)
+                if code == 200:
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                else:
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+
+            def log_message(self, *a):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/verileriGetir?tip=altin"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    s = _Stub()
+    yield s
+    s.close()
+
+
+def test_etag_and_reused_connection(stub, tmp_path):
+    updates = []
+    feed = MarketFeed(stub.url, cache_path=str(tmp_path / "m.json"), on_update=updates.append)
+    assert feed.fetch() is True
+    assert feed.data["HAS_ALTIN"]["satis"] == 3075.25 and feed.data["CEYREK"]["name"] == "Çeyrek"
+    assert feed.fetch() is False               # 304: gövde yok, olay yok
+    stub.items[0] = dict(PRICES[0], satis="3080")
+    assert feed.fetch() is True and feed.data["HAS_ALTIN"]["satis"] == 3080.0
+
+    assert [code for _, _, code in stub.hits] == [200, 304, 200]
+    assert stub.hits[0][1] is None and stub.hits[1][1] is not None
+    assert len({port for port, _, _ in stub.hits}) == 1    # tek kalıcı bağlantı
+    assert len(updates) == 2
+    feed.stop()
+
+
+def test_backoff_on_failures(stub):
+    feed = MarketFeed(stub.url, interval=30, retry=2, max_backoff=10)
+    stub.status = 500
+    delays = []
+    for _ in range(5):
+        assert feed.fetch() is False
+        delays.append(feed.next_delay())
+    assert delays == [2, 4, 8, 10, 10] and feed.last_error == "HTTP 500"
+    stub.status = 200
+    assert feed.fetch() is True
+    assert feed.failures == 0 and feed.next_delay() == 30
+    feed.stop()
+
+
+def test_unreachable_feed_keeps_last_prices(stub, tmp_path):
+    svc = DataService(str(tmp_path / "a.db"), market_url=stub.url)
+    assert svc.fetch_market_prices()["HAS_ALTIN"]["alis"] == 3050.5
+    svc.close()
+    stub.close()
+
+    # Yeni açılış: fiyatlar ağ beklenmeden diskten gelir; sunucu yokken çekim hata verir ama veri kalır
+    svc = DataService(str(tmp_path / "a.db"), market_url=stub.url)
+    assert svc.market_data["HAS_ALTIN"]["satis"] == 3075.25
+    timeout = svc.market.timeout
+    assert svc.fetch_market_prices(timeout=0.5) == {}
+    assert svc.market.failures == 1 and svc.market_data["HAS_ALTIN"]["satis"] == 3075.25
+    assert svc.market.timeout == timeout and svc.market.url == stub.url   # çağrı başına ayar kalıcı değil
+    svc.close()
+
+
+def test_one_off_url_leaves_the_feed_alone(stub, tmp_path):
+    other = _Stub()
+    other.items = [dict(PRICES[0], satis="9999")]
+    svc = DataService(str(tmp_path / "o.db"), market_url=stub.url)
+    svc.fetch_market_prices()
+    ticks = svc.db.query_one("SELECT COUNT(*) FROM market_ticks")[0]
+    assert svc.fetch_market_prices(url=other.url)["HAS_ALTIN"]["satis"] == 9999.0
+    assert svc.market_data["HAS_ALTIN"]["satis"] == 3075.25 and svc.market.url == stub.url
+    assert svc.db.query_one("SELECT COUNT(*) FROM market_ticks")[0] == ticks
+    assert svc.market.fetch() is False and stub.hits[-1][2] == 304      # kendi ETag'i hâlâ geçerli
+    other.close()
+    assert svc.fetch_market_prices(url=other.url, timeout=0.5) == {} and svc.market.failures == 0
+    svc.close()
+
+    svc = DataService(str(tmp_path / "o.db"), market_url=stub.url)   # diskten de kendi fiyatları gelir
+    assert svc.market_data["HAS_ALTIN"]["satis"] == 3075.25
+    svc.close()
+
+
+def test_background_feed_does_not_block_caller(stub, tmp_path):
+    stub.delay = 0.5
+    svc = DataService(str(tmp_path / "b.db"), market_url=stub.url)
+    t0 = time.perf_counter()
+    svc.start_market_feed()
+    assert time.perf_counter() - t0 < 0.1
+    assert svc.market_data == {}
+    deadline = time.monotonic() + 5
+    while not svc.market_data and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert svc.market_data["CEYREK"]["satis"] == 5100.0
+    assert svc.market.requests == 1             # sonraki tur interval (30 sn) sonra
+    svc.close()
+
+
+def test_apply_to_stock(stub, tmp_path):
+    svc = DataService(str(tmp_path / "c.db"), market_url=stub.url)
+    with svc.db.tx() as cx:
+        cx.execute("INSERT INTO stock_items(code,name,qty,gram,milyem) VALUES ('B22','Bilezik',1,10.0,916)")
+    svc._stock_written()
+    svc.fetch_market_prices(apply_to_stock=True)
+    # 10 gr × 0,916 × 3075,25 (HAS_ALTIN satış) = 28169,29 → 10 ₺ adımına
+    assert svc.catalog.get("B22")["sell_price"] == 28170.0
+    assert svc.db.query_one("SELECT sell_price FROM stock_items WHERE code='B22'")[0] == 28170.0
+    svc.close()
@@ -0,0 +1,97 @@
+import random
+
+from app.data import ticks
+from app.data.service import DataService
+
+DAY = 86400
+T0 = 1_758_326_400  # 2025-09-20 00:00 UTC
+
+
+def _svc(tmp_path):
+    return DataService(str(tmp_path / "ticks.db"))
+
+
+def _feed(svc, n, step=30, start=T0, seed=7):
+    """n tick, step saniye arayla; (ts, satis_kurus) listesi döner."""
+    rnd = random.Random(seed)
+    price, out = 3_000_00, []
+    rows = []
+    for i in range(n):
+        price += rnd.randint(-500, 500)
+        ts = start + i * step
+        rows.append(("HAS_ALTIN", ts, price - 2000, price))
+        out.append((ts, price))
+    with svc.db.tx() as cx:
+        ticks.insert(cx, rows)
+    return out
+
+
+def _brute(raw, start, end, secs):
+    buckets = {}
+    for ts, p in raw:
+        b = ts - ts % secs
+        if start - start % secs <= b <= end:  # dilimler bütün olarak döner
+            o, h, lo, c, n = buckets.get(b, (p, p, p, p, 0))
+            buckets[b] = (o, max(h, p), min(lo, p), p, n + 1)
+    return [{"ts": b, "open": o / 100, "high": h / 100, "low": lo / 100, "close": c / 100, "n": n}
+            for b, (o, h, lo, c, n) in sorted(buckets.items())]
+
+
+def test_rollups_match_raw_ticks(tmp_path):
+    svc = _svc(tmp_path)
+    raw = _feed(svc, 3 * DAY // 30)          # 3 gün, 30 sn'de bir
+    now = T0 + 3 * DAY
+    with svc.db.read() as cx:
+        # 2 saat → 1 dk dilimler; 3 gün → 1 sa dilimler
+        assert ticks.series(cx, "HAS_ALTIN", T0 + 3600, T0 + 3 * 3600, max_points=300, now=now) == \
+            _brute(raw, T0 + 3600, T0 + 3 * 3600, 60)
+        assert ticks.series(cx, "HAS_ALTIN", T0, now, max_points=300, now=now) == _brute(raw, T0, now, 3600)
+        days = ticks.series(cx, "HAS_ALTIN", T0, now, max_points=3, now=now)
+    assert days == _brute(raw, T0, now, DAY)
+    svc.close()
+
+
+def test_out_of_order_ticks_keep_open_close(tmp_path):
+    svc = _svc(tmp_path)
+    with svc.db.tx() as cx:
+        ticks.insert(cx, [("X", T0 + 30, 0, 200), ("X", T0 + 10, 0, 100), ("X", T0 + 50, 0, 300),
+                          ("X", T0 + 20, 0, 50), ("X", T0 + 50, 0, 999)])   # son satır aynı saniye → yok sayılır
+    with svc.db.read() as cx:
+        [p] = ticks.series(cx, "X", T0, T0 + 59, now=T0 + 60)
+    assert (p["open"], p["high"], p["low"], p["close"], p["n"]) == (1.0, 3.0, 0.5, 3.0, 4)
+    svc.close()
+
+
+def test_long_ranges_are_bounded(tmp_path):
+    svc = _svc(tmp_path)
+    _feed(svc, 3 * 365, step=DAY)             # 3 yıl, günde bir tick
+    now = T0 + 3 * 365 * DAY
+    with svc.db.read() as cx:
+        pts = ticks.series(cx, "HAS_ALTIN", T0, now, max_points=100, now=now)
+        assert 50 <= len(pts) <= 100
+        assert sum(p["n"] for p in pts) == 3 * 365
+        # Saatlik tablonun saklama süresi dışında kalan aralık → günlük tabloya düşer
+        old = ticks.series(cx, "HAS_ALTIN", T0, T0 + 30 * DAY, max_points=1000, now=now)
+    assert len(old) == 31                       # uçlar dahil
+    svc.close()
+
+
+def test_retention_prunes_raw_but_keeps_rollups(tmp_path):
+    svc = _svc(tmp_path)
+    _feed(svc, 10 * DAY // 600, step=600)     # 10 gün, 10 dk'da bir
+    svc.record_market_ticks({"HAS_ALTIN": {"alis": 3000.0, "satis": 3100.5}}, ts=T0 + 10 * DAY)
+    raw_min = svc.db.query_one("SELECT MIN(ts) FROM market_ticks")[0]
+    assert raw_min >= T0 + 10 * DAY - ticks.RAW_RETENTION
+    assert svc.db.query_one("SELECT SUM(n) FROM market_ohlc_1d")[0] == 10 * DAY // 600 + 1
+    svc.close()
+
+
+def test_fetch_appends_ticks(tmp_path):
+    svc = _svc(tmp_path)
+    svc.market.fetched_at = T0 + 5
+    svc._market_updated({"HAS_ALTIN": {"alis": 3000.0, "satis": 3100.5}, "CEYREK": {"alis": 1, "satis": 2}})
+    assert [tuple(r) for r in svc.db.query("SELECT kod, ts, satis_kurus FROM market_ticks ORDER BY kod")] == \
+        [("CEYREK", T0 + 5, 200), ("HAS_ALTIN", T0 + 5, 310050)]
+    pts = svc.market_series("HAS_ALTIN", T0, T0 + 60)
+    assert [p["close"] for p in pts] == [3100.5]
+    svc.close()
@@ -0,0 +1,65 @@
+import sqlite3
+import time
+
+import pytest
+
+from app.data import migrations
+from app.data.db import DB
+
+
+def test_fresh_db_runs_all_migrations(tmp_path):
+    db = DB(str(tmp_path / "fresh.db"))
+    assert db.applied_migrations == [v for v, _, _ in migrations.MIGRATIONS]
+    assert db.cx.execute("PRAGMA user_version").fetchone()[0] == migrations.latest_version()
+    db.close()
+
+
+def test_current_db_opens_without_migrating(tmp_path):
+    path = str(tmp_path / "current.db")
+    DB(path).close()
+
+    timings = []
+    for _ in range(5):
+        t0 = time.perf_counter()
+        db = DB(path)
+        timings.append(time.perf_counter() - t0)
+        assert db.applied_migrations == []
+        db.close()
+    # Güncel DB'yi açmak: bağlantı + pragmalar + tek user_version okuması
+    assert min(timings) < 0.05, f"açılış çok yavaş: {min(timings) * 1000:.1f} ms"
+
+
+def test_legacy_db_gets_cash_ledger_columns(tmp_path):
+    path = str(tmp_path / "legacy.db")
+    cx = sqlite3.connect(path)
+    cx.execute("""CREATE TABLE cash_ledger(
+        id INTEGER PRIMARY KEY AUTOINCREMENT, date TEXT NOT NULL, time TEXT,
+        account TEXT NOT NULL, type TEXT NOT NULL, category TEXT, description TEXT,
+        amount REAL NOT NULL, customer_id INTEGER, sale_id INTEGER)""")
+    cx.execute("INSERT INTO cash_ledger(date,account,type,amount) VALUES ('2025-01-01','Kasa','Giriş',10)")
+    cx.commit(); cx.close()
+
+    db = DB(path)
+    cols = {r[1] for r in db.cx.execute("PRAGMA table_info(cash_ledger)")}
+    assert {"ref_no", "currency_code", "amount_foreign", "fx_rate", "type_code"} <= cols
+    assert db.cx.execute("SELECT COUNT(*) FROM cash_ledger").fetchone()[0] == 1
+    db.close()
+
+
+def test_failed_migration_is_rolled_back(tmp_path, monkeypatch):
+    path = str(tmp_path / "broken.db")
+    DB(path).close()
+    latest = migrations.latest_version()
+
+    def broken(cx):
+        cx.execute("CREATE TABLE half_done(x)")
+        raise RuntimeError("göç hatası")
+
+    monkeypatch.setattr(migrations, "MIGRATIONS", migrations.MIGRATIONS + [(latest + 1, "bozuk", broken)])
+    with pytest.raises(RuntimeError):
+        DB(path)
+
+    cx = sqlite3.connect(path)
+    assert cx.execute("PRAGMA user_version").fetchone()[0] == latest
+    assert cx.execute("SELECT COUNT(*) FROM sqlite_master WHERE name='half_done'").fetchone()[0] == 0
+    cx.close()
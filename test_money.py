@@ -0,0 +1,103 @@
+import sqlite3
+
+import pytest
+
+from app.data import migrations
+from app.data.db import DB
+from app.data.money import to_kurus, from_kurus, parse_number, format_kurus
+from app.data.service import DataService
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("₺25.330,00", 2533000),
+    ("25.330,5", 2533050),
+    ("25,330.50", 2533050),
+    ("25330", 2533000),
+    ("1.234.567", 123456700),
+    ("1,234,567", 123456700),
+    ("0,005", 1),
+    ("-12,34", -1234),
+    ("Toplam: 1.250,00 ₺", 125000),
+    ("", 0),
+    (None, 0),
+    ("abc", 0),
+    (12.3, 1230),
+    (0.1 + 0.2, 30),
+    (7, 700),
+])
+def test_to_kurus(text, expected):
+    assert to_kurus(text) == expected
+
+
+def test_format_and_parse_number():
+    assert format_kurus(123456789) == "1.234.567,89"
+    assert format_kurus(-5) == "-0,05"
+    assert format_kurus(100, thousands="") == "1,00"
+    assert from_kurus(2533050) == 25330.5
+    assert parse_number("12,345") == 12.345
+
+
+def test_sums_are_exact_in_kurus(tmp_path):
+    svc = DataService(str(tmp_path / "money.db"))
+    for _ in range(1000):
+        svc.record_cash_entry(date="2025-01-01", time="10:00", account="Kasa", type="Giriş",
+                              category="Test", description="kuruş", amount=0.1)
+    k, tl = svc.db.query_one("SELECT SUM(amount_kurus), SUM(amount) FROM cash_ledger")
+    assert k == 10000
+    assert tl == pytest.approx(100.0)
+    svc.close()
+
+
+def test_sale_writes_integer_columns(tmp_path):
+    svc = DataService(str(tmp_path / "sale.db"))
+    with svc.db.tx() as cx:
+        cx.execute("INSERT INTO stock_items(code,name,gram,qty) VALUES ('X1','Yüzük',2.5,3)")
+    svc.create_sale(
+        {"type": "Satış", "doc_no": "M-1", "date": "2025-01-01", "customer_text": "Ali — 555",
+         "pay_type": "Nakit", "paid_amount": "₺100,10", "discount": "0,20"},
+        [{"code": "X1", "name": "Yüzük", "gram": "2,5", "qty": 1, "unit_price": "100,30",
+          "milyem": 916, "iscilik": 0, "line_total": "100,30"}])
+    sale = svc.db.query_one("SELECT total_kurus, paid_kurus, due_kurus, total, due FROM sales")
+    assert (sale["total_kurus"], sale["paid_kurus"], sale["due_kurus"]) == (10010, 10010, 0)
+    assert sale["total"] == 100.10 and sale["due"] == 0
+    bal = svc.db.query_one("SELECT balance_kurus FROM customers WHERE name='Ali'")[0]
+    assert bal == 0
+    assert svc.db.query_one("SELECT typeof(amount_kurus) FROM cash_ledger")[0] == "integer"
+    svc.close()
+
+
+def test_v4_converts_real_amounts(tmp_path, monkeypatch):
+    path = str(tmp_path / "legacy.db")
+    monkeypatch.setattr(migrations, "MIGRATIONS", [m for m in migrations.MIGRATIONS if m[0] < 4])
+    db = DB(path)
+    with db.tx() as cx:
+        cx.execute("INSERT INTO customers(name, phone, balance) VALUES ('Ayşe','1', 1234.565)")
+        cx.execute("""INSERT INTO sales(type,doc_no,date,customer_id,paid_amount,discount,total,due)
+                      VALUES ('Satış','S1','2025-01-01',1,0.1,0,0.30000000000000004,0.2)""")
+        cx.execute("""INSERT INTO sale_items(sale_id,code,name,gram,qty,unit_price,milyem,iscilik,line_total)
+                      VALUES (1,'K','Kolye',3.25,1,99.995,916,10.5,110.49)""")
+        cx.execute("INSERT INTO customer_ledger(customer_id,sale_id,direction,amount,date) VALUES (1,1,'Borç',0.3,'2025-01-01')")
+        cx.execute("INSERT INTO cash_ledger(date,account,type,amount,sale_id) VALUES ('2025-01-01','Kasa','Giriş',0.1,1)")
+    db.close()
+    monkeypatch.undo()
+
+    db = DB(path)
+    assert 4 in db.applied_migrations
+    cx = db.cx
+    assert cx.execute("SELECT balance_kurus, balance FROM customers").fetchone()[:] == (123457, 1234.57)
+    assert cx.execute("SELECT total_kurus, paid_kurus, due_kurus FROM sales").fetchone()[:] == (30, 10, 20)
+    assert cx.execute("SELECT unit_price_kurus, iscilik_kurus, line_total_kurus, gram FROM sale_items").fetchone()[:] \
+        == (10000, 1050, 11049, 3.25)
+    assert cx.execute("SELECT amount_kurus FROM customer_ledger").fetchone()[0] == 30
+    assert cx.execute("SELECT amount_kurus, amount FROM cash_ledger").fetchone()[:] == (10, 0.1)
+    assert cx.execute("PRAGMA foreign_keys").fetchone()[0] == 1
+    assert cx.execute("PRAGMA foreign_key_check").fetchall() == []
+    db.close()
+
+
+def test_legacy_columns_are_read_only(tmp_path):
+    db = DB(str(tmp_path / "ro.db"))
+    with pytest.raises(sqlite3.OperationalError):
+        with db.tx() as cx:
+            cx.execute("INSERT INTO cash_ledger(date,account,type,amount) VALUES ('2025-01-01','Kasa','Giriş',1)")
+    db.close()
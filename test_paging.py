@@ -0,0 +1,103 @@
+import pytest
+
+from app.data.service import DataService
+
+
+@pytest.fixture
+def svc(tmp_path):
+    svc = DataService(str(tmp_path / "paging.db"))
+    with svc.db.tx() as cx:
+        # Aynı güne düşen çok kayıt: sıra (date, id) ile kesin olmalı
+        cx.executemany("INSERT INTO cash_ledger(date, time, account, type, category, description, amount_kurus) "
+                       "VALUES (?,?,?,?,?,?,?)",
+                       [(f"2025-09-{1 + i % 7:02}", "10:00", "Kasa" if i % 3 else "Banka — Ziraat",
+                         "Giriş" if i % 2 else "Çıkış", "Satış" if i % 5 else "Masraf",
+                         f"Tahsilat {i}" if i % 4 == 0 else f"Ödeme {i}", 100 * i) for i in range(500)])
+        cx.executemany("INSERT INTO customers(name, phone) VALUES (?, ?)",
+                       [(f"{('Ayşe', 'Mehmet', 'Işık')[i % 3]} {i % 40:02}", f"0532 {i:04}") for i in range(120)])
+        cx.executemany("INSERT INTO stock_items(code, name, category, qty) VALUES (?,?,?,1)",
+                       [(f"K{i:04}", f"Bilezik {i}" if i % 3 == 0 else f"Yüzük {i}",
+                         "Bilezik" if i % 3 == 0 else "Yüzük") for i in range(300)])
+    svc._stock_written()
+    yield svc
+    svc.close()
+
+
+def _walk(fn, filters, limit):
+    out, after = [], None
+    while True:
+        page = fn(filters, after, limit)
+        assert len(page["rows"]) <= limit
+        out += page["rows"]
+        if page["next"] is None:
+            return out
+        after = page["next"]
+
+
+@pytest.mark.parametrize("filters", [
+    {}, {"account": "Kasa"}, {"date_from": "2025-09-03", "date_to": "2025-09-05", "type": "Giriş"},
+    {"category": "Masraf"}, {"text": "tahsilat"}, {"text": "ödeme 1"}, {"account": "", "text": None},
+])
+def test_cash_pages_cover_filtered_ledger_in_order(svc, filters):
+    rows = _walk(svc.page_cash_ledger, filters, 37)
+    want = [r for r in svc.list_cash_ledger()
+            if all(v in (None, "") or
+                   (k == "date_from" and r["date"] >= v) or (k == "date_to" and r["date"] <= v) or
+                   (k == "text" and all(t in r["description"].casefold() for t in v.casefold().split())) or
+                   r.get(k) == v for k, v in filters.items())]
+    assert [r["id"] for r in rows] == [r["id"] for r in sorted(want, key=lambda r: (r["date"], r["id"]),
+                                                                  reverse=True)]
+    assert svc.count_cash_ledger(filters) == len(want)
+
+
+def test_stock_and_customer_pages(svc):
+    codes = [r["code"] for r in _walk(svc.page_stock, {"category": "Bilezik"}, 25)]
+    assert codes == sorted(r["code"] for r in svc.list_stock() if r["category"] == "Bilezik")
+    assert svc.count_stock() == 300 and svc.count_stock({"category": "Bilezik"}) == len(codes) == 100
+    assert len(_walk(svc.page_stock, {"text": "bilezik"}, 40)) == 100
+
+    people = _walk(svc.page_customers, None, 7)
+    assert [(r["name"], r["id"]) for r in people] == sorted((r["name"], r["id"]) for r in svc.list_customers())
+    isik = _walk(svc.page_customers, {"text": "ISIK"}, 9)      # Türkçe katlamalı FTS araması
+    assert [(r["name"], r["id"]) for r in isik] == [(r["name"], r["id"]) for r in people if r["name"][0] == "I"]
+    assert svc.count_customers({"text": "ışık"}) == len(isik) == 40
+
+
+def test_page_after_last_row_is_empty_and_bad_filter_raises(svc):
+    last = svc.page_cash_ledger(limit=500)
+    assert len(last["rows"]) == 500 and last["next"] is None
+    tail = last["rows"][-1]
+    assert svc.page_cash_ledger(after=[tail["date"], tail["id"]]) == {"rows": [], "next": None}
+    with pytest.raises(ValueError, match="süzgeç"):
+        svc.page_stock({"account": "Kasa"})
+
+
+@pytest.mark.parametrize("order", [("ts", True), ("amount_kurus", False), ("category", True), ("time", False)])
+def test_cash_pages_follow_requested_order(svc, order):
+    with svc.db.tx() as cx:
+        cx.execute("UPDATE cash_ledger SET time = printf('%02d:%02d', 8 + id % 9, id % 60), "
+                   "category = CASE WHEN id % 11 = 0 THEN NULL ELSE category END")
+    filters = {"date_from": "2025-09-02", "date_to": "2025-09-06", "account": "Kasa"}
+    rows = _walk(lambda f, a, n: svc.page_cash_ledger(f, a, n, order), filters, 23)
+    column, desc = order
+    want = [r for r in svc.list_cash_ledger() if "2025-09-02" <= r["date"] <= "2025-09-06" and r["account"] == "Kasa"]
+    want.sort(key=lambda r: (r[column] or "", r["id"]), reverse=desc)
+    assert [r["id"] for r in rows] == [r["id"] for r in want]
+    with pytest.raises(ValueError, match="sıralama"):
+        svc.page_cash_ledger(order=("amount", True))
+
+
+@pytest.mark.parametrize("filters", [{}, {"account": "Kasa", "date_from": "2025-09-03"}, {"category": "Masraf"},
+                                     {"text": "tahsilat", "type": "Giriş"}, {"text": "  "},
+                                     {"text": " tahsilat ", "account": "Kasa"}])
+def test_cash_totals_match_ledger(svc, filters):
+    svc.rebuild_daily_aggregates()
+    rows = [r for r in svc.list_cash_ledger()
+            if all((k == "date_from" and r["date"] >= v) or (k == "text" and v.strip() in r["description"].casefold()) or
+                   r.get(k) == v for k, v in filters.items())]
+    t = svc.cash_ledger_totals(filters)
+    giris = sum(r["amount"] for r in rows if r["type"] == "Giriş")
+    cikis = sum(r["amount"] for r in rows if r["type"] == "Çıkış")
+    assert t == {"count": len(rows), "giris": pytest.approx(giris), "cikis": pytest.approx(cikis),
+                 "net": pytest.approx(giris - cikis)}
+    assert svc.count_cash_ledger(filters) == len(rows)
@@ -0,0 +1,148 @@
+import random
+import sqlite3
+from datetime import date
+
+import pytest
+
+from app.data import closing
+from app.data.service import DataService
+from conftest import CUSTOMERS, sale_header, sale_items, stock_item
+
+DAYS = [f"2025-09-{d:02}" for d in range(1, 11)]
+
+
+def _day(svc, rnd, day, n=6):
+    for i in range(n):
+        is_sale = rnd.random() < 0.7
+        qty = rnd.randrange(1, 3)
+        header = sale_header(f"{day}-{i}", rnd.choice(CUSTOMERS), str(rnd.randrange(0, 400)), date=day,
+                             type="Satış" if is_sale else "Alış", pay_type=rnd.choice(("Nakit", "Kart", "Veresiye")))
+        svc.create_sale(header, sale_items(rnd.choice(("A1", "B2")), qty, price=200))
+        svc.record_cash_entry(date=day, time="12:00", account=rnd.choice(("Kasa", "Banka — Ziraat")),
+                              type=rnd.choice(("Giriş", "Çıkış")), category="Diğer", description="Masraf",
+                              amount=rnd.randrange(1, 500))
+
+
+@pytest.fixture
+def svc(tmp_path):
+    svc = DataService(str(tmp_path / "close.db"))
+    svc.upsert_stock_item(stock_item("A1", 500, "Yüzük", sell_price=150.5))
+    svc.upsert_stock_item(stock_item("B2", 500, "Bilezik", sell_price=150.5))
+    rnd = random.Random(7)
+    for day in DAYS:
+        _day(svc, rnd, day)
+    yield svc
+    svc.close()
+
+
+def _brute_cash(svc, day):
+    out = {}
+    for r in svc.db.query("SELECT account, type, amount_kurus FROM cash_ledger WHERE date <= ?", (day,)):
+        out[r[0]] = out.get(r[0], 0) + (r[2] if r[1] == "Giriş" else -r[2])
+    return out
+
+
+def _brute_customers(svc):
+    # create_sale müşteri bakiyesini cari hareketle birlikte yürütür: customers.balance_kurus doğrulama kaynağı
+    return {r[0]: r[1] for r in svc.db.query("SELECT id, balance_kurus FROM customers WHERE balance_kurus != 0")}
+
+
+def test_close_freezes_balances_and_sales(svc):
+    rep = svc.close_day(DAYS[-1])
+    assert rep["prev_date"] is None and rep["date"] == DAYS[-1]
+    assert {c["account"]: round(c["closing"] * 100) for c in rep["cash"]} == _brute_cash(svc, DAYS[-1])
+    frozen = dict(svc.db.query("SELECT customer_id, balance_kurus FROM close_customer WHERE date = ?", (DAYS[-1],)))
+    assert frozen == _brute_customers(svc)
+    assert rep["receivable"] * 100 == pytest.approx(sum(b for b in frozen.values() if b > 0))
+    assert rep["customers_n"] == len(frozen)
+
+    sales = svc.db.query("SELECT type, COUNT(*), SUM(total_kurus), SUM(paid_kurus) FROM sales GROUP BY type")
+    by_type = {t: (0, 0, 0) for t, *_ in sales}
+    for s in rep["sales"]:
+        n, total, paid = by_type[s["type"]]
+        by_type[s["type"]] = (n + s["n"], total + round(s["total"] * 100), paid + round(s["paid"] * 100))
+    assert by_type == {t: (n, total, paid) for t, n, total, paid in sales}
+
+    # Geriye dönük kapanış: stok tarih tutmaz, bugünkü durum o güne yazılmaz
+    assert rep["stock"] == [] and rep["stock_at"] is None
+    assert "Z RAPORU" in rep["text"] and DAYS[-1] in rep["text"] and "geriye dönük" in rep["text"]
+
+
+def test_stock_is_frozen_only_when_closing_today(svc):
+    svc.close_day(DAYS[-1])
+    rep = svc.close_day()                                           # bugün
+    assert rep["date"] == date.today().isoformat() and rep["prev_date"] == DAYS[-1]
+    assert rep["stock_at"].startswith(rep["date"]) and rep["stock_at"] in rep["text"]
+    stock = {r["category"]: r for r in rep["stock"]}
+    for code, category in (("A1", "Yüzük"), ("B2", "Bilezik")):
+        qty = svc.db.query_one("SELECT qty FROM stock_items WHERE code = ?", (code,))[0]
+        assert stock[category]["qty"] == qty and stock[category]["value"] == pytest.approx(qty * 150.5)
+    assert svc.z_report(DAYS[-1])["stock"] == []
+
+
+def test_incremental_closes_match_one_close(svc):
+    for day in DAYS[2::3]:                                        # 03, 06, 09, sonra 10
+        svc.close_day(day)
+    rep = svc.close_day(DAYS[-1])
+    assert rep["prev_date"] == "2025-09-09"
+    assert {c["account"]: round(c["closing"] * 100) for c in rep["cash"]} == _brute_cash(svc, DAYS[-1])
+    assert dict(svc.db.query("SELECT customer_id, balance_kurus FROM close_customer WHERE date = ?",
+                             (DAYS[-1],))) == _brute_customers(svc)
+    # Dönem satış toplamı yalnızca önceki kapanıştan sonraki günleri kapsar
+    assert sum(s["n"] for s in rep["sales"]) == svc.db.query_one("SELECT COUNT(*) FROM sales WHERE date = ?",
+                                                                 (DAYS[-1],))[0]
+    prev = {c["account"]: c["closing"] for c in svc.z_report("2025-09-09")["cash"]}
+    assert all(c["opening"] == prev.get(c["account"], 0.0) for c in rep["cash"])
+    assert [c["date"] for c in svc.list_closes()] == ["2025-09-10", "2025-09-09", "2025-09-06", "2025-09-03"]
+
+
+def test_closed_days_are_locked(svc):
+    svc.close_day("2025-09-05")
+    rid = svc.db.query_one("SELECT id FROM cash_ledger WHERE date = '2025-09-04'")[0]
+    open_rid = svc.db.query_one("SELECT id FROM cash_ledger WHERE date = '2025-09-06'")[0]
+    writes = [
+        ("INSERT INTO cash_ledger(date, time, account, type, category, description, amount_kurus) "
+         "VALUES ('2025-09-05', '10:00', 'Kasa', 'Giriş', 'x', 'geç kayıt', 100)", ()),
+        ("UPDATE cash_ledger SET amount_kurus = amount_kurus + 1 WHERE id = ?", (rid,)),
+        ("UPDATE cash_ledger SET date = '2025-09-01' WHERE id = ?", (open_rid,)),    # açık günden kapalı güne
+        ("DELETE FROM cash_ledger WHERE id = ?", (rid,)),
+        ("DELETE FROM sales WHERE date = '2025-09-02'", ()),
+        ("UPDATE customer_ledger SET amount_kurus = 1 WHERE date = '2025-09-03'", ()),
+        ("DELETE FROM stock_moves WHERE date = '2025-09-03'", ()),
+    ]
+    for sql, args in writes:
+        with pytest.raises(sqlite3.IntegrityError, match=closing.LOCKED):
+            with svc.db.tx() as cx:
+                cx.execute(sql, args)
+
+    before = svc.db.query_one("SELECT COUNT(*), (SELECT qty FROM stock_items WHERE code = 'A1') FROM sales")
+    with pytest.raises(sqlite3.IntegrityError, match=closing.LOCKED):
+        svc.create_sale({"type": "Satış", "doc_no": "LATE", "date": "2025-09-05", "pay_type": "Nakit",
+                         "paid_amount": "10", "discount": "0"},
+                        [{"code": "A1", "name": "Ürün", "qty": 1, "unit_price": "10", "line_total": "10"}])
+    assert tuple(svc.db.query_one("SELECT COUNT(*), (SELECT qty FROM stock_items WHERE code = 'A1') FROM sales")) \
+        == tuple(before)                                            # satış bütünüyle geri alındı
+
+    # Açık günler yazılabilir; kapanmış güne ya da geleceğe kapanış yapılamaz
+    svc.record_cash_entry(date="2025-09-06", time="10:00", account="Kasa", type="Giriş", category="x",
+                          description="açık gün", amount=1)
+    with svc.db.tx() as cx:
+        cx.execute("UPDATE cash_ledger SET description = 'not' WHERE id = ?", (rid,))   # tutar/tarih dışı kolon
+    for day in ("2025-09-05", "2025-09-01", "2999-01-01"):
+        with pytest.raises(ValueError):
+            svc.close_day(day)
+
+
+def test_closed_day_reads_frozen_numbers(svc, monkeypatch):
+    svc.close_day("2025-09-04")
+    svc.close_day("2025-09-08")
+    want = {a: k / 100 for a, k in _brute_cash(svc, "2025-09-04").items()}
+    monkeypatch.setattr("app.data.balances.as_of", lambda *a: pytest.fail("kapanmış gün kontrol noktalarından okundu"))
+    assert svc.cash_balances("2025-09-04") == pytest.approx(want)
+    monkeypatch.undo()
+    assert svc.cash_balances("2025-09-05") == pytest.approx({a: k / 100 for a, k in _brute_cash(svc, "2025-09-05").items()})
+    assert svc.z_report("2025-09-05") is None
+
+    other = DataService(svc.db.path)                                # yeni açılış son kapanışı DB'den okur
+    assert other.last_close() == "2025-09-08" and other.z_report("2025-09-04")["cash"] == svc.z_report("2025-09-04")["cash"]
+    other.close()
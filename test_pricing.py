@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+from app.data import pricing
+from app.data.service import DataService
+
+
+def _svc(tmp_path, rows):
+    svc = DataService(str(tmp_path / "pricing.db"))
+    with svc.db.tx() as cx:
+        cx.executemany("INSERT INTO stock_items(code, name, qty, gram, milyem, ayar, category, isc_tip, isc_alinan) "
+                       "VALUES (?,?,1,?,?,?,?,?,?)", rows)
+    svc._stock_written()
+    return svc
+
+
+def _price(svc, code):
+    return svc.catalog.get(code)["sell_price"]
+
+
+def test_round_to_step_half_up():
+    assert pricing.round_to_step(25.0, 10) == 30.0
+    assert pricing.round_to_step(24.99, 10) == 20.0
+    assert pricing.round_to_step(12.345, 0) == 12.35
+    assert pricing.round_to_step(np.array([5.0, 15.0]), 10).tolist() == [10.0, 20.0]   # banker değil
+
+
+def test_rules_labour_and_milyem_fallback(tmp_path):
+    svc = _svc(tmp_path, [
+        ("A", "Bilezik 22", 10.0, 916, 22, "Bilezik", None, 0.0),
+        ("B", "Yüzük 14", 2.0, None, 14, "Yüzük", "Gram", 50.0),      # milyem ayardan → 585
+        ("C", "Bilezik 18", 5.0, 750, 18, "Bilezik", "Milyem", 30.0),
+        ("D", "Kolye", 3.0, 916, 22, "Kolye", "TL", 400.0),
+    ])
+    rules = pricing.PriceRules(markup=2.0, round_step=10.0, rules=[
+        {"ayar": 22, "markup": 4.0},
+        {"category": "Bilezik", "markup": 5.0, "round_step": 50},
+        {"category": "Bilezik", "ayar": 22, "markup": 6.0},          # en özel kural kazanır
+        {"category": "Yok", "markup": 99.0},                          # stokta olmayan kategori → etkisiz
+    ])
+    base = 3000.0
+    assert svc.reprice_stock(base, rules) == 4
+    assert _price(svc, "A") == pricing.round_to_step(10 * 0.916 * base * 1.06, 50)
+    assert _price(svc, "B") == pricing.round_to_step(2 * 0.585 * base * 1.02, 10) + 2 * 50.0
+    assert _price(svc, "C") == pricing.round_to_step(5 * 0.750 * base * 1.05, 50) + 5 * 30.0 / 1000 * base
+    assert _price(svc, "D") == pricing.round_to_step(3 * 0.916 * base * 1.04, 10) + 400.0
+    db = {r["code"]: r["sell_price"] for r in svc.db.query("SELECT code, sell_price FROM stock_items")}
+    assert db == {c: _price(svc, c) for c in "ABCD"}
+    svc.close()
+
+
+def test_only_changed_prices_written_and_announced(tmp_path):
+    svc = _svc(tmp_path, [("A", "A", 1.0, 916, 22, "Gram", None, 0.0), ("B", "B", 0.0, 916, 22, "Gram", None, 0.0)])
+    deltas = []
+    svc.stockDelta.connect(deltas.append)
+    assert svc.reprice_stock(3000.0) == 1                # gram 0 → fiyat 0 zaten, yazılmaz
+    assert deltas[-1]["changed"] == [svc.catalog.get("A")["id"]] and not deltas[-1]["reset"]
+    assert svc.reprice_stock(3000.0) == 0                # aynı baz → değişiklik yok
+    assert len(deltas) == 1
+    svc.close()
+
+
+def test_reprice_rolls_back_with_outer_transaction(tmp_path):
+    svc = _svc(tmp_path, [("A", "A", 1.0, 916, 22, "Gram", None, 0.0)])
+    with pytest.raises(RuntimeError):
+        with svc.db.tx():
+            svc.reprice_stock(3000.0)
+            raise RuntimeError
+    assert _price(svc, "A") == 0.0
+    assert svc.db.query_one("SELECT sell_price FROM stock_items")[0] == 0.0
+    svc.close()
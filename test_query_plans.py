@@ -0,0 +1,115 @@
+"""
+EXPLAIN QUERY PLAN regresyon testi: servis ve sayfaların çalıştırdığı her sorgu
+indeks kullanmalı; tam tablo taraması (SCAN <tablo>) veya ORDER BY için geçici
+B-ağacı görülürse test başarısız olur.
+"""
+import re
+
+from app.data import db as dbmod
+from app.data.service import DataService
+
+# Baştaki joker karakterli LIKE hiçbir B-ağacı indeksini kullanamaz (fiyat güncelleme yolu);
+# FTS5'in kendi gölge tablolarına attığı iç sorgular ('main'.'x_fts_config' …) kapsam dışı;
+# cash_balance_state hesap listesidir (hesap sayısı kadar satır), bakiye sorguları onu baştan sona okur;
+# gün sonu kapanışı stoğun anlık durumunu kategori bazında dondurur (stok kartı sayısı kadar, geçmiş değil);
+# kapanış listesi WITHOUT ROWID birincil anahtar sırasında LIMIT'le yürür (plan "SCAN" der, sıralama yok)
+KNOWN_SCANS = ("name LIKE", "'main'.'", "cash_balance_state", "FROM stock_items GROUP BY",
+               "FROM period_close ORDER BY date DESC LIMIT")
+
+# (subquery-N): pencere fonksiyonunun kendi ara sonucu (co-routine), tablo değil
+FULL_SCAN = re.compile(r"^SCAN (?!CONSTANT ROW|\(subquery-)\S+(?: AS \S+)?$")
+TEMP_SORT = re.compile(r"TEMP B-TREE FOR (RIGHT PART OF )?ORDER BY")
+
+
+def _traced_service(tmp_path, monkeypatch):
+    seen = []
+    real_reader = dbmod._connect_reader
+
+    def reader(path):
+        cx = real_reader(path)
+        cx.set_trace_callback(seen.append)
+        return cx
+
+    monkeypatch.setattr(dbmod, "_connect_reader", reader)
+    svc = DataService(str(tmp_path / "plans.db"))
+    svc.db.cx.set_trace_callback(seen.append)
+    return svc, seen
+
+
+def _workload(svc):
+    svc.seed_demo_if_empty()
+    svc.list_customers(); svc.list_stock(); svc.list_cash(); svc.list_cash_ledger()
+    svc.list_critical_stock(); svc.get_recent_transactions()
+    svc.list_customers([1, 2]); svc.list_cash_ledger([1, 2])  # değişiklik olaylarından sonraki id okumaları
+    cid = svc.find_customer_id("Ahmet Yılmaz", "5xx xxx xx xx")
+    svc.find_customer_id("Ahmet Yılmaz")
+    svc.customer_activity(cid); svc.customer_30day_summary(cid)
+    svc.sales_kpis("2025-09-20"); svc.cash_by_account("2025-09-01", "2025-09-30")
+    svc.cash_balances("2025-09-20"); svc.account_statement("Kasa", "2025-09-01", "2025-09-30")
+    svc.search_stock("bilezik 22"); svc.search_customers("ahmet"); svc.search_cash("tahsilat")
+    # Sayfalı listeler: ilk sayfa, devam sayfası ve süzgeçler (kısa kelime → satır başına LIKE)
+    for f in ({}, {"account": "Kasa", "date_from": "2025-01-01"}, {"type": "Giriş", "text": "tahsilat"},
+              {"category": "Satış", "text": "na"}, {"text": "na tahsilat"}):
+        svc.page_cash_ledger(f, after=svc.page_cash_ledger(f, limit=2)["next"], limit=2)
+        svc.count_cash_ledger(f)
+        svc.cash_ledger_totals(f)
+    # Kasa defteri sayfası: tarih + saat (ts) sırası, tarih aralığı ts aralığına çevrilir
+    for f in ({"date_from": "2025-09-01", "date_to": "2025-09-30"}, {"account": "Kasa", "date_from": "2025-09-01"}):
+        first = svc.page_cash_ledger(f, limit=2, order=("ts", True))
+        svc.page_cash_ledger(f, after=first["next"], limit=2, order=("ts", True))
+    svc.page_stock({"category": "Bilezik"}, after=["STK0001"]); svc.page_stock({"text": "bilezik"})
+    svc.page_customers(after=["Ahmet Yılmaz", 1]); svc.page_customers({"text": "ah"})
+    svc.count_stock({"category": "Bilezik"}); svc.count_customers()
+    svc.record_market_ticks({"HAS_ALTIN": {"alis": 3000, "satis": 3050}})
+    svc.market_series("HAS_ALTIN", 0); svc.market_series("HAS_ALTIN", 1_758_326_400, max_points=1440)
+
+    stock = svc.list_stock()[0]
+    header = {"type": "Satış", "doc_no": "PLAN1", "date": "2025-09-20",
+              "customer_text": "Ahmet Yılmaz — 5xx xxx xx xx", "pay_type": "Nakit",
+              "paid_amount": "100", "discount": "0"}
+    items = [{"code": stock["code"], "name": stock["name"], "qty": 1,
+              "unit_price": "100", "line_total": "100"}]
+    svc.create_sale(header, items)
+    svc.create_sale(dict(header, type="Alış", doc_no="PLAN2"),
+                    [dict(items[0], code="NEWCODE1", name="Yeni")])
+    svc.create_sales_batch([(dict(header, doc_no="PLAN3"), items),
+                            (dict(header, type="Alış", doc_no="PLAN4", customer_text="Toplu — 0"),
+                             [dict(items[0], code="NEWCODE2", name="Yeni")])])
+
+    svc.upsert_stock_item({"code": "UPS1", "name": "U", "category": "Gram", "milyem": 995, "ayar": 24,
+                           "gram": 1.0, "qty": 1, "buy_price": 1, "sell_price": 2, "isc_tip": "TL",
+                           "isc_alinan": 0, "isc_verilen": 0, "vat": 20, "critical_qty": 1})
+    svc.delete_stock_item("UPS1")
+    svc.delete_stock_item(stock["code"])
+
+    # FinancePage yazımlarının sorguları (sayfa yalnızca genel API'yi çağırır)
+    svc.find_customer_id("Ahmet Yılmaz")
+    rid = svc.db.query_one("SELECT MAX(id) FROM cash_ledger")[0]
+    entry = dict(date="2025-09-20", time="10:00", account="Kasa", type="Giriş", category="Diğer",
+                 description="x", amount=1)
+    svc.update_cash_entry(rid, **entry)
+    svc.delete_cash_entry(rid)
+    svc.refresh_balances()
+
+    # Gün sonu: ilk kapanış, önceki kapanıştan artımlı ikinci kapanış, dondurulmuş okumalar
+    svc.close_day("2025-09-19"); svc.close_day("2025-09-20")
+    svc.z_report("2025-09-20"); svc.cash_balances("2025-09-20"); svc.list_closes()
+
+
+def test_no_full_table_scans(tmp_path, monkeypatch):
+    svc, seen = _traced_service(tmp_path, monkeypatch)
+    _workload(svc)
+
+    statements = {s.strip() for s in seen
+                  if s.strip().split(None, 1)[0].upper() in ("SELECT", "UPDATE", "DELETE")}
+    assert len(statements) > 15  # iş yükü gerçekten çalıştı mı
+
+    bad = {}
+    for sql in sorted(statements):
+        if any(k in sql for k in KNOWN_SCANS):
+            continue
+        plan = [r[3] for r in svc.db.cx.execute("EXPLAIN QUERY PLAN " + sql)]
+        offenders = [d for d in plan if FULL_SCAN.match(d) or TEMP_SORT.search(d)]
+        if offenders:
+            bad[sql] = plan
+    assert not bad, "\n\n".join(f"{sql}\n  -> {plan}" for sql, plan in bad.items())
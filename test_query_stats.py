@@ -0,0 +1,64 @@
+from app.data.stats import normalize
+from app.data.service import DataService
+
+
+def test_normalize_collapses_literals():
+    assert normalize("SELECT * FROM t WHERE a = 12 AND b='x''y'\n  AND c IN (?, ?,?)") == \
+        "SELECT * FROM t WHERE a = ? AND b=? AND c IN (?, …)"
+    assert normalize("UPDATE stock_items SET qty = MAX(0, qty + ?) WHERE id=?;") == \
+        "UPDATE stock_items SET qty = MAX(?, qty + ?) WHERE id=?"
+
+
+def _sale(svc, doc_no):
+    svc.create_sale({"type": "Satış", "doc_no": doc_no, "date": "2025-09-01", "customer_text": "Ali — 555",
+                     "pay_type": "Nakit", "paid_amount": "10", "discount": "0"},
+                    [{"code": "QS1", "name": "Yüzük", "qty": 1, "unit_price": "10", "line_total": "10"}])
+
+
+def test_stats_are_opt_in(tmp_path):
+    svc = DataService(str(tmp_path / "off.db"))
+    svc.list_stock()
+    assert svc.db.stats is None and svc.query_stats() == []
+    svc.close()
+
+
+def test_counts_writer_and_reader_statements(tmp_path):
+    svc = DataService(str(tmp_path / "stats.db"), sql_stats=True)
+    with svc.db.tx() as cx:
+        cx.executemany("INSERT INTO stock_items(code,name,qty) VALUES (?,?,?)",
+                       [(f"QS{i}", "Yüzük", 10) for i in range(1, 4)])
+    for i in range(3):
+        _sale(svc, f"S{i}")
+    for _ in range(5):
+        svc.list_stock()
+
+    stats = {r["sql"]: r for r in svc.query_stats(limit=None)}
+    assert stats["SELECT * FROM stock_items ORDER BY code"]["count"] == 5
+    assert stats["SELECT * FROM stock_items ORDER BY code"]["rows"] == 15
+    assert stats["INSERT INTO stock_items(code,name,qty) VALUES (?, …)"]["rows"] == 3
+    sale_insert = next(r for sql, r in stats.items() if sql.startswith("INSERT INTO sales("))
+    assert sale_insert["count"] == 3
+    for r in stats.values():
+        assert r["total_ms"] >= r["p95_ms"] >= 0 and r["avg_ms"] * r["count"] == r["total_ms"]
+
+    by_count = svc.query_stats(sort="count", limit=3)
+    assert len(by_count) == 3 and by_count[0]["count"] >= by_count[-1]["count"]
+    svc.close()
+
+
+def test_slow_queries_go_to_rotating_log(tmp_path, monkeypatch):
+    monkeypatch.setenv("ORBITX_SQL_STATS", "0")  # eşik 0 ms → her ifade yavaş sayılır
+    svc = DataService(str(tmp_path / "slow.db"))
+    log = svc.db.stats.log
+    try:
+        svc.list_customers()
+        for h in log.handlers:
+            h.flush()
+        text = (tmp_path / "orbitx-slow.log").read_text(encoding="utf-8")
+        assert "SELECT * FROM customers ORDER BY name" in text
+        assert " ms | rows=" in text
+    finally:
+        svc.close()
+        for h in list(log.handlers):
+            log.removeHandler(h)
+            h.close()
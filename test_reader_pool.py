@@ -0,0 +1,57 @@
+import sqlite3
+import threading
+
+import pytest
+
+from app.data.service import DataService
+
+
+def test_reads_use_pool_and_see_commits(tmp_path):
+    svc = DataService(str(tmp_path / "pool.db"), readers=3)
+    svc.seed_if_empty(["Ahmet Yılmaz — 0555"], None)
+
+    # Okuma bağlantıları yazıcıdan farklıdır ve salt-okunurdur
+    with svc.db.read() as rcx:
+        assert rcx is not svc.db.cx
+        with pytest.raises(sqlite3.OperationalError):
+            rcx.execute("INSERT INTO customers(name) VALUES ('x')")
+
+    # Commit edilen yazım bir sonraki okumada görünür
+    before = len(svc.list_stock())
+    with svc.db.tx() as cx:
+        cx.execute("INSERT INTO stock_items(code,name,qty) VALUES ('NEW1','Yeni',1)")
+    assert len(svc.list_stock()) == before + 1
+
+
+def test_parallel_readers_with_writer(tmp_path):
+    svc = DataService(str(tmp_path / "pool_mt.db"), readers=4)
+    svc.seed_fake_stock(n=50)
+    errors = []
+
+    def reader():
+        try:
+            for _ in range(50):
+                assert len(svc.list_stock()) >= 50
+                svc.get_recent_transactions()
+        except Exception as e:  # pragma: no cover - hata raporu için
+            errors.append(e)
+
+    def writer():
+        for i in range(50):
+            with svc.db.tx() as cx:
+                cx.execute("UPDATE stock_items SET qty = qty + 1 WHERE code=?", (f"STK{i % 50 + 1:04}",))
+
+    threads = [threading.Thread(target=reader) for _ in range(6)] + [threading.Thread(target=writer)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert svc.db._pool._opened <= 4
+
+
+def test_memory_db_falls_back_to_writer():
+    svc = DataService(":memory:")
+    with svc.db.read() as rcx:
+        assert rcx is svc.db.cx
+    assert svc.list_stock() == []
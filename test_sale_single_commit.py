@@ -0,0 +1,64 @@
+import pytest
+
+from app.data.service import DataService
+
+
+def _svc(tmp_path):
+    svc = DataService(str(tmp_path / "one_commit.db"))
+    with svc.db.tx() as cx:
+        cx.execute("INSERT INTO stock_items(code,name,qty) VALUES ('TEK1','Gram Altın',10)")
+    return svc
+
+
+def _sale(svc, doc_no="T1"):
+    return svc.create_sale(
+        {"type": "Satış", "doc_no": doc_no, "date": "2025-09-20", "customer_text": "Yeni Müşteri — 0555 123 45 67",
+         "pay_type": "Nakit", "paid_amount": "400", "discount": "0"},
+        [{"code": "TEK1", "name": "Gram Altın", "qty": 1, "unit_price": "1000", "line_total": "1000"}])
+
+
+def _counts(svc):
+    return tuple(svc.db.query_one(f"SELECT COUNT(*) FROM {t}")[0]
+                 for t in ("customers", "sales", "customer_ledger", "cash_ledger"))
+
+
+def test_sale_with_new_customer_and_cash_is_one_commit(tmp_path):
+    svc = _svc(tmp_path)
+    statements = []
+    svc.db.cx.set_trace_callback(statements.append)
+    _sale(svc)
+    svc.db.cx.set_trace_callback(None)
+
+    assert sum(s.startswith("BEGIN") for s in statements) == 1
+    assert sum(s == "COMMIT" for s in statements) == 1
+    assert _counts(svc) == (1, 1, 2, 1)
+    svc.close()
+
+
+def test_cash_entry_failure_rolls_back_whole_sale(tmp_path, monkeypatch):
+    svc = _svc(tmp_path)
+    emitted = []
+    svc.saleCommitted.connect(emitted.append)
+    svc.cashChanged.connect(lambda: emitted.append("cash"))
+
+    def broken(**_):
+        raise RuntimeError("disk dolu")
+    monkeypatch.setattr(svc, "record_cash_entry", broken)
+
+    with pytest.raises(RuntimeError):
+        _sale(svc)
+    assert _counts(svc) == (0, 0, 0, 0)
+    assert svc.db.query_one("SELECT qty FROM stock_items WHERE code='TEK1'")[0] == 10
+    assert emitted == []
+    svc.close()
+
+
+def test_signals_fire_after_outer_commit(tmp_path):
+    svc = _svc(tmp_path)
+    seen = []
+    # Okuma havuzu ayrı bağlantıdır: yalnızca commit edilmiş veriyi görür
+    svc.saleCommitted.connect(lambda p: seen.append(("sale", _counts(svc))))
+    svc.cashChanged.connect(lambda: seen.append(("cash", _counts(svc))))
+    _sale(svc)
+    assert seen == [("cash", (1, 1, 2, 1)), ("sale", (1, 1, 2, 1))]
+    svc.close()
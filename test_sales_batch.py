@@ -0,0 +1,100 @@
+from app.data.service import DataService
+
+
+def _svc(path):
+    svc = DataService(path)
+    with svc.db.tx() as cx:
+        cx.executemany("INSERT INTO stock_items(code,name,qty) VALUES (?,?,?)",
+                       [("BT1", "Bilezik", 5), ("BT2", "Yüzük", 2)])
+        cx.execute("INSERT INTO customers(name, phone) VALUES ('Ayşe Kaya','0532')")
+    return svc
+
+
+def _sales():
+    def h(doc_no, type="Satış", cust="", pay_type="Nakit", paid="100", discount="0"):
+        return {"type": type, "doc_no": doc_no, "date": "2025-09-20", "customer_text": cust,
+                "pay_type": pay_type, "paid_amount": paid, "discount": discount}
+
+    def it(code, qty, price="100", name="Ürün", total=None):
+        return {"code": code, "name": name, "qty": qty, "unit_price": price, "line_total": total or str(int(price) * qty)}
+
+    return [
+        (h("B1", cust="Ayşe Kaya — 0532", paid="50"), [it("BT1", 2), it("BT2", 1)]),
+        (h("B2", cust="Yeni Kişi — 0555", pay_type="Veresiye"), [it("BT1", 1, "250,50", total="250,50")]),
+        (h("B3", pay_type="Kart", paid="1000", discount="10"), [it("BT2", 2)]),      # BT2'de 1 kaldı → hata
+        (h("B4", type="Alış", cust="Yeni Kişi — 0555", paid="300"), [it("YENI1", 3, name="Çeyrek")]),
+        (h("B5", cust="Yeni Kişi — 0555", paid="200"), [it("YENI1", 2), it("BT1", 2)]),
+        ({"type": "Satış", "date": "2025-09-20"}, [{"code": "BT1"}]),               # bozuk kayıt
+    ]
+
+
+SNAPSHOT = {
+    "stock_items": "SELECT code, name, qty FROM stock_items ORDER BY code",
+    "customers": "SELECT name, phone, balance_kurus, last_txn_at FROM customers ORDER BY id",
+    "sales": "SELECT id, type, doc_no, customer_id, pay_type, paid_kurus, discount_kurus, total_kurus, due_kurus FROM sales ORDER BY id",
+    "sale_items": "SELECT sale_id, stock_id, code, qty, unit_price_kurus, line_total_kurus FROM sale_items ORDER BY id",
+    "stock_moves": "SELECT stock_id, sale_id, move_type, qty FROM stock_moves ORDER BY id",
+    "customer_ledger": "SELECT customer_id, sale_id, direction, amount_kurus, desc FROM customer_ledger ORDER BY id",
+    "cash_ledger": "SELECT account, type, category, description, amount_kurus, customer_id, sale_id, ref_no FROM cash_ledger ORDER BY id",
+    "daily_sales_agg": "SELECT * FROM daily_sales_agg ORDER BY date, type, pay_type",
+}
+
+
+def _snapshot(svc):
+    return {t: [tuple(r) for r in svc.db.query(sql)] for t, sql in SNAPSHOT.items()}
+
+
+def test_batch_matches_one_by_one(tmp_path):
+    single = _svc(str(tmp_path / "single.db"))
+    expected = []
+    for header, items in _sales():
+        try:
+            expected.append(single.create_sale(header, items)["sale_id"])
+        except (KeyError, ValueError):
+            expected.append(None)
+
+    batch = _svc(str(tmp_path / "batch.db"))
+    results = batch.create_sales_batch(iter(_sales()), chunk_size=4)
+    assert [r.get("sale_id") for r in results] == expected
+    assert [r["success"] for r in results] == [True, True, False, True, True, False]
+    assert results[2]["message"] == "Yetersiz stok:\n- BT2 (Ürün): 2 adet istenen, 1 adet mevcut"
+    assert results[2]["doc_no"] == "B3"
+    assert _snapshot(batch) == _snapshot(single)
+    single.close(); batch.close()
+
+
+def test_one_notification_per_chunk(tmp_path):
+    svc = _svc(str(tmp_path / "signals.db"))
+    batches, stock_events = [], []
+    svc.salesBatchCommitted.connect(batches.append)
+    svc.saleCommitted.connect(lambda p: stock_events.append("sale"))
+    svc.stockChanged.connect(lambda: stock_events.append("stock"))
+    svc.create_sales_batch(_sales(), chunk_size=3)
+    assert [len(b) for b in batches] == [2, 2]
+    assert stock_events == ["stock", "stock"]
+    svc.close()
+
+
+def test_database_error_isolates_the_bad_sale(tmp_path):
+    svc = _svc(str(tmp_path / "isolate.db"))
+    with svc.db.tx() as cx:
+        cx.execute("CREATE TRIGGER no_b2 BEFORE INSERT ON sales WHEN NEW.doc_no='B2' "
+                   "BEGIN SELECT RAISE(ABORT, 'B2 reddedildi'); END")
+    results = svc.create_sales_batch(_sales()[:2])
+    assert [r["success"] for r in results] == [True, False]
+    assert results[1]["message"] == "B2 reddedildi"
+    assert svc.db.query_one("SELECT COUNT(*) FROM sales")[0] == 1
+    svc.close()
+
+
+def test_malformed_item_is_rejected_alone(tmp_path):
+    svc = _svc(str(tmp_path / "malformed.db"))
+    b1, b2, _, b4, *_ = _sales()
+    bad = ({"type": "Satış", "date": "2025-09-20", "doc_no": "X1"},
+           [{"code": "BT1", "qty": 1, "line_total": "100"}])                      # ad/birim fiyat yok
+    results = svc.create_sales_batch([b1, b2, b4, bad], chunk_size=2)
+    assert [r["success"] for r in results] == [True, True, True, False]
+    assert results[3]["doc_no"] == "X1"
+    assert svc.db.query_one("SELECT COUNT(*) FROM sales")[0] == 3
+    assert svc.db.query_one("SELECT qty FROM stock_items WHERE code = 'YENI1'")[0] == 3
+    svc.close()
@@ -0,0 +1,113 @@
+import pytest
+
+from app.data import migrations, search
+from app.data.db import DB
+from app.data.service import DataService
+
+
+def _svc(tmp_path):
+    svc = DataService(str(tmp_path / "search.db"))
+    with svc.db.tx() as cx:
+        cx.executemany("INSERT INTO stock_items(code,name,category,qty) VALUES (?,?,?,1)", [
+            ("STK0001", "Şahmeran Bilezik 22 Ayar", "Bilezik"),
+            ("STK0002", "IŞILTI Kolye", "Kolye"),
+            ("STK0003", "İnce Burma Yüzük", "Yüzük"),
+            ("STK0004", "Gram Altın", "Gram"),
+        ])
+        cx.executemany("INSERT INTO customers(name, phone) VALUES (?,?)", [
+            ("Işık Çelik", "0532 111 22 33"), ("İsmail Öztürk", "0555 000 11 22"),
+        ])
+    return svc
+
+
+def _codes(svc, ids):
+    return [svc.db.query_one("SELECT code FROM stock_items WHERE id=?", (i,))[0] for i in ids]
+
+
+def test_turkish_folding():
+    assert search.fold("İSTANBUL ışık ŞÜĞÇÖ") == "istanbul isik sugco"
+
+
+def test_search_stock_turkish_case(tmp_path):
+    svc = _svc(tmp_path)
+    assert _codes(svc, svc.search_stock("sahmeran")) == ["STK0001"]
+    assert _codes(svc, svc.search_stock("ışıltı")) == ["STK0002"]
+    assert _codes(svc, svc.search_stock("INCE")) == ["STK0003"]
+    assert _codes(svc, svc.search_stock("burma yüz")) == ["STK0003"]
+    assert _codes(svc, svc.search_stock("stk0004")) == ["STK0004"]
+    assert _codes(svc, svc.search_stock("22")) == ["STK0001"]       # 3 harften kısa → LIKE yolu
+    assert svc.search_stock("") == [] and svc.search_stock("yok-böyle") == []
+    assert len(svc.search_stock("stk", limit=2)) == 2
+    svc.close()
+
+
+def test_ranking_prefers_head_match(tmp_path):
+    svc = _svc(tmp_path)
+    with svc.db.tx() as cx:
+        cx.execute("INSERT INTO stock_items(code,name,category,qty) VALUES ('STK0005','Bileklik Gram','Gram',1)")
+    # STK0004 adı "gram" ile başlıyor; daha yeni STK0005 yalnızca ikinci kelimede içeriyor
+    assert _codes(svc, svc.search_stock("gram")) == ["STK0004", "STK0005"]
+    svc.close()
+
+
+@pytest.mark.parametrize("head_scan", [500, 3])
+def test_exact_and_head_matches_outside_window(tmp_path, monkeypatch, head_scan):
+    monkeypatch.setattr(search, "WINDOW", 5)
+    monkeypatch.setattr(search, "SHORT_SCAN", 5)
+    monkeypatch.setattr(search, "HEAD_SCAN", head_scan)        # 3: yaygın baş → trigram "^" yolu
+    svc = _svc(tmp_path)
+    with svc.db.tx() as cx:
+        cx.executemany("INSERT INTO stock_items(code,name,category,qty) VALUES (?,?,?,1)",
+                       [(f"YNI{i:04}", f"Altın Gram Işıltı Kolye {i}", "Kolye") for i in range(30)]
+                       + [(f"SET{i:04}", f"Işıltı Kolye Seti {i % 2} ab", "Kolye") for i in range(30)])
+    # Eski kayıtlar "içinde geçer" penceresinin dışında kalsa da: tam eşleşme > ad başı > diğerleri
+    assert _codes(svc, svc.search_stock("gram", limit=3)) == ["STK0004", "YNI0029", "YNI0028"]
+    assert _codes(svc, svc.search_stock("ışıltı kolye", limit=3)) == ["STK0002", "SET0029", "SET0028"]
+    assert _codes(svc, svc.search_stock("IŞILTI kolye seti 0 ab", limit=2)) == ["SET0028", "SET0026"]
+    assert _codes(svc, svc.search_stock("stk0001", limit=1)) == ["STK0001"]
+    # Yalnızca kısa kelimeler: tam/ad başı eşleşme bulunur, "içinde geçer" en yeni SHORT_SCAN kayıtla sınırlı
+    with svc.db.tx() as cx:
+        cx.execute("INSERT INTO stock_items(code,name,category,qty) VALUES ('ESK1','ab 22',NULL,1)")
+        cx.executemany("INSERT INTO stock_items(code,name,category,qty) VALUES (?,?,?,1)",
+                       [(f"SN{i:04}", f"Yeni ab {i}", "Set") for i in range(10)])
+    assert _codes(svc, svc.search_stock("AB 22")) == ["ESK1"]
+    assert _codes(svc, svc.search_stock("ab", limit=3)) == ["ESK1", "SN0009", "SN0008"]
+    assert "SET0029" not in _codes(svc, svc.search_stock("ab"))
+    svc.close()
+
+
+def test_triggers_keep_index_in_sync(tmp_path):
+    svc = _svc(tmp_path)
+    ids = svc.search_customers("isik")
+    assert len(ids) == 1
+    assert svc.search_customers("0555") != []
+    with svc.db.tx() as cx:
+        cx.execute("UPDATE customers SET name='Işık Demir' WHERE id=?", (ids[0],))
+    assert svc.search_customers("demir") == ids and svc.search_customers("celik") == []
+
+    svc.record_cash_entry(date="2025-09-01", time="10:00", account="Kasa", type="Çıkış",
+                          category="Masraf", description="Çay/kahve İKRAMI", amount=120)
+    cid = svc.search_cash("ikram")
+    assert len(cid) == 1
+    with svc.db.tx() as cx:
+        cx.execute("DELETE FROM cash_ledger WHERE id=?", (cid[0],))
+        cx.execute("INSERT OR REPLACE INTO stock_items(code,name,qty) VALUES ('STK0004','Çeyrek',1)")
+    assert svc.search_cash("ikram") == []
+    assert _codes(svc, svc.search_stock("ceyrek")) == ["STK0004"]
+    assert svc.search_stock("gram alt") == []
+    svc.close()
+
+
+def test_v6_indexes_existing_rows(tmp_path, monkeypatch):
+    path = str(tmp_path / "legacy.db")
+    monkeypatch.setattr(migrations, "MIGRATIONS", [m for m in migrations.MIGRATIONS if m[0] < 6])
+    db = DB(path)
+    with db.tx() as cx:
+        cx.execute("INSERT INTO stock_items(code,name,qty) VALUES ('OLD1','Eski Çeyrek',1)")
+    db.close()
+    monkeypatch.undo()
+
+    svc = DataService(path)
+    assert 6 in svc.db.applied_migrations
+    assert len(svc.search_stock("ceyrek")) == 1
+    svc.close()
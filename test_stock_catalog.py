@@ -0,0 +1,115 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "app"))
+
+from data.service import DataService
+
+
+def _svc(tmp_path):
+    svc = DataService(str(tmp_path / "catalog.db"))
+    svc.seed_fake_stock(n=12, replace=True)
+    return svc
+
+
+def _assert_in_sync(svc):
+    cat = svc.catalog
+    db = {r["code"]: dict(r) for r in svc.db.query(
+        "SELECT id, code, name, qty, gram, sell_price, buy_price FROM stock_items")}
+    assert len(cat) == len(db)
+    for code, row in db.items():
+        got = cat.get(code)
+        assert got is not None and got["id"] == row["id"] and got["qty"] == row["qty"] and got["name"] == row["name"]
+        pos = cat._by_code[code]
+        assert (cat.ids[pos], cat.qty[pos], cat.sell[pos]) == (row["id"], row["qty"], row["sell_price"])
+    assert cat.totals()["qty"] == sum(r["qty"] for r in db.values())
+
+
+def _sale(svc, code, qty, type="Satış", name="Ürün"):
+    svc.create_sale({"type": type, "doc_no": "K", "date": "2025-09-20", "customer_text": "",
+                     "pay_type": "Kart", "paid_amount": "0", "discount": "0"},
+                    [{"code": code, "name": name, "qty": qty, "unit_price": "1", "line_total": str(qty)}])
+
+
+def test_catalog_follows_committed_writes(tmp_path):
+    svc = _svc(tmp_path)
+    deltas = []
+    svc.stockDelta.connect(deltas.append)
+    _assert_in_sync(svc)
+    first = svc.catalog.get("STK0001")
+
+    svc.upsert_stock_item({"code": "STK0001", "name": first["name"], "category": first["category"], "milyem": 995,
+                           "ayar": 24, "gram": 1.0, "qty": 40, "buy_price": 1, "sell_price": 2, "isc_tip": "TL",
+                           "isc_alinan": 0, "isc_verilen": 0, "vat": 20, "critical_qty": 1})
+    _sale(svc, "STK0001", 3)
+    _sale(svc, "YENI01", 2, type="Alış", name="Çeyrek")
+    assert svc.catalog.get("STK0001")["qty"] == 37 and svc.catalog.get("YENI01")["qty"] == 2
+
+    with pytest.raises(ValueError):
+        _sale(svc, "STK0001", 1000)           # geri alınan satış delta üretmez
+    svc.delete_stock_item("STK0005")          # ortadan silme: son satır boşluğa taşınır
+    assert "STK0005" not in svc.catalog
+    _assert_in_sync(svc)
+
+    sid = first["id"]
+    assert [d["changed"] for d in deltas[:2]] == [[sid], [sid]]
+    assert deltas[3]["removed"] and deltas[3]["changed"] == []
+    assert [d["version"] for d in deltas] == sorted({d["version"] for d in deltas})
+
+    svc.seed_fake_stock(n=5, replace=True)
+    assert deltas[-1]["reset"] and len(svc.catalog) == 5
+    _assert_in_sync(svc)
+    svc.close()
+
+
+def test_batch_sales_refresh_only_touched_items(tmp_path):
+    svc = _svc(tmp_path)
+    deltas = []
+    svc.stockDelta.connect(deltas.append)
+    header = {"type": "Satış", "date": "2025-09-20", "customer_text": "", "pay_type": "Kart",
+              "paid_amount": "0", "discount": "0"}
+    item = {"name": "Ürün", "qty": 1, "unit_price": "1", "line_total": "1"}
+    svc.create_sales_batch([(dict(header, doc_no=f"B{i}"), [dict(item, code=f"STK{i + 1:04}")]) for i in range(3)])
+    ids = sorted(svc.catalog.get(f"STK{i + 1:04}")["id"] for i in range(3))
+    assert [d["changed"] for d in deltas] == [ids]
+    _assert_in_sync(svc)
+    svc.close()
+
+
+def test_snapshot_columns_is_a_detached_copy(tmp_path):
+    svc = _svc(tmp_path)
+    a, b = svc.catalog.get("STK0002"), svc.catalog.get("STK0007")
+    full = svc.catalog.snapshot_columns()
+    assert list(full["ids"]) == [r["id"] for r in full["rows"]] and len(full["ids"]) == 12
+    part = svc.catalog.snapshot_columns([b["id"], -1, a["id"]])   # verilen sıra; olmayan id atlanır
+    assert list(part["ids"]) == [b["id"], a["id"]] and list(part["qty"]) == [b["qty"], a["qty"]]
+    assert [r["code"] for r in part["rows"]] == ["STK0007", "STK0002"]
+    assert svc.catalog.labels[part["category"][1]] == (a["category"] or "")
+    _sale(svc, "STK0002", 1)
+    assert list(part["qty"]) == [b["qty"], a["qty"]] and full["qty"][list(full["ids"]).index(a["id"])] == a["qty"]
+    svc.close()
+
+
+def test_stock_page_updates_only_changed_rows(tmp_path):
+    QtWidgets = pytest.importorskip("PyQt6.QtWidgets")
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    from pages.stock import StockPage
+
+    svc = _svc(tmp_path)
+    page = StockPage(svc)
+    resets = []
+    page.model.modelReset.connect(lambda: resets.append(page.model.rowCount()))
+
+    before = svc.catalog.get("STK0003")["qty"]
+    _sale(svc, "STK0003", 1)
+    row = page.model.row_of("STK0003")
+    assert page.model.index(row, 6).data() == str(before - 1)
+    assert resets == []                       # yalnızca satır güncellendi
+
+    _sale(svc, "YENI02", 1, type="Alış")     # yeni ürün → depoya eklenir (satır sayısı değişti: tek sıfırlama)
+    assert resets == [13] and page.model.rowCount() == 13
+    page.deleteLater(); app.processEvents()
+    svc.close()
@@ -0,0 +1,122 @@
+import multiprocessing as mp
+import sys
+import threading
+
+import pytest
+
+from app.data.service import DataService
+
+LAST_UNITS = 3
+
+
+def _header(doc_no):
+    return {"type": "Satış", "doc_no": doc_no, "date": "2025-09-20", "customer_text": "",
+            "pay_type": "Nakit", "paid_amount": "100", "discount": "0"}
+
+
+ITEMS = [{"code": "SON1", "name": "Son Bilezik", "qty": 1, "unit_price": "100", "line_total": "100"}]
+
+
+def _prepare(path):
+    svc = DataService(path)
+    with svc.db.tx() as cx:
+        cx.execute("INSERT INTO stock_items(code,name,qty) VALUES ('SON1','Son Bilezik',?)", (LAST_UNITS,))
+    return svc
+
+
+def _sell_in_process(path, doc_no, barrier, results):
+    svc = DataService(path)
+    barrier.wait()
+    try:
+        svc.create_sale(_header(doc_no), ITEMS)
+        results.put("ok")
+    except ValueError:
+        results.put("yetersiz")
+    finally:
+        svc.close()
+
+
+def _assert_sold_exactly_last_units(svc, outcomes):
+    assert outcomes.count("ok") == LAST_UNITS
+    assert outcomes.count("yetersiz") == len(outcomes) - LAST_UNITS
+    assert svc.db.query_one("SELECT qty FROM stock_items WHERE code='SON1'")[0] == 0
+    assert svc.db.query_one("SELECT COUNT(*) FROM sales")[0] == LAST_UNITS
+    assert svc.db.query_one("SELECT SUM(qty) FROM stock_moves")[0] == LAST_UNITS
+
+
+def _race_threads(svc, n=8):
+    barrier = threading.Barrier(n)
+    outcomes = []
+
+    def sell(i):
+        barrier.wait()
+        try:
+            svc.create_sale(_header(f"T{i}"), ITEMS)
+            outcomes.append("ok")
+        except ValueError as e:
+            assert str(e) == "Yetersiz stok:\n- SON1 (Son Bilezik): 1 adet istenen, 0 adet mevcut"
+            outcomes.append("yetersiz")
+
+    threads = [threading.Thread(target=sell, args=(i,)) for i in range(n)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return outcomes
+
+
+def test_threads_cannot_oversell_last_units(tmp_path):
+    # Sık iş parçacığı geçişi: kontrol ile düşüm arasındaki olası yarışı görünür kılar
+    old_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        for round_no in range(5):
+            svc = _prepare(str(tmp_path / f"threads{round_no}.db"))
+            _assert_sold_exactly_last_units(svc, _race_threads(svc))
+            svc.close()
+    finally:
+        sys.setswitchinterval(old_interval)
+
+
+def test_terminals_in_separate_processes_cannot_oversell(tmp_path):
+    path = str(tmp_path / "terminals.db")
+    svc = _prepare(path)
+    ctx = mp.get_context("spawn")
+    barrier, results = ctx.Barrier(6), ctx.Queue()
+    procs = [ctx.Process(target=_sell_in_process, args=(path, f"P{i}", barrier, results)) for i in range(6)]
+    for p in procs:
+        p.start()
+    outcomes = [results.get(timeout=60) for _ in procs]
+    for p in procs:
+        p.join(10)
+    _assert_sold_exactly_last_units(svc, outcomes)
+    svc.close()
+
+
+def test_duplicate_lines_are_checked_together(tmp_path):
+    svc = _prepare(str(tmp_path / "dup.db"))
+    with pytest.raises(ValueError) as e:
+        svc.create_sale(_header("D1"), [dict(ITEMS[0], qty=2), dict(ITEMS[0], qty=2)])
+    assert str(e.value) == "Yetersiz stok:\n- SON1 (Son Bilezik): 4 adet istenen, 3 adet mevcut"
+    assert svc.db.query_one("SELECT qty FROM stock_items WHERE code='SON1'")[0] == LAST_UNITS
+    assert svc.db.query_one("SELECT COUNT(*) FROM sales")[0] == 0
+    svc.close()
+
+
+def test_unknown_code_and_non_positive_qty_are_rejected(tmp_path):
+    svc = _prepare(str(tmp_path / "unknown.db"))
+    unknown = dict(ITEMS[0], code="ZZZ", name="Yok")
+    with pytest.raises(ValueError) as e:
+        svc.create_sale(_header("U1"), [unknown])
+    assert str(e.value) == "Yetersiz stok:\n- ZZZ (Yok): 1 adet istenen, 0 adet mevcut"
+    for qty in (0, -2):
+        for item in (unknown, ITEMS[0]):
+            with pytest.raises(ValueError, match="Geçersiz adet"):
+                svc.create_sale(_header("U2"), [dict(item, qty=qty)])
+    results = svc.create_sales_batch([(_header("U3"), [unknown]), (_header("U4"), [dict(unknown, qty=0)]),
+                                      (_header("U5"), ITEMS)])
+    assert [r["success"] for r in results] == [False, False, True]
+    assert results[0]["message"].startswith("Yetersiz stok") and "Geçersiz adet" in results[1]["message"]
+    assert svc.db.query_one("SELECT qty FROM stock_items WHERE code='SON1'")[0] == LAST_UNITS - 1
+    assert svc.db.query_one("SELECT COUNT(*) FROM sales")[0] == 1
+    svc.close()
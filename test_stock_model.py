@@ -0,0 +1,103 @@
+import pytest
+
+pytest.importorskip("PyQt6.QtWidgets")
+from PyQt6.QtCore import Qt
+
+from data.service import DataService
+
+
+@pytest.fixture
+def page(tmp_path, app):
+    from pages.stock import StockPage
+    svc = DataService(str(tmp_path / "model.db"))
+    with svc.db.tx() as cx:
+        cx.executemany("INSERT INTO stock_items(code, name, category, gram, qty, sell_price, buy_price, critical_qty, "
+                       "isc_tip, vat) VALUES (?,?,?,?,?,?,?,?,?,?)",
+                       [(f"K{i:03}", f"{'Bilezik' if i % 2 else 'Yüzük'} {i}", "Bilezik" if i % 2 else "Yüzük",
+                         1.0 + i, 10 - i % 10, 100.0 * (30 - i), 50.0, 3, "TL", 20.0) for i in range(30)])
+    svc._stock_written()
+    page = StockPage(svc)
+    yield page
+    page.deleteLater()
+    app.processEvents()
+    svc.close()
+
+
+def _column(model, col):
+    return [model.index(r, col).data() for r in range(model.rowCount())]
+
+
+def test_filter_sort_and_lazy_formatting(page):
+    m = page.model
+    assert m.rowCount() == 30 and m.index(0, 7).data() == "50.00 ₺"
+    assert m.index(0, 12).data() == "20.00 %" and m.index(0, 9).data() == "TL"
+    page.filter.setCurrentText("Bilezik")
+    page.search.setText("1")
+    page.apply_filters()                    # arama kutusu gecikmeli (debounce); hemen uygula
+    assert sorted(_column(m, 0)) == [f"K{i:03}" for i in range(30) if i % 2 and "1" in str(i)]
+
+    page.table.sortByColumn(8, Qt.SortOrder.DescendingOrder)     # satış fiyatı: sayısal sıralama
+    prices = [float(t.split()[0]) for t in _column(m, 8)]
+    assert prices == sorted(prices, reverse=True)
+    t = page.data.catalog.totals()
+    page.filter.setCurrentText("Tümü")
+    page.search.setText("")
+    page.apply_filters()
+    s = m.summary()
+    assert (s["count"], s["qty"], s["critical"]) == (t["count"], t["qty"], t["critical"])
+    assert s["sell_value"] == pytest.approx(t["sell_value"])
+
+
+def test_critical_qty_cell_is_highlighted(page):
+    m = page.model
+    row = m.row_of("K008")                  # qty 2 <= kritik 3
+    assert m.index(row, 6).data(Qt.ItemDataRole.BackgroundRole) is not None
+    assert m.index(m.row_of("K001"), 6).data(Qt.ItemDataRole.BackgroundRole) is None
+    assert m.row_dict(row)["Adet"] == 2 and m.row_dict(row)["Kategori"] == "Yüzük"
+
+
+def test_delta_resorts_and_keeps_selection(page):
+    m, svc = page.model, page.data
+    page.table.sortByColumn(6, Qt.SortOrder.AscendingOrder)      # adede göre
+    page.table.selectRow(m.row_of("K005"))
+    header = {"type": "Satış", "date": "2025-09-20", "customer_text": "", "pay_type": "Nakit",
+              "paid_amount": "0", "discount": "0", "doc_no": "D1"}
+    svc.create_sale(header, [{"code": "K005", "name": "x", "qty": 4, "unit_price": "1", "line_total": "4"}])
+
+    assert m.index(m.row_of("K005"), 6).data() == "1"
+    qty = [int(v) for v in _column(m, 6)]
+    assert qty == sorted(qty)
+    selected = page.table.selectionModel().selectedRows()
+    assert [m.code_at(ix.row()) for ix in selected] == ["K005"]   # seçim satırla birlikte taşındı
+
+
+def test_search_is_debounced_and_narrowing_keeps_sort(page, monkeypatch):
+    m = page.model
+    page.table.sortByColumn(8, Qt.SortOrder.DescendingOrder)
+    page.search.setText("yüz")
+    assert m.rowCount() == 30 and page._search_timer.isActive()    # tuş başına süzme yok
+    page._search_timer.timeout.emit()
+    assert m.rowCount() == 15
+
+    monkeypatch.setattr(m, "_sorted", lambda view: pytest.fail("daraltma yeniden sıraladı"))
+    page.search.setText("YÜZÜK 2")                                 # katlanmış, öncekini içerir
+    page.apply_filters()
+    assert _column(m, 2) == [f"Yüzük {i}" for i in (2, 20, 22, 24, 26, 28)]    # fiyat azalan sırası korunur
+
+
+def test_added_and_removed_rows_are_applied_in_place(page, monkeypatch):
+    m, catalog = page.model, page.data.catalog
+    page.table.sortByColumn(0, Qt.SortOrder.AscendingOrder)
+    page.search.setText("yüzük 1")
+    page.apply_filters()
+    monkeypatch.setattr(m, "load", lambda catalog: pytest.fail("delta depoyu yeniden kurdu"))
+
+    with catalog._lock:
+        gone = catalog.get("K012")["id"]
+        new = dict(catalog.get("K014"), id=999, code="K100", name="Yüzük 100")
+    page.on_stock_delta(catalog.refresh_rows([gone, 999], [new]))
+    assert _column(m, 0) == ["K010", "K014", "K016", "K018", "K100"]
+    assert m.row_of("K012") is None and m.row_dict(m.row_of("K100"))["Gram"] == 15.0
+    page.search.setText("")
+    page.apply_filters()
+    assert m.rowCount() == 30 == len(catalog) and m.summary()["count"] == catalog.totals()["count"]
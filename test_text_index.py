@@ -0,0 +1,63 @@
+import random
+
+import pytest
+
+from app.data.search import fold
+from app.data.textindex import TextIndex, key_of
+
+WORDS = ["Bilezik", "Yüzük", "Kolye", "Işıltı", "ŞAHİN", "çeyrek", "Gram", "22", "ayar"]
+
+
+def _brute(ix, q):
+    q = fold(q).strip()
+    return [p for p, k in enumerate(ix.keys) if p not in ix._dead and q in k]
+
+
+@pytest.fixture
+def ix():
+    rnd = random.Random(5)
+    return TextIndex(key_of(f"K{i:05}", " ".join(rnd.sample(WORDS, 3)) + f" {i}") for i in range(3000))
+
+
+QUERIES = ["b", "bi", "bil", "bilezik", "ISIK", "ışıltı", "sahin", "k0012", "yüzük 1", "22 a", "zz", "", "  kolye  "]
+
+
+def test_find_matches_substring_scan(ix):
+    for q in QUERIES:
+        assert ix.find(q).tolist() == _brute(ix, q), q
+    # Alanlar ayrı: kod sonu + ad başı birlikte aranmaz
+    two = TextIndex([key_of("K1", "Bilezik"), key_of("K2", "Yüzük")])
+    assert two.find("1 bil").tolist() == [] and two.find("bil").tolist() == [0]
+
+
+def test_narrowing_refines_previous_result(ix, monkeypatch):
+    first = ix.find("çey")
+    assert first.tolist() == _brute(ix, "çey")
+
+    def no_rescan(q):
+        raise AssertionError(f"daraltma yeniden taradı: {q}")
+    monkeypatch.setattr(ix, "_candidates", no_rescan)
+    for q in ("çeyr", "çeyrek", "çeyrek 2", "çeyrek 21"):
+        hits = ix.find(q)
+        assert hits.tolist() == _brute(ix, q), q
+        assert set(hits.tolist()) <= set(first.tolist())
+    assert ix.find("çeyrek 21") is ix.find("ÇEYREK 21")   # aynı (katlanmış) sorgu önbellekten
+
+
+def test_incremental_updates_appends_and_removals(ix):
+    ix.find("zümrüt")
+    for p in range(0, 300, 3):
+        ix.set(p, key_of(f"Z{p}", "Zümrüt Yüzük"))
+    for p in range(1, 300, 7):
+        ix.remove(p)
+    ix.set(len(ix), key_of("YENİ1", "Zümrüt kolye"))
+    for q in ("zümrüt", "zü", "yeni", "yüzük", "k00001", "", "bilezik 2"):
+        want = _brute(ix, q) if q else [p for p in range(len(ix)) if p not in ix._dead]
+        assert ix.find(q).tolist() == want, q
+
+    # Kirli küme büyüyünce dizin aynı konumlarla yeniden kurulur
+    for p in range(2, 3000, 2):
+        ix.set(p, key_of(f"R{p}", "Reşat altın"))
+    assert len(ix._dirty) < 1000
+    assert ix.find("resat").tolist() == _brute(ix, "reşat") == list(range(2, 3000, 2))
+    assert ix.find("zümrüt").tolist() == _brute(ix, "zümrüt")
@@ -0,0 +1,64 @@
+import threading
+
+from app.data.service import DataService
+
+
+def _entry(i, amount=10.0):
+    return dict(date="2025-09-20", time="10:00", account="Kasa", type="Giriş",
+                category="Test", description=f"kayıt {i}", amount=amount)
+
+
+def test_async_writes_group_commit(tmp_path):
+    svc = DataService(str(tmp_path / "wq.db"))
+    futs = []
+
+    def producer(base):
+        for i in range(50):
+            futs.append(svc.record_cash_entry_async(**_entry(base + i)))
+
+    threads = [threading.Thread(target=producer, args=(k * 100,)) for k in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    for f in futs:
+        f.result(timeout=10)
+
+    assert len(svc.list_cash()) == 200
+    # Yakın zamanda gelen işler tek commit'te toplanır
+    assert svc.writer.jobs == 200
+    assert svc.writer.commits < 200
+    svc.close()
+
+
+def test_failed_job_only_rolls_back_itself(tmp_path):
+    svc = DataService(str(tmp_path / "wq_err.db"))
+
+    def bad():
+        with svc.db.tx() as cx:
+            cx.execute("INSERT INTO cash_ledger(date,account,type,amount_kurus) VALUES ('2025-01-01','Kasa','Giriş',100)")
+            raise RuntimeError("boom")
+
+    ok1 = svc.record_cash_entry_async(**_entry(1))
+    err = svc.submit_write(bad)
+    ok2 = svc.record_cash_entry_async(**_entry(2))
+    ok1.result(5); ok2.result(5)
+    assert isinstance(err.exception(5), RuntimeError)
+    assert [r["description"] for r in svc.list_cash()] == ["kayıt 2", "kayıt 1"]
+    svc.close()
+
+
+def test_signals_fire_after_commit(tmp_path):
+    svc = DataService(str(tmp_path / "wq_sig.db"))
+    seen = []
+
+    def job():
+        with svc.db.tx() as cx:
+            cx.execute("INSERT INTO cash_ledger(date,account,type,amount_kurus) VALUES ('2025-01-01','Kasa','Giriş',500)")
+            # commit sonrası çağrılmalı: okuma havuzu kaydı görebilmeli
+            svc.db.after_commit(lambda: seen.append(len(svc.list_cash())))
+        assert seen == []
+
+    svc.submit_write(job).result(5)
+    assert seen == [1]
+    svc.close()